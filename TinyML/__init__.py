@@ -1,3 +1,7 @@
 from .models import Model as Model
 from .models import load_model as load_model
 from .models import save_model as save_model
+from .internal.runtime.coalescing import BatchingPredictor as BatchingPredictor
+from .internal.runtime.encoding import InputEncoder as InputEncoder
+from .internal.runtime.preprocessing import compile_preprocessing as compile_preprocessing
+from .internal.serving.host import ModelHost as ModelHost
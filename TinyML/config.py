@@ -18,6 +18,11 @@ class _Config:
     @dataclass(frozen=True)
     class _FileStorageConfig:
         model_cache_dir: str = field(default=".tinycache/")
+        artifact_store_dir: str = field(default=".tinycache/store/")
+        artifact_store_prune_grace_seconds: float = field(default=300.0)
+        archive_buffer_bytes: int = field(default=1024 * 1024)
+        archive_format: str = field(default="tar")
+        archive_codec: str = field(default="zstd")
 
     @dataclass(frozen=True)
     class _LoggingConfig:
@@ -31,6 +36,11 @@ class _Config:
         max_fixing_attempts_train: int = field(default=3)
         max_fixing_attempts_predict: int = field(default=10)
         max_time_elapsed: int = field(default=600)
+        cascade_candidates: int = field(default=2)
+        cascade_calibration_fraction: float = field(default=0.2)
+        cascade_max_disagreement: float = field(default=0.01)
+        cascade_tolerance: float = field(default=1e-6)
+        cascade_min_saving: float = field(default=0.3)
 
     @dataclass(frozen=True)
     class _ExecutionConfig:
@@ -174,20 +184,46 @@ class _Config:
                 "def predict(sample: dict) -> dict:\n"
                 "    # todo: prediction code goes here\n"
                 "    pass\n"
+                "\n"
+                "def predict_batch(samples: pd.DataFrame) -> pd.DataFrame:\n"
+                "    # todo: vectorised prediction code goes here\n"
+                "    pass\n"
                 "```\n\n"
                 "You can add any imports or functionality to the code, but you must not change the overall structure "
-                "or the signature of the predict() function. The input parameter 'sample' will take a single input "
-                "sample for which a model inference must be produced. The contents of 'sample' will be as per the "
-                "input schema below, and the contents of the returned dictionary must be as per the output schema "
-                "below.\n\n"
+                "or the signatures of the predict() and predict_batch() functions. The input parameter 'sample' will "
+                "take a single input sample for which a model inference must be produced. The contents of 'sample' "
+                "will be as per the input schema below, and the contents of the returned dictionary must be as per "
+                "the output schema below. The input parameter 'samples' will take a pandas DataFrame with one row "
+                "per sample and one column per input schema field; predict_batch() must return a pandas DataFrame "
+                "with one row per input row, in the same order, and one column per output schema field. "
+                "predict_batch() must operate on the whole DataFrame at once, and must not loop over the rows.\n\n"
                 "# INPUT SCHEMA:\n```python\n${input_schema}```\n\n"
                 "# OUTPUT SCHEMA:\n```python\n${output_schema}```\n\n"
                 "The model in question has been trained using the following ML training script. Take a look at the "
                 "script in order to understand what type of model is being used, how it needs to be loaded, and what "
                 "type of input it expects.\n\n"
                 "# TRAINING CODE FOR REFERENCE:\n```python\n${training_code}```\n\n"
-                "The script must not use any packages that are not in ${allowed_packages}. Return only the completed "
-                "inference script, with no external explanations or commentary."
+                "If the model accepts NumPy arrays, avoid building a pandas DataFrame for every call to predict(). "
+                "Instead, create an encoder at the module level with 'from TinyML import InputEncoder' and "
+                "'encoder = InputEncoder(INPUT_SCHEMA)', where INPUT_SCHEMA is the input schema above. Then "
+                "'encoder.encode(sample)' returns a 2D NumPy array with one row and one column per input schema "
+                "field, in schema order, and 'encoder.encode_many(samples)' does the same for a DataFrame.\n\n"
+                "If the training code saves fitted scikit-learn preprocessors (StandardScaler, MinMaxScaler, "
+                "OneHotEncoder, LabelEncoder or ColumnTransformer), do not call their transform methods per request. "
+                "Instead, fuse them at the module level with 'from TinyML import compile_preprocessing' and "
+                '\'plan = compile_preprocessing([("scaler.joblib", ["column_a", "column_b"]), ...])\', listing '
+                "each saved preprocessor with the input columns it transforms, in the order in which the training code "
+                "stacks their outputs. Then 'plan.transform(sample)' returns the 2D feature array for a sample, a list "
+                "of samples, or a DataFrame.\n\n"
+                "If the model is a classifier, also define 'predict_with_confidence(sample: dict) -> tuple', returning "
+                "the output that predict() returns for the sample together with the model's predicted probability of "
+                "the predicted class, and 'predict_with_confidence_batch(samples: pd.DataFrame) -> tuple', returning "
+                "the DataFrame that predict_batch() returns together with a NumPy array of the same probability for "
+                "each row. Compute the prediction and the probability from a single call to the model's "
+                "predict_proba, on the whole DataFrame at once in the batch function.\n\n"
+                "The script must not use any packages that are not in ${allowed_packages}, except for the TinyML "
+                "InputEncoder and compile_preprocessing. Return only the completed inference script, with no external "
+                "explanations or commentary."
             )
         )
         prompt_inference_fix: Template = field(
@@ -202,14 +238,19 @@ class _Config:
                 "def predict(sample: dict) -> dict:\n"
                 "    # todo: prediction code goes here\n"
                 "    pass\n"
+                "\n"
+                "def predict_batch(samples: pd.DataFrame) -> pd.DataFrame:\n"
+                "    # todo: vectorised prediction code goes here\n"
+                "    pass\n"
                 "```\n\n"
                 "# INFERENCE CODE TO FIX:\n```python\n${inference_code}```\n"
                 "# IDENTIFIED ISSUES:\n${review}\n\n"
                 "# SPECIFIC ERRORS:\n${problems}\n\n"
-                "You must not change the signature of the predict() function, unless this was specifically called out "
-                "as one of the problems in the issues above. You also must not change the locations from which files "
-                "are loaded, or any of the packages being imported, unless explicitly called out as part of the fix "
-                "in the issues above. Return an explanation of the fix, followed by the fixed inference script."
+                "You must not change the signatures of the predict() and predict_batch() functions, unless this was "
+                "specifically called out as one of the problems in the issues above. You also must not change the "
+                "locations from which files are loaded, or any of the packages being imported, unless explicitly "
+                "called out as part of the fix in the issues above. Return an explanation of the fix, followed by the "
+                "fixed inference script."
             )
         )
         prompt_inference_review: Template = field(
@@ -224,6 +265,10 @@ class _Config:
                 "def predict(sample: dict) -> dict:\n"
                 "    # todo: prediction code goes here\n"
                 "    pass\n"
+                "\n"
+                "def predict_batch(samples: pd.DataFrame) -> pd.DataFrame:\n"
+                "    # todo: vectorised prediction code goes here\n"
+                "    pass\n"
                 "```\n\n"
                 "Here is the script that needs to be reviewed:\n"
                 "# INFERENCE CODE TO REVIEW:\n```python\n${inference_code}```\n\n"
@@ -239,6 +284,58 @@ class _Config:
     class _DataGenerationConfig:
         pass  # todo: implement
 
+    @dataclass(frozen=True)
+    class _InferenceConfig:
+        chunks_per_worker: int = field(default=4)
+        cache_max_size: int = field(default=10000)
+        cache_ttl_seconds: float | None = field(default=None)
+        warmup_samples: int = field(default=32)
+        warmup_batch_size: int = field(default=32)
+        warmup_batch_runs: int = field(default=5)
+        async_max_concurrency: int = field(default=8)
+        file_batch_size: int = field(default=65536)
+        constraint_sample_rate: float = field(default=0.01)
+        compile_trees_samples: int = field(default=256)
+        compile_trees_tolerance: float = field(default=1e-5)
+        preprocessing_check_samples: int = field(default=256)
+        preprocessing_check_tolerance: float = field(default=1e-9)
+        pickle_artifacts: bool = field(default=False)
+        metrics_latency_buckets: tuple = field(
+            default=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+        )
+        metrics_batch_size_buckets: tuple = field(default=tuple(2**i for i in range(17)))
+        metrics_stripes: int = field(default=16)
+        drift_buffer_size: int = field(default=1024)
+        drift_profile_bins: int = field(default=10)
+        drift_top_k: int = field(default=32)
+        drift_psi_threshold: float = field(default=0.2)
+        shadow_sample_rate: float = field(default=0.1)
+        shadow_workers: int = field(default=2)
+        shadow_queue_size: int = field(default=1000)
+        shadow_tolerance: float = field(default=1e-6)
+        shadow_latency_window: int = field(default=10000)
+        deadline_workers: int = field(default=8)
+        coalesce_max_batch_size: int = field(default=64)
+        coalesce_max_wait_ms: float = field(default=2.0)
+        compression_tolerance: float = field(default=0.01)
+        compression_samples: int = field(default=1000)
+        compression_holdout_fraction: float = field(default=0.1)
+        compression_latency_samples: int = field(default=32)
+        compression_tree_fractions: tuple = field(default=(0.5, 0.25, 0.1))
+        compression_distil_depths: tuple = field(default=(8, 12))
+
+    @dataclass(frozen=True)
+    class _ServingConfig:
+        host: str = field(default="127.0.0.1")
+        port: int = field(default=8000)
+        max_batch_size: int = field(default=64)
+        max_wait_ms: float = field(default=5.0)
+        host_memory_budget_bytes: int = field(default=4 * 1024**3)
+        workers: int = field(default=1)
+        reload_poll_seconds: float = field(default=2.0)
+        metrics_port: int = field(default=8001)
+        metrics_publish_seconds: float = field(default=1.0)
+
     # configuration objects
     file_storage: _FileStorageConfig = field(default_factory=_FileStorageConfig)
     logging: _LoggingConfig = field(default_factory=_LoggingConfig)
@@ -246,6 +343,8 @@ class _Config:
     code_generation: _CodeGenerationConfig = field(default_factory=_CodeGenerationConfig)
     execution: _ExecutionConfig = field(default_factory=_ExecutionConfig)
     data_generation: _DataGenerationConfig = field(default_factory=_DataGenerationConfig)
+    inference: _InferenceConfig = field(default_factory=_InferenceConfig)
+    serving: _ServingConfig = field(default_factory=_ServingConfig)
 
 
 # Instantiate configuration
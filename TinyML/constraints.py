@@ -42,6 +42,9 @@ Usage:
 import inspect
 from typing import Any, Callable, Optional
 
+import numpy as np
+import pandas as pd
+
 
 # todo: something to think about is how to represent constraints in cases where the model is not a
 # deterministic function, but rather represents a probability distribution P(Y|X), or even a distribution
@@ -67,6 +70,7 @@ class Constraint:
 
     Methods:
         evaluate(inputs, outputs): Evaluates the constraint on a given inputs/outputs pair.
+        evaluate_batch(inputs, outputs): Evaluates the constraint on every row of a batch of inputs/outputs.
 
     Example:
         non_negative = Constraint(
@@ -103,6 +107,10 @@ class Constraint:
 
         self.condition = condition
         self.description = description or "Unnamed constraint"
+        # Batch-level condition of constraints composed with &, | and ~, built from their operands' batch conditions
+        self._batch_condition: Callable[[pd.DataFrame, pd.DataFrame], np.ndarray] | None = None
+        # Whether the condition can be applied to whole DataFrames; None until first attempted
+        self._vectorised: bool | None = None
 
     def evaluate(self, inputs: Any, outputs: Any) -> bool:
         """
@@ -118,6 +126,41 @@ class Constraint:
         except Exception as e:
             raise RuntimeError(f"Constraint evaluation failed: {self.description}") from e
 
+    def evaluate_batch(self, inputs: pd.DataFrame, outputs: pd.DataFrame) -> np.ndarray:
+        """
+        Evaluate the constraint on every row of a batch of inputs/outputs pairs.
+
+        The condition is first applied to the whole DataFrames at once, which works for conditions built from
+        column lookups, arithmetic and comparisons, such as `outputs["score"] >= 0`. If that does not produce
+        one boolean per row, the condition is evaluated row by row instead, and the constraint is not vectorised
+        again on later calls.
+
+        :param pd.DataFrame inputs: The batch of inputs, with one row per sample.
+        :param pd.DataFrame outputs: The batch of outputs, with one row per sample.
+        :return: A boolean array with one element per row, True where the constraint is satisfied.
+        :raises RuntimeError: If an error occurs during row-by-row constraint evaluation.
+        """
+        if self._batch_condition is not None:
+            return self._batch_condition(inputs, outputs)
+
+        if self._vectorised is not False:
+            try:
+                result = np.asarray(self.condition(inputs, outputs))
+                if result.dtype == np.bool_ and result.shape == (len(outputs),):
+                    self._vectorised = True
+                    return result
+            except Exception:
+                pass
+            if self._vectorised is None:
+                self._vectorised = False
+
+        # A DataFrame without columns has no records, even if it has rows
+        input_rows = inputs.to_dict(orient="records") if len(inputs.columns) else [{}] * len(outputs)
+        output_rows = outputs.to_dict(orient="records") if len(outputs.columns) else [{}] * len(outputs)
+        return np.fromiter(
+            (bool(self.evaluate(x, y)) for x, y in zip(input_rows, output_rows)), dtype=np.bool_, count=len(outputs)
+        )
+
     def __str__(self) -> str:
         return f"Constraint(description={self.description})"
 
@@ -128,11 +171,17 @@ class Constraint:
         :param Constraint other: Another constraint to combine with.
         :return: A new constraint that is satisfied if both constraints are satisfied.
         """
-        return Constraint(
+        combined = Constraint(
             condition=lambda inputs, outputs: self.evaluate(inputs, outputs) and other.evaluate(inputs, outputs),
             description=f"({self.description}) AND ({other.description})",
         )
 
+        def batch_condition(inputs: pd.DataFrame, outputs: pd.DataFrame) -> np.ndarray:
+            return self.evaluate_batch(inputs, outputs) & other.evaluate_batch(inputs, outputs)
+
+        combined._batch_condition = batch_condition
+        return combined
+
     def __or__(self, other: "Constraint") -> "Constraint":
         """
         Combine this constraint with another using logical OR.
@@ -140,18 +189,26 @@ class Constraint:
         :param Constraint other: Another constraint to combine with.
         :return: A new constraint that is satisfied if either constraint is satisfied.
         """
-        return Constraint(
+        combined = Constraint(
             condition=lambda inputs, outputs: self.evaluate(inputs, outputs) or other.evaluate(inputs, outputs),
             description=f"({self.description}) OR ({other.description})",
         )
 
+        def batch_condition(inputs: pd.DataFrame, outputs: pd.DataFrame) -> np.ndarray:
+            return self.evaluate_batch(inputs, outputs) | other.evaluate_batch(inputs, outputs)
+
+        combined._batch_condition = batch_condition
+        return combined
+
     def __invert__(self) -> "Constraint":
         """
         Negate this constraint (logical NOT).
 
         :return: A new constraint that is satisfied if this constraint is not satisfied.
         """
-        return Constraint(
+        negated = Constraint(
             condition=lambda inputs, outputs: not self.evaluate(inputs, outputs),
             description=f"NOT ({self.description})",
         )
+        negated._batch_condition = lambda inputs, outputs: ~self.evaluate_batch(inputs, outputs)
+        return negated
@@ -79,6 +79,14 @@ class ConstraintError(SmolmodelsError):
     pass
 
 
+class ConstraintViolationError(ConstraintError):
+    """
+    Raised when a model's prediction violates one of the model's constraints.
+    """
+
+    pass
+
+
 # todo: add more specific constraint-related errors once we have a better idea of how constraints are used
 
 
@@ -0,0 +1,24 @@
+"""
+Utilities for working with the input and output schemas of a model.
+
+Schemas map field names to types. Depending on how they were created, the types are either Python types
+(e.g. `int`), or the names of those types (e.g. `"int"`), as produced by schema inference.
+"""
+
+from typing import Any
+
+_TYPE_NAMES = {int: "int", float: "float", str: "str", bool: "bool"}
+
+
+def type_name(schema_type: Any) -> str:
+    """
+    Return the canonical name of a schema type, one of "int", "float", "str" or "bool".
+
+    :param schema_type: a Python type or a type name, as found in a model schema
+    :return: the canonical type name; unrecognised types are treated as "str"
+    """
+    if isinstance(schema_type, str):
+        name = schema_type.strip().lower()
+        name = {"integer": "int", "double": "float", "string": "str", "boolean": "bool"}.get(name, name)
+        return name if name in _TYPE_NAMES.values() else "str"
+    return _TYPE_NAMES.get(schema_type, "str")
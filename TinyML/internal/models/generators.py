@@ -11,7 +11,7 @@ import types
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Tuple
 
 import pandas as pd
 
@@ -31,9 +31,11 @@ from smolmodels.internal.models.generation.training import TrainingCodeGenerator
 from smolmodels.internal.models.search.best_first_policy import BestFirstSearchPolicy
 from smolmodels.internal.models.search.policy import SearchPolicy
 from smolmodels.internal.models.utils import join_task_statement, execute_node
+from TinyML.internal.models.validation.interface import InterfaceValidator
 from smolmodels.internal.models.validation.security import SecurityValidator
 from smolmodels.internal.models.validation.syntax import SyntaxValidator
 from smolmodels.internal.models.validation.validator import Validator, ValidationResult
+from TinyML.internal.runtime.cascade import build_cascade
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +53,7 @@ class GenerationResult:
     inference_module: types.ModuleType
     model_artifacts: List[Path]
     performance: Metric
+    cascade: Dict[str, Any] | None = None
 
 
 class ModelGenerator:
@@ -119,7 +122,11 @@ class ModelGenerator:
         self.infer_generator = InferenceCodeGenerator(provider)
         self.search_policy: SearchPolicy = BestFirstSearchPolicy(self.graph)
         self.train_validators: List[Validator] = [SyntaxValidator(), SecurityValidator()]
-        self.infer_validators: List[Validator] = [SyntaxValidator(), SecurityValidator()]  # todo: flesh this out
+        self.infer_validators: List[Validator] = [
+            SyntaxValidator(),
+            SecurityValidator(),
+            InterfaceValidator({"predict": 1, "predict_batch": 1}),
+        ]  # todo: flesh this out
 
     def generate(
         self,
@@ -128,6 +135,7 @@ class ModelGenerator:
         max_iterations=None,
         directives: List[Directive] = None,
         callbacks: List[Callback] = None,
+        cascade: bool = False,
     ) -> GenerationResult:
         """
         Generates a machine learning model based on the given problem statement, input schema, and output schema.
@@ -137,6 +145,9 @@ class ModelGenerator:
         :param max_iterations: The maximum number of iterations to spend generating the model.
         :param directives: A list of directives to apply to the model generation process.
         :param callbacks: A list of callbacks to apply to the model generation process.
+        :param cascade: Whether to try to combine a fast solution with the best solution into a cascade predictor,
+            calibrated on a held-out fraction of the dataset. The held-out data is not used for training, whether or
+            not a cascade is kept.
         :return: A GenerationResult object containing the training and inference code, and the predictor module.
         """
         # Check either timeout or max_iterations is set
@@ -159,6 +170,13 @@ class ModelGenerator:
         self._initialise_graph(config.model_search.initial_nodes, task, target_metric)
         logger.info(f"🔨 Initialised solution graph with {config.model_search.initial_nodes} nodes")
 
+        # Hold out part of the dataset to calibrate a cascade on, if one is requested
+        calibration_data = None
+        if cascade:
+            calibration_data = dataset.sample(frac=config.model_search.cascade_calibration_fraction, random_state=0)
+            dataset = dataset.drop(calibration_data.index).reset_index(drop=True)
+            calibration_data = calibration_data[[c for c in self.input_schema if c in calibration_data.columns]]
+
         # Explore the solution graph until the stopping condition is met
         best_node = self._produce_trained_model(task, run_id, dataset, target_metric, stop_condition)
         logger.info("🧠 Generating inference code for the best solution")
@@ -167,16 +185,29 @@ class ModelGenerator:
 
         self._cache_model_files(best_node)
 
+        inference_code = best_node.inference_code
+        model_artifacts = list(best_node.model_artifacts)
+        summary = None
+        if cascade:
+            built = self._produce_cascade(best_node, calibration_data.reset_index(drop=True))
+            if built is not None:
+                inference_code, summary, fast_artifacts = built
+                model_artifacts.extend(fast_artifacts)
+
+        # Delete the working directory before returning
+        shutil.rmtree("./workdir")
+
         # compile the inference code into a module
         predictor: types.ModuleType = types.ModuleType("predictor")
-        exec(best_node.inference_code, predictor.__dict__)
+        exec(inference_code, predictor.__dict__)
 
         return GenerationResult(
             best_node.training_code,
-            best_node.inference_code,
+            inference_code,
             predictor,
-            best_node.model_artifacts,
+            model_artifacts,
             best_node.performance,
+            summary,
         )
 
     def _initialise_graph(self, n_nodes: int, task: str, metric: Metric) -> None:
@@ -334,11 +365,59 @@ class ModelGenerator:
                 continue
         return node
 
-    def _cache_model_files(self, node: Node) -> None:
+    def _produce_cascade(
+        self, best_node: Node, calibration_data: pd.DataFrame
+    ) -> Tuple[str, Dict[str, Any], List[Path]] | None:
+        """
+        Tries to combine a fast solution from the search graph with the best solution into a cascade predictor.
+
+        The good solutions other than the best one are tried in order of their training time, which is a proxy for
+        their inference cost. For each, inference code is generated, and a cascade is calibrated on the held-out
+        data. The cascade that saves the most time is kept.
+
+        :param best_node: the graph node containing the best solution, with its inference code and cached artifacts
+        :param calibration_data: held-out inputs on which to calibrate the cascade
+        :return: the cascade's inference code, its calibration summary, and the fast solution's artifacts; or None
+        """
+        candidates = [
+            n
+            for n in self.graph.good_nodes
+            if n is not best_node and n.performance is not None and isinstance(n.performance.value, float)
+        ]
+        candidates.sort(key=lambda n: (n.execution_time is None, n.execution_time or 0.0))
+
+        best = None
+        for i, node in enumerate(candidates[: config.model_search.cascade_candidates]):
+            logger.info(f"🧠 Generating inference code for cascade candidate {i} ({node.performance})")
+            try:
+                node = self._produce_inference_code(node, self.input_schema, self.output_schema)
+                self._cache_model_files(node, prefix=f"fast-{i}-")
+                built = build_cascade(node.inference_code, best_node.inference_code, calibration_data)
+            except Exception as e:
+                logger.warning(f"Cascade candidate {i} could not be used: {str(e)}")
+                built = None
+            artifacts = [Path(a) for a in node.model_artifacts if Path(a).parent == self.filedir]
+            if built is not None and (best is None or built[1]["saving"] > best[1]["saving"]):
+                best, artifacts = (built[0], built[1], artifacts), best[2] if best is not None else []
+            # Remove the cached artifacts of candidates that are not used
+            for artifact in artifacts:
+                artifact.unlink(missing_ok=True)
+
+        if best is not None:
+            logger.info(
+                f"✅ Built cascade predictor: {best[1]['escalation_rate']:.0%} of samples escalated, "
+                f"{best[1]['saving']:.0%} faster than the best solution alone"
+            )
+        else:
+            logger.info("No cascade predictor was cheaper than the best solution alone")
+        return best
+
+    def _cache_model_files(self, node: Node, prefix: str = "") -> None:
         """
         Copies the model artifacts to the model cache directory, and updates the paths in the code.
 
         :param node: graph node containing the model artifacts
+        :param prefix: prefix for the names of the cached artifacts, to keep them apart from other solutions' files
         :return: None
         """
         # Make sure the model cache directory exists
@@ -348,10 +427,9 @@ class ModelGenerator:
             # Copy the model artifact to the cache directory
             artifact: Path = Path(node.model_artifacts[i])
             basename: str = Path(artifact).name
-            shutil.copy(artifact, self.filedir)
+            cached: Path = self.filedir / f"{prefix}{basename}"
+            shutil.copy(artifact, cached)
             # Update the paths in the training and inference code
-            node.training_code = node.training_code.replace(basename, str((self.filedir / basename).as_posix()))
-            node.inference_code = node.inference_code.replace(basename, str((self.filedir / basename).as_posix()))
-            node.model_artifacts[i] = self.filedir / basename
-        # Delete the working directory before returning
-        shutil.rmtree("./workdir")
+            node.training_code = node.training_code.replace(basename, str(cached.as_posix()))
+            node.inference_code = node.inference_code.replace(basename, str(cached.as_posix()))
+            node.model_artifacts[i] = cached
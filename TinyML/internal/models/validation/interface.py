@@ -0,0 +1,60 @@
+# TinyML/internal/models/validation/interface.py
+
+"""
+This module defines the InterfaceValidator class, which is responsible for validating that generated
+Python code exposes the functions expected by the caller, such as the `predict` and `predict_batch`
+functions of an inference module.
+
+Classes:
+    - InterfaceValidator: A validator class that checks the top-level functions defined by Python code.
+"""
+
+import ast
+from typing import Dict
+
+from TinyML.internal.models.validation.validator import Validator, ValidationResult
+
+
+class InterfaceValidator(Validator):
+    """
+    A validator class that checks that Python code defines a set of top-level functions, each of which
+    accepts the expected number of positional arguments.
+    """
+
+    def __init__(self, functions: Dict[str, int]):
+        """
+        Initialize the InterfaceValidator with the name 'interface'.
+
+        :param functions: mapping of required function names to the number of positional arguments they take.
+        """
+        super().__init__("interface")
+        self.functions: Dict[str, int] = functions
+
+    def validate(self, code: str) -> ValidationResult:
+        """
+        Validate that the code defines the required functions at module level, with the expected arity.
+
+        :param code: Python code to validate.
+        :return: Validation result indicating whether the required interface is present.
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return ValidationResult(self.name, False, message=f"Could not parse code: {e.msg}.", exception=e)
+
+        defined = {
+            node.name: len(node.args.posonlyargs) + len(node.args.args)
+            for node in tree.body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+        problems = []
+        for name, n_args in self.functions.items():
+            if name not in defined:
+                problems.append(f"function '{name}' is not defined at module level")
+            elif defined[name] != n_args:
+                problems.append(f"function '{name}' takes {defined[name]} positional arguments, expected {n_args}")
+
+        if problems:
+            message = f"Interface is not valid: {'; '.join(problems)}."
+            return ValidationResult(self.name, False, message=message, exception=TypeError(message))
+        return ValidationResult(self.name, passed=True, message="Interface is valid.")
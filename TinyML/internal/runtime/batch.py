@@ -0,0 +1,146 @@
+# TinyML/internal/runtime/batch.py
+
+"""
+This module provides batch prediction on top of generated predictor modules.
+
+Generated predictors expose a single-sample `predict(sample: dict) -> dict` function and, for models built
+with a recent version of the library, a vectorised `predict_batch(samples: pd.DataFrame) -> pd.DataFrame`
+function. The helpers in this module accept pandas DataFrames, pyarrow Tables or lists of records, dispatch
+to the vectorised function where the predictor provides it, and otherwise fall back to calling `predict`
+once per row.
+"""
+
+import logging
+import types
+from typing import List, Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+BatchInput = pd.DataFrame | pa.Table | List[dict]
+
+# Sets of unexpected output columns that have already been logged, so that each is only logged once
+_reported_extra_columns: set = set()
+
+
+def to_dataframe(data: BatchInput) -> pd.DataFrame:
+    """
+    Convert a batch of inputs into a pandas DataFrame with one row per sample.
+
+    :param data: a pandas DataFrame, a pyarrow Table, or a list of input dictionaries
+    :return: the batch as a pandas DataFrame; DataFrames are returned as-is, without copying
+    :raises TypeError: if the batch type is not supported
+    """
+    if isinstance(data, pd.DataFrame):
+        return data
+    elif isinstance(data, pa.Table):
+        return data.to_pandas()
+    elif isinstance(data, list):
+        return pd.DataFrame.from_records(data)
+    raise TypeError(f"Unsupported batch type: {type(data)}")
+
+
+def has_vectorised_predict(predictor: types.ModuleType | Any) -> bool:
+    """
+    Check whether a predictor exposes a vectorised `predict_batch` function.
+
+    :param predictor: the predictor module
+    :return: True if the predictor can score a whole DataFrame in one call
+    """
+    return callable(getattr(predictor, "predict_batch", None))
+
+
+def predict_batch(
+    predictor: types.ModuleType | Any, data: BatchInput, output_columns: List[str] = None
+) -> pd.DataFrame | pa.Table:
+    """
+    Score a batch of inputs with a predictor, returning one output row per input row.
+
+    The predictor's `predict_batch` function is used if it exists; otherwise `predict` is called once per row.
+    The result is a pyarrow Table if the input was a pyarrow Table, and a pandas DataFrame otherwise.
+
+    :param predictor: the predictor module
+    :param data: the batch of inputs
+    :param output_columns: the expected output columns, used to check, select and order the result, and to shape
+        empty results
+    :return: the outputs in columnar form
+    :raises ValueError: if the predictor does not return exactly one output per input, or does not return all of
+        the expected output columns
+    """
+    frame = to_dataframe(data)
+
+    if has_vectorised_predict(predictor):
+        outputs = predictor.predict_batch(frame)
+        outputs = outputs if isinstance(outputs, pd.DataFrame) else pd.DataFrame(outputs)
+    else:
+        outputs = pd.DataFrame.from_records([predictor.predict(sample) for sample in frame.to_dict(orient="records")])
+
+    if len(outputs) != len(frame):
+        raise ValueError(f"Predictor returned {len(outputs)} outputs for a batch of {len(frame)} inputs")
+
+    outputs = outputs.reset_index(drop=True)
+    if output_columns is not None:
+        if len(outputs) == 0:
+            outputs = outputs.reindex(columns=output_columns)
+        missing = [column for column in output_columns if column not in outputs.columns]
+        if missing:
+            raise ValueError(
+                f"Predictor outputs are missing the columns {missing}; it returned {list(outputs.columns)}"
+            )
+        extra = tuple(column for column in outputs.columns if column not in output_columns)
+        if extra and extra not in _reported_extra_columns:
+            _reported_extra_columns.add(extra)
+            logger.warning(f"Dropping predictor output columns that are not in the output schema: {list(extra)}")
+        outputs = outputs[output_columns]
+
+    if isinstance(data, pa.Table):
+        return pa.Table.from_pandas(outputs, preserve_index=False)
+    return outputs
+
+
+def rows_match(expected: pd.DataFrame, actual: pd.DataFrame, tolerance: float = 0.0) -> np.ndarray:
+    """
+    Check, row by row, whether two batches of outputs with the same length are equivalent.
+
+    Numeric columns match if their values are within the tolerance, relative or absolute; other columns must be
+    equal. Missing values match each other. A column that is missing from either batch matches no rows.
+
+    :param expected: the reference outputs
+    :param actual: the outputs to check
+    :param tolerance: the maximum relative or absolute difference between numeric values
+    :return: a boolean array with one entry per row, True where all the row's values match
+    :raises ValueError: if the batches have different lengths
+    """
+    if len(expected) != len(actual):
+        raise ValueError(f"Cannot compare batches of {len(expected)} and {len(actual)} outputs")
+    matches = np.ones(len(expected), dtype=bool)
+    for column in set(expected.columns) | set(actual.columns):
+        if column not in expected.columns or column not in actual.columns:
+            return np.zeros(len(expected), dtype=bool)
+        a, b = expected[column].reset_index(drop=True), actual[column].reset_index(drop=True)
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b) and not pd.api.types.is_bool_dtype(a):
+            a_values, b_values = a.to_numpy(dtype=np.float64), b.to_numpy(dtype=np.float64)
+            matches &= np.isclose(a_values, b_values, rtol=tolerance, atol=tolerance, equal_nan=True)
+        else:
+            matches &= (a.eq(b) | (a.isna() & b.isna())).to_numpy(dtype=bool)
+    return matches
+
+
+def outputs_match(expected: pd.DataFrame, actual: pd.DataFrame, tolerance: float = 0.0) -> bool:
+    """
+    Check whether two batches of outputs are equivalent, for example before and after optimising a predictor.
+
+    Numeric columns match if their values are within the tolerance, relative or absolute; other columns must be
+    equal. Missing values match each other.
+
+    :param expected: the reference outputs
+    :param actual: the outputs to check
+    :param tolerance: the maximum relative or absolute difference between numeric values
+    :return: True if the outputs have the same columns and length, and matching values
+    """
+    if list(expected.columns) != list(actual.columns) or len(expected) != len(actual):
+        return False
+    return bool(rows_match(expected, actual, tolerance).all())
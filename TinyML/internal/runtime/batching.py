@@ -0,0 +1,171 @@
+# TinyML/internal/runtime/batching.py
+
+"""
+This module provides the `MicroBatcher` class, which groups individually submitted items into batches.
+
+Callers submit single items from any number of threads and receive a `Future` for each. A background thread
+collects the submitted items and passes them to a batch function, either when the configured maximum batch size
+has been reached, or when the oldest item in the batch has waited for the configured maximum time. This allows
+concurrent single-sample requests to be served by a single vectorised prediction call.
+
+Example:
+>>>    batcher = MicroBatcher(lambda items: [x * 2 for x in items], max_batch_size=32, max_wait_ms=5)
+>>>    batcher.start()
+>>>    future = batcher.submit(21)
+>>>    print(future.result())  # 42
+>>>    batcher.stop()
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Placed on the queue to wake up the worker thread when the batcher is stopped
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from multiple threads into batches, and processes each batch with a single call.
+
+    Attributes:
+        batch_fn: Function that takes a list of items and returns a list of results of the same length.
+        max_batch_size: The maximum number of items in a batch.
+        max_wait_ms: The maximum time in milliseconds that an item waits for a batch to fill up.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        name: str = "micro-batcher",
+    ):
+        """
+        Initialise the batcher. The batcher does not process any items until `start()` is called.
+
+        :param batch_fn: function that takes a list of items and returns a list of results of the same length
+        :param max_batch_size: the maximum number of items in a batch
+        :param max_wait_ms: the maximum time in milliseconds that an item waits for a batch to fill up
+        :param name: name of the background worker thread
+        """
+        if max_batch_size < 1:
+            raise ValueError("Maximum batch size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("Maximum wait time must be non-negative")
+
+        self.batch_fn: Callable[[List[Any]], List[Any]] = batch_fn
+        self.max_batch_size: int = max_batch_size
+        self.max_wait_ms: float = max_wait_ms
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._stopped: threading.Event = threading.Event()
+
+    def start(self) -> "MicroBatcher":
+        """
+        Start the background thread that processes batches.
+
+        :return: the batcher itself, to allow chaining
+        """
+        self._thread.start()
+        return self
+
+    def submit(self, item: Any) -> Future:
+        """
+        Submit a single item for processing as part of the next batch.
+
+        :param item: the item to process
+        :return: a future that resolves to the result for this item
+        :raises RuntimeError: if the batcher has been stopped
+        """
+        if self._stopped.is_set():
+            raise RuntimeError("Cannot submit to a stopped batcher")
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stop the batcher, after processing all items that have already been submitted.
+
+        :param timeout: the maximum time in seconds to wait for pending items to be processed
+        """
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._queue.put(_STOP)
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def __enter__(self) -> "MicroBatcher":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        """
+        Worker loop: block for the first item of a batch, then collect more items until the batch is full or
+        the maximum wait time since the first item has elapsed.
+        """
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch: List[Tuple[Any, Future]] = [first]
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self._process(batch)
+
+        # Drain anything submitted concurrently with the stop request
+        remaining_entries = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP:
+                remaining_entries.append(entry)
+        for i in range(0, len(remaining_entries), self.max_batch_size):
+            self._process(remaining_entries[i : i + self.max_batch_size])
+
+    def _process(self, batch: List[Tuple[Any, Future]]) -> None:
+        """
+        Run the batch function on a batch, and resolve the futures of the items in the batch.
+
+        :param batch: list of (item, future) pairs
+        """
+        # Skip items whose callers have cancelled their futures in the meantime
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch function returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            logger.warning(f"Batch of {len(batch)} items failed: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,158 @@
+# TinyML/internal/runtime/cache.py
+
+"""
+This module provides the `PredictionCache` class, a bounded in-memory cache of model predictions.
+
+Predictions are keyed on the values of the input sample, taken in the order of the model's input schema, so that
+two samples with the same values map to the same entry regardless of the order of their keys. Entries are evicted
+in least-recently-used order when the cache is full, and expire after an optional time-to-live. Expired entries are
+never returned as hits, but are kept until they are recomputed or evicted, so that they can still serve as fallback
+responses. The cache keeps counters of hits, misses, evictions and expirations, which are reported by `stats()`.
+
+Example:
+>>>    cache = PredictionCache(fields=["bedrooms", "bathrooms"], max_size=1000, ttl_seconds=60)
+>>>    prediction = cache.get_or_compute({"bedrooms": 3, "bathrooms": 2}, predictor.predict)
+>>>    print(cache.stats())
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+
+class PredictionCache:
+    """
+    A thread-safe LRU cache of predictions, with optional time-based expiry.
+
+    Attributes:
+        fields: The input fields whose values make up the cache key, in a fixed order.
+        max_size: The maximum number of cached predictions.
+        ttl_seconds: The time after which a cached prediction expires, or None if predictions never expire.
+    """
+
+    def __init__(self, fields: List[str], max_size: int, ttl_seconds: float | None = None):
+        """
+        Initialise an empty cache.
+
+        :param fields: the input fields whose values make up the cache key, in a fixed order
+        :param max_size: the maximum number of cached predictions
+        :param ttl_seconds: the time after which a cached prediction expires, or None to disable expiry
+        """
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("Cache time-to-live must be positive")
+
+        self.fields: List[str] = list(fields)
+        self.max_size: int = max_size
+        self.ttl_seconds: float | None = ttl_seconds
+        self._entries: OrderedDict[Hashable, Tuple[dict, float]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+        self._expirations: int = 0
+
+    def __reduce__(self):
+        # Cached predictions are timestamped with this process's monotonic clock, so copies of the cache start empty
+        return PredictionCache, (self.fields, self.max_size, self.ttl_seconds)
+
+    def key(self, x: dict) -> Hashable:
+        """
+        Compute the canonical cache key of an input sample.
+
+        The key consists of the sample's values in the order of the cache's fields, followed by any keys that are
+        not part of the schema, in sorted order.
+
+        :param x: the input sample
+        :return: a hashable key identifying the sample
+        """
+        values = tuple(x.get(field) for field in self.fields)
+        if len(x) > len(self.fields) or any(field not in x for field in self.fields):
+            values += tuple(sorted((k, v) for k, v in x.items() if k not in self.fields))
+        try:
+            hash(values)
+            return values
+        except TypeError:
+            # Samples containing unhashable values, such as lists, are keyed on their JSON representation
+            return json.dumps(values, sort_keys=True, default=str)
+
+    def get_or_compute(self, x: dict, compute: Callable[[dict], dict]) -> dict:
+        """
+        Return the cached prediction for a sample, computing and caching it if it is not cached.
+
+        :param x: the input sample
+        :param compute: the function that computes a prediction for the sample on a cache miss
+        :return: the prediction; a copy of the cached value, so that callers may modify it
+        """
+        key = self.key(x)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return dict(value)
+                self._expirations += 1
+            self._misses += 1
+
+        value = compute(x)
+        self.put(key, value)
+        return dict(value)
+
+    def peek(self, x: dict, include_expired: bool = False) -> dict | None:
+        """
+        Return the cached prediction for a sample, if there is one, without computing it or updating the counters.
+
+        :param x: the input sample
+        :param include_expired: whether to also return a prediction that has expired but is still held
+        :return: a copy of the cached prediction, or None if it is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(self.key(x))
+        if entry is None or (not include_expired and entry[1] < time.monotonic()):
+            return None
+        return dict(entry[0])
+
+    def put(self, key: Hashable, value: dict) -> None:
+        """
+        Cache a prediction under the given key, evicting the least recently used entry if the cache is full.
+
+        :param key: the cache key, as returned by `key()`
+        :param value: the prediction to cache
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (dict(value), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """
+        Remove all cached predictions. The counters are not reset.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache's counters and current size.
+
+        :return: a dictionary with the hits, misses, evictions, expirations, size and hit rate of the cache
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
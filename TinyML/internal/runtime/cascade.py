@@ -0,0 +1,358 @@
+# TinyML/internal/runtime/cascade.py
+
+"""
+This module provides the `CascadePredictor` class, which answers predictions with a fast model when the fast model
+is confident, and escalates the remaining predictions to a slower, more accurate model.
+
+The model search often finds solutions whose accuracy is close to that of the best solution, but which are much
+cheaper to run. A cascade combines such a fast predictor with the best predictor. The fast predictor must report
+its confidence in each prediction; for a classifier, the confidence is typically the predicted probability of the
+predicted class. Samples on which the fast predictor's confidence is at least the cascade's threshold are answered
+by the fast predictor, and all other samples by the accurate predictor.
+
+The fast predictor should expose `predict_with_confidence(sample: dict) -> (dict, float)` and a vectorised
+`predict_with_confidence_batch(samples: pd.DataFrame) -> (pd.DataFrame, np.ndarray)`, which return the prediction
+and the confidence from a single run of the model. A fast predictor that only exposes
+`predict_confidence(sample: dict) -> float`, and optionally `predict_confidence_batch(samples: pd.DataFrame)`, is
+also supported, but then the fast model runs twice for each sample that it answers.
+
+The threshold is calibrated on held-out inputs with `build_cascade`, as the lowest confidence at which the cascade
+still agrees with the accurate predictor on all but a given fraction of the inputs. The cascade is only worth
+building if it is meaningfully cheaper than the accurate predictor on those inputs. A built cascade is a predictor
+module of its own, whose source embeds the sources of both predictors, so it can be saved, loaded and pickled like
+any other predictor.
+
+Example:
+>>>    built = build_cascade(fast_source, accurate_source, held_out_inputs, max_disagreement=0.01)
+>>>    if built is not None:
+>>>        source, summary = built
+>>>        predictor = types.ModuleType("predictor")
+>>>        exec(source, predictor.__dict__)
+"""
+
+import logging
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from TinyML.config import config
+from TinyML.internal.runtime.batch import BatchInput, predict_batch, rows_match, to_dataframe
+
+logger = logging.getLogger(__name__)
+
+
+def _load_module(source: str, name: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    exec(source, module.__dict__)
+    return module
+
+
+def has_confidence(predictor: types.ModuleType | Any) -> bool:
+    """
+    Check whether a predictor exposes a `predict_with_confidence` or `predict_confidence` function, and can be the
+    fast model of a cascade.
+
+    :param predictor: the predictor module
+    :return: True if the predictor reports a confidence for its predictions
+    """
+    return callable(getattr(predictor, "predict_with_confidence", None)) or callable(
+        getattr(predictor, "predict_confidence", None)
+    )
+
+
+def _as_confidences(values: Any, samples: int) -> np.ndarray:
+    confidences = np.asarray(values, dtype=np.float64).reshape(-1)
+    if len(confidences) != samples:
+        raise ValueError(f"Predictor returned {len(confidences)} confidences for a batch of {samples} inputs")
+    return np.nan_to_num(confidences, nan=-np.inf)
+
+
+def predict_confidences(predictor: types.ModuleType | Any, samples: pd.DataFrame) -> np.ndarray:
+    """
+    Compute a predictor's confidence in its prediction for each row of a batch.
+
+    The predictor's `predict_confidence_batch` function is used if it exists; otherwise `predict_confidence` is
+    called once per row, or `predict_with_confidence` if the predictor has no `predict_confidence`. Missing
+    confidences are treated as no confidence at all.
+
+    :param predictor: the predictor module
+    :param samples: the batch of inputs
+    :return: the confidences, one per row
+    """
+    if callable(getattr(predictor, "predict_confidence_batch", None)):
+        return _as_confidences(predictor.predict_confidence_batch(samples), len(samples))
+    records = samples.to_dict(orient="records")
+    if callable(getattr(predictor, "predict_confidence", None)):
+        return _as_confidences([predictor.predict_confidence(sample) for sample in records], len(samples))
+    return _as_confidences([predictor.predict_with_confidence(sample)[1] for sample in records], len(samples))
+
+
+def predict_with_confidences(
+    predictor: types.ModuleType | Any, samples: pd.DataFrame, columns: List[str] = None
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Score a batch with a predictor, and compute its confidence in the prediction for each row.
+
+    The predictor's `predict_with_confidence_batch` function is used if it exists, so that the model runs once;
+    otherwise the batch is scored with `predict_batch`, and the confidences are computed with `predict_confidences`.
+
+    :param predictor: the predictor module
+    :param samples: the batch of inputs
+    :param columns: the output columns, used if the predictor falls back to scoring one row at a time
+    :return: the outputs, one row per input row, and the confidences, one per row
+    """
+    if callable(getattr(predictor, "predict_with_confidence_batch", None)):
+        outputs, confidences = predictor.predict_with_confidence_batch(samples)
+        outputs = to_dataframe(outputs).reset_index(drop=True)
+        if len(outputs) != len(samples):
+            raise ValueError(f"Predictor returned {len(outputs)} rows for a batch of {len(samples)} inputs")
+        return outputs, _as_confidences(confidences, len(samples))
+    return predict_batch(predictor, samples, columns), predict_confidences(predictor, samples)
+
+
+def calibrate_threshold(confidences: np.ndarray, agrees: np.ndarray, max_disagreement: float) -> float:
+    """
+    Find the lowest confidence threshold at which a cascade disagrees with its accurate model on at most a given
+    fraction of the calibration inputs.
+
+    Inputs on which the fast model's confidence is below the threshold are escalated, so the cascade only
+    disagrees with the accurate model on confident inputs on which the fast model disagrees with it. Inputs with
+    equal confidence are always answered by the same model.
+
+    :param confidences: the fast model's confidence on each calibration input
+    :param agrees: whether the fast model agrees with the accurate model on each calibration input
+    :param max_disagreement: the maximum fraction of inputs on which the cascade may disagree with the accurate model
+    :return: the threshold, or infinity if the fast model should answer no inputs
+    """
+    confidences = np.nan_to_num(np.asarray(confidences, dtype=np.float64), nan=-np.inf)
+    agrees = np.asarray(agrees, dtype=bool)
+    if len(confidences) == 0:
+        return np.inf
+
+    order = np.argsort(-confidences, kind="stable")
+    sorted_confidences = confidences[order]
+    disagreements = np.cumsum(~agrees[order])
+    # The fast model can only answer the k most confident inputs if the k-th and (k+1)-th confidences differ
+    boundary = np.append(sorted_confidences[:-1] > sorted_confidences[1:], True)
+    allowed = boundary & (disagreements <= max_disagreement * len(confidences)) & np.isfinite(sorted_confidences)
+    if not allowed.any():
+        return np.inf
+    return float(sorted_confidences[np.flatnonzero(allowed)[-1]])
+
+
+class CascadePredictor:
+    """
+    Answers predictions with a fast predictor when it is confident, and with an accurate predictor otherwise.
+
+    Attributes:
+        fast: The fast predictor, which must expose a `predict_with_confidence` or `predict_confidence` function.
+        accurate: The accurate predictor.
+        threshold: The lowest confidence at which the fast predictor answers.
+    """
+
+    def __init__(self, fast: types.ModuleType | Any, accurate: types.ModuleType | Any, threshold: float):
+        """
+        Combine two predictors into a cascade.
+
+        :param fast: the fast predictor
+        :param accurate: the accurate predictor
+        :param threshold: the lowest confidence at which the fast predictor answers
+        """
+        if not has_confidence(fast):
+            raise ValueError(
+                "The fast predictor of a cascade must define a 'predict_with_confidence' or 'predict_confidence' function"
+            )
+        self.fast: types.ModuleType | Any = fast
+        self.accurate: types.ModuleType | Any = accurate
+        self.threshold: float = float(threshold)
+        self._lock: threading.Lock = threading.Lock()
+        self._fast_answers: int = 0
+        self._escalations: int = 0
+
+    @classmethod
+    def from_sources(cls, fast_source: str, accurate_source: str, threshold: float) -> "CascadePredictor":
+        """
+        Create a cascade from the source code of its two predictors.
+
+        :param fast_source: the source code of the fast predictor module
+        :param accurate_source: the source code of the accurate predictor module
+        :param threshold: the lowest confidence at which the fast predictor answers
+        :return: the cascade
+        """
+        return cls(_load_module(fast_source, "fast_predictor"), _load_module(accurate_source, "predictor"), threshold)
+
+    def predict(self, sample: dict) -> dict:
+        """
+        Score a single sample with the fast predictor if it is confident, or else with the accurate predictor.
+
+        :param sample: input to the model
+        :return: output of the model
+        """
+        if callable(getattr(self.fast, "predict_with_confidence", None)):
+            output, confidence = self.fast.predict_with_confidence(sample)
+            if confidence >= self.threshold:
+                with self._lock:
+                    self._fast_answers += 1
+                return output
+        elif self.fast.predict_confidence(sample) >= self.threshold:
+            with self._lock:
+                self._fast_answers += 1
+            return self.fast.predict(sample)
+        with self._lock:
+            self._escalations += 1
+        return self.accurate.predict(sample)
+
+    def predict_batch(self, samples: BatchInput) -> pd.DataFrame:
+        """
+        Score a batch, answering the rows on which the fast predictor is confident with the fast predictor, and
+        the remaining rows with the accurate predictor, each in a single vectorised call where available.
+
+        :param samples: the batch of inputs
+        :return: the outputs, one row per input row, in the same order
+        """
+        frame = to_dataframe(samples)
+        parts: List[pd.DataFrame] = []
+        if callable(getattr(self.fast, "predict_with_confidence_batch", None)):
+            # The fast model scores the whole batch once, and its outputs are kept for the confident rows
+            fast_outputs, confidences = predict_with_confidences(self.fast, frame)
+            confident = confidences >= self.threshold
+            if confident.any():
+                parts.append(fast_outputs.iloc[np.flatnonzero(confident)])
+            routes = ((self.accurate, ~confident),)
+        else:
+            confident = predict_confidences(self.fast, frame) >= self.threshold
+            routes = ((self.fast, confident), (self.accurate, ~confident))
+        for predictor, mask in routes:
+            rows = np.flatnonzero(mask)
+            if len(rows):
+                outputs = predict_batch(predictor, frame.iloc[rows].reset_index(drop=True))
+                parts.append(outputs.set_axis(rows, axis=0))
+        with self._lock:
+            self._fast_answers += int(confident.sum())
+            self._escalations += int(len(confident) - confident.sum())
+        if not parts:
+            return predict_batch(self.accurate, frame)
+        return pd.concat(parts).sort_index().reset_index(drop=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cascade's counters.
+
+        :return: a dictionary with the threshold, the predictions answered by the fast predictor, the escalated
+            predictions, and the escalation rate
+        """
+        with self._lock:
+            total = self._fast_answers + self._escalations
+            return {
+                "threshold": self.threshold,
+                "fast_answers": self._fast_answers,
+                "escalations": self._escalations,
+                "escalation_rate": self._escalations / total if total else 0.0,
+            }
+
+
+def cascade_source(fast_source: str, accurate_source: str, threshold: float) -> str:
+    """
+    Generate the source code of a predictor module that runs two predictors as a cascade.
+
+    :param fast_source: the source code of the fast predictor module
+    :param accurate_source: the source code of the accurate predictor module
+    :param threshold: the lowest confidence at which the fast predictor answers
+    :return: the source code of the cascade predictor module
+    """
+    return (
+        "# Cascade predictor: answers with the fast predictor when its confidence is at least THRESHOLD, and\n"
+        "# escalates all other samples to the accurate predictor.\n"
+        "from TinyML.internal.runtime.cascade import CascadePredictor\n"
+        "\n"
+        f"THRESHOLD = {float(threshold)!r}\n"
+        f"FAST_SOURCE = {fast_source!r}\n"
+        f"ACCURATE_SOURCE = {accurate_source!r}\n"
+        "\n"
+        "cascade = CascadePredictor.from_sources(FAST_SOURCE, ACCURATE_SOURCE, THRESHOLD)\n"
+        "\n"
+        "\n"
+        "def predict(sample: dict) -> dict:\n"
+        "    return cascade.predict(sample)\n"
+        "\n"
+        "\n"
+        "def predict_batch(samples):\n"
+        "    return cascade.predict_batch(samples)\n"
+    )
+
+
+def _best_time(function: Callable[[], Any], runs: int) -> float:
+    best = np.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def build_cascade(
+    fast_source: str,
+    accurate_source: str,
+    calibration_inputs: BatchInput,
+    max_disagreement: float = config.model_search.cascade_max_disagreement,
+    tolerance: float = config.model_search.cascade_tolerance,
+    min_saving: float = config.model_search.cascade_min_saving,
+    runs: int = 3,
+) -> Tuple[str, Dict[str, Any]] | None:
+    """
+    Calibrate a cascade of two predictors on held-out inputs, and return its source code if it is worth using.
+
+    Both predictors score the held-out inputs, and the confidence threshold is calibrated so that the cascade
+    disagrees with the accurate predictor on at most `max_disagreement` of the inputs. The cascade is only returned
+    if scoring the inputs with it takes at least `min_saving` less time than scoring them with the accurate
+    predictor alone.
+
+    :param fast_source: the source code of the fast predictor module
+    :param accurate_source: the source code of the accurate predictor module
+    :param calibration_inputs: held-out inputs that were not used to train either predictor
+    :param max_disagreement: the maximum fraction of inputs on which the cascade may disagree with the accurate model
+    :param tolerance: the maximum relative or absolute difference between numeric outputs that still agree
+    :param min_saving: the minimum fraction of the accurate predictor's time that the cascade must save
+    :param runs: the number of timed runs of each predictor, of which the fastest is used
+    :return: the cascade's source code and a summary of its calibration, or None if the cascade is not worth using
+    """
+    inputs = to_dataframe(calibration_inputs).reset_index(drop=True)
+    if len(inputs) == 0:
+        logger.info("No calibration inputs for a cascade")
+        return None
+    fast = _load_module(fast_source, "fast_predictor")
+    accurate = _load_module(accurate_source, "predictor")
+    if not has_confidence(fast):
+        logger.info("The fast predictor does not report its confidence, so it cannot be used in a cascade")
+        return None
+
+    accurate_outputs = predict_batch(accurate, inputs)
+    fast_outputs, confidences = predict_with_confidences(fast, inputs, list(accurate_outputs.columns))
+    agrees = rows_match(accurate_outputs, fast_outputs, tolerance)
+    threshold = calibrate_threshold(confidences, agrees, max_disagreement)
+    if not np.isfinite(threshold):
+        logger.info("The fast predictor is not accurate enough at any confidence to be used in a cascade")
+        return None
+
+    cascade = CascadePredictor(fast, accurate, threshold)
+    accurate_seconds = _best_time(lambda: predict_batch(accurate, inputs), runs)
+    cascade_seconds = _best_time(lambda: cascade.predict_batch(inputs), runs)
+    confident = confidences >= threshold
+    summary = {
+        "threshold": threshold,
+        "calibration_samples": len(inputs),
+        "escalation_rate": float(1.0 - confident.mean()),
+        "fast_agreement": float(agrees.mean()),
+        "agreement": float(1.0 - (confident & ~agrees).mean()),
+        "accurate_ms_per_sample": accurate_seconds * 1000.0 / len(inputs),
+        "cascade_ms_per_sample": cascade_seconds * 1000.0 / len(inputs),
+        "saving": float(1.0 - cascade_seconds / accurate_seconds) if accurate_seconds > 0 else 0.0,
+    }
+    if summary["saving"] < min_saving:
+        logger.info(f"The cascade saves only {summary['saving']:.0%} of the accurate predictor's time")
+        return None
+    return cascade_source(fast_source, accurate_source, threshold), summary
@@ -0,0 +1,129 @@
+# TinyML/internal/runtime/coalescing.py
+
+"""
+This module provides the `BatchingPredictor` class, which coalesces concurrent single-sample predictions from many
+threads into vectorised batch predictions.
+
+In a threaded server, each request thread typically calls `Model.predict` with a single sample, so the predictor
+pays its per-call overhead once per sample. A `BatchingPredictor` keeps the same one-dict-in, one-dict-out calling
+convention, but hands each sample to a `MicroBatcher`, which collects the samples submitted by concurrent callers
+over a short window and scores them with one call to the model's `predict_batch`. Each caller then gets its own row
+of the batch back.
+
+If a batch fails, its samples are scored again one at a time, so that a single bad input fails only its own caller.
+Samples are looked up in the model's prediction cache first, if it is enabled, and their predictions are cached.
+
+Example:
+>>>    predictor = BatchingPredictor(model, max_batch_size=64, max_wait_ms=2)
+>>>    prediction = predictor.predict({"bedrooms": 3})  # called from many threads at once
+>>>    predictor.close()
+"""
+
+from typing import Any, List
+
+import pandas as pd
+
+from TinyML.config import config
+from TinyML.internal.runtime.batching import MicroBatcher
+
+
+class RowError:
+    """The exception raised for a single sample of a batch, passed back to the sample's caller."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def predict_rows(model: Any, samples: List[dict]) -> List[dict | RowError]:
+    """
+    Score a batch of samples with a model's `predict_batch` method, isolating the samples that fail.
+
+    If the batch fails, its samples are scored again one at a time, so that a single bad sample does not fail the
+    others; each failing sample gets a `RowError` in place of its prediction.
+
+    :param model: the model, or any object with a `predict_batch(pd.DataFrame) -> pd.DataFrame` method
+    :param samples: the samples to score
+    :return: one prediction or `RowError` per sample, in the same order
+    """
+    try:
+        return _score(model, samples)
+    except Exception as e:
+        if len(samples) == 1:
+            return [RowError(e)]
+    results: List[dict | RowError] = []
+    for sample in samples:
+        try:
+            results.extend(_score(model, [sample]))
+        except Exception as e:
+            results.append(RowError(e))
+    return results
+
+
+def _score(model: Any, samples: List[dict]) -> List[dict]:
+    outputs = model.predict_batch(pd.DataFrame.from_records(samples))
+    if len(outputs) != len(samples):
+        raise ValueError(f"The model returned {len(outputs)} outputs for {len(samples)} samples")
+    return outputs.to_dict(orient="records")
+
+
+class BatchingPredictor:
+    """
+    Wraps a model, so that concurrent calls to `predict` are scored together in batches.
+
+    Attributes:
+        model: The wrapped model, or any object with a `predict_batch(pd.DataFrame) -> pd.DataFrame` method.
+        batcher: The micro-batcher that collects the concurrent calls.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        max_batch_size: int = config.inference.coalesce_max_batch_size,
+        max_wait_ms: float = config.inference.coalesce_max_wait_ms,
+    ):
+        """
+        Wrap a model, and start collecting calls.
+
+        :param model: the model to wrap
+        :param max_batch_size: the maximum number of samples scored in a single batch
+        :param max_wait_ms: the maximum time in milliseconds that a sample waits for its batch to fill up
+        """
+        self.model: Any = model
+        self.batcher: MicroBatcher = MicroBatcher(
+            self._predict_batch, max_batch_size, max_wait_ms, name="batching-predictor"
+        ).start()
+
+    def predict(self, x: dict) -> dict:
+        """
+        Score a single sample, as part of a batch with the samples of concurrent callers.
+
+        :param x: input to the model
+        :return: output of the model
+        """
+        cache = getattr(self.model, "cache", None)
+        if cache is not None:
+            return cache.get_or_compute(x, self._submit)
+        return self._submit(x)
+
+    def close(self) -> None:
+        """
+        Stop collecting calls, after scoring the samples that have already been submitted.
+        """
+        self.batcher.stop()
+
+    def __enter__(self) -> "BatchingPredictor":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _submit(self, x: dict) -> dict:
+        result = self.batcher.submit(x).result()
+        if isinstance(result, RowError):
+            raise result.error
+        return result
+
+    def _predict_batch(self, samples: List[dict]) -> List[dict | RowError]:
+        return predict_rows(self.model, samples)
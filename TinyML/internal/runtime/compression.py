@@ -0,0 +1,372 @@
+# TinyML/internal/runtime/compression.py
+
+"""
+This module provides a compression pass for the estimators loaded by a predictor, which trades a bounded loss of
+accuracy for faster predictions and smaller model artifacts.
+
+The estimators held in a predictor's module-level variables are often much larger than they need to be: forests
+with hundreds of trees, or weights stored in float64. For each estimator, `compress_predictor` tries cheaper
+variants of it:
+
+- fewer trees, for scikit-learn forests and gradient boosting estimators and for xgboost models, keeping the first
+  trees of the ensemble;
+- float32 weights, for estimators whose fitted parameters are float64 arrays, such as linear models and scalers;
+- a shallow decision tree distilled from the estimator, trained on the features the predictor passes to the
+  estimator and on the estimator's own predictions for them.
+
+Each variant is swapped into the predictor and measured on held-out inputs, for its prediction error, its latency
+on single samples, and its pickled size. The error is measured against the true outputs if they are known, and
+against the original predictor's outputs otherwise. The variant with the largest combined saving in latency and
+size whose error exceeds the original predictor's by at most the tolerance is kept.
+
+Example:
+>>>    report = compress_predictor(predictor, predictor, inputs, truth, tolerance=0.01, distil_inputs=more_inputs)
+>>>    print(report)  # {"model": {"variant": "50 of 200 trees", "bytes_before": ..., "bytes_after": ...}}
+"""
+
+import copy
+import logging
+import os
+import pickle
+import time
+import types
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    ExtraTreesRegressor,
+    GradientBoostingClassifier,
+    GradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from TinyML.config import config
+from TinyML.internal.runtime.batch import predict_batch
+
+logger = logging.getLogger(__name__)
+
+_TREE_ENSEMBLES = (
+    ExtraTreesClassifier,
+    ExtraTreesRegressor,
+    GradientBoostingClassifier,
+    GradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+
+
+def is_estimator(obj: Any) -> bool:
+    """
+    Return whether an object is a fitted estimator instance, with `fit` and `predict` methods.
+
+    :param obj: the object to check
+    :return: True if the object looks like an estimator
+    """
+    if isinstance(obj, (type, types.ModuleType)):
+        return False
+    return callable(getattr(obj, "predict", None)) and callable(getattr(obj, "fit", None))
+
+
+def estimator_size(estimator: Any) -> int:
+    """
+    Return the size of an estimator, as the number of bytes of its pickle.
+
+    :param estimator: the estimator
+    :return: the size in bytes
+    """
+    return len(pickle.dumps(estimator, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _fewer_trees(estimator: Any, fractions: Sequence[float]) -> Iterator[Tuple[str, Any]]:
+    if type(estimator).__module__.startswith("xgboost") and hasattr(estimator, "get_booster"):
+        booster = estimator.get_booster()
+        n_trees = booster.num_boosted_rounds()
+    elif isinstance(estimator, _TREE_ENSEMBLES):
+        booster = None
+        n_trees = len(estimator.estimators_)
+    else:
+        return
+
+    for k in sorted({max(1, int(round(n_trees * fraction))) for fraction in fractions}, reverse=True):
+        if k >= n_trees:
+            continue
+        variant = copy.copy(estimator)
+        if booster is not None:
+            variant._Booster = booster[:k]
+        else:
+            variant.estimators_ = estimator.estimators_[:k]
+            if hasattr(estimator, "train_score_"):
+                variant.train_score_ = estimator.train_score_[:k]
+            if hasattr(estimator, "n_estimators_"):
+                variant.n_estimators_ = k
+        variant.n_estimators = k
+        yield f"{k} of {n_trees} trees", variant
+
+
+def _float32(estimator: Any) -> Iterator[Tuple[str, Any]]:
+    # Class labels are outputs, not weights, so they keep their type
+    arrays = {
+        name: value
+        for name, value in vars(estimator).items()
+        if isinstance(value, np.ndarray) and value.dtype == np.float64 and name != "classes_"
+    }
+    if not arrays:
+        return
+    variant = copy.copy(estimator)
+    for name, value in arrays.items():
+        setattr(variant, name, value.astype(np.float32))
+    yield "float32 weights", variant
+
+
+def _distilled(estimator: Any, features: Any, depths: Sequence[int]) -> Iterator[Tuple[str, Any]]:
+    targets = estimator.predict(features)
+    classes = getattr(estimator, "classes_", None)
+    for depth in depths:
+        if classes is not None:
+            student = DecisionTreeClassifier(max_depth=depth, random_state=0).fit(features, targets)
+            # The predictor may rely on the columns of predict_proba, which follow the classes
+            if not np.array_equal(student.classes_, classes):
+                continue
+        else:
+            student = DecisionTreeRegressor(max_depth=depth, random_state=0).fit(features, targets)
+        yield f"decision tree of depth {depth} distilled from the estimator", student
+
+
+def compression_variants(
+    estimator: Any,
+    features: Any = None,
+    tree_fractions: Sequence[float] = config.inference.compression_tree_fractions,
+    distil_depths: Sequence[int] = config.inference.compression_distil_depths,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Generate cheaper variants of a fitted estimator. The estimator itself is not modified.
+
+    :param estimator: the fitted estimator
+    :param features: the features on which to distil the estimator into a decision tree, or None to skip distilling
+    :param tree_fractions: the fractions of an ensemble's trees to keep in each fewer-trees variant
+    :param distil_depths: the maximum depths of the distilled decision trees
+    :return: an iterator over pairs of a description of the variant and the variant
+    """
+    yield from _fewer_trees(estimator, tree_fractions)
+    yield from _float32(estimator)
+    if features is not None:
+        yield from _distilled(estimator, features, distil_depths)
+
+
+class _FeatureRecorder:
+    """Stands in for an estimator, recording the features passed to its prediction methods."""
+
+    def __init__(self, estimator: Any):
+        self._estimator = estimator
+        self.features: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._estimator, name)
+
+    def _record(self, method: str, X: Any, *args, **kwargs) -> Any:
+        self.features.append(X.copy() if hasattr(X, "copy") else np.asarray(X))
+        return getattr(self._estimator, method)(X, *args, **kwargs)
+
+    def predict(self, X: Any, *args, **kwargs) -> Any:
+        return self._record("predict", X, *args, **kwargs)
+
+    def predict_proba(self, X: Any, *args, **kwargs) -> Any:
+        return self._record("predict_proba", X, *args, **kwargs)
+
+    def decision_function(self, X: Any, *args, **kwargs) -> Any:
+        return self._record("decision_function", X, *args, **kwargs)
+
+
+def record_features(module: types.ModuleType | Any, name: str, run: Callable[[], Any]) -> Any:
+    """
+    Record the features that a predictor passes to one of its estimators.
+
+    :param module: the predictor module holding the estimator
+    :param name: the name of the module-level variable holding the estimator
+    :param run: a function that runs the predictor on some inputs
+    :return: the recorded features, as a DataFrame or a 2D array, or None if none could be recorded
+    """
+    estimator = getattr(module, name)
+    recorder = _FeatureRecorder(estimator)
+    setattr(module, name, recorder)
+    try:
+        run()
+    except Exception as e:
+        logger.debug(f"Could not record the features of '{name}': {str(e)}")
+        return None
+    finally:
+        setattr(module, name, estimator)
+    if not recorder.features:
+        return None
+    try:
+        if all(isinstance(f, pd.DataFrame) for f in recorder.features):
+            return pd.concat(recorder.features, ignore_index=True)
+        return np.vstack([np.asarray(f) for f in recorder.features])
+    except ValueError as e:
+        logger.debug(f"The features of '{name}' could not be combined: {str(e)}")
+        return None
+
+
+def prediction_error(outputs: pd.DataFrame, truth: pd.DataFrame) -> float:
+    """
+    Measure the error of a predictor's outputs, averaged over the output columns.
+
+    The error of a float column is its mean absolute error, relative to the standard deviation of the true values;
+    the error of any other column is its fraction of wrong values. A missing column is entirely wrong.
+
+    :param outputs: the predictor's outputs
+    :param truth: the true outputs, with the same rows
+    :return: the mean error over the columns of the true outputs
+    """
+    errors = []
+    for column in truth.columns:
+        if column not in outputs.columns:
+            errors.append(1.0)
+            continue
+        expected, actual = truth[column].reset_index(drop=True), outputs[column].reset_index(drop=True)
+        if pd.api.types.is_float_dtype(expected):
+            expected_values, actual_values = expected.to_numpy(dtype=np.float64), actual.to_numpy(dtype=np.float64)
+            scale = np.nanstd(expected_values) or 1.0
+            errors.append(float(np.nanmean(np.abs(actual_values - expected_values)) / scale))
+        else:
+            errors.append(float(1.0 - (expected.eq(actual) | (expected.isna() & actual.isna())).mean()))
+    return float(np.mean(errors)) if errors else 0.0
+
+
+def _latency_ms(predictor: types.ModuleType | Any, samples: List[dict], runs: int = 3) -> float:
+    best = np.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        for sample in samples:
+            predictor.predict(sample)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0 / len(samples)
+
+
+def compress_predictor(
+    predictor: types.ModuleType | Any,
+    module: types.ModuleType | Any,
+    inputs: pd.DataFrame,
+    truth: pd.DataFrame = None,
+    tolerance: float = config.inference.compression_tolerance,
+    distil_inputs: pd.DataFrame = None,
+    names: List[str] = None,
+    output_columns: List[str] = None,
+    latency_samples: int = config.inference.compression_latency_samples,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Replace the estimators held by a predictor with cheaper variants, where the loss of accuracy is within a tolerance.
+
+    The estimators are compressed one at a time, and the tolerance bounds the total increase in error over the
+    original predictor. The chosen variants are left in the predictor module; all other estimators are unchanged.
+
+    :param predictor: the predictor to score inputs with
+    :param module: the module holding the predictor's estimators, usually the predictor itself
+    :param inputs: held-out inputs on which the variants are measured
+    :param truth: the true outputs for the inputs, or None to measure errors against the original predictor's outputs
+    :param tolerance: the maximum increase in prediction error over the original predictor
+    :param distil_inputs: inputs on which to distil estimators into decision trees, or None to skip distilling; they
+        should not overlap with the measurement inputs
+    :param names: the names of the variables holding the estimators to compress, or None for all estimators
+    :param output_columns: the expected output columns of the predictor
+    :param latency_samples: the number of inputs on which the single-sample latency is measured
+    :return: for each compressed variable, the chosen variant, and its size, latency and error before and after
+    """
+    baseline = predict_batch(predictor, inputs, output_columns)
+    truth = baseline if truth is None else truth
+    reference_error = prediction_error(baseline, truth)
+    samples = inputs.head(latency_samples).to_dict(orient="records")
+
+    report: Dict[str, Dict[str, Any]] = {}
+    for name, estimator in list(vars(module).items()):
+        if not is_estimator(estimator) or (names is not None and name not in names):
+            continue
+        features = None
+        if distil_inputs is not None:
+            features = record_features(module, name, lambda: predict_batch(predictor, distil_inputs, output_columns))
+        size, latency = estimator_size(estimator), _latency_ms(predictor, samples)
+
+        best = None
+        try:
+            for description, variant in compression_variants(estimator, features):
+                setattr(module, name, variant)
+                try:
+                    error = prediction_error(predict_batch(predictor, inputs, output_columns), truth)
+                    measured = (description, variant, error, estimator_size(variant), _latency_ms(predictor, samples))
+                except Exception as e:
+                    logger.debug(f"Variant '{description}' of '{name}' failed: {str(e)}")
+                    continue
+                finally:
+                    setattr(module, name, estimator)
+                saving = (measured[3] / size) * (measured[4] / latency)
+                if error - reference_error <= tolerance and saving < 1.0 and (best is None or saving < best[0]):
+                    best = (saving, measured)
+        except Exception as e:
+            logger.debug(f"Could not create variants of '{name}': {str(e)}")
+
+        if best is not None:
+            description, variant, error, variant_size, variant_latency = best[1]
+            setattr(module, name, variant)
+            report[name] = {
+                "variant": description,
+                "bytes_before": size,
+                "bytes_after": variant_size,
+                "latency_ms_before": latency,
+                "latency_ms_after": variant_latency,
+                "error_before": reference_error,
+                "error_after": error,
+            }
+    return report
+
+
+def _fingerprint(estimator: Any) -> Tuple[type, int, str]:
+    params = estimator.get_params() if callable(getattr(estimator, "get_params", None)) else None
+    return type(estimator), estimator_size(estimator), repr(params)
+
+
+def store_compressed(original: Any, compressed: Any, artifacts: List[str | Path]) -> Path | None:
+    """
+    Overwrite the model artifact that an estimator was loaded from with a compressed variant of the estimator.
+
+    The artifact is found among the joblib and pickle artifacts as the one holding an estimator of the same type,
+    with the same parameters and the same pickled size as the original. The pickles themselves cannot be compared,
+    as the node arrays of fitted trees contain uninitialised padding bytes. The artifact is written back in the same
+    format, so that the predictor loads the compressed estimator without any change to its code. It is replaced
+    rather than written in place, as it may be a link to a file shared with other models in the artifact store.
+
+    :param original: the original estimator
+    :param compressed: the compressed estimator
+    :param artifacts: the paths of the model artifacts
+    :return: the path of the overwritten artifact, or None if no artifact holds the original estimator
+    """
+    fingerprint = _fingerprint(original)
+    for artifact in artifacts:
+        path = Path(artifact)
+        if path.suffix not in (".joblib", ".pkl", ".pickle") or not path.is_file():
+            continue
+        try:
+            loaded = joblib.load(path)
+            matches = _fingerprint(loaded) == fingerprint
+        except Exception:
+            continue
+        if matches:
+            temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}{path.suffix}")
+            try:
+                if path.suffix == ".joblib":
+                    joblib.dump(compressed, temporary)
+                else:
+                    with open(temporary, "wb") as f:
+                        pickle.dump(compressed, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary, path)
+            finally:
+                if temporary.exists():
+                    temporary.unlink()
+            return path
+    return None
@@ -0,0 +1,92 @@
+# TinyML/internal/runtime/concurrency.py
+
+"""
+This module provides the `AsyncExecutor` class, which runs blocking prediction calls from asyncio code.
+
+Calling a synchronous predictor from a coroutine blocks the event loop for the duration of the call. An
+`AsyncExecutor` offloads each call to a thread or process pool, limits the number of calls in flight, and
+applies an optional per-call deadline. When the concurrency limit is reached, further calls wait for a free
+slot instead of piling up work in the pool, which propagates backpressure to the callers.
+
+Example:
+>>>    executor = AsyncExecutor(ThreadPoolExecutor(max_workers=4), max_concurrency=4)
+>>>    prediction = await executor.run(model.predict, {"bedrooms": 3}, deadline_ms=50)
+"""
+
+import asyncio
+import functools
+import weakref
+from concurrent.futures import Executor, Future
+from typing import Any, Callable
+
+
+def _release(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore, future: Future) -> None:
+    """Release a call's slot once the function has returned, from the executor thread that ran it."""
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # The event loop has been closed, and its semaphore with it
+        pass
+
+
+class AsyncExecutor:
+    """
+    Runs blocking functions on an executor from asyncio code, with a concurrency limit and per-call deadlines.
+
+    Attributes:
+        executor: The thread or process pool on which the functions run.
+        max_concurrency: The maximum number of calls in flight at once.
+    """
+
+    def __init__(self, executor: Executor, max_concurrency: int):
+        """
+        Initialise the async executor.
+
+        :param executor: the thread or process pool on which the functions run
+        :param max_concurrency: the maximum number of calls in flight at once
+        """
+        if max_concurrency < 1:
+            raise ValueError("Maximum concurrency must be at least 1")
+        self.executor: Executor = executor
+        self.max_concurrency: int = max_concurrency
+        # asyncio primitives belong to a single event loop, so each loop gets its own semaphore
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, deadline_ms: float | None = None) -> Any:
+        """
+        Run a blocking function on the executor, waiting for a free slot if the concurrency limit is reached.
+
+        The deadline covers both the time spent waiting for a slot and the time spent running the function.
+        A call that misses its deadline raises a `TimeoutError`; the function itself cannot be interrupted, and
+        keeps its slot until it returns, so slow calls that time out still count towards the concurrency limit.
+        A call that times out before the function has started is cancelled, and frees its slot at once.
+
+        :param fn: the function to run
+        :param args: the positional arguments to pass to the function
+        :param deadline_ms: the maximum time in milliseconds to wait for the result, or None to wait indefinitely
+        :return: the result of the function
+        :raises TimeoutError: if the deadline is exceeded
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+
+        async with asyncio.timeout(deadline_ms / 1000.0 if deadline_ms is not None else None):
+            await semaphore.acquire()
+            try:
+                future = self.executor.submit(functools.partial(fn, *args))
+            except BaseException:
+                semaphore.release()
+                raise
+            # The slot is released when the function returns, not when the awaiting coroutine gives up on it
+            future.add_done_callback(functools.partial(_release, loop, semaphore))
+            return await asyncio.wrap_future(future, loop=loop)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the underlying executor.
+
+        :param wait: whether to wait for running calls to complete
+        """
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,138 @@
+# TinyML/internal/runtime/deadline.py
+
+"""
+This module provides the `DeadlineGuard` class, which bounds the latency of single predictions, and answers with a
+fallback when the predictor does not answer in time.
+
+A running Python function cannot be interrupted, so a prediction with a deadline runs on a small pool of threads
+owned by the guard, and the calling thread waits for its result no longer than the deadline. When the deadline is
+missed, the caller gets a fallback response instead: the most recent cached prediction for the same input, even if
+it has expired, or else a configured default, which may be a fixed output or a cheap function of the input. The slow
+prediction keeps its thread until it returns, but no longer holds up the request that started it; predictions
+that have not started by their deadline are cancelled. The guard counts the calls, the missed deadlines, and the
+fallbacks it serves, and records missed deadlines in the model's prediction metrics, as "predict_fallback" calls.
+
+Example:
+>>>    guard = DeadlineGuard(fallback={"price": 0.0}, workers=8)
+>>>    prediction = guard.run(model.predict, {"bedrooms": 3}, deadline_ms=50, cache=model.cache)
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from TinyML.config import config
+from TinyML.internal.runtime.cache import PredictionCache
+from TinyML.internal.runtime.metrics import PredictionMetrics
+
+
+class DeadlineGuard:
+    """
+    Runs predictions with a deadline on a thread pool, and serves fallback responses for missed deadlines.
+
+    Attributes:
+        fallback: The default response for missed deadlines: a fixed output, a function of the input, or None.
+        use_cache: Whether to answer missed deadlines with the most recent cached prediction for the same input.
+    """
+
+    def __init__(
+        self,
+        fallback: dict | Callable[[dict], dict] | None = None,
+        use_cache: bool = True,
+        workers: int = config.inference.deadline_workers,
+    ):
+        """
+        Initialise the guard and its thread pool.
+
+        :param fallback: the default response for missed deadlines: a fixed output, a function of the input, or None
+            to raise a TimeoutError when no cached prediction is available
+        :param use_cache: whether to answer missed deadlines with the most recent cached prediction for the input
+        :param workers: the number of threads that run predictions with a deadline
+        """
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        self.fallback: dict | Callable[[dict], dict] | None = fallback
+        self.use_cache: bool = use_cache
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tinyml-slo")
+        self._lock: threading.Lock = threading.Lock()
+        self._calls: int = 0
+        self._timeouts: int = 0
+        self._cached_fallbacks: int = 0
+        self._default_fallbacks: int = 0
+
+    def run(
+        self,
+        predict: Callable[[dict], dict],
+        x: dict,
+        deadline_ms: float,
+        cache: PredictionCache | None = None,
+        metrics: PredictionMetrics | None = None,
+    ) -> dict:
+        """
+        Call a prediction function, and return its output if it arrives within the deadline, or else a fallback.
+
+        :param predict: the prediction function
+        :param x: the input sample
+        :param deadline_ms: the maximum time in milliseconds to wait for the prediction
+        :param cache: the prediction cache to take cached fallbacks from
+        :param metrics: the prediction metrics to record missed deadlines in
+        :return: the prediction, or the fallback response if the deadline is missed
+        :raises TimeoutError: if the deadline is missed and no fallback is available
+        """
+        future = self._executor.submit(predict, x)
+        try:
+            output = future.result(timeout=deadline_ms / 1000.0)
+        except TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._calls += 1
+                self._timeouts += 1
+            if metrics is None:
+                return self._fallback(x, deadline_ms, cache)
+            # The slow prediction itself is recorded when it completes
+            with metrics.observe("predict_fallback"):
+                return self._fallback(x, deadline_ms, cache)
+        with self._lock:
+            self._calls += 1
+        return output
+
+    def _fallback(self, x: dict, deadline_ms: float, cache: PredictionCache | None) -> dict:
+        if self.use_cache and cache is not None:
+            cached = cache.peek(x, include_expired=True)
+            if cached is not None:
+                with self._lock:
+                    self._cached_fallbacks += 1
+                return cached
+        if self.fallback is None:
+            raise TimeoutError(f"Prediction did not complete within {deadline_ms} ms, and no fallback is available")
+        try:
+            output = self.fallback(x) if callable(self.fallback) else dict(self.fallback)
+        except Exception as e:
+            raise TimeoutError(f"Prediction did not complete within {deadline_ms} ms, and the fallback failed") from e
+        with self._lock:
+            self._default_fallbacks += 1
+        return output
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the guard's counters.
+
+        :return: a dictionary with the calls made with a deadline, the missed deadlines, the fallbacks served from
+            the cache and from the default, and the rate of missed deadlines
+        """
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "timeouts": self._timeouts,
+                "cached_fallbacks": self._cached_fallbacks,
+                "default_fallbacks": self._default_fallbacks,
+                "timeout_rate": self._timeouts / self._calls if self._calls else 0.0,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Shut down the thread pool.
+
+        :param wait: whether to wait for running predictions to complete
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,379 @@
+# TinyML/internal/runtime/drift.py
+
+"""
+This module provides the `DriftMonitor` class, which summarises the inputs that a model receives in streaming
+sketches, and compares them with a profile of the model's training data to detect input drift.
+
+Each input schema field gets a sketch of bounded size, however many samples are observed:
+- numeric fields are summarised in a `QuantileSketch`, a merging t-digest that estimates quantiles with the best
+  accuracy in the tails, and are also counted in the bins of the training profile;
+- other fields are summarised in a `FrequencySketch`, a count-min sketch that estimates the frequency of any value,
+  together with the most frequent values seen.
+
+Observing a sample only appends its values to per-field buffers. The buffers are merged into the sketches with
+vectorised numpy operations once they fill up, so the work per sample is amortised O(1) and takes microseconds.
+Batches of inputs are merged directly.
+
+Drift is measured per field with the population stability index (PSI) between the training profile and the
+observed inputs, over the profile's quantile bins for numeric fields, and over its most frequent values for other
+fields; missing values are a bin of their own. A PSI above 0.2 is commonly read as a significant shift.
+
+Example:
+>>>    profile = profile_inputs(training_data, input_schema)
+>>>    monitor = DriftMonitor(input_schema, profile)
+>>>    monitor.observe({"age": 42, "city": "Leeds"})
+>>>    report = monitor.report()
+"""
+
+import threading
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from TinyML.config import config
+from TinyML.internal.common.utils.schema import type_name
+
+# Quantiles reported for numeric fields, alongside the drift score
+_REPORTED_QUANTILES = {"p01": 0.01, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p99": 0.99}
+
+
+def _is_numeric(schema_type: Any) -> bool:
+    return type_name(schema_type) in ("int", "float")
+
+
+def _psi(expected: np.ndarray, actual: np.ndarray, epsilon: float = 1e-4) -> float:
+    """
+    Compute the population stability index between two distributions over the same bins.
+    """
+    expected = np.clip(np.asarray(expected, dtype=float), epsilon, None)
+    actual = np.clip(np.asarray(actual, dtype=float), epsilon, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class QuantileSketch:
+    """
+    A merging t-digest, which summarises a stream of numbers in a bounded number of weighted centroids.
+
+    Centroids are small near the extremes of the distribution and larger near the median, so quantiles are most
+    accurate in the tails. The number of centroids is at most about half the compression.
+    """
+
+    def __init__(self, compression: float = 200.0):
+        """
+        :param compression: the accuracy parameter of the digest; higher values keep more centroids
+        """
+        self.compression: float = compression
+        self.means: np.ndarray = np.empty(0)
+        self.weights: np.ndarray = np.empty(0)
+        self.count: int = 0
+        self.min: float = np.inf
+        self.max: float = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Merge a batch of values into the digest. Missing values must be removed beforehand.
+
+        :param values: the values to add
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(values.size)])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # Group neighbouring centroids by the unit interval of the k1 scale function that their upper edge falls in,
+        # so that a group spans at most one unit of the scale plus the width of its first centroid
+        cumulative = np.cumsum(weights)
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * cumulative / cumulative[-1] - 1, -1, 1))
+        groups = np.floor(k)
+        starts = np.flatnonzero(np.r_[True, np.diff(groups) != 0])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def _knots(self) -> tuple:
+        positions = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        return np.r_[self.min, self.means, self.max], np.r_[0.0, positions, 1.0]
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile of the values added so far.
+
+        :param q: the quantile, between 0 and 1
+        :return: the estimated quantile, or NaN if no values were added
+        """
+        if not self.count:
+            return float("nan")
+        values, positions = self._knots()
+        return float(np.interp(q, positions, values))
+
+    def cdf(self, x: float) -> float:
+        """
+        Estimate the fraction of the values added so far that are at most x.
+
+        :param x: the value
+        :return: the estimated fraction, or NaN if no values were added
+        """
+        if not self.count:
+            return float("nan")
+        values, positions = self._knots()
+        return float(np.interp(x, values, positions))
+
+
+class FrequencySketch:
+    """
+    A count-min sketch, which estimates how often each value occurs in a stream, together with the most frequent
+    values seen. Estimates never undercount, and overcount by a small fraction of the total count.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, top_k: int = config.inference.drift_top_k):
+        """
+        :param width: the number of counters in each row of the sketch
+        :param depth: the number of rows of the sketch, each using a different hash function
+        :param top_k: the number of most frequent values to keep track of
+        """
+        self.width: int = width
+        self.top_k: int = top_k
+        self.counts: np.ndarray = np.zeros((depth, width), dtype=np.int64)
+        self.heavy_hitters: Dict[str, int] = {}
+        self.count: int = 0
+
+    def _indices(self, values: np.ndarray) -> np.ndarray:
+        # Derive one index per row from a single 64-bit hash (Kirsch-Mitzenmacher double hashing)
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+        low, high = hashes & np.uint64(0xFFFFFFFF), (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.counts.shape[0], dtype=np.uint64)[:, None]
+        return ((low[None, :] + rows * high[None, :]) % np.uint64(self.width)).astype(np.intp)
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add a batch of values to the sketch. Missing values must be removed beforehand.
+
+        :param values: the values to add, as strings
+        """
+        counts = pd.Series(values, dtype=object).value_counts()
+        if counts.empty:
+            return
+        indices = self._indices(counts.index.to_numpy())
+        for row, row_indices in enumerate(indices):
+            np.add.at(self.counts[row], row_indices, counts.to_numpy())
+        self.count += int(counts.sum())
+
+        candidates = list(dict.fromkeys([*self.heavy_hitters, *counts.index[: self.top_k]]))
+        estimates = self.estimate(candidates)
+        ranked = sorted(zip(candidates, estimates), key=lambda item: item[1], reverse=True)[: self.top_k]
+        self.heavy_hitters = {value: int(estimate) for value, estimate in ranked}
+
+    def estimate(self, values: List[str]) -> np.ndarray:
+        """
+        Estimate how often each of the given values was added.
+
+        :param values: the values to look up, as strings
+        :return: the estimated counts, in the order of the values
+        """
+        if not len(values):
+            return np.zeros(0, dtype=np.int64)
+        indices = self._indices(np.asarray(values, dtype=object))
+        return np.take_along_axis(self.counts, indices, axis=1).min(axis=0)
+
+
+def profile_inputs(
+    data: pd.DataFrame,
+    input_schema: Dict[str, Any],
+    bins: int = config.inference.drift_profile_bins,
+    top_k: int = config.inference.drift_top_k,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Profile the input schema fields of a dataset, as the reference that a `DriftMonitor` compares inputs with.
+
+    Numeric fields are profiled by their quantile bin edges and the fraction of values in each bin, other fields by
+    the fractions of their most frequent values. Fields missing from the dataset are left out.
+
+    :param data: the dataset, typically the model's training data
+    :param input_schema: mapping of input field names to their types
+    :param bins: the number of quantile bins for numeric fields
+    :param top_k: the number of most frequent values profiled for other fields
+    :return: the profile, which can be pickled and stored with the model
+    """
+    profile = {}
+    for field, schema_type in input_schema.items():
+        if field not in data or not len(data):
+            continue
+        column = data[field]
+        missing = column.isna()
+        entry: Dict[str, Any] = {"count": int(len(column)), "missing": float(missing.mean())}
+        present = column[~missing]
+        if _is_numeric(schema_type):
+            values = pd.to_numeric(present, errors="coerce").dropna().to_numpy(dtype=float)
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])) if len(values) else []
+            histogram = np.bincount(np.searchsorted(edges, values, side="left"), minlength=len(edges) + 1)
+            entry["type"] = "numeric"
+            entry["edges"] = [float(edge) for edge in edges]
+            entry["fractions"] = (histogram / len(column)).tolist()
+            entry["quantiles"] = {
+                name: float(np.quantile(values, q)) if len(values) else float("nan")
+                for name, q in _REPORTED_QUANTILES.items()
+            }
+        else:
+            frequencies = present.astype(str).value_counts().head(top_k) / len(column)
+            entry["type"] = "categorical"
+            entry["frequencies"] = {str(value): float(fraction) for value, fraction in frequencies.items()}
+        profile[field] = entry
+    return profile
+
+
+class DriftMonitor:
+    """
+    Summarises the inputs of a model in per-field streaming sketches, and reports their drift from a profile of the
+    training data.
+
+    Attributes:
+        input_schema: Mapping of input field names to their types.
+        profile: The training data profile created by `profile_inputs`, or None to only summarise the inputs.
+        buffer_size: The number of observed samples buffered before they are merged into the sketches.
+    """
+
+    def __init__(
+        self,
+        input_schema: Dict[str, Any],
+        profile: Dict[str, Dict[str, Any]] = None,
+        buffer_size: int = config.inference.drift_buffer_size,
+    ):
+        """
+        :param input_schema: mapping of input field names to their types
+        :param profile: the training data profile created by `profile_inputs`
+        :param buffer_size: the number of observed samples buffered before they are merged into the sketches
+        """
+        self.input_schema: Dict[str, Any] = dict(input_schema)
+        self.profile: Dict[str, Dict[str, Any]] | None = profile
+        self.buffer_size: int = buffer_size
+        self.fields: List[str] = list(self.input_schema)
+        self._numeric: Dict[str, bool] = {field: _is_numeric(t) for field, t in self.input_schema.items()}
+        self._sketches: Dict[str, QuantileSketch | FrequencySketch] = {
+            field: QuantileSketch() if numeric else FrequencySketch() for field, numeric in self._numeric.items()
+        }
+        self._missing: Dict[str, int] = dict.fromkeys(self.fields, 0)
+        self._bin_counts: Dict[str, np.ndarray] = {
+            field: np.zeros(len(entry["edges"]) + 1, dtype=np.int64)
+            for field, entry in (profile or {}).items()
+            if entry["type"] == "numeric" and field in self._numeric
+        }
+        self._observed: int = 0
+        self._buffers: Dict[str, List[Any]] = {field: [] for field in self.fields}
+        self._buffered: int = 0
+        self._buffer_lock: threading.Lock = threading.Lock()
+        self._sketch_lock: threading.Lock = threading.Lock()
+
+    def __reduce__(self):
+        # Copies of the monitor, such as in worker processes, start with empty sketches
+        return DriftMonitor, (self.input_schema, self.profile, self.buffer_size)
+
+    def observe(self, sample: dict) -> None:
+        """
+        Record the input values of a single sample.
+
+        :param sample: the input sample
+        """
+        with self._buffer_lock:
+            for field, buffer in self._buffers.items():
+                buffer.append(sample.get(field))
+            self._buffered += 1
+            if self._buffered < self.buffer_size:
+                return
+            buffers, self._buffers = self._buffers, {field: [] for field in self.fields}
+            self._buffered = 0
+        self._merge(pd.DataFrame(buffers))
+
+    def observe_batch(self, samples: pd.DataFrame) -> None:
+        """
+        Record the input values of a batch of samples.
+
+        :param samples: the batch of inputs, with one column per input schema field
+        """
+        self._merge(samples)
+
+    def flush(self) -> None:
+        """
+        Merge the buffered samples into the sketches.
+        """
+        with self._buffer_lock:
+            buffers, self._buffers = self._buffers, {field: [] for field in self.fields}
+            self._buffered = 0
+        self._merge(pd.DataFrame(buffers))
+
+    def _merge(self, samples: pd.DataFrame) -> None:
+        if not len(samples):
+            return
+        with self._sketch_lock:
+            self._observed += len(samples)
+            for field in self.fields:
+                if field not in samples:
+                    self._missing[field] += len(samples)
+                    continue
+                column = samples[field]
+                if self._numeric[field]:
+                    values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=float)
+                    values = values[~np.isnan(values)]
+                    self._sketches[field].update(values)
+                    if field in self._bin_counts:
+                        edges = self.profile[field]["edges"]
+                        self._bin_counts[field] += np.bincount(
+                            np.searchsorted(edges, values, side="left"), minlength=len(edges) + 1
+                        )
+                else:
+                    present = column[column.notna()]
+                    values = present.astype(str).to_numpy(dtype=object)
+                    self._sketches[field].update(values)
+                self._missing[field] += len(samples) - len(values)
+
+    def report(self, threshold: float = config.inference.drift_psi_threshold) -> Dict[str, Any]:
+        """
+        Summarise the observed inputs, and their drift from the training profile if there is one.
+
+        :param threshold: the PSI above which a field is reported as drifted
+        :return: the number of observed samples, the fields reported as drifted, and per field the missing rate, the
+            most frequent values or the estimated quantiles, and the PSI against the training profile
+        """
+        self.flush()
+        fields: Dict[str, Dict[str, Any]] = {}
+        with self._sketch_lock:
+            observed = self._observed
+            for field in self.fields:
+                sketch = self._sketches[field]
+                missing = self._missing[field] / observed if observed else 0.0
+                summary: Dict[str, Any] = {"missing": missing}
+                if isinstance(sketch, QuantileSketch):
+                    summary["quantiles"] = {name: sketch.quantile(q) for name, q in _REPORTED_QUANTILES.items()}
+                else:
+                    summary["top_values"] = {
+                        value: count / observed for value, count in list(sketch.heavy_hitters.items())[:5]
+                    }
+                entry = (self.profile or {}).get(field)
+                if entry is not None and observed:
+                    summary["psi"] = self._field_psi(field, entry, missing)
+                fields[field] = summary
+
+        drifted = [field for field, summary in fields.items() if summary.get("psi", 0.0) > threshold]
+        return {"observed": observed, "drifted": drifted, "fields": fields}
+
+    def _field_psi(self, field: str, entry: Dict[str, Any], missing: float) -> float:
+        """
+        Compute the PSI of a field against its training profile, with missing values as a bin of their own.
+        """
+        if entry["type"] == "numeric" and field in self._bin_counts:
+            expected = np.r_[entry["fractions"], entry["missing"]]
+            actual = np.r_[self._bin_counts[field] / self._observed, missing]
+        elif entry["type"] == "categorical" and not self._numeric[field]:
+            values = list(entry["frequencies"])
+            known = np.asarray(list(entry["frequencies"].values()))
+            estimates = self._sketches[field].estimate(values) / self._observed
+            expected = np.r_[known, max(0.0, 1.0 - known.sum() - entry["missing"]), entry["missing"]]
+            actual = np.r_[estimates, max(0.0, 1.0 - estimates.sum() - missing), missing]
+        else:
+            return float("nan")
+        return _psi(expected, actual)
@@ -0,0 +1,152 @@
+# TinyML/internal/runtime/encoding.py
+
+"""
+This module provides the `InputEncoder` class, which converts model inputs into NumPy feature arrays.
+
+Building a pandas DataFrame for every prediction request often costs more than the estimator itself on small
+models. An `InputEncoder` is compiled once from a model's input schema: it fixes the column order and the type
+coercion of every field, and then turns a sample dictionary, a list of samples, or a DataFrame directly into a
+2D NumPy array with one row per sample and one column per input field. If all fields are numeric or boolean,
+the array has a float64 dtype; otherwise it has an object dtype, holding values of the schema's types.
+
+Every input path applies the same coercion rule: None and NaN are missing values, int fields are truncated towards
+zero, and bool fields are true for non-zero numbers and for strings such as "true" or "yes". A sample therefore
+encodes to the same features whether it is passed alone, in a list, or as a row of a DataFrame.
+
+Generated inference code can use an encoder in place of building a DataFrame per request:
+
+Example:
+>>>    from TinyML import InputEncoder
+>>>
+>>>    encoder = InputEncoder({"bedrooms": int, "bathrooms": int, "square_footage": float})
+>>>    features = encoder.encode({"bedrooms": 3, "bathrooms": 2, "square_footage": 1500.0})
+>>>    price = estimator.predict(features)[0]  # e.g. a fitted scikit-learn regressor
+"""
+
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from TinyML.internal.common.utils.schema import type_name
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or value is pd.NA or (isinstance(value, (float, np.floating)) and np.isnan(value))
+
+
+def _to_int(value: Any) -> int | None:
+    if _is_missing(value):
+        return None
+    if isinstance(value, str):
+        value = float(value)
+        return None if np.isnan(value) else int(value)
+    return int(value)
+
+
+def _to_float(value: Any) -> float | None:
+    return None if _is_missing(value) else float(value)
+
+
+def _to_bool(value: Any) -> bool | None:
+    if _is_missing(value):
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes", "y", "t")
+    return bool(value)
+
+
+def _to_str(value: Any) -> str | None:
+    return None if _is_missing(value) else str(value)
+
+
+_COERCIONS: Dict[str, Callable[[Any], Any]] = {"int": _to_int, "float": _to_float, "bool": _to_bool, "str": _to_str}
+
+
+class InputEncoder:
+    """
+    Converts model inputs into NumPy feature arrays, with a fixed column order and typed coercion per field.
+
+    Missing fields and missing values are encoded as NaN in float64 arrays, and as None in object arrays.
+
+    Attributes:
+        columns: The input field names, in the order of the array's columns.
+        types: The canonical type name of each column, one of "int", "float", "bool" or "str".
+        dtype: The dtype of the encoded arrays.
+    """
+
+    def __init__(self, input_schema: dict):
+        """
+        Compile an encoder from an input schema.
+
+        :param input_schema: mapping of input field names to their types
+        """
+        if not input_schema:
+            raise ValueError("Input schema must contain at least one field")
+
+        self.columns: List[str] = list(input_schema)
+        self.types: List[str] = [type_name(schema_type) for schema_type in input_schema.values()]
+        self.dtype: np.dtype = np.dtype(np.float64 if "str" not in self.types else object)
+        self._fields = list(zip(self.columns, [_COERCIONS[t] for t in self.types]))
+        self._types: Dict[str, str] = dict(zip(self.columns, self.types))
+
+    @property
+    def n_features(self) -> int:
+        """
+        The number of columns in the encoded arrays.
+        """
+        return len(self.columns)
+
+    def encode(self, sample: dict) -> np.ndarray:
+        """
+        Encode a single sample as an array with one row.
+
+        :param sample: the input sample
+        :return: an array of shape (1, n_features)
+        """
+        return np.array([[coerce(sample.get(column)) for column, coerce in self._fields]], dtype=self.dtype)
+
+    def encode_many(self, samples: List[dict] | pd.DataFrame, out: np.ndarray = None) -> np.ndarray:
+        """
+        Encode a batch of samples as an array with one row per sample.
+
+        :param samples: a list of input samples, or a DataFrame with one column per input field
+        :param out: optional preallocated array of shape (len(samples), n_features) and the encoder's dtype, which
+            is filled in place to avoid an allocation per call
+        :return: an array of shape (len(samples), n_features)
+        """
+        if out is None:
+            out = np.empty((len(samples), self.n_features), dtype=self.dtype)
+        elif out.shape != (len(samples), self.n_features) or out.dtype != self.dtype:
+            raise ValueError(
+                f"Output array must have shape {(len(samples), self.n_features)} and dtype {self.dtype}, "
+                f"got shape {out.shape} and dtype {out.dtype}"
+            )
+
+        if isinstance(samples, pd.DataFrame):
+            for j, (column, coerce) in enumerate(self._fields):
+                if column not in samples:
+                    out[:, j] = np.nan if self.dtype == np.float64 else None
+                elif self.dtype == np.float64:
+                    out[:, j] = self._numeric_column(samples[column], coerce)
+                else:
+                    out[:, j] = [coerce(value) for value in samples[column]]
+            return out
+
+        for j, (column, coerce) in enumerate(self._fields):
+            out[:, j] = [coerce(sample.get(column)) for sample in samples]
+        return out
+
+    def _numeric_column(self, values: pd.Series, coerce: Callable[[Any], Any]) -> np.ndarray:
+        """
+        Encode a DataFrame column as float64, vectorised for numeric columns, with the same rule as `coerce`.
+        """
+        if not (pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values)):
+            return np.array([coerce(value) for value in values], dtype=np.float64)
+        column = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        kind = self._types[values.name]
+        if kind == "int":
+            return np.trunc(column)
+        if kind == "bool":
+            return np.where(np.isnan(column), np.nan, column != 0)
+        return column
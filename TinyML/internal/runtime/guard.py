@@ -0,0 +1,152 @@
+# TinyML/internal/runtime/guard.py
+
+"""
+This module provides the `ConstraintGuard` class, which checks a model's constraints on its live predictions.
+
+Evaluating every constraint on every prediction is too expensive to leave on in production, so the guard checks
+a random sample of single predictions, at a configurable rate. Batches are checked with the constraints'
+vectorised `evaluate_batch`, which evaluates each constraint once over the whole batch rather than once per row.
+The guard counts the predictions it checks and the violations it finds, in total and per constraint, and either
+logs violations or raises a `ConstraintViolationError`.
+"""
+
+import logging
+import random
+import threading
+from typing import Any, Dict, List, Literal
+
+import numpy as np
+import pandas as pd
+
+from TinyML.constraints import Constraint
+from TinyML.exceptions import ConstraintViolationError
+
+logger = logging.getLogger(__name__)
+
+
+class ConstraintGuard:
+    """
+    Checks sampled predictions against a list of constraints, and counts the violations.
+
+    Attributes:
+        constraints: The constraints to check.
+        sample_rate: The fraction of single predictions that are checked.
+        batch_sample_rate: The fraction of rows that are checked in each batch of predictions.
+        on_violation: Whether to "log" violations, or to "raise" a ConstraintViolationError.
+    """
+
+    def __init__(
+        self,
+        constraints: List[Constraint],
+        sample_rate: float,
+        batch_sample_rate: float = 1.0,
+        on_violation: Literal["log", "raise"] = "log",
+        seed: int = None,
+    ):
+        """
+        Initialise the guard.
+
+        :param constraints: the constraints to check
+        :param sample_rate: the fraction of single predictions that are checked, between 0 and 1
+        :param batch_sample_rate: the fraction of rows that are checked in each batch, between 0 and 1
+        :param on_violation: whether to "log" violations, or to "raise" a ConstraintViolationError
+        :param seed: seed for the random sampling of predictions
+        """
+        if not 0 <= sample_rate <= 1 or not 0 <= batch_sample_rate <= 1:
+            raise ValueError("Sample rates must be between 0 and 1")
+        if on_violation not in ("log", "raise"):
+            raise ValueError(f"Unsupported violation handling: {on_violation}")
+
+        self.constraints: List[Constraint] = list(constraints)
+        self.sample_rate: float = sample_rate
+        self.batch_sample_rate: float = batch_sample_rate
+        self.on_violation: str = on_violation
+        self._random: random.Random = random.Random(seed)
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self._lock: threading.Lock = threading.Lock()
+        self._checked: int = 0
+        self._violations: int = 0
+        self._errors: int = 0
+        self._violations_by_constraint: Dict[str, int] = {c.description: 0 for c in self.constraints}
+
+    def __reduce__(self):
+        # Copies of the guard, such as in worker processes, keep their own counters
+        return ConstraintGuard, (self.constraints, self.sample_rate, self.batch_sample_rate, self.on_violation)
+
+    def check(self, inputs: dict, outputs: dict) -> None:
+        """
+        Check a single prediction against the constraints, if it is selected by sampling.
+
+        :param inputs: the input of the prediction
+        :param outputs: the output of the prediction
+        :raises ConstraintViolationError: if the prediction violates a constraint and on_violation is "raise"
+        """
+        if not self.constraints or self._random.random() >= self.sample_rate:
+            return
+        violated, errors = [], 0
+        for constraint in self.constraints:
+            try:
+                if not constraint.evaluate(inputs, outputs):
+                    violated.append(constraint.description)
+            except RuntimeError as e:
+                logger.debug(f"Constraint check failed: {str(e)}")
+                errors += 1
+        self._record(1, {description: 1 for description in violated}, errors)
+
+    def check_batch(self, inputs: pd.DataFrame, outputs: pd.DataFrame) -> None:
+        """
+        Check a sample of the rows of a batch of predictions against the constraints.
+
+        :param inputs: the inputs of the predictions, with one row per sample
+        :param outputs: the outputs of the predictions, with one row per sample
+        :raises ConstraintViolationError: if any prediction violates a constraint and on_violation is "raise"
+        """
+        if not self.constraints or len(outputs) == 0 or self.batch_sample_rate == 0:
+            return
+        inputs, outputs = inputs.reset_index(drop=True), outputs.reset_index(drop=True)
+        if self.batch_sample_rate < 1:
+            mask = self._rng.random(len(outputs)) < self.batch_sample_rate
+            inputs, outputs = inputs[mask].reset_index(drop=True), outputs[mask].reset_index(drop=True)
+            if len(outputs) == 0:
+                return
+
+        violations, errors = {}, 0
+        for constraint in self.constraints:
+            try:
+                n_violated = int(len(outputs) - np.count_nonzero(constraint.evaluate_batch(inputs, outputs)))
+            except RuntimeError as e:
+                logger.debug(f"Constraint check failed: {str(e)}")
+                errors += 1
+                continue
+            if n_violated:
+                violations[constraint.description] = n_violated
+        self._record(len(outputs), violations, errors)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the guard's counters.
+
+        :return: a dictionary with the number of predictions checked, the number of constraint violations in total
+            and per constraint, and the number of constraint evaluations that raised an error
+        """
+        with self._lock:
+            return {
+                "checked": self._checked,
+                "violations": self._violations,
+                "errors": self._errors,
+                "violations_by_constraint": dict(self._violations_by_constraint),
+            }
+
+    def _record(self, n_checked: int, violations: Dict[str, int], errors: int) -> None:
+        with self._lock:
+            self._checked += n_checked
+            self._errors += errors
+            for description, count in violations.items():
+                self._violations += count
+                self._violations_by_constraint[description] = self._violations_by_constraint.get(description, 0) + count
+
+        if violations:
+            message = "Prediction violated constraints: " + ", ".join(f"{d} ({n}x)" for d, n in violations.items())
+            if self.on_violation == "raise":
+                raise ConstraintViolationError(message)
+            logger.warning(message)
@@ -0,0 +1,212 @@
+# TinyML/internal/runtime/handle.py
+
+"""
+This module provides the `PredictorHandle` class, a picklable stand-in for a model's predictor module.
+
+A predictor module is created by executing the predictor's source code, so it cannot be pickled. A handle carries
+what is needed to create the module again instead: the predictor source, the paths of the model artifacts it
+loads, and optionally the artifacts' contents. When a handle is unpickled, for example in a worker process of a
+`ProcessPoolExecutor` or `joblib.Parallel`, it creates the module on first use. Modules are cached per process,
+keyed on the handle's contents, so every copy of a handle in a process shares one module, and the artifacts are
+loaded once per process however many tasks the process receives. The key covers the contents of the artifacts as
+well as their paths, so a handle for a model reloaded with new artifacts at the same paths gets a new module. A
+process releases its cached modules for a model with `release_modules` once it no longer serves the model.
+
+If the handle carries the artifacts' contents and the artifact paths do not exist in the receiving process, as on
+another machine, the artifacts are written to a local directory and the predictor source is pointed at them.
+
+Example:
+>>>    handle = PredictorHandle(model.predictor_source, model.artifacts)
+>>>    with ProcessPoolExecutor() as pool:
+>>>        predictions = list(pool.map(handle.predict, samples))
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import types
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import pandas as pd
+
+from TinyML.internal.runtime.batch import BatchInput, predict_batch, to_dataframe
+from TinyML.internal.runtime.preprocessing import use_reference_preprocessing
+from TinyML.internal.runtime.trees import compile_tree_ensemble
+
+# Predictor modules created in this process, keyed on the handle's digest, and the artifacts that each one loads
+_modules: Dict[str, types.ModuleType] = {}
+_module_artifacts: Dict[str, Set[str]] = {}
+_modules_lock: threading.Lock = threading.Lock()
+
+# SHA-256 digests of artifact files, keyed on their path, size, modification time and inode
+_file_digests: Dict[Tuple[str, int, int, int], bytes] = {}
+
+
+def _file_digest(path: str) -> bytes:
+    """
+    Return the SHA-256 digest of a file, memoised on its metadata, or an empty digest if the file does not exist.
+    """
+    try:
+        info = os.stat(path)
+    except OSError:
+        return b""
+    key = (os.path.abspath(path), info.st_size, info.st_mtime_ns, info.st_ino)
+    digest = _file_digests.get(key)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                sha256.update(chunk)
+        digest = _file_digests[key] = sha256.digest()
+    return digest
+
+
+def release_modules(artifacts: Iterable[str | Path]) -> int:
+    """
+    Drop the cached predictor modules of this process that load any of the given artifacts, so that the estimators
+    they hold can be garbage collected once no handle refers to them.
+
+    :param artifacts: the paths of the artifacts of a model that is no longer used
+    :return: the number of modules dropped
+    """
+    paths = {Path(artifact).as_posix() for artifact in artifacts}
+    with _modules_lock:
+        digests = [digest for digest, loaded in _module_artifacts.items() if loaded & paths]
+        for digest in digests:
+            _modules.pop(digest, None)
+            _module_artifacts.pop(digest, None)
+        stale = [key for key in _file_digests if Path(key[0]).as_posix() in paths]
+        for key in stale:
+            del _file_digests[key]
+    return len(digests)
+
+
+class PredictorHandle:
+    """
+    A picklable reference to a predictor module, which creates the module lazily in each process that uses it.
+
+    A handle exposes the predictor's `predict` and `predict_batch` functions as methods, which can be pickled and
+    sent to other processes. Other attribute lookups are forwarded to the module, so a handle can be used wherever a
+    predictor module is expected.
+
+    Attributes:
+        source: The source code of the predictor module.
+        artifacts: The paths of the model artifacts loaded by the predictor.
+        compiled_trees: The predictor variables holding tree ensembles that are compiled after the module is created.
+        reference_preprocessing: The predictor variables holding preprocessing plans that call their original
+            preprocessors, as they failed their check.
+        digest: A digest of the handle's contents, which identifies its module in the per-process cache.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        artifacts: List[str | Path] = None,
+        embed_artifacts: bool = False,
+        compiled_trees: List[str] = None,
+        reference_preprocessing: List[str] = None,
+    ):
+        """
+        Create a handle for a predictor.
+
+        :param source: the source code of the predictor module
+        :param artifacts: the paths of the model artifacts loaded by the predictor
+        :param embed_artifacts: whether to carry the artifacts' contents, so that the predictor can be created in
+            processes where the artifact paths do not exist
+        :param compiled_trees: the predictor variables holding tree ensembles to compile after the module is created
+        :param reference_preprocessing: the predictor variables holding preprocessing plans that must call their
+            original preprocessors
+        """
+        self.source: str = source
+        self.artifacts: List[str] = [str(Path(artifact).as_posix()) for artifact in artifacts or []]
+        self.compiled_trees: List[str] = list(compiled_trees or [])
+        self.reference_preprocessing: List[str] = list(reference_preprocessing or [])
+        self._artifact_data: Dict[str, bytes] | None = None
+        if embed_artifacts:
+            self._artifact_data = {path: Path(path).read_bytes() for path in self.artifacts}
+
+        digest = hashlib.sha256(source.encode("utf-8"))
+        for path in self.artifacts + self.compiled_trees + self.reference_preprocessing:
+            digest.update(b"\0" + path.encode("utf-8"))
+        if self._artifact_data is not None:
+            for data in self._artifact_data.values():
+                digest.update(hashlib.sha256(data).digest())
+        else:
+            for path in self.artifacts:
+                digest.update(_file_digest(path))
+        self.digest: str = digest.hexdigest()
+        self._module: types.ModuleType | None = None
+
+    @property
+    def module(self) -> types.ModuleType:
+        """
+        The predictor module, which is created on first use and then shared by all handles with the same digest.
+        """
+        if self._module is None:
+            with _modules_lock:
+                module = _modules.get(self.digest)
+                if module is None:
+                    module = _modules[self.digest] = self._create_module()
+                    _module_artifacts[self.digest] = set(self.artifacts)
+            self._module = module
+        return self._module
+
+    def predict(self, sample: dict) -> dict:
+        """
+        Score a single sample with the predictor.
+
+        :param sample: the input sample
+        :return: the output of the predictor
+        """
+        return self.module.predict(sample)
+
+    def predict_batch(self, samples: BatchInput) -> pd.DataFrame:
+        """
+        Score a batch of samples with the predictor, falling back to one `predict` call per row for predictors
+        without a vectorised `predict_batch` function.
+
+        :param samples: the batch of inputs
+        :return: one output row per input row
+        """
+        return predict_batch(self.module, to_dataframe(samples))
+
+    def __getattr__(self, name: str) -> Any:
+        # Private names are never forwarded, so that lookups made while unpickling do not create the module
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.module, name)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_module"] = None
+        return state
+
+    def _create_module(self) -> types.ModuleType:
+        """
+        Execute the predictor source, restoring embedded artifacts first if their paths do not exist.
+        """
+        source = self.source
+        if self._artifact_data and not all(Path(path).exists() for path in self.artifacts):
+            directory = Path(tempfile.gettempdir()) / "tinyml-predictors" / self.digest[:16]
+            directory.mkdir(parents=True, exist_ok=True)
+            for path, data in self._artifact_data.items():
+                local = directory / Path(path).name
+                if not local.exists():
+                    local.write_bytes(data)
+                source = source.replace(path, local.as_posix())
+        else:
+            missing = [path for path in self.artifacts if path in source and not Path(path).exists()]
+            if missing:
+                raise FileNotFoundError(
+                    f"Predictor artifacts not found: {', '.join(missing)}; create the handle with embed_artifacts=True "
+                    f"to use it where the artifacts are not available"
+                )
+
+        module = types.ModuleType("predictor")
+        exec(source, module.__dict__)
+        for name in self.compiled_trees:
+            setattr(module, name, compile_tree_ensemble(getattr(module, name)))
+        use_reference_preprocessing(module, self.reference_preprocessing)
+        return module
@@ -0,0 +1,422 @@
+# TinyML/internal/runtime/metrics.py
+
+"""
+This module provides the `PredictionMetrics` class, which records per-model prediction metrics, and exports them
+in the Prometheus text exposition format.
+
+For each prediction method, such as `predict` or `predict_batch`, the metrics count the calls, the failed calls and
+the samples scored, and keep histograms of the call latency and of the batch size. Histograms use fixed bucket
+bounds, so recording an observation is a binary search and a few additions.
+
+Recording must not become a point of contention between threads serving predictions, so counters are striped:
+each method's counters are split into a fixed number of stripes, each with its own lock, and each thread always
+records into the same stripe, assigned round-robin on its first observation. Threads rarely share a stripe, so its
+lock is almost never contended, and the stripes are only summed when the metrics are exported.
+
+A model served by several worker processes has separate counters in each process. `SharedMetrics` sums them: each
+process publishes the totals of its own counters to a file in a directory shared by the processes, periodically
+and whenever it exports the metrics, and exports the sum of all the files. The files of workers that have exited
+are kept, so that the totals never decrease.
+
+Example:
+>>>    metrics = PredictionMetrics("house-prices")
+>>>    with metrics.observe("predict"):
+>>>        prediction = model.predict(sample)
+>>>    metrics.write("/var/lib/node_exporter/house-prices.prom")
+"""
+
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from TinyML.config import config
+
+# Layout of the values of a stripe: counters, sums, then the latency and batch size bucket counts
+_CALLS, _ERRORS, _SAMPLES, _BATCHES, _LATENCY_SUM, _BATCH_SIZE_SUM, _BUCKETS = range(7)
+
+
+class _Stripe:
+    __slots__ = ("lock", "values")
+
+    def __init__(self, width: int):
+        self.lock = threading.Lock()
+        self.values: List[float] = [0] * width
+
+
+class _Observation:
+    """
+    Context manager that records the duration and outcome of its block; cheaper to enter than a generator-based one.
+    """
+
+    __slots__ = ("metrics", "method", "n_samples", "batch", "start")
+
+    def __init__(self, metrics: "PredictionMetrics", method: str, n_samples: int, batch: bool):
+        self.metrics, self.method, self.n_samples, self.batch = metrics, method, n_samples, batch
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.metrics.record(
+            self.method, time.perf_counter() - self.start, self.n_samples, exc_type is not None, self.batch
+        )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound)) if bound != int(bound) else f"{int(bound)}.0"
+
+
+class PredictionMetrics:
+    """
+    Thread-safe counters and fixed-bucket histograms of a model's predictions, per prediction method.
+
+    Attributes:
+        model_name: The value of the `model` label of the exported metrics.
+        latency_buckets: The upper bounds of the latency histogram buckets, in seconds.
+        batch_size_buckets: The upper bounds of the batch size histogram buckets.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        latency_buckets: Sequence[float] = config.inference.metrics_latency_buckets,
+        batch_size_buckets: Sequence[float] = config.inference.metrics_batch_size_buckets,
+        stripes: int = config.inference.metrics_stripes,
+    ):
+        """
+        Initialise empty metrics.
+
+        :param model_name: the value of the `model` label of the exported metrics
+        :param latency_buckets: the upper bounds of the latency histogram buckets, in seconds
+        :param batch_size_buckets: the upper bounds of the batch size histogram buckets
+        :param stripes: the number of stripes that each method's counters are split into
+        """
+        if stripes < 1:
+            raise ValueError("The number of stripes must be at least 1")
+        self.model_name: str = model_name
+        self.latency_buckets: tuple = tuple(sorted(latency_buckets))
+        self.batch_size_buckets: tuple = tuple(sorted(batch_size_buckets))
+        self._stripes: int = stripes
+        self._batch_offset: int = _BUCKETS + len(self.latency_buckets) + 1
+        self._width: int = self._batch_offset + len(self.batch_size_buckets) + 1
+        self._series: Dict[str, List[_Stripe]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._local: threading.local = threading.local()
+        self._next_stripe: Iterator[int] = itertools.count()
+
+    def __reduce__(self):
+        # Copies of the metrics, such as in worker processes, keep their own counters
+        return PredictionMetrics, (self.model_name, self.latency_buckets, self.batch_size_buckets, self._stripes)
+
+    def record(self, method: str, seconds: float, n_samples: int = 1, error: bool = False, batch: bool = False) -> None:
+        """
+        Record a prediction call.
+
+        :param method: the prediction method, such as "predict" or "predict_batch"
+        :param seconds: the duration of the call
+        :param n_samples: the number of samples scored by the call
+        :param error: whether the call failed
+        :param batch: whether to record the number of samples in the batch size histogram
+        """
+        series = self._series.get(method)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(method, [_Stripe(self._width) for _ in range(self._stripes)])
+        try:
+            stripe = series[self._local.stripe]
+        except AttributeError:
+            self._local.stripe = next(self._next_stripe) % self._stripes
+            stripe = series[self._local.stripe]
+
+        latency_bucket = _BUCKETS + bisect_left(self.latency_buckets, seconds)
+        with stripe.lock:
+            values = stripe.values
+            values[_CALLS] += 1
+            values[_SAMPLES] += n_samples
+            values[_LATENCY_SUM] += seconds
+            values[latency_bucket] += 1
+            if error:
+                values[_ERRORS] += 1
+            if batch:
+                values[_BATCHES] += 1
+                values[_BATCH_SIZE_SUM] += n_samples
+                values[self._batch_offset + bisect_left(self.batch_size_buckets, n_samples)] += 1
+
+    def reset(self) -> None:
+        """
+        Discard all recorded observations.
+        """
+        with self._lock:
+            self._series = {}
+
+    def observe(self, method: str, n_samples: int = 1, batch: bool = False) -> _Observation:
+        """
+        Record the duration and outcome of the code in a `with` block as a prediction call.
+
+        :param method: the prediction method, such as "predict" or "predict_batch"
+        :param n_samples: the number of samples scored by the call
+        :param batch: whether to record the number of samples in the batch size histogram
+        :return: a context manager
+        """
+        return _Observation(self, method, n_samples, batch)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the current totals, per prediction method.
+
+        :return: a dictionary mapping each method to its calls, errors, samples and batches, its latency sum and
+            latency bucket counts, and its batch size sum and batch size bucket counts; bucket counts are not
+            cumulative, and have one more entry than there are bounds, for the values above the last bound
+        """
+        with self._lock:
+            series = dict(self._series)
+        snapshot = {}
+        for method, stripes in series.items():
+            totals = [0] * self._width
+            for stripe in stripes:
+                with stripe.lock:
+                    totals = [total + value for total, value in zip(totals, stripe.values)]
+            snapshot[method] = {
+                "calls": totals[_CALLS],
+                "errors": totals[_ERRORS],
+                "samples": totals[_SAMPLES],
+                "batches": totals[_BATCHES],
+                "latency_sum": totals[_LATENCY_SUM],
+                "latency_buckets": totals[_BUCKETS : self._batch_offset],
+                "batch_size_sum": totals[_BATCH_SIZE_SUM],
+                "batch_size_buckets": totals[self._batch_offset :],
+            }
+        return snapshot
+
+    def export(self) -> str:
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        :return: the metrics as text
+        """
+        return render_metrics([self])
+
+    def write(self, path: str | Path) -> None:
+        """
+        Write the metrics in the Prometheus text exposition format to a file, such as one read by the node
+        exporter's textfile collector. The file is replaced atomically, so readers never see a partial file.
+
+        :param path: the path of the file to write
+        """
+        write_metrics(path, [self])
+
+
+def _add_totals(totals: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: [a + b for a, b in zip(value, other[key])] if isinstance(value, list) else value + other[key]
+        for key, value in totals.items()
+    }
+
+
+class SharedMetrics:
+    """
+    The prediction metrics of a model served by several processes, summed across the processes.
+
+    Each process wraps its own `PredictionMetrics` in a `SharedMetrics` on the same directory. A `SharedMetrics`
+    can be exported like a `PredictionMetrics`, with `render_metrics` or `send_metrics`.
+
+    Attributes:
+        metrics: The metrics recorded by this process.
+        directory: The directory shared by the processes, holding one file of totals per process.
+        name: The name of this process's file in the directory.
+    """
+
+    def __init__(self, metrics: PredictionMetrics, directory: str | Path, name: str = None):
+        """
+        Wrap the metrics of this process.
+
+        :param metrics: the metrics recorded by this process
+        :param directory: the directory shared by the processes
+        :param name: the name of this process's file; by default, the process ID
+        """
+        self.metrics: PredictionMetrics = metrics
+        self.directory: Path = Path(directory)
+        self.name: str = name or str(os.getpid())
+        self._publisher: threading.Thread | None = None
+
+    @property
+    def model_name(self) -> str:
+        return self.metrics.model_name
+
+    @property
+    def latency_buckets(self) -> tuple:
+        return self.metrics.latency_buckets
+
+    @property
+    def batch_size_buckets(self) -> tuple:
+        return self.metrics.batch_size_buckets
+
+    def publish(self) -> None:
+        """
+        Write the totals of this process's metrics to its file, replacing the file atomically.
+        """
+        path = self.directory / f"{self.name}.json"
+        fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.metrics.snapshot(), f)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def start(self, interval: float = config.serving.metrics_publish_seconds) -> "SharedMetrics":
+        """
+        Publish this process's totals periodically from a background thread, until the process exits.
+
+        :param interval: the time in seconds between two publications
+        :return: the shared metrics themselves, to allow chaining
+        """
+
+        def run() -> None:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.publish()
+                except OSError:
+                    # The directory is removed when the processes stop serving
+                    return
+
+        self._publisher = threading.Thread(target=run, name="metrics-publisher", daemon=True)
+        self._publisher.start()
+        return self
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Publish this process's totals, and return the totals of all processes, per prediction method.
+
+        :return: the summed totals, in the same format as `PredictionMetrics.snapshot`
+        """
+        self.publish()
+        totals: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for method, method_totals in snapshot.items():
+                totals[method] = _add_totals(totals[method], method_totals) if method in totals else method_totals
+        return totals
+
+
+def render_metrics(metrics: Iterable[PredictionMetrics | SharedMetrics]) -> str:
+    """
+    Render the metrics of several models in the Prometheus text exposition format.
+
+    :param metrics: the metrics to render
+    :return: the metrics as text
+    """
+    snapshots = [(m, m.snapshot()) for m in metrics]
+    lines: List[str] = []
+
+    def counter(name: str, help_text: str, key: str) -> None:
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter"])
+        for m, snapshot in snapshots:
+            for method, totals in snapshot.items():
+                lines.append(f'{name}{{model="{_escape(m.model_name)}",method="{_escape(method)}"}} {totals[key]}')
+
+    def histogram(name: str, help_text: str, bounds_attr: str, prefix: str, count_key: str) -> None:
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+        for m, snapshot in snapshots:
+            bounds = getattr(m, bounds_attr)
+            for method, totals in snapshot.items():
+                if not totals[count_key]:
+                    continue
+                labels = f'model="{_escape(m.model_name)}",method="{_escape(method)}"'
+                for bound, cumulative in zip(bounds, itertools.accumulate(totals[f"{prefix}_buckets"])):
+                    lines.append(f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {totals[count_key]}')
+                lines.append(f"{name}_sum{{{labels}}} {totals[f'{prefix}_sum']}")
+                lines.append(f"{name}_count{{{labels}}} {totals[count_key]}")
+
+    counter("tinyml_predictions_total", "Number of prediction calls.", "calls")
+    counter("tinyml_prediction_errors_total", "Number of prediction calls that failed.", "errors")
+    counter("tinyml_prediction_samples_total", "Number of samples scored.", "samples")
+    histogram(
+        "tinyml_prediction_latency_seconds", "Latency of prediction calls.", "latency_buckets", "latency", "calls"
+    )
+    histogram(
+        "tinyml_prediction_batch_size", "Number of samples per batch.", "batch_size_buckets", "batch_size", "batches"
+    )
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: str | Path, metrics: Iterable[PredictionMetrics | SharedMetrics]) -> None:
+    """
+    Write the metrics of several models to a file in the Prometheus text exposition format, replacing it atomically.
+
+    :param path: the path of the file to write
+    :param metrics: the metrics to write
+    """
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(render_metrics(metrics))
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path != "/metrics":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        send_metrics(self, self.server.metrics)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def send_metrics(handler: BaseHTTPRequestHandler, metrics: Iterable[PredictionMetrics | SharedMetrics]) -> None:
+    """
+    Send the metrics as the response to an HTTP request, in the Prometheus text exposition format.
+
+    :param handler: the handler of the request
+    :param metrics: the metrics to send
+    """
+    content = render_metrics(metrics).encode("utf-8")
+    handler.send_response(HTTPStatus.OK)
+    handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+    handler.send_header("Content-Length", str(len(content)))
+    handler.end_headers()
+    handler.wfile.write(content)
+
+
+def start_metrics_server(
+    metrics: Iterable[PredictionMetrics | SharedMetrics],
+    host: str = "127.0.0.1",
+    port: int = config.serving.metrics_port,
+) -> ThreadingHTTPServer:
+    """
+    Serve the metrics of several models on a local `GET /metrics` endpoint, from a background thread.
+
+    :param metrics: the metrics to serve
+    :param host: the host address to bind to
+    :param port: the port to bind to; use 0 to pick any free port
+    :return: the HTTP server; call its `shutdown()` method to stop it
+    """
+    httpd = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    httpd.daemon_threads = True
+    httpd.metrics = list(metrics)
+    threading.Thread(target=httpd.serve_forever, name="metrics-server", daemon=True).start()
+    return httpd
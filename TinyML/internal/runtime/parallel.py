@@ -0,0 +1,137 @@
+# TinyML/internal/runtime/parallel.py
+
+"""
+This module provides multi-process batch prediction for generated predictors.
+
+The predictor module of a model is created by executing its source code, so it cannot be pickled and sent to
+worker processes. Instead, workers receive a `PredictorHandle`, which creates the predictor module once per worker
+process, loading the model artifacts once per worker. The input batch is written once to an Arrow IPC file, placed
+in shared memory where the platform provides it, and every worker memory-maps that file; workers then receive only
+row ranges to score, rather than pickled copies of the input rows.
+"""
+
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+
+from TinyML.config import config
+from TinyML.internal.runtime.batch import BatchInput, predict_batch, to_dataframe
+from TinyML.internal.runtime.handle import PredictorHandle
+
+# Per-process state of a worker, populated once by the pool initializer
+_worker_state: Dict[str, Any] = {}
+
+
+def _shared_memory_dir() -> str | None:
+    """Return a RAM-backed directory for the shared input file if available, or None for the default temp dir."""
+    return "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+
+def _handle(predictor: PredictorHandle | str) -> PredictorHandle:
+    return predictor if isinstance(predictor, PredictorHandle) else PredictorHandle(predictor)
+
+
+def _initialise_worker(
+    predictor: PredictorHandle, input_path: str | None = None, output_columns: List[str] | None = None
+) -> None:
+    """
+    Load the predictor and, if given, map the shared input table, once per worker process.
+    """
+    _worker_state["predictor"] = predictor.module
+    _worker_state["output_columns"] = output_columns
+    if input_path is not None:
+        _worker_state["table"] = pa.ipc.open_file(pa.memory_map(input_path, "r")).read_all()
+
+
+def _predict_rows(start: int, stop: int) -> pd.DataFrame:
+    """
+    Score the rows [start, stop) of the shared input table in a worker process.
+    """
+    rows = _worker_state["table"].slice(start, stop - start).to_pandas()
+    return predict_batch(_worker_state["predictor"], rows, _worker_state["output_columns"])
+
+
+def worker_predict(sample: dict) -> dict:
+    """
+    Score a single sample in a worker process.
+    """
+    return _worker_state["predictor"].predict(sample)
+
+
+def worker_predict_batch(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score a batch of samples passed to a worker process.
+    """
+    return predict_batch(_worker_state["predictor"], frame, _worker_state["output_columns"])
+
+
+def create_worker_pool(
+    predictor: PredictorHandle | str, max_workers: int, output_columns: List[str] = None
+) -> ProcessPoolExecutor:
+    """
+    Create a pool of worker processes that each load the predictor once, for use with `worker_predict` and
+    `worker_predict_batch`.
+
+    :param predictor: a handle to the predictor, or the source code of the predictor module
+    :param max_workers: the number of worker processes
+    :param output_columns: the expected output columns of batch predictions
+    :return: the process pool
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_initialise_worker, initargs=(_handle(predictor), None, output_columns)
+    )
+
+
+def predict_many(
+    predictor: PredictorHandle | str,
+    data: BatchInput,
+    output_columns: List[str] = None,
+    n_jobs: int = -1,
+    chunk_size: int = None,
+) -> pd.DataFrame | pa.Table:
+    """
+    Score a batch of inputs across a pool of worker processes.
+
+    :param predictor: a handle to the predictor, or the source code of the predictor module
+    :param data: the batch of inputs
+    :param output_columns: the expected output columns
+    :param n_jobs: the number of worker processes; -1 to use one per CPU
+    :param chunk_size: the number of rows scored per task; by default, each worker receives several chunks
+    :return: one output row per input row, as a pyarrow Table if the input was a pyarrow Table
+    """
+    if n_jobs == 0 or n_jobs < -1:
+        raise ValueError("n_jobs must be a positive integer, or -1 to use all CPUs")
+    n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(to_dataframe(data), preserve_index=False)
+    n_rows = table.num_rows
+    chunk_size = chunk_size or max(1, math.ceil(n_rows / (n_jobs * config.inference.chunks_per_worker)))
+    ranges = [(start, min(start + chunk_size, n_rows)) for start in range(0, n_rows, chunk_size)]
+
+    chunks: List[pd.DataFrame] = []
+    if ranges:
+        fd, input_path = tempfile.mkstemp(prefix="tinyml-batch-", suffix=".arrow", dir=_shared_memory_dir())
+        os.close(fd)
+        try:
+            with pa.OSFile(input_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            with ProcessPoolExecutor(
+                max_workers=min(n_jobs, len(ranges)),
+                initializer=_initialise_worker,
+                initargs=(_handle(predictor), input_path, output_columns),
+            ) as pool:
+                futures = [pool.submit(_predict_rows, start, stop) for start, stop in ranges]
+                chunks = [future.result() for future in futures]
+        finally:
+            Path(input_path).unlink(missing_ok=True)
+
+    outputs = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=output_columns)
+    if isinstance(data, pa.Table):
+        return pa.Table.from_pandas(outputs, preserve_index=False)
+    return outputs
@@ -0,0 +1,367 @@
+# TinyML/internal/runtime/preprocessing.py
+
+"""
+This module provides a compiler that fuses fitted scikit-learn preprocessors into a single NumPy transform.
+
+Generated training scripts save each preprocessor to its own joblib file, so a generated predictor typically calls
+several scikit-learn `transform` methods per request, each with its own input validation and DataFrame handling.
+`compile_preprocessing` turns the fitted preprocessors into a `PreprocessingPlan`, which precomputes everything the
+transform needs: scalers become one vectorised affine map over the numeric columns, and encoders become lookup
+tables from category to output column. The plan writes every output column into a single preallocated array.
+
+The supported preprocessors are `StandardScaler`, `MinMaxScaler`, `OneHotEncoder` and `LabelEncoder`, and
+`ColumnTransformer`s whose transformers are any of these, "passthrough" or "drop". The plan's output has the same
+columns as the preprocessors' outputs stacked side by side, and is always a dense float64 array.
+
+Generated predictors list the preprocessors and their columns by hand, so a plan can disagree with the fitted
+preprocessors, for instance if columns are listed in the wrong order. `verify_preprocessing` checks every plan held
+by a predictor against its preprocessors on sample inputs, and switches the plans that disagree to calling the
+original preprocessors, which is slower but correct.
+
+Example:
+>>>    from TinyML import compile_preprocessing
+>>>
+>>>    plan = compile_preprocessing([
+>>>        ("scaler.joblib", ["bedrooms", "square_footage"]),
+>>>        ("encoder.joblib", ["neighbourhood"]),
+>>>    ])
+>>>    features = plan.transform({"bedrooms": 3, "square_footage": 1500.0, "neighbourhood": "north"})
+"""
+
+import logging
+import types
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import FunctionTransformer, LabelEncoder, MinMaxScaler, OneHotEncoder, StandardScaler
+
+from TinyML.config import config
+from TinyML.internal.runtime.batch import outputs_match
+
+logger = logging.getLogger(__name__)
+
+Step = Tuple[Any, Sequence[str]] | Any
+
+
+class _Missing:
+    """Lookup key shared by all missing values, since NaN is not equal to itself."""
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING = _Missing()
+_UNKNOWN = -2
+_DROPPED = -1
+
+
+def _key(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and value != value):
+        return _MISSING
+    return value
+
+
+def _lookup(categories: Sequence[Any], codes: Sequence[int]) -> Dict[Any, int]:
+    return {
+        _key(category.item() if isinstance(category, np.generic) else category): int(code)
+        for category, code in zip(categories, codes)
+    }
+
+
+class PreprocessingPlan:
+    """
+    A fused transform compiled from fitted preprocessors, which maps input samples to a 2D float64 feature array.
+
+    Attributes:
+        columns: The input columns that the plan reads.
+        n_features_out: The number of columns in the transformed arrays.
+        use_reference: Whether `transform` calls the original preprocessors instead of the compiled plan, as it
+            does once the plan has failed its check.
+    """
+
+    def __init__(self, steps: List[Tuple[Any, List[str]]]):
+        """
+        Compile a plan from fitted preprocessors and the input columns that each one transforms.
+
+        :param steps: pairs of a fitted preprocessor and its input columns; a ColumnTransformer is given with the
+            columns None, as it selects its own columns
+        :raises ValueError: if a preprocessor is not supported
+        """
+        self.steps: List[Tuple[Any, List[str] | None]] = steps
+        self.columns: List[str] = []
+        self.n_features_out: int = 0
+        self.use_reference: bool = False
+        # Numeric columns: out[:, dst] = x[:, src] * scale + offset
+        self._affine_src: List[str] = []
+        self._affine_dst: List[int] = []
+        self._affine_scale: List[float] = []
+        self._affine_offset: List[float] = []
+        # Categorical columns: (input column, lookup table, one-hot?, raise on unknown categories?, output column)
+        self._categorical: List[Tuple[str, Dict[Any, int], bool, bool, int]] = []
+
+        for transformer, columns in steps:
+            if isinstance(transformer, ColumnTransformer):
+                self._add_column_transformer(transformer)
+            else:
+                self._add(transformer, list(columns))
+
+        self._scale = np.asarray(self._affine_scale, dtype=np.float64)
+        self._offset = np.asarray(self._affine_offset, dtype=np.float64)
+        self._dst = np.asarray(self._affine_dst, dtype=np.intp)
+
+    def transform(self, samples: dict | List[dict] | pd.DataFrame) -> np.ndarray:
+        """
+        Transform input samples into a feature array.
+
+        :param samples: a single input sample, a list of samples, or a DataFrame with one row per sample
+        :return: an array of shape (n_samples, n_features_out)
+        :raises ValueError: if a sample has a category that its encoder does not know and does not ignore
+        """
+        if self.use_reference:
+            if not isinstance(samples, pd.DataFrame):
+                samples = pd.DataFrame.from_records([samples] if isinstance(samples, dict) else samples)
+            return self.reference_transform(samples)
+        return self._transform(samples)
+
+    def _transform(self, samples: dict | List[dict] | pd.DataFrame) -> np.ndarray:
+        if isinstance(samples, dict):
+            samples = [samples]
+        is_frame = isinstance(samples, pd.DataFrame)
+        out = np.zeros((len(samples), self.n_features_out), dtype=np.float64)
+
+        if self._affine_src:
+            if is_frame:
+                values = samples[self._affine_src].to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                values = np.array([[s.get(c) for c in self._affine_src] for s in samples], dtype=np.float64)
+            out[:, self._dst] = values * self._scale + self._offset
+
+        rows = np.arange(len(samples))
+        for column, lookup, one_hot, error_on_unknown, dst in self._categorical:
+            values = samples[column] if is_frame else [s.get(column) for s in samples]
+            codes = np.fromiter((lookup.get(_key(v), _UNKNOWN) for v in values), dtype=np.intp, count=len(samples))
+            if (error_on_unknown or not one_hot) and (codes == _UNKNOWN).any():
+                unknown = [v for v, code in zip(values, codes) if code == _UNKNOWN]
+                raise ValueError(f"Found unknown categories {unknown[:5]} in column '{column}'")
+            if one_hot:
+                hit = codes >= 0
+                out[rows[hit], codes[hit]] = 1.0
+            else:
+                out[:, dst] = codes
+        return out
+
+    def reference_transform(self, samples: pd.DataFrame) -> np.ndarray:
+        """
+        Transform input samples with the original preprocessors, for comparison with the compiled plan.
+
+        Preprocessors fitted on a DataFrame read the columns they were fitted on, whatever columns they were listed
+        with, so that a plan compiled with the wrong columns disagrees with the reference transform.
+
+        :param samples: a DataFrame with one row per sample
+        :return: the preprocessors' outputs stacked side by side, as a dense float64 array
+        """
+        outputs = []
+        for transformer, columns in self.steps:
+            if columns is None:
+                output = transformer.transform(samples)
+            elif isinstance(transformer, LabelEncoder):
+                output = np.column_stack([transformer.transform(samples[column]) for column in columns])
+            else:
+                output = transformer.transform(samples[list(getattr(transformer, "feature_names_in_", columns))])
+            output = output.toarray() if hasattr(output, "toarray") else np.asarray(output)
+            outputs.append(output.astype(np.float64).reshape(len(samples), -1))
+        return np.hstack(outputs) if outputs else np.zeros((len(samples), 0))
+
+    def check(self, samples: pd.DataFrame, tolerance: float = 1e-9) -> bool:
+        """
+        Check that the compiled plan produces the same features as the original preprocessors.
+
+        :param samples: a DataFrame with one row per sample, on which both transforms are run
+        :param tolerance: the maximum relative or absolute difference allowed between features
+        :return: True if the features match
+        """
+        expected, actual = self.reference_transform(samples), self._transform(samples)
+        return expected.shape == actual.shape and outputs_match(pd.DataFrame(expected), pd.DataFrame(actual), tolerance)
+
+    def _output(self, width: int) -> int:
+        start = self.n_features_out
+        self.n_features_out += width
+        return start
+
+    def _use(self, columns: List[str]) -> None:
+        self.columns.extend(column for column in columns if column not in self.columns)
+
+    def _add_affine(self, columns: List[str], scale: np.ndarray, offset: np.ndarray) -> None:
+        start = self._output(len(columns))
+        self._affine_src.extend(columns)
+        self._affine_dst.extend(range(start, start + len(columns)))
+        self._affine_scale.extend(np.broadcast_to(scale, len(columns)).tolist())
+        self._affine_offset.extend(np.broadcast_to(offset, len(columns)).tolist())
+        self._use(columns)
+
+    def _add(self, transformer: Any, columns: List[str]) -> None:
+        # Fitted ColumnTransformers store "passthrough" as an identity FunctionTransformer
+        is_identity = isinstance(transformer, FunctionTransformer) and transformer.func is None
+        if is_identity or (isinstance(transformer, str) and transformer == "passthrough"):
+            self._add_affine(columns, np.ones(1), np.zeros(1))
+        elif isinstance(transformer, StandardScaler):
+            mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+            scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+            self._add_affine(columns, 1.0 / scale, -mean / scale)
+        elif isinstance(transformer, MinMaxScaler):
+            if transformer.clip:
+                raise ValueError("MinMaxScaler with clip=True is not supported")
+            self._add_affine(columns, transformer.scale_, transformer.min_)
+        elif isinstance(transformer, OneHotEncoder):
+            self._add_one_hot(transformer, columns)
+        elif isinstance(transformer, LabelEncoder):
+            for column in columns:
+                dst = self._output(1)
+                self._categorical.append(
+                    (column, _lookup(transformer.classes_, range(len(transformer.classes_))), False, True, dst)
+                )
+            self._use(columns)
+        else:
+            raise ValueError(f"Unsupported preprocessor: {type(transformer).__name__}")
+
+    def _add_one_hot(self, encoder: OneHotEncoder, columns: List[str]) -> None:
+        if getattr(encoder, "_infrequent_enabled", False):
+            raise ValueError("OneHotEncoder with infrequent categories is not supported")
+        if len(columns) != len(encoder.categories_):
+            raise ValueError(f"OneHotEncoder expects {len(encoder.categories_)} columns, got {len(columns)}")
+        drop_idx = encoder.drop_idx_ if encoder.drop_idx_ is not None else [None] * len(columns)
+        for column, categories, dropped in zip(columns, encoder.categories_, drop_idx):
+            kept = [i for i in range(len(categories)) if dropped is None or i != dropped]
+            start = self._output(len(kept))
+            codes = np.full(len(categories), _DROPPED)
+            codes[kept] = np.arange(start, start + len(kept))
+            self._categorical.append(
+                (column, _lookup(categories, codes), True, encoder.handle_unknown == "error", start)
+            )
+        self._use(columns)
+
+    def _add_column_transformer(self, transformer: ColumnTransformer) -> None:
+        if not hasattr(transformer, "feature_names_in_"):
+            raise ValueError("ColumnTransformer must be fitted on a DataFrame with column names")
+        names = list(transformer.feature_names_in_)
+        for _, step, selection in transformer.transformers_:
+            columns = _selected_columns(selection, names)
+            if (isinstance(step, str) and step == "drop") or not columns:
+                continue
+            self._add(step, columns)
+
+
+def _selected_columns(selection: Any, names: List[str]) -> List[str]:
+    """
+    Resolve the columns selected for a transformer of a fitted ColumnTransformer, as found in its `transformers_`,
+    to input column names.
+
+    :param selection: a column name or index, a list of names or indices, a boolean mask, or a slice
+    :param names: the input column names of the ColumnTransformer, from its `feature_names_in_`
+    :return: the names of the selected columns
+    :raises ValueError: if the selection cannot be resolved
+    """
+    if isinstance(selection, str):
+        return [selection]
+    if isinstance(selection, (int, np.integer)) and not isinstance(selection, bool):
+        return [names[selection]]
+    if isinstance(selection, slice):
+        if isinstance(selection.start, str) or isinstance(selection.stop, str):
+            # Slices of column names include their end, as in pandas
+            start = names.index(selection.start) if selection.start is not None else 0
+            stop = names.index(selection.stop) + 1 if selection.stop is not None else len(names)
+            return names[start : stop : selection.step]
+        return names[selection]
+    values = np.asarray(selection)
+    if values.size == 0:
+        return []
+    if values.dtype == bool:
+        if len(values) != len(names):
+            raise ValueError(f"ColumnTransformer column mask has {len(values)} entries for {len(names)} columns")
+        return [name for name, selected in zip(names, values) if selected]
+    if np.issubdtype(values.dtype, np.integer):
+        return [names[i] for i in values.ravel()]
+    if all(isinstance(value, str) for value in values.ravel()):
+        return [str(value) for value in values.ravel()]
+    raise ValueError(f"Cannot determine the ColumnTransformer columns selected by {selection!r}")
+
+
+def verify_preprocessing(
+    module: types.ModuleType,
+    samples: pd.DataFrame,
+    tolerance: float = config.inference.preprocessing_check_tolerance,
+) -> List[str]:
+    """
+    Check the preprocessing plans held in a predictor's module-level variables against their original
+    preprocessors, and switch each plan that does not match to calling its original preprocessors.
+
+    A plan is only judged on samples that the original preprocessors can transform; if they reject the samples, for
+    instance because of a category they do not know, the plan is left as it is.
+
+    :param module: the predictor module
+    :param samples: a DataFrame of sample inputs
+    :param tolerance: the maximum relative or absolute difference allowed between features
+    :return: the names of the variables holding plans that failed their check
+    """
+    failed = []
+    for name, plan in list(vars(module).items()):
+        if not isinstance(plan, PreprocessingPlan):
+            continue
+        try:
+            plan.reference_transform(samples)
+        except Exception as e:
+            logger.debug(f"Preprocessing plan '{name}' could not be checked: {str(e)}")
+            continue
+        try:
+            matches = plan.check(samples, tolerance)
+        except Exception as e:
+            logger.debug(f"Preprocessing plan '{name}' failed on the sample inputs: {str(e)}")
+            matches = False
+        if not matches:
+            plan.use_reference = True
+            failed.append(name)
+            logger.warning(f"Preprocessing plan '{name}' does not match its preprocessors, using the originals")
+    return failed
+
+
+def use_reference_preprocessing(module: types.ModuleType, names: List[str]) -> None:
+    """
+    Switch the named preprocessing plans of a predictor to calling their original preprocessors.
+
+    :param module: the predictor module
+    :param names: the names of the variables holding the plans, as returned by `verify_preprocessing`
+    """
+    for name in names:
+        plan = getattr(module, name, None)
+        if isinstance(plan, PreprocessingPlan):
+            plan.use_reference = True
+
+
+def compile_preprocessing(steps: Step | List[Step]) -> PreprocessingPlan:
+    """
+    Compile fitted preprocessors into a single `PreprocessingPlan`.
+
+    :param steps: a fitted preprocessor, or a list of them, in the order in which their outputs are stacked; each
+        is either a (preprocessor, input columns) pair, or a preprocessor fitted on a DataFrame, whose input
+        columns are taken from its `feature_names_in_`; a preprocessor can also be given as the path of the
+        joblib file it was saved to, such as a model artifact
+    :return: the compiled plan
+    :raises ValueError: if a preprocessor is not supported, or its input columns cannot be determined
+    """
+    if not isinstance(steps, list):
+        steps = [steps]
+    resolved = []
+    for step in steps:
+        transformer, columns = step if isinstance(step, tuple) else (step, None)
+        if isinstance(transformer, Path) or (isinstance(transformer, str) and transformer != "passthrough"):
+            transformer = joblib.load(transformer)
+        if columns is None and not isinstance(transformer, ColumnTransformer):
+            if not hasattr(transformer, "feature_names_in_"):
+                raise ValueError(f"Input columns must be given for {type(transformer).__name__}")
+            columns = transformer.feature_names_in_
+        resolved.append((transformer, list(columns) if columns is not None else None))
+    return PreprocessingPlan(resolved)
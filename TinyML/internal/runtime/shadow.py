@@ -0,0 +1,204 @@
+# TinyML/internal/runtime/shadow.py
+
+"""
+This module provides the `ShadowScorer` class, which mirrors a fraction of a model's live predictions to a shadow
+model, such as a rebuilt candidate, and compares the two models before the candidate is promoted.
+
+Shadow scoring must never slow down the primary model's responses. A mirrored prediction is only put on a bounded
+queue, without waiting, and the shadow model scores it later on a pool of background threads. When the shadow
+model falls behind and the queue is full, mirrored predictions are dropped and counted, rather than queued without
+bound or waited for.
+
+For each mirrored prediction, the scorer records whether the shadow model's output agrees with the primary model's
+output, within a tolerance for numeric values, and the latency of both models. The latency percentiles are computed
+over a window of the most recent mirrored predictions.
+
+Example:
+>>>    scorer = ShadowScorer(candidate, sample_rate=0.1)
+>>>    output = model.predict(sample)
+>>>    scorer.submit(sample, output, primary_seconds=0.002)
+>>>    print(scorer.stats())
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from TinyML.config import config
+from TinyML.internal.runtime.batch import outputs_match
+
+logger = logging.getLogger(__name__)
+
+# How often an idle background thread checks whether the scorer was closed
+_POLL_SECONDS = 0.05
+
+
+def _percentiles_ms(durations: Deque[float], prefix: str) -> Dict[str, float | None]:
+    """Summarise durations in seconds as p50/p95/p99 latencies in milliseconds."""
+    if not durations:
+        return {f"{prefix}_p50_ms": None, f"{prefix}_p95_ms": None, f"{prefix}_p99_ms": None}
+    p50, p95, p99 = np.percentile(np.asarray(durations) * 1000.0, [50, 95, 99])
+    return {f"{prefix}_p50_ms": float(p50), f"{prefix}_p95_ms": float(p95), f"{prefix}_p99_ms": float(p99)}
+
+
+class ShadowScorer:
+    """
+    Scores a sample of a primary model's predictions with a shadow model in the background, and compares them.
+
+    Attributes:
+        shadow: The shadow model, or any object with a `predict(dict) -> dict` method.
+        sample_rate: The fraction of predictions that are mirrored to the shadow model.
+        tolerance: The maximum relative or absolute difference between numeric outputs that still agree.
+    """
+
+    def __init__(
+        self,
+        shadow: Any,
+        sample_rate: float = config.inference.shadow_sample_rate,
+        workers: int = config.inference.shadow_workers,
+        queue_size: int = config.inference.shadow_queue_size,
+        tolerance: float = config.inference.shadow_tolerance,
+        latency_window: int = config.inference.shadow_latency_window,
+        seed: int = None,
+    ):
+        """
+        Initialise the scorer, and start its background threads.
+
+        :param shadow: the shadow model
+        :param sample_rate: the fraction of predictions that are mirrored, between 0 and 1
+        :param workers: the number of background threads that score mirrored predictions
+        :param queue_size: the maximum number of mirrored predictions waiting to be scored; further ones are dropped
+        :param tolerance: the maximum relative or absolute difference between numeric outputs that still agree
+        :param latency_window: the number of most recent mirrored predictions that latency percentiles cover
+        :param seed: seed for the random sampling of predictions
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("The sample rate must be between 0 and 1")
+        if workers < 1 or queue_size < 1:
+            raise ValueError("The number of workers and the queue size must be at least 1")
+
+        self.shadow: Any = shadow
+        self.sample_rate: float = sample_rate
+        self.tolerance: float = tolerance
+        self._random: random.Random = random.Random(seed)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: threading.Event = threading.Event()
+        self._mirrored: int = 0
+        self._dropped: int = 0
+        self._scored: int = 0
+        self._agreements: int = 0
+        self._errors: int = 0
+        self._primary_latencies: Deque[float] = deque(maxlen=latency_window)
+        self._shadow_latencies: Deque[float] = deque(maxlen=latency_window)
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._work, name=f"shadow-scorer-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, inputs: dict, output: dict, primary_seconds: float) -> bool:
+        """
+        Mirror a prediction of the primary model to the shadow model, if it is selected by sampling. This never
+        blocks: if the queue of mirrored predictions is full, the prediction is dropped.
+
+        :param inputs: the input of the prediction
+        :param output: the primary model's output
+        :param primary_seconds: the primary model's latency for the prediction
+        :return: whether the prediction was queued for the shadow model
+        """
+        if self._closed.is_set() or self._random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            # checked again under the lock, so that nothing is queued once close() has returned
+            if self._closed.is_set():
+                return False
+            try:
+                self._queue.put_nowait((dict(inputs), output, primary_seconds))
+            except queue.Full:
+                self._dropped += 1
+                return False
+            self._mirrored += 1
+        return True
+
+    def drain(self) -> None:
+        """
+        Wait until every queued prediction has been scored by the shadow model.
+        """
+        self._queue.join()
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop mirroring predictions, and stop the background threads once the queued predictions are scored. This
+        never blocks on the queue, so with `wait=False` it returns immediately even if the queue is full.
+
+        :param wait: whether to wait for the background threads to finish
+        """
+        with self._lock:
+            self._closed.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the shadow scoring statistics.
+
+        :return: the number of mirrored, dropped and scored predictions, the shadow model's errors, the agreement
+            rate between the two models, and the p50/p95/p99 latency of both models on the mirrored predictions
+        """
+        with self._lock:
+            stats = {
+                "mirrored": self._mirrored,
+                "dropped": self._dropped,
+                "scored": self._scored,
+                "shadow_errors": self._errors,
+                "agreement_rate": self._agreements / self._scored if self._scored else None,
+                "queued": self._queue.qsize(),
+            }
+            stats.update(_percentiles_ms(self._primary_latencies, "primary"))
+            stats.update(_percentiles_ms(self._shadow_latencies, "shadow"))
+        return stats
+
+    def _work(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if self._closed.is_set():
+                    return
+                continue
+            try:
+                self._score(*item)
+            finally:
+                self._queue.task_done()
+
+    def _score(self, inputs: dict, primary_output: dict, primary_seconds: float) -> None:
+        start = time.perf_counter()
+        try:
+            shadow_output = self.shadow.predict(inputs)
+        except Exception as e:
+            logger.debug(f"Shadow prediction failed: {str(e)}")
+            shadow_output = None
+        shadow_seconds = time.perf_counter() - start
+
+        agrees = False
+        if shadow_output is not None:
+            try:
+                agrees = outputs_match(pd.DataFrame([primary_output]), pd.DataFrame([shadow_output]), self.tolerance)
+            except Exception as e:
+                logger.debug(f"Shadow outputs could not be compared: {str(e)}")
+
+        with self._lock:
+            self._scored += 1
+            self._agreements += agrees
+            self._errors += shadow_output is None
+            self._primary_latencies.append(primary_seconds)
+            self._shadow_latencies.append(shadow_seconds)
@@ -0,0 +1,165 @@
+# TinyML/internal/runtime/streaming.py
+
+"""
+This module provides streaming file-to-file scoring for generated predictors.
+
+The input file is read as a stream of pyarrow record batches, each batch is scored with the predictor, and the
+outputs are appended to a parquet file as they are produced. Only one batch is held in memory at a time, so the
+memory used does not depend on the size of the input file. Parquet and CSV inputs are supported; CSV files may be
+compressed, in which case the compression is detected from the file extension.
+
+CSV files are read in blocks of bytes, which are regrouped into batches of the requested number of rows. The types
+of the columns in the model's input schema are fixed up front, as pyarrow otherwise infers each column's type from
+the first block only, and fails on a later block whose values do not fit it. Likewise, the types of the output
+columns are taken from the model's output schema, rather than inferred from the first scored batch, in which a
+column may be entirely null.
+"""
+
+import logging
+import types
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from TinyML.internal.common.utils.schema import type_name
+from TinyML.internal.runtime.batch import predict_batch
+
+logger = logging.getLogger(__name__)
+
+_ARROW_TYPES = {"int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(), "str": pa.string()}
+
+# CSV blocks are sized from the batch size with a rough estimate of the bytes per row, within these bounds
+_CSV_BYTES_PER_ROW = 64
+_CSV_MIN_BLOCK_BYTES = 1 << 20
+_CSV_MAX_BLOCK_BYTES = 64 << 20
+
+
+def _rebatch(batches: Iterator[pa.RecordBatch], batch_size: int) -> Iterator[pa.RecordBatch]:
+    """
+    Regroup a stream of record batches of any size into batches of `batch_size` rows, and a smaller last batch.
+    """
+    pending: List[pa.RecordBatch] = []
+    n_pending = 0
+    for batch in batches:
+        pending.append(batch)
+        n_pending += batch.num_rows
+        if n_pending < batch_size:
+            continue
+        table = pa.Table.from_batches(pending)
+        offset = 0
+        while n_pending - offset >= batch_size:
+            yield table.slice(offset, batch_size).combine_chunks().to_batches()[0]
+            offset += batch_size
+        pending = table.slice(offset).to_batches()
+        n_pending -= offset
+    if n_pending:
+        yield pa.Table.from_batches(pending).combine_chunks().to_batches()[0]
+
+
+def _read_batches(path: Path, batch_size: int, input_schema: Dict[str, Any] = None) -> Iterator[pa.RecordBatch]:
+    """
+    Stream the record batches of a parquet or CSV file.
+
+    :param path: the path of the input file
+    :param batch_size: the number of rows per batch
+    :param input_schema: the model's input schema, which fixes the types of its columns in CSV files
+    :return: an iterator over the record batches of the file
+    """
+    suffixes = [suffix.lower() for suffix in path.suffixes]
+    if suffixes and suffixes[-1] in (".parquet", ".pq"):
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    elif ".csv" in suffixes:
+        block_size = min(max(batch_size * _CSV_BYTES_PER_ROW, _CSV_MIN_BLOCK_BYTES), _CSV_MAX_BLOCK_BYTES)
+        column_types = _arrow_types(input_schema)
+        with pa.input_stream(str(path)) as stream:
+            reader = pa_csv.open_csv(
+                stream,
+                read_options=pa_csv.ReadOptions(block_size=block_size),
+                convert_options=pa_csv.ConvertOptions(column_types=column_types),
+            )
+            yield from _rebatch(reader, batch_size)
+    else:
+        raise ValueError(f"Unsupported input file format: {path.name}; expected parquet or CSV")
+
+
+def _arrow_types(schema: Dict[str, Any] | None) -> Dict[str, pa.DataType]:
+    return {field: _ARROW_TYPES[type_name(t)] for field, t in (schema or {}).items()}
+
+
+def _cast_columns(table: pa.Table, types: Dict[str, pa.DataType]) -> pa.Table:
+    """
+    Cast the columns of a table that have a type in `types` to that type, and leave the other columns as they are.
+    """
+    fields = [pa.field(f.name, types[f.name]) if f.name in types else f for f in table.schema]
+    schema = pa.schema(fields)
+    return table if schema == table.schema else table.cast(schema)
+
+
+def predict_file(
+    predictor: types.ModuleType | Any,
+    in_path: str | Path,
+    out_path: str | Path,
+    output_columns: List[str] = None,
+    batch_size: int = 65536,
+    include_inputs: bool = False,
+    input_schema: Dict[str, Any] = None,
+    output_schema: Dict[str, Any] = None,
+) -> int:
+    """
+    Score every row of a parquet or CSV file, writing the outputs to a parquet file batch by batch.
+
+    :param predictor: the predictor module
+    :param in_path: the path of the input file
+    :param out_path: the path of the parquet file to write; it is removed if scoring fails
+    :param output_columns: the expected output columns
+    :param batch_size: the number of rows scored at a time
+    :param include_inputs: whether to write the input columns next to the output columns
+    :param input_schema: the model's input schema, which fixes the types of its columns in CSV files
+    :param output_schema: the model's output schema, which fixes the types of the output columns
+    :return: the number of rows written
+    """
+    in_path, out_path = Path(in_path), Path(out_path)
+    output_types = _arrow_types(output_schema)
+    writer: pq.ParquetWriter | None = None
+    n_rows = 0
+
+    try:
+        for batch in _read_batches(in_path, batch_size, input_schema):
+            if batch.num_rows == 0:
+                continue
+            outputs: pa.Table = predict_batch(predictor, pa.Table.from_batches([batch]), output_columns)
+            outputs = _cast_columns(outputs, output_types)
+            if include_inputs:
+                for name, column in zip(batch.schema.names, batch.columns):
+                    if name not in outputs.column_names:
+                        outputs = outputs.append_column(name, column)
+
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, outputs.schema)
+            elif outputs.schema != writer.schema:
+                # Types inferred per batch can differ for columns outside the output schema, e.g. a column that
+                # is entirely null in one batch
+                outputs = outputs.cast(writer.schema)
+            writer.write_table(outputs)
+            n_rows += outputs.num_rows
+            logger.debug(f"Scored {n_rows} rows from {in_path.name}")
+
+        if writer is None:
+            # The input had no rows, but the output file should still exist and carry the output columns
+            empty = pa.Table.from_pandas(pd.DataFrame(columns=output_columns or []), preserve_index=False)
+            pq.write_table(_cast_columns(empty, output_types), out_path)
+    except Exception:
+        if writer is not None:
+            writer.close()
+            writer = None
+        out_path.unlink(missing_ok=True)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return n_rows
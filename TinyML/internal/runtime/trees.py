@@ -0,0 +1,364 @@
+# TinyML/internal/runtime/trees.py
+
+"""
+This module provides a flattened inference engine for fitted tree ensembles.
+
+Most models produced by the model search are tree ensembles from scikit-learn or xgboost, whose per-call overhead
+dominates the cost of small predictions. `compile_tree_ensemble` exports the trees of a fitted ensemble into flat
+NumPy node arrays, in which the nodes of all trees are concatenated: each node holds its split feature, its
+threshold, the indices of its children, the direction taken by missing values, and its leaf value. A
+`TreeEnsemble` predicts by advancing every row through every tree at once, one tree level per step, without
+calling into the original estimator.
+
+Inputs are compared in float32, as both libraries do, so that the compiled ensemble reproduces the original
+estimator's decisions exactly. The supported estimators are scikit-learn's decision trees, random forests,
+extra-trees and gradient boosting estimators, and xgboost's `XGBRegressor` and `XGBClassifier` with tree boosters.
+
+Example:
+>>>    ensemble = compile_tree_ensemble(joblib.load("model.joblib"))
+>>>    probabilities = ensemble.predict_proba(features)
+"""
+
+import json
+from typing import Any, List, Literal, Tuple
+
+import numpy as np
+from sklearn.dummy import DummyClassifier, DummyRegressor
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    ExtraTreesRegressor,
+    GradientBoostingClassifier,
+    GradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+Link = Literal["identity", "sigmoid", "softmax", "exp"]
+
+_XGBOOST_LINKS = {
+    "reg:squarederror": "identity",
+    "reg:absoluteerror": "identity",
+    "reg:pseudohubererror": "identity",
+    "reg:logistic": "sigmoid",
+    "binary:logistic": "sigmoid",
+    "multi:softprob": "softmax",
+    "multi:softmax": "softmax",
+    "count:poisson": "exp",
+    "reg:gamma": "exp",
+    "reg:tweedie": "exp",
+}
+
+# A flattened tree: feature, threshold, left, right, missing_left and value arrays, indexed by local node id
+_Tree = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class TreeEnsemble:
+    """
+    A tree ensemble compiled to flat node arrays, with the prediction interface of the estimator it was compiled from.
+
+    The ensemble's raw output is the sum of one leaf value per tree, plus an intercept. The link function turns the
+    raw output into predictions, or into class probabilities for classifiers.
+
+    Attributes:
+        roots: The index of each tree's root node.
+        max_depth: The depth of the deepest tree.
+        base: The intercept added to the raw output, one per output.
+        link: The function applied to the raw output, one of "identity", "sigmoid", "softmax" or "exp".
+        classes_: The class labels for classifiers, or None for regressors.
+        n_features_in_: The number of input features.
+    """
+
+    def __init__(
+        self,
+        trees: List[_Tree],
+        n_outputs: int,
+        n_features: int,
+        link: Link = "identity",
+        classes: np.ndarray = None,
+        chunk_size: int = 1024,
+    ):
+        """
+        Concatenate flattened trees into a single ensemble.
+
+        :param trees: the flattened trees, whose node values have shape (n_nodes, n_outputs); leaf nodes must
+            point to themselves
+        :param n_outputs: the number of raw outputs
+        :param n_features: the number of input features
+        :param link: the function applied to the raw output
+        :param classes: the class labels for classifiers, or None for regressors
+        :param chunk_size: the number of rows traversed at a time, which bounds the memory used by a prediction
+        """
+        if not trees:
+            raise ValueError("A tree ensemble must contain at least one tree")
+
+        offsets = np.cumsum([0] + [len(tree[0]) for tree in trees])
+        self.feature: np.ndarray = np.concatenate([tree[0] for tree in trees]).astype(np.intp)
+        self.threshold: np.ndarray = np.concatenate([tree[1] for tree in trees]).astype(np.float64)
+        self.left: np.ndarray = np.concatenate([tree[2] + offset for tree, offset in zip(trees, offsets)])
+        self.right: np.ndarray = np.concatenate([tree[3] + offset for tree, offset in zip(trees, offsets)])
+        self.missing_left: np.ndarray = np.concatenate([tree[4] for tree in trees]).astype(bool)
+        self.value: np.ndarray = np.concatenate([tree[5] for tree in trees]).astype(np.float64)
+        self.roots: np.ndarray = offsets[:-1].astype(np.intp)
+        self.max_depth: int = max(_depth(tree[2], tree[3]) for tree in trees)
+        self.base: np.ndarray = np.zeros(n_outputs)
+        self.link: Link = link
+        self.classes_: np.ndarray | None = classes
+        self.n_features_in_: int = n_features
+        self.chunk_size: int = chunk_size
+
+    @property
+    def n_trees(self) -> int:
+        """
+        The number of trees in the ensemble.
+        """
+        return len(self.roots)
+
+    def raw_predict(self, X: Any) -> np.ndarray:
+        """
+        Compute the raw output of the ensemble, before the link function is applied.
+
+        :param X: the input features, as an array-like of shape (n_samples, n_features)
+        :return: an array of shape (n_samples, n_outputs)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n_samples, {self.n_features_in_}), got {X.shape}")
+        X = X.astype(np.float64)
+
+        out = np.empty((len(X), len(self.base)))
+        for start in range(0, len(X), self.chunk_size):
+            chunk = X[start : start + self.chunk_size]
+            rows = np.arange(len(chunk))[:, None]
+            nodes = np.broadcast_to(self.roots, (len(chunk), self.n_trees))
+            for _ in range(self.max_depth):
+                x = chunk[rows, self.feature[nodes]]
+                go_left = np.where(np.isnan(x), self.missing_left[nodes], x <= self.threshold[nodes])
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            out[start : start + len(chunk)] = self.value[nodes].sum(axis=1)
+        return out + self.base
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """
+        Predict the class probabilities of a classifier.
+
+        :param X: the input features, as an array-like of shape (n_samples, n_features)
+        :return: an array of shape (n_samples, n_classes)
+        """
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        proba = self._transform(self.raw_predict(X))
+        if proba.shape[1] == 1:
+            proba = np.hstack([1 - proba, proba])
+        return proba
+
+    def predict(self, X: Any) -> np.ndarray:
+        """
+        Predict the class labels of a classifier, or the values of a regressor.
+
+        :param X: the input features, as an array-like of shape (n_samples, n_features)
+        :return: an array of shape (n_samples,), or (n_samples, n_outputs) for multi-output regressors
+        """
+        if self.classes_ is not None:
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        out = self._transform(self.raw_predict(X))
+        return out[:, 0] if out.shape[1] == 1 else out
+
+    def _transform(self, raw: np.ndarray) -> np.ndarray:
+        if self.link == "sigmoid":
+            return 1.0 / (1.0 + np.exp(-raw))
+        if self.link == "softmax":
+            e = np.exp(raw - raw.max(axis=1, keepdims=True))
+            return e / e.sum(axis=1, keepdims=True)
+        if self.link == "exp":
+            return np.exp(raw)
+        return raw
+
+
+def _depth(left: np.ndarray, right: np.ndarray) -> int:
+    """
+    Return the number of steps from the root (node 0) to the deepest leaf of a flattened tree.
+    """
+    depth, level = 0, np.array([0])
+    while True:
+        children = np.concatenate([left[level], right[level]])
+        children = np.unique(children[np.isin(children, level, invert=True)])
+        if len(children) == 0:
+            return depth
+        depth, level = depth + 1, children
+
+
+def _sklearn_tree(estimator: Any, scale: float = 1.0, normalise: bool = False) -> _Tree:
+    """
+    Flatten a fitted scikit-learn decision tree, whose values have shape (n_nodes, n_outputs, n_classes).
+    """
+    tree = estimator.tree_
+    is_leaf = tree.children_left < 0
+    nodes = np.arange(tree.node_count)
+    value = tree.value[:, 0, :] if normalise else tree.value[:, :, 0]
+    if normalise:
+        value = value / value.sum(axis=1, keepdims=True)
+    missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=bool))
+    return (
+        np.where(is_leaf, 0, tree.feature),
+        np.where(is_leaf, np.inf, tree.threshold),
+        np.where(is_leaf, nodes, tree.children_left),
+        np.where(is_leaf, nodes, tree.children_right),
+        np.asarray(missing_left, dtype=bool),
+        value * scale,
+    )
+
+
+def _compile_sklearn(estimator: Any) -> TreeEnsemble:
+    n_features = estimator.n_features_in_
+
+    if isinstance(estimator, (DecisionTreeClassifier, DecisionTreeRegressor)):
+        estimators, is_classifier = [estimator], isinstance(estimator, DecisionTreeClassifier)
+    elif isinstance(
+        estimator, (RandomForestClassifier, RandomForestRegressor, ExtraTreesClassifier, ExtraTreesRegressor)
+    ):
+        estimators = estimator.estimators_
+        is_classifier = isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier))
+    else:
+        estimators, is_classifier = None, None
+
+    if estimators is not None:
+        if estimator.n_outputs_ > 1 and is_classifier:
+            raise ValueError("Multi-output classifiers are not supported")
+        scale = 1.0 / len(estimators)
+        trees = [_sklearn_tree(tree, scale, normalise=is_classifier) for tree in estimators]
+        n_outputs = len(estimator.classes_) if is_classifier else estimator.n_outputs_
+        classes = np.asarray(estimator.classes_) if is_classifier else None
+        return TreeEnsemble(trees, n_outputs, n_features, "identity", classes)
+
+    # Gradient boosting: each stage holds one regression tree per raw output, scaled by the learning rate
+    if not (estimator.init_ == "zero" or isinstance(estimator.init_, (DummyRegressor, DummyClassifier))):
+        raise ValueError("Gradient boosting with a custom init estimator is not supported")
+    stages = estimator.estimators_
+    n_outputs = stages.shape[1]
+    trees = []
+    for stage in stages:
+        for k, tree in enumerate(stage):
+            flat = _sklearn_tree(tree, estimator.learning_rate)
+            value = np.zeros((len(flat[5]), n_outputs))
+            value[:, k] = flat[5][:, 0]
+            trees.append(flat[:5] + (value,))
+
+    if isinstance(estimator, GradientBoostingClassifier):
+        link = "sigmoid" if n_outputs == 1 else "softmax"
+        ensemble = TreeEnsemble(trees, n_outputs, n_features, link, np.asarray(estimator.classes_))
+        reference = estimator.decision_function
+    else:
+        ensemble = TreeEnsemble(trees, n_outputs, n_features, "identity")
+        reference = estimator.predict
+    _calibrate_base(ensemble, reference)
+    return ensemble
+
+
+def _compile_xgboost(estimator: Any) -> TreeEnsemble:
+    import xgboost
+
+    booster = estimator.get_booster()
+    model = json.loads(booster.save_raw(raw_format="json"))["learner"]
+    objective = model["objective"]["name"]
+    if model["gradient_booster"]["name"] != "gbtree":
+        raise ValueError(f"Unsupported xgboost booster: {model['gradient_booster']['name']}")
+    if objective not in _XGBOOST_LINKS:
+        raise ValueError(f"Unsupported xgboost objective: {objective}")
+
+    gbtree = model["gradient_booster"]["model"]
+    n_trees = len(gbtree["trees"])
+    best_iteration = getattr(estimator, "best_iteration", None)
+    if best_iteration is not None and "iteration_indptr" in gbtree:
+        # The scikit-learn interface only predicts with the trees up to the best iteration of early stopping
+        n_trees = gbtree["iteration_indptr"][best_iteration + 1]
+
+    tree_info = gbtree["tree_info"]
+    n_outputs = max(tree_info[:n_trees]) + 1
+    trees = []
+    for tree, output in zip(gbtree["trees"][:n_trees], tree_info):
+        if any(tree.get("split_type", [])):
+            raise ValueError("Categorical splits are not supported")
+        left, right = np.asarray(tree["left_children"]), np.asarray(tree["right_children"])
+        is_leaf = left < 0
+        nodes = np.arange(len(left))
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        # xgboost sends x < threshold to the left; in float32, that is x <= the next float32 below the threshold
+        thresholds = np.nextafter(conditions, np.float32(-np.inf)).astype(np.float64)
+        value = np.zeros((len(left), n_outputs))
+        value[:, output] = np.where(is_leaf, conditions, 0.0)
+        trees.append(
+            (
+                np.where(is_leaf, 0, tree["split_indices"]),
+                np.where(is_leaf, np.inf, thresholds),
+                np.where(is_leaf, nodes, left),
+                np.where(is_leaf, nodes, right),
+                np.asarray(tree["default_left"], dtype=bool),
+                value,
+            )
+        )
+
+    link = _XGBOOST_LINKS[objective]
+    classes = np.asarray(estimator.classes_) if isinstance(estimator, xgboost.XGBClassifier) else None
+    ensemble = TreeEnsemble(trees, n_outputs, booster.num_features(), link, classes)
+    _calibrate_base(
+        ensemble,
+        lambda X: estimator.predict(X, output_margin=True),
+    )
+    return ensemble
+
+
+def _calibrate_base(ensemble: TreeEnsemble, reference: Any) -> None:
+    """
+    Set the intercept of an ensemble from the raw output of the original estimator on a probe input.
+
+    The intercept is stored differently across estimators and library versions, but it is always the difference
+    between the estimator's raw output and the sum of the leaf values.
+    """
+    probe = np.zeros((1, ensemble.n_features_in_), dtype=np.float32)
+    expected = np.asarray(reference(probe), dtype=np.float64).reshape(1, -1)
+    ensemble.base = (expected - ensemble.raw_predict(probe))[0]
+
+
+def compile_tree_ensemble(estimator: Any) -> TreeEnsemble:
+    """
+    Compile a fitted tree ensemble into a `TreeEnsemble`.
+
+    :param estimator: a fitted scikit-learn tree, forest or gradient boosting estimator, or a fitted xgboost
+        XGBRegressor or XGBClassifier
+    :return: the compiled ensemble, with the same predictions as the estimator
+    :raises ValueError: if the estimator is not a supported tree ensemble
+    """
+    if type(estimator).__module__.startswith("xgboost") and hasattr(estimator, "get_booster"):
+        return _compile_xgboost(estimator)
+    if isinstance(estimator, SUPPORTED_SKLEARN_ESTIMATORS):
+        return _compile_sklearn(estimator)
+    raise ValueError(f"Unsupported estimator for tree compilation: {type(estimator).__name__}")
+
+
+def is_tree_ensemble(obj: Any) -> bool:
+    """
+    Return whether an object is a fitted estimator that `compile_tree_ensemble` supports.
+
+    :param obj: the object to check
+    :return: True if the object can be compiled
+    """
+    if isinstance(obj, type):
+        return False
+    if isinstance(obj, SUPPORTED_SKLEARN_ESTIMATORS):
+        return hasattr(obj, "n_features_in_")
+    if type(obj).__module__.startswith("xgboost") and type(obj).__name__ in ("XGBRegressor", "XGBClassifier"):
+        return getattr(obj, "_Booster", None) is not None
+    return False
+
+
+SUPPORTED_SKLEARN_ESTIMATORS = (
+    DecisionTreeClassifier,
+    DecisionTreeRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+    ExtraTreesClassifier,
+    ExtraTreesRegressor,
+    GradientBoostingClassifier,
+    GradientBoostingRegressor,
+)
@@ -0,0 +1,108 @@
+# TinyML/internal/runtime/warmup.py
+
+"""
+This module provides warm-up and latency profiling for generated predictors.
+
+The first calls to a freshly loaded predictor are slow: modules are imported lazily, some libraries compile code
+on first use, and model artifacts are paged into memory. Running a number of representative inputs through the
+predictor before it serves traffic moves these costs out of the request path, and measuring the calls gives
+single-sample and batch latency percentiles that can be recorded in the model's metadata.
+
+Native libraries such as xgboost, lightgbm and scikit-learn start OpenMP or BLAS thread pools on their first
+parallel call. A process whose pools have started cannot safely be forked: the children inherit the pools' state
+but not their threads, and can deadlock or run single-threaded. `single_threaded` limits the pools to one thread,
+so that no pool threads are started, for code that runs in a process that may be forked later, such as the warm-up
+in `load_model`.
+"""
+
+import logging
+import time
+import types
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from TinyML.internal.common.utils.schema import type_name
+from TinyML.internal.runtime.batch import predict_batch
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def single_threaded() -> Iterator[None]:
+    """
+    Limit the OpenMP and BLAS thread pools of native libraries to a single thread for the duration of the block,
+    so that the block does not start any pool threads, and the process can be forked safely afterwards.
+    """
+    with threadpool_limits(limits=1):
+        yield
+
+
+def synthesise_inputs(input_schema: dict, n_samples: int, seed: int = 0) -> List[dict]:
+    """
+    Generate random input samples that conform to an input schema.
+
+    :param input_schema: mapping of input field names to their types
+    :param n_samples: the number of samples to generate
+    :param seed: seed for the random number generator, so that the samples are reproducible
+    :return: a list of input samples
+    """
+    rng = np.random.default_rng(seed)
+    columns: Dict[str, List[Any]] = {}
+    for field, schema_type in input_schema.items():
+        match type_name(schema_type):
+            case "int":
+                columns[field] = rng.integers(0, 10, n_samples).tolist()
+            case "float":
+                columns[field] = rng.random(n_samples).tolist()
+            case "bool":
+                columns[field] = (rng.random(n_samples) < 0.5).tolist()
+            case _:
+                columns[field] = [f"{field}-{i}" for i in rng.integers(0, 10, n_samples)]
+    return [{field: values[i] for field, values in columns.items()} for i in range(n_samples)]
+
+
+def _percentiles_ms(durations: List[float], prefix: str) -> Dict[str, float]:
+    """Summarise durations in seconds as p50/p95/p99 latencies in milliseconds."""
+    p50, p95, p99 = np.percentile(np.asarray(durations) * 1000.0, [50, 95, 99])
+    return {f"{prefix}_p50_ms": float(p50), f"{prefix}_p95_ms": float(p95), f"{prefix}_p99_ms": float(p99)}
+
+
+def profile_predictor(
+    predictor: types.ModuleType | Any, samples: List[dict], batch_size: int, batch_runs: int
+) -> Dict[str, float]:
+    """
+    Warm up a predictor by running samples through it, and measure its single-sample and batch latency.
+
+    :param predictor: the predictor module
+    :param samples: the input samples to use
+    :param batch_size: the number of samples per batch when measuring batch latency
+    :param batch_runs: the number of batches to time
+    :return: the time of the first call, and latency percentiles for single samples and batches, in milliseconds
+    """
+    if not samples:
+        raise ValueError("At least one sample is required to warm up a predictor")
+
+    durations: List[float] = []
+    for sample in samples:
+        start = time.perf_counter()
+        predictor.predict(sample)
+        durations.append(time.perf_counter() - start)
+
+    batch = pd.DataFrame.from_records([samples[i % len(samples)] for i in range(batch_size)])
+    batch_durations: List[float] = []
+    for _ in range(batch_runs):
+        start = time.perf_counter()
+        predict_batch(predictor, batch)
+        batch_durations.append(time.perf_counter() - start)
+
+    return {
+        "samples": len(samples),
+        "first_call_ms": durations[0] * 1000.0,
+        **_percentiles_ms(durations[1:] or durations, "single"),
+        "batch_size": batch_size,
+        **_percentiles_ms(batch_durations, "batch"),
+    }
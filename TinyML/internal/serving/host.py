@@ -0,0 +1,324 @@
+# TinyML/internal/serving/host.py
+
+"""
+This module provides the `ModelHost` class, which serves many model archives from a single process.
+
+Models are loaded lazily, on the first request for their archive, and kept in memory while they are in use.
+The host estimates the memory held by each loaded model, and when the total exceeds the configured budget,
+it evicts the least recently used models: their references are dropped and their extracted files are removed
+from the model cache directory. An evicted model is loaded again on its next request.
+
+Requests hold the model they use with `use()`, which counts the requests in flight on each model, as the model
+server does across reloads. An evicted model is only released once its last request has completed. Its files are
+only removed if no other hosted or held model shares its cache directory, which is named after the model's
+identifier, so two archives of the same model never delete each other's files. Once a model's files are
+removed, the objects of the shared artifact store that no other model links to are pruned.
+
+The memory of a model is estimated as the larger of the growth in the process's resident memory while the model
+was loaded, where the platform reports it, and the total size of the model's artifacts and sources. Loads are
+serialised, so that the growth in resident memory can be attributed to a single model.
+
+Example:
+>>>    host = ModelHost(memory_budget_bytes=8 * 1024**3)
+>>>    prediction = host.predict("models/house-prices.tar.gz", {"bedrooms": 3, "bathrooms": 2})
+>>>    with host.use("models/house-prices.tar.gz") as model:
+>>>        predictions = model.predict_batch(samples)
+"""
+
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+from TinyML.config import config
+from TinyML.internal.runtime.handle import release_modules
+from TinyML.internal.storage.archive import forget_pending
+from TinyML.internal.storage.store import ArtifactStore
+from TinyML.models import Model, load_model
+
+logger = logging.getLogger(__name__)
+
+
+def _resident_memory() -> int | None:
+    """Return the resident memory of the current process in bytes, or None if the platform does not report it."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def estimate_model_memory(model: Model) -> int:
+    """
+    Estimate the memory held by a loaded model from the size of its artifacts and sources.
+
+    :param model: the loaded model
+    :return: the estimated size in bytes
+    """
+    size = len(model.predictor_source or "") + len(model.trainer_source or "")
+    for artifact in model.artifacts:
+        path = Path(artifact)
+        if path.is_file():
+            size += path.stat().st_size
+    return size
+
+
+def release_model(model: Model, remove_files: bool = True) -> None:
+    """
+    Release the process-wide resources of a model that is no longer served.
+
+    Requests that still hold a reference to the model can complete, as the predictor stays loaded in memory until
+    the model is garbage collected. The predictor modules that this process cached for handles to the model are
+    dropped, so that they do not keep its estimators in memory, and artifacts that were deferred until first accessed
+    are no longer tracked.
+
+    :param model: the model to release
+    :param remove_files: whether to remove the model's extracted files from the model cache, and delete the artifact
+        store objects that only they referred to
+    """
+    if model.async_executor is not None:
+        model.async_executor.shutdown(wait=False)
+    if getattr(model, "deadline_guard", None) is not None:
+        model.deadline_guard.shutdown()
+    if getattr(model, "shadow_scorer", None) is not None:
+        model.shadow_scorer.close(wait=False)
+    release_modules(getattr(model, "artifacts", []))
+    forget_pending(getattr(model, "artifacts", []))
+    if remove_files and model.files_path.exists():
+        shutil.rmtree(model.files_path, ignore_errors=True)
+        if Path(config.file_storage.artifact_store_dir).is_dir():
+            ArtifactStore().release(getattr(model, "artifacts", []))
+
+
+def _files_key(model: Model) -> str:
+    """The cache directory of a model, which is named after its identifier and shared by archives of the model."""
+    return str(Path(model.files_path).resolve())
+
+
+@dataclass
+class _HostedModel:
+    model: Model
+    memory_bytes: int
+
+
+class ModelHost:
+    """
+    Loads model archives on demand, and evicts the least recently used models to stay within a memory budget.
+
+    Attributes:
+        memory_budget_bytes: The maximum estimated memory of all loaded models together.
+        loader: The function that loads a model from its archive path.
+        cleanup_files: Whether to remove the extracted files of a model from the model cache when it is evicted.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int = config.serving.host_memory_budget_bytes,
+        loader: Callable[[str], Model] = load_model,
+        cleanup_files: bool = True,
+    ):
+        """
+        Initialise an empty host.
+
+        :param memory_budget_bytes: the maximum estimated memory of all loaded models together
+        :param loader: the function that loads a model from its archive path
+        :param cleanup_files: whether to remove an evicted model's extracted files from the model cache
+        """
+        if memory_budget_bytes <= 0:
+            raise ValueError("Memory budget must be positive")
+        self.memory_budget_bytes: int = memory_budget_bytes
+        self.loader: Callable[[str], Model] = loader
+        self.cleanup_files: bool = cleanup_files
+        self._models: OrderedDict[str, _HostedModel] = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        # Requests in flight on each model, by id, and evicted models that requests still hold
+        self._leases: Dict[int, int] = {}
+        self._retired: List[Model] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._load_lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._loads: int = 0
+        self._evictions: int = 0
+
+    def get(self, path: str) -> Model:
+        """
+        Return the model stored in an archive, loading it if it is not already loaded.
+
+        Concurrent requests for a model that is being loaded wait for that load, rather than loading it again. The
+        model is not held for the caller, so it may be evicted, and its files removed, while it is still in use;
+        use `use()` to hold it for the duration of a request.
+
+        :param path: the path of the model archive
+        :return: the loaded model
+        """
+        return self._get(path, lease=False)
+
+    @contextmanager
+    def use(self, path: str) -> Iterator[Model]:
+        """
+        Hold the model stored in an archive for the duration of a request, loading it if necessary.
+
+        A model that is evicted while it is held is released, and its files removed, only after the last request
+        holding it has completed.
+
+        :param path: the path of the model archive
+        :return: a context manager that yields the model
+        """
+        model = self._get(path, lease=True)
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._leases[id(model)] -= 1
+                if not self._leases[id(model)]:
+                    del self._leases[id(model)]
+                released = self._collect_retired()
+            self._release(released)
+
+    def predict(self, path: str, x: dict) -> dict:
+        """
+        Call the model stored in an archive with input x, loading the model if necessary.
+
+        :param path: the path of the model archive
+        :param x: input to the model
+        :return: output of the model
+        """
+        with self.use(path) as model:
+            return model.predict(x)
+
+    def evict(self, path: str) -> bool:
+        """
+        Evict a model from the host, if it is loaded. The model is released once no request holds it.
+
+        :param path: the path of the model archive
+        :return: True if the model was loaded and has been evicted
+        """
+        with self._lock:
+            hosted = self._models.pop(str(Path(path).resolve()), None)
+            if hosted is not None:
+                self._evictions += 1
+                self._retired.append(hosted.model)
+            released = self._collect_retired()
+        self._release(released)
+        return hosted is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the host's counters and the models it currently holds.
+
+        :return: a dictionary with the loaded models and their estimated memory, the total estimated memory, and
+            the number of cache hits, loads and evictions
+        """
+        with self._lock:
+            return {
+                "models": {key: hosted.memory_bytes for key, hosted in self._models.items()},
+                "memory_bytes": sum(hosted.memory_bytes for hosted in self._models.values()),
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "hits": self._hits,
+                "loads": self._loads,
+                "evictions": self._evictions,
+            }
+
+    def _get(self, path: str, lease: bool) -> Model:
+        """
+        Return the model stored in an archive, loading it if necessary, and optionally hold it for the caller.
+
+        :param path: the path of the model archive
+        :param lease: whether to count the caller as a request in flight on the model, which it must end
+        :return: the loaded model
+        """
+        key = str(Path(path).resolve())
+        with self._lock:
+            hosted = self._models.get(key)
+            if hosted is not None:
+                self._models.move_to_end(key)
+                self._hits += 1
+                if lease:
+                    self._leases[id(hosted.model)] = self._leases.get(id(hosted.model), 0) + 1
+                return hosted.model
+            future = self._loading.get(key)
+            is_loader = future is None
+            if is_loader:
+                future = self._loading[key] = Future()
+
+        if not is_loader:
+            model = future.result()
+            # Hold the model through the host's table, as it may have been evicted since it was loaded
+            return self._get(path, lease) if lease else model
+
+        try:
+            with self._load_lock:
+                before = _resident_memory()
+                model = self.loader(path)
+                after = _resident_memory()
+            growth = after - before if before is not None and after is not None else 0
+            hosted = _HostedModel(model, max(growth, estimate_model_memory(model)))
+            logger.info(f"📦 Loaded {Path(path).name}, estimated memory {hosted.memory_bytes / 1024**2:.1f}MB")
+
+            with self._lock:
+                self._models[key] = hosted
+                self._loads += 1
+                if lease:
+                    self._leases[id(model)] = self._leases.get(id(model), 0) + 1
+                self._retired.extend(self._evict_over_budget(keep=key))
+                released = self._collect_retired()
+            self._release(released)
+
+            future.set_result(model)
+            return model
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+
+    def _collect_retired(self) -> List[tuple[Model, bool]]:
+        """
+        Remove the evicted models that no request holds any more, and return them with whether their files can be
+        removed, which is when no hosted or held model shares their cache directory. Must hold the lock.
+        """
+        released = [model for model in self._retired if id(model) not in self._leases]
+        self._retired = [model for model in self._retired if id(model) in self._leases]
+        in_use = {_files_key(hosted.model) for hosted in self._models.values()}
+        in_use |= {_files_key(model) for model in self._retired}
+        removable = []
+        for model in released:
+            removable.append((model, self.cleanup_files and _files_key(model) not in in_use))
+            # A directory shared by several released models is removed once
+            in_use.add(_files_key(model))
+        return removable
+
+    def _release(self, released: List[tuple[Model, bool]]) -> None:
+        for model, remove_files in released:
+            try:
+                release_model(model, remove_files)
+            except Exception as e:
+                logger.warning(f"Failed to release an evicted model: {str(e)}")
+
+    def _evict_over_budget(self, keep: str) -> list[Model]:
+        """
+        Remove least recently used models until the total memory is within budget. Must hold the lock.
+
+        :param keep: the key of a model that must not be evicted, such as the one that was just loaded
+        :return: the evicted models, which the caller must retire
+        """
+        evicted = []
+        total = sum(hosted.memory_bytes for hosted in self._models.values())
+        for key in list(self._models):
+            if total <= self.memory_budget_bytes:
+                break
+            if key == keep:
+                continue
+            hosted = self._models.pop(key)
+            total -= hosted.memory_bytes
+            self._evictions += 1
+            evicted.append(hosted.model)
+            logger.info(f"♻️ Evicted {Path(key).name} to stay within the memory budget")
+        return evicted
@@ -0,0 +1,340 @@
+# TinyML/internal/serving/prefork.py
+
+"""
+This module provides the `PreforkServer` class, which serves a model from several worker processes that share the
+model's memory.
+
+Starting each worker process separately makes every worker load the model on its own, extracting the archive and
+holding a private copy of the artifacts, so memory grows with the number of workers. A `PreforkServer` loads and
+warms up the model once in the parent process, binds the listening socket, and then forks the workers. The workers
+inherit the loaded model, whose memory pages stay shared between all processes until a worker writes to them.
+
+Before forking, the parent runs a full garbage collection and calls `gc.freeze()`, which moves every existing
+object into a permanent generation that the garbage collector no longer scans. Without it, each collection in a
+worker would touch the headers of the model's objects and copy their pages into the worker. The parent then
+supervises the workers: it restarts workers that exit unexpectedly, and stops all of them on SIGINT or SIGTERM.
+
+If the model records prediction metrics, each worker records into its own copy of the counters, so every worker
+serves the sum of all the workers' metrics on `GET /metrics`, through `SharedMetrics` files in a temporary directory.
+Metrics recorded in the parent before forking, such as by warming up the model, are counted once.
+
+Native libraries start OpenMP or BLAS thread pools on their first parallel call, and a forked child that inherits a
+started pool can deadlock or run single-threaded. `load_model` therefore warms up the model with these pools limited
+to one thread, and each worker warms up the model again after it is forked, so that the worker's own thread pools
+are started before it serves requests. A model that was used with unrestricted thread pools in the parent, for
+instance one that was just built, should be saved and loaded before it is served with pre-forking.
+
+New versions of the model are loaded by the parent, never by the workers, since the workers share the model's
+cached files and a worker cannot replace the model of its siblings. A `POST /reload` request received by a worker is
+handed to the parent with SIGHUP, and with `watch` the parent polls the archive itself. The parent loads the new
+version while the current workers keep serving, forks a new generation of workers from it, and then stops the
+previous workers gracefully, so that their requests in flight finish on the previous version. The previous model is
+released once its last worker has exited. Workers restarted after a reload are forked from the new version.
+
+Pre-forking relies on `os.fork`, and is only available on POSIX platforms.
+
+Example:
+>>>    server = PreforkServer(load_model("model.tar.gz"), port=8000, workers=4)
+>>>    server.serve_forever()
+"""
+
+import gc
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from TinyML.config import config
+from TinyML.internal.serving.host import release_model
+from TinyML.internal.runtime.metrics import SharedMetrics
+from TinyML.internal.serving.server import ModelServer, archive_signature
+from TinyML.models import load_model
+
+logger = logging.getLogger(__name__)
+
+
+class PreforkServer:
+    """
+    Serves a model over HTTP from forked worker processes, which share the parent's copy of the model.
+
+    Attributes:
+        server: The model server that each worker runs; it is created, and its socket bound, in the parent process.
+        workers: The number of worker processes.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        host: str = config.serving.host,
+        port: int = config.serving.port,
+        workers: int = config.serving.workers,
+        max_batch_size: int = config.serving.max_batch_size,
+        max_wait_ms: float = config.serving.max_wait_ms,
+        path: str = None,
+        watch: bool = False,
+        loader: Any = load_model,
+    ):
+        """
+        Initialise the server and bind it to the given address. Workers are not forked until `serve_forever()`.
+
+        :param model: the model to serve, already loaded in this process
+        :param host: the host address to bind to
+        :param port: the port to bind to; use 0 to pick any free port
+        :param workers: the number of worker processes
+        :param max_batch_size: the maximum number of samples scored in a single batch, per worker
+        :param max_wait_ms: the maximum time in milliseconds that a sample waits for its batch to fill up
+        :param path: the archive that the model was loaded from, which a reload loads again by default
+        :param watch: whether to reload the model when the archive at `path` changes; the parent process polls the
+            archive, and replaces the workers with workers forked from the new version
+        :param loader: the function that loads a model from an archive
+        """
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Pre-fork serving requires a platform that supports os.fork")
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        if watch and path is None:
+            raise ValueError("An archive path is required to watch for new versions of the model")
+        # The workers never reload on their own: reloads are done by the parent, see `_reload()`
+        self.server: ModelServer = ModelServer(model, host, port, max_batch_size, max_wait_ms, path, loader=loader)
+        self.workers: int = workers
+        self.watch: bool = watch
+        self._children: Dict[int, float] = {}
+        self._retiring: Dict[int, Any] = {}
+        self._stopping: bool = False
+        self._reload_requested: bool = False
+        self._metrics_dir: str | None = None
+        self._control_dir: str | None = None
+        self._parent: int | None = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        The (host, port) address that the server is bound to.
+        """
+        return self.server.address
+
+    def serve_forever(self, interval: float = config.serving.reload_poll_seconds) -> None:
+        """
+        Fork the workers and supervise them until SIGINT or SIGTERM is received, then stop the workers and return.
+
+        :param interval: the time in seconds between two polls of the archive, if the server watches it
+        """
+        metrics = getattr(self.server.model, "prediction_metrics", None)
+        if metrics is not None:
+            self._metrics_dir = tempfile.mkdtemp(prefix="tinyml-metrics-")
+            SharedMetrics(metrics, self._metrics_dir, name="parent").publish()
+        self._control_dir = tempfile.mkdtemp(prefix="tinyml-prefork-")
+        self._parent = os.getpid()
+
+        gc.collect()
+        gc.freeze()
+
+        previous_handlers = {sig: signal.signal(sig, self._handle_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        previous_handlers[signal.SIGHUP] = signal.signal(signal.SIGHUP, self._handle_reload)
+        host, port = self.address
+        logger.info(f"🚀 Serving model on http://{host}:{port} with {self.workers} workers")
+        try:
+            for _ in range(self.workers):
+                self._spawn()
+            loaded = previous = archive_signature(self.server.path) if self.watch else None
+            next_poll = time.monotonic() + interval
+            while self._children or self._retiring:
+                if self._reload_requested and not self._stopping:
+                    self._reload_requested = False
+                    self._reload(self._requested_path())
+                    # Watch the archive that is now served, from its current version
+                    loaded = previous = archive_signature(self.server.path) if self.watch else None
+                if self.watch and not self._stopping and time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + interval
+                    current = archive_signature(self.server.path)
+                    # Wait for two identical polls, so that an archive that is still being written is not loaded
+                    if current is not None and current != loaded and current == previous:
+                        self._reload(self.server.path)
+                        loaded = current
+                    previous = current
+                try:
+                    # Poll rather than block, since a blocking wait is resumed after the reload signal is handled
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if not pid:
+                    time.sleep(0.05)
+                    continue
+                if pid in self._retiring:
+                    self._retire(pid)
+                    continue
+                started = self._children.pop(pid, None)
+                if started is None or self._stopping:
+                    continue
+                logger.warning(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting it")
+                if time.monotonic() - started < 1.0:
+                    # Avoid a tight restart loop when workers fail immediately
+                    time.sleep(1.0)
+                if not self._stopping:
+                    self._spawn()
+        finally:
+            self._stop_children()
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            self.server.close()
+            gc.unfreeze()
+            if self._metrics_dir is not None:
+                shutil.rmtree(self._metrics_dir, ignore_errors=True)
+            shutil.rmtree(self._control_dir, ignore_errors=True)
+
+    def shutdown(self) -> None:
+        """
+        Stop the workers. Samples that workers have already received are still scored.
+        """
+        self._stopping = True
+        for pid in list(self._children) + list(self._retiring):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def request_reload(self, path: str = None) -> None:
+        """
+        Ask the parent process to load a new version of the model and replace the workers; callable from a worker.
+
+        :param path: the archive to load; by default, the archive that the served model was loaded from
+        """
+        if path is not None:
+            # Hand the path over through a file, since a signal carries no data; the last request wins
+            target = os.path.join(self._control_dir, "reload")
+            with open(f"{target}.{os.getpid()}", "w", encoding="utf-8") as f:
+                f.write(path)
+            os.replace(f"{target}.{os.getpid()}", target)
+        os.kill(self._parent, signal.SIGHUP)
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = time.monotonic()
+            return
+
+        # Worker process: stop gracefully on SIGTERM, and let the parent handle SIGINT and reloads
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=self.server.shutdown).start())
+            self.server.reload_delegate = self.request_reload
+            if self._metrics_dir is not None:
+                # The parent's counts are published once by the parent, so the worker counts from zero
+                metrics = self.server.model.prediction_metrics
+                metrics.reset()
+                self.server.shared_metrics = SharedMetrics(metrics, self._metrics_dir).start()
+            # Start the worker's own native thread pools, which the parent did not start before forking
+            warm_up = getattr(self.server.model, "warm_up", None)
+            if callable(warm_up):
+                warm_up()
+            self.server.serve_forever()
+            if self.server.shared_metrics is not None:
+                self.server.shared_metrics.publish()
+        except Exception as e:
+            logger.error(f"Worker {os.getpid()} failed: {str(e)}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        logger.info("🛑 Server interrupted, stopping workers")
+        self.shutdown()
+
+    def _handle_reload(self, signum: int, frame: Any) -> None:
+        self._reload_requested = True
+
+    def _requested_path(self) -> str | None:
+        try:
+            with open(os.path.join(self._control_dir, "reload"), encoding="utf-8") as f:
+                path = f.read()
+            os.remove(os.path.join(self._control_dir, "reload"))
+            return path
+        except FileNotFoundError:
+            return None
+
+    def _reload(self, path: str = None) -> None:
+        """
+        Load a new version of the model in the parent, fork new workers from it, and stop the previous workers.
+
+        If loading fails, the current workers keep serving the current version.
+        """
+        path = path or self.server.path
+        if path is None:
+            logger.error("No archive path to reload the model from")
+            return
+        logger.info(f"🔄 Loading new model version from {path}")
+        try:
+            model = self.server.loader(path)
+        except Exception as e:
+            logger.error(f"Failed to reload the model, keeping the current version: {str(e)}")
+            return
+        old = self.server.model
+        metrics = getattr(old, "prediction_metrics", None)
+        if metrics is not None and getattr(model, "prediction_metrics", None) is None:
+            # Keep the counters monotonic across versions; the parent's own counts stay published once
+            model.prediction_metrics = metrics
+        self.server.model, self.server.path = model, path
+
+        # Freeze the new model's objects as well, so that the new workers share its pages
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+        previous = list(self._children)
+        self._children.clear()
+        for _ in range(self.workers):
+            self._spawn()
+        for pid in previous:
+            self._retiring[pid] = old
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        if not previous:
+            self._release(old)
+        logger.info(f"✅ Swapped in new model version from {path}")
+
+    def _retire(self, pid: int) -> None:
+        """
+        Forget a previous worker that has exited, and release its model once no worker serves it.
+        """
+        old = self._retiring.pop(pid)
+        if not any(model is old for model in self._retiring.values()):
+            self._release(old)
+
+    def _release(self, model: Any) -> None:
+        # The new version may be cached in the same directory, if the same archive was loaded again
+        keep_files = getattr(model, "files_path", None) == getattr(self.server.model, "files_path", None)
+        try:
+            release_model(model, remove_files=not keep_files)
+        except Exception as e:
+            logger.warning(f"Failed to release the previous model version: {str(e)}")
+
+    def _stop_children(self, timeout: float = 10.0) -> None:
+        """
+        Ask the remaining workers to stop, and wait for them, killing any that do not stop within the timeout.
+        """
+        self.shutdown()
+        self._children.update(dict.fromkeys(self._retiring, 0.0))
+        self._retiring.clear()
+        deadline = time.monotonic() + timeout
+        while self._children and time.monotonic() < deadline:
+            for pid in list(self._children):
+                try:
+                    if os.waitpid(pid, os.WNOHANG)[0]:
+                        self._children.pop(pid)
+                except ChildProcessError:
+                    self._children.pop(pid)
+            time.sleep(0.05)
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self._children.pop(pid)
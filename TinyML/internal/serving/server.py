@@ -0,0 +1,436 @@
+# TinyML/internal/serving/server.py
+
+"""
+This module provides a minimal HTTP server for serving predictions from a TinyML model.
+
+The server exposes the following endpoints:
+- `POST /predict`: takes a JSON object (a single sample) or a JSON array of objects (several samples), and
+  returns the prediction(s) in the same shape.
+- `GET /health`: returns the status of the server.
+- `GET /describe`: returns the model's description.
+- `GET /metrics`: returns the model's prediction metrics in the Prometheus text format, if they are enabled.
+- `POST /reload`: loads the served archive again, or the archive given as `{"path": ...}`, and swaps it in.
+
+Concurrent requests are grouped into micro-batches, which are scored with a single call to the model's
+`predict_batch` method. A batch is flushed when it reaches the configured maximum size, or when its oldest
+sample has waited for the configured maximum time. If a batch fails, its samples are scored one at a time, so that
+a bad sample fails only the request it came from. Samples are checked against the model's input schema before they
+are batched, and missing or non-finite output values are returned as `null`. The server only uses the Python
+standard library.
+
+A new version of the model can be swapped in without downtime: the new archive is loaded and warmed up while the
+current model keeps serving, and the server then switches to the new model in a single reference assignment.
+Requests that are already being scored finish on the old model, whose cached files are released once its last
+request completes. The server can also watch the archive it serves, and reload it whenever the file changes.
+A server run by a worker of a pre-fork server hands reloads to the parent process instead, which loads the new
+version once and replaces the workers; see `PreforkServer`.
+
+Example:
+>>>    server = ModelServer(load_model("model.tar.gz"), port=8000)
+>>>    server.serve_forever()
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from TinyML.config import config
+from TinyML.internal.runtime.batching import MicroBatcher
+from TinyML.internal.runtime.coalescing import RowError, predict_rows
+from TinyML.internal.runtime.metrics import SharedMetrics, send_metrics
+from TinyML.internal.serving.host import release_model
+from TinyML.models import load_model
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    """Convert values that the json module cannot serialise, such as numpy scalars and arrays."""
+    if isinstance(value, np.generic):
+        return _finite(value.item())
+    if isinstance(value, np.ndarray):
+        return _finite(value.tolist())
+    return str(value)
+
+
+def _finite(value: Any) -> Any:
+    """Replace NaN and infinite floats with None, as they cannot be represented in JSON."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    return value
+
+
+class _PredictionRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles HTTP requests for a `ModelServer`. The owning `ModelServer` is available as `self.server.owner`.
+    """
+
+    server_version = "TinyML"
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/describe":
+            with self.server.owner.use_model() as model:
+                self._send_json(HTTPStatus.OK, model.describe())
+        elif self.path == "/metrics" and self.server.owner.shared_metrics is not None:
+            send_metrics(self, [self.server.owner.shared_metrics])
+        elif self.path == "/metrics":
+            with self.server.owner.use_model() as model:
+                metrics = getattr(model, "prediction_metrics", None)
+            if metrics is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Prediction metrics are not enabled"})
+            else:
+                send_metrics(self, [metrics])
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path not in ("/predict", "/reload"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length)) if length or self.path == "/predict" else {}
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON body: {str(e)}"})
+            return
+
+        if self.path == "/reload":
+            self._reload(payload)
+            return
+
+        single = isinstance(payload, dict)
+        samples = [payload] if single else payload
+        if not isinstance(samples, list) or not all(isinstance(sample, dict) for sample in samples):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Body must be a JSON object or an array of objects"})
+            return
+        error = self.server.owner.validate(samples)
+        if error is not None:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": error})
+            return
+
+        try:
+            predictions = self.server.owner.predict(samples)
+        except Exception as e:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Error during prediction: {str(e)}"})
+            return
+        self._send_json(HTTPStatus.OK, predictions[0] if single else predictions)
+
+    def _reload(self, payload: Any) -> None:
+        path = payload.get("path") if isinstance(payload, dict) else None
+        if path is None and self.server.owner.path is None:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "No archive path to reload the model from"})
+            return
+        if self.server.owner.reload_delegate is not None:
+            # The reload happens in another process, such as the parent of a pre-fork server
+            self.server.owner.reload_delegate(path)
+            self._send_json(HTTPStatus.ACCEPTED, {"status": "reload requested", "path": path or self.server.owner.path})
+            return
+        try:
+            self.server.owner.reload(path)
+        except Exception as e:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Error during reload: {str(e)}"})
+            return
+        self._send_json(HTTPStatus.OK, {"status": "reloaded", "path": self.server.owner.path})
+
+    def _send_json(self, status: HTTPStatus, body: Any) -> None:
+        content = json.dumps(_finite(body), default=_json_default, allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class ModelServer:
+    """
+    Serves predictions from a model over HTTP, grouping concurrent requests into micro-batches.
+
+    Attributes:
+        model: The model currently served; must be ready for predictions.
+        path: The archive that the served model was loaded from, if any.
+        batcher: The micro-batcher that groups samples into calls to the model's `predict_batch` method.
+        shared_metrics: The metrics served on `GET /metrics` in place of the model's own, such as the metrics of
+            all the workers of a pre-fork server.
+        reload_delegate: The function that `POST /reload` requests are handed to, with the requested archive path
+            or None, instead of reloading the model in this process; set by the workers of a pre-fork server.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        host: str = config.serving.host,
+        port: int = config.serving.port,
+        max_batch_size: int = config.serving.max_batch_size,
+        max_wait_ms: float = config.serving.max_wait_ms,
+        path: str = None,
+        watch: bool = False,
+        loader: Any = load_model,
+    ):
+        """
+        Initialise the server and bind it to the given address. Requests are not handled until `serve_forever()`.
+
+        :param model: the model to serve
+        :param host: the host address to bind to
+        :param port: the port to bind to; use 0 to pick any free port
+        :param max_batch_size: the maximum number of samples scored in a single batch
+        :param max_wait_ms: the maximum time in milliseconds that a sample waits for its batch to fill up
+        :param path: the archive that the model was loaded from, which `reload()` loads again by default
+        :param watch: whether to reload the model whenever the archive at `path` changes, while serving
+        :param loader: the function that loads a model from an archive
+        """
+        if watch and path is None:
+            raise ValueError("An archive path is required to watch for new versions of the model")
+        self.model = model
+        self.path: str | None = path
+        self.watch: bool = watch
+        self.loader = loader
+        self.shared_metrics: SharedMetrics | None = None
+        self.reload_delegate: Callable[[str | None], None] | None = None
+        self._model_lock: threading.Lock = threading.Lock()
+        self._reload_lock: threading.Lock = threading.Lock()
+        self._leases: Dict[int, int] = {}
+        self._retired: List[Any] = []
+        self._stopped: threading.Event = threading.Event()
+        self.batcher: MicroBatcher = MicroBatcher(
+            self._predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, name="model-server-batcher"
+        )
+        self._httpd: ThreadingHTTPServer = ThreadingHTTPServer((host, port), _PredictionRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        The (host, port) address that the server is bound to.
+        """
+        return self._httpd.server_address[:2]
+
+    def predict(self, samples: List[dict]) -> List[dict]:
+        """
+        Submit samples to the micro-batcher, and wait for their predictions.
+
+        :param samples: the samples to score
+        :return: one prediction per sample, in the same order
+        """
+        futures: List[Future] = [self.batcher.submit(sample) for sample in samples]
+        results = [future.result() for future in futures]
+        for result in results:
+            if isinstance(result, RowError):
+                raise result.error
+        return results
+
+    def validate(self, samples: List[dict]) -> str | None:
+        """
+        Check that samples have exactly the fields of the served model's input schema, if the model has one.
+
+        :param samples: the samples to check
+        :return: a description of the first invalid sample, or None if all samples are valid
+        """
+        with self.use_model() as model:
+            schema = getattr(model, "input_schema", None)
+        if not schema:
+            return None
+        fields = set(schema)
+        for i, sample in enumerate(samples):
+            missing, unknown = fields - sample.keys(), sample.keys() - fields
+            if missing or unknown:
+                problems = [f"missing fields {sorted(missing)}"] if missing else []
+                problems += [f"unknown fields {sorted(unknown)}"] if unknown else []
+                return f"Sample {i} does not match the input schema: {', '.join(problems)}"
+        return None
+
+    @contextmanager
+    def use_model(self) -> Iterator[Any]:
+        """
+        Hold the currently served model for the duration of a request, so that it is not released by a reload.
+
+        :return: a context manager that yields the model
+        """
+        with self._model_lock:
+            model = self.model
+            self._leases[id(model)] = self._leases.get(id(model), 0) + 1
+        try:
+            yield model
+        finally:
+            with self._model_lock:
+                self._leases[id(model)] -= 1
+                if not self._leases[id(model)]:
+                    del self._leases[id(model)]
+                released = self._collect_retired()
+            self._release(released)
+
+    def reload(self, path: str = None) -> Any:
+        """
+        Load a new version of the model and swap it in, without interrupting the requests being served.
+
+        The new archive is loaded, and warmed up, while the current model keeps serving. Once the new model is
+        swapped in, requests already holding the old model finish on it, and the old model's cached files are
+        released after the last of them completes. If loading fails, the current model keeps serving. If the
+        current model records prediction metrics, the new model carries on recording into them.
+
+        :param path: the archive to load; by default, the archive that the served model was loaded from
+        :return: the new model
+        :raises ValueError: if no path is given and the server does not know the served archive
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No archive path to reload the model from")
+
+        with self._reload_lock:
+            logger.info(f"🔄 Loading new model version from {path}")
+            model = self.loader(path)
+            with self._model_lock:
+                metrics = getattr(self.model, "prediction_metrics", None)
+                if metrics is not None and getattr(model, "prediction_metrics", None) is None:
+                    # Keep the counters monotonic across versions, as Prometheus expects
+                    model.prediction_metrics = metrics
+                old, self.model, self.path = self.model, model, path
+                self._retired.append(old)
+                released = self._collect_retired()
+            self._release(released)
+        logger.info(f"✅ Swapped in new model version from {path}")
+        return model
+
+    def serve_forever(self) -> None:
+        """
+        Handle requests until `shutdown()` is called from another thread, or the process is interrupted.
+        """
+        host, port = self.address
+        self.batcher.start()
+        self._stopped.clear()
+        if self.watch:
+            threading.Thread(target=self._watch, name="model-server-watcher", daemon=True).start()
+        logger.info(f"🚀 Serving model on http://{host}:{port}")
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._stopped.set()
+            self._httpd.server_close()
+            self.batcher.stop()
+
+    def shutdown(self) -> None:
+        """
+        Stop handling requests. Samples that have already been submitted are still scored.
+        """
+        self._stopped.set()
+        self._httpd.shutdown()
+
+    def close(self) -> None:
+        """
+        Release the server's socket, for a server that is not serving requests in this process.
+        """
+        self._httpd.server_close()
+
+    def _predict_batch(self, samples: List[dict]) -> List[dict | RowError]:
+        with self.use_model() as model:
+            return predict_rows(model, samples)
+
+    def _collect_retired(self) -> List[Any]:
+        """
+        Remove the retired models that no request holds any more, and return them. Must hold the model lock.
+        """
+        released = [model for model in self._retired if id(model) not in self._leases]
+        self._retired = [model for model in self._retired if id(model) in self._leases]
+        return released
+
+    def _release(self, models: List[Any]) -> None:
+        for model in models:
+            # A reload of the same archive extracts into the same cache directory, which must be kept
+            files_path = getattr(model, "files_path", None)
+            keep_files = files_path is None or files_path == getattr(self.model, "files_path", None)
+            try:
+                release_model(model, remove_files=not keep_files)
+            except Exception as e:
+                logger.warning(f"Failed to release the previous model version: {str(e)}")
+
+    def _watch(self, interval: float = config.serving.reload_poll_seconds) -> None:
+        """
+        Poll the served archive, and reload the model when the file has changed and stopped changing.
+        """
+        loaded, previous = archive_signature(self.path), None
+        while not self._stopped.wait(interval):
+            current = archive_signature(self.path)
+            # Wait for two identical polls, so that an archive that is still being written is not loaded
+            if current is not None and current != loaded and current == previous:
+                try:
+                    self.reload(self.path)
+                except Exception as e:
+                    logger.error(f"Failed to reload the model, keeping the current version: {str(e)}")
+                loaded = current
+            previous = current
+
+
+def archive_signature(path: str) -> Tuple[int, int] | None:
+    """
+    Describe the current version of an archive file by its modification time and size, to detect when it changes.
+
+    :param path: the path of the archive
+    :return: the (mtime_ns, size) of the file, or None if it cannot be read
+    """
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def serve(
+    path: str,
+    host: str = config.serving.host,
+    port: int = config.serving.port,
+    max_batch_size: int = config.serving.max_batch_size,
+    max_wait_ms: float = config.serving.max_wait_ms,
+    workers: int = config.serving.workers,
+    watch: bool = False,
+    metrics: bool = False,
+) -> None:
+    """
+    Load a model archive created by `save_model` and serve it over HTTP until interrupted.
+
+    With more than one worker, the model is loaded once and shared by forked worker processes; see `PreforkServer`.
+
+    :param path: the path of the model archive
+    :param host: the host address to bind to
+    :param port: the port to bind to
+    :param max_batch_size: the maximum number of samples scored in a single batch
+    :param max_wait_ms: the maximum time in milliseconds that a sample waits for its batch to fill up
+    :param workers: the number of worker processes
+    :param watch: whether to reload the model, without downtime, whenever the archive changes; with several workers,
+        the parent process reloads it and replaces the workers
+    :param metrics: whether to record prediction metrics, and serve them on `GET /metrics`; with several workers,
+        every worker serves the sum of all the workers' metrics
+    """
+    model = load_model(path)
+    if metrics:
+        model.enable_metrics(os.path.basename(path))
+    if workers > 1:
+        from TinyML.internal.serving.prefork import PreforkServer
+
+        server = PreforkServer(model, host, port, workers, max_batch_size, max_wait_ms, path, watch)
+        server.serve_forever()
+        return
+
+    server = ModelServer(model, host, port, max_batch_size, max_wait_ms, path, watch)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Server interrupted, shutting down")
@@ -0,0 +1,308 @@
+# TinyML/internal/storage/archive.py
+
+"""
+This module provides a random-access model archive format, and lazy materialisation of the artifacts it contains.
+
+A model archive in this format is a zip file. Zip files end with a central directory, which indexes every member,
+so a single member can be read without decompressing the members before it, as a tar.gz file requires. The
+archive's comment holds a version marker, "tinyml-archive <version>", from which `load_model` recognises the format.
+The members are:
+
+- `manifest.json`: the format version, and the name, member name, codec, size and SHA-256 digest of each artifact;
+- `model_data.pkl`: the pickled model metadata;
+- `trainer.py` and `predictor.py`: the model's source code;
+- `artifacts/<name>`: the artifacts, each either stored as is or compressed as a single zstd stream. Zstd is much
+  faster than gzip to decompress, and the artifacts can be decompressed in parallel.
+
+The metadata, the manifest and the sources can be read on their own, and the artifacts can be decompressed in
+parallel. Writing an artifact can also be deferred until it is needed: `defer_artifacts` registers artifacts that
+have not been written yet, `materialise_pending` writes those among the given paths, for instance when a model's
+`artifact_path()` is called, and `forget_pending` drops the registered artifacts of a model that is released.
+Deferred artifacts are only written through these calls, never when their paths are opened, so code that opens an
+artifact directly must not defer it.
+
+If the archive is read with an `ArtifactStore`, artifacts are linked from the store, and only decompressed into it if
+the store does not already hold an artifact with the same digest. A file already at an artifact's path is only kept
+if its contents have the artifact's SHA-256 digest, so that an older version of a model with the same identifier is
+never served in its place.
+
+Example:
+>>>    write_model_archive("model.zip", model_data, {"predictor.py": source}, artifacts)
+>>>    archive = ModelArchive("model.zip")
+>>>    predictor_source = archive.read_source("predictor.py")
+>>>    archive.materialise("model.joblib", Path(".tinycache/model"))
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal
+
+import pyarrow as pa
+
+from TinyML.config import config
+from TinyML.internal.storage.store import ArtifactStore, HashingReader
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = "tinyml-archive"
+ARCHIVE_VERSION = 1
+
+Codec = Literal["zstd", "stored"]
+
+
+def is_model_archive(path: str | Path) -> bool:
+    """
+    Check whether a file is a model archive in the random-access format, from its version marker.
+
+    :param path: the path of the file
+    :return: True if the file is a zip file with the archive's version marker
+    """
+    if not zipfile.is_zipfile(path):
+        return False
+    with zipfile.ZipFile(path) as zf:
+        return zf.comment.decode("utf-8", errors="replace").startswith(ARCHIVE_FORMAT)
+
+
+def _has_digest(path: Path, size: int, digest: str | None) -> bool:
+    """Check whether a file has the given size and SHA-256 digest, reading it only if its size matches."""
+    if digest is None or not path.is_file() or path.stat().st_size != size:
+        return False
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(config.file_storage.archive_buffer_bytes):
+            sha256.update(chunk)
+    return sha256.hexdigest() == digest
+
+
+def write_model_archive(
+    path: str | Path,
+    model_data: Dict[str, Any],
+    sources: Dict[str, str],
+    artifacts: List[str | Path],
+    codec: Codec = config.file_storage.archive_codec,
+) -> None:
+    """
+    Write a model archive in the random-access format.
+
+    :param path: the path of the archive
+    :param model_data: the model metadata, which is pickled
+    :param sources: the model's source files, by file name
+    :param artifacts: the paths of the model artifacts
+    :param codec: "zstd" to compress the artifacts, or "stored" to store them as they are
+    :raises FileNotFoundError: if an artifact does not exist
+    """
+    if codec == "zstd" and not pa.Codec.is_available("zstd"):
+        logger.warning("The zstd codec is not available, so the artifacts are stored uncompressed")
+        codec = "stored"
+
+    manifest = {"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION, "sources": list(sources), "artifacts": {}}
+    for artifact in artifacts:
+        artifact_path = Path(artifact)
+        if not artifact_path.is_file():
+            raise FileNotFoundError(f"Artifact not found: {artifact}")
+        manifest["artifacts"][artifact_path.name] = {
+            "member": f"artifacts/{artifact_path.name}",
+            "codec": codec,
+            "size": artifact_path.stat().st_size,
+        }
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.comment = f"{ARCHIVE_FORMAT} {ARCHIVE_VERSION}".encode("utf-8")
+        zf.writestr("model_data.pkl", pickle.dumps(model_data))
+        for name, source in sources.items():
+            zf.writestr(name, source.encode("utf-8"), compress_type=zipfile.ZIP_DEFLATED)
+        for artifact in artifacts:
+            artifact_path = Path(artifact)
+            with (
+                open(artifact_path, "rb") as f,
+                zf.open(f"artifacts/{artifact_path.name}", "w", force_zip64=True) as dst,
+            ):
+                src = HashingReader(f)
+                if codec == "zstd":
+                    with pa.CompressedOutputStream(pa.PythonFile(dst, mode="w"), "zstd") as stream:
+                        shutil.copyfileobj(src, stream, config.file_storage.archive_buffer_bytes)
+                else:
+                    shutil.copyfileobj(src, dst, config.file_storage.archive_buffer_bytes)
+            manifest["artifacts"][artifact_path.name]["sha256"] = src.sha256.hexdigest()
+        # The manifest is written last, once the digests of the artifacts are known
+        zf.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+
+class ModelArchive:
+    """
+    Reads the members of a model archive in the random-access format, each without reading the others.
+
+    Attributes:
+        path: The path of the archive.
+        manifest: The archive's manifest.
+        store: The content-addressed store that artifacts are linked from, or None to write them directly.
+    """
+
+    def __init__(self, path: str | Path, store: ArtifactStore = None):
+        """
+        Open an archive, and read its manifest.
+
+        :param path: the path of the archive
+        :param store: the content-addressed store that artifacts are linked from, or None to write them directly
+        :raises ValueError: if the file is not a model archive, or was written by a newer version of the format
+        """
+        self.path: Path = Path(path)
+        self.store: ArtifactStore | None = store
+        if not is_model_archive(self.path):
+            raise ValueError(f"{path} is not a model archive")
+        with zipfile.ZipFile(self.path) as zf:
+            self.manifest: Dict[str, Any] = json.loads(zf.read("manifest.json"))
+        if self.manifest.get("version", 0) > ARCHIVE_VERSION:
+            raise ValueError(
+                f"{path} was written in archive version {self.manifest['version']}, which is not supported"
+            )
+
+    @property
+    def artifact_names(self) -> List[str]:
+        """
+        The names of the artifacts in the archive, in the order in which they were saved.
+        """
+        return list(self.manifest["artifacts"])
+
+    def model_data(self) -> Dict[str, Any]:
+        """
+        Read the model metadata.
+
+        :return: the unpickled model metadata
+        """
+        with zipfile.ZipFile(self.path) as zf:
+            return pickle.loads(zf.read("model_data.pkl"))
+
+    def read_source(self, name: str) -> str | None:
+        """
+        Read one of the model's source files.
+
+        :param name: the file name, such as "predictor.py"
+        :return: the source code, or None if the archive does not contain the file
+        """
+        if name not in self.manifest["sources"]:
+            return None
+        with zipfile.ZipFile(self.path) as zf:
+            return zf.read(name).decode("utf-8")
+
+    def materialise(self, name: str, directory: Path) -> Path:
+        """
+        Write an artifact to a directory, unless the artifact is already there.
+
+        With a store, the artifact is linked from the store, after decompressing it into the store if the store
+        does not hold it yet; a file that is already a link to the artifact's object is kept. Without one, a file
+        at the artifact's path is kept if its SHA-256 digest is the artifact's, and otherwise the artifact is
+        decompressed into a temporary file, which is then renamed, so that a partly written artifact is never seen
+        at the artifact's path.
+
+        :param name: the name of the artifact
+        :param directory: the directory to write the artifact to
+        :return: the path of the artifact
+        """
+        entry = self.manifest["artifacts"][name]
+        target = directory / name
+        if self.store is not None and entry.get("sha256") and self.store.has(entry["sha256"]):
+            return self.store.link(entry["sha256"], target)
+        if _has_digest(target, entry["size"], entry.get("sha256")):
+            return target
+
+        directory.mkdir(parents=True, exist_ok=True)
+        temporary = directory / f".{name}.{uuid.uuid4().hex}.part"
+        try:
+            with zipfile.ZipFile(self.path) as zf, zf.open(entry["member"]) as member:
+                src = member
+                if entry["codec"] == "zstd":
+                    src = pa.CompressedInputStream(pa.PythonFile(member, mode="r"), "zstd")
+                if self.store is not None:
+                    return self.store.link(self.store.put_stream(src), target)
+                with open(temporary, "wb") as dst:
+                    shutil.copyfileobj(src, dst, config.file_storage.archive_buffer_bytes)
+            os.replace(temporary, target)
+        finally:
+            if temporary.exists():
+                temporary.unlink()
+        return target
+
+    def materialise_all(self, names: Iterable[str], directory: Path) -> List[Path]:
+        """
+        Write several artifacts to a directory, decompressing them in parallel.
+
+        :param names: the names of the artifacts
+        :param directory: the directory to write the artifacts to
+        :return: the paths of the artifacts
+        """
+        names = list(names)
+        if len(names) <= 1:
+            return [self.materialise(name, directory) for name in names]
+        with ThreadPoolExecutor(max_workers=min(len(names), os.cpu_count() or 1)) as pool:
+            return list(pool.map(lambda name: self.materialise(name, directory), names))
+
+
+class _PendingArtifact:
+    """An artifact of an archive that is written to disk when it is first needed."""
+
+    def __init__(self, archive: ModelArchive, name: str, directory: Path):
+        self.archive = archive
+        self.name = name
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.done = False
+
+    def materialise(self) -> None:
+        with self.lock:
+            if not self.done:
+                self.archive.materialise(self.name, self.directory)
+                self.done = True
+
+
+# Artifacts that are written when first needed, keyed on their absolute path
+_pending: Dict[str, _PendingArtifact] = {}
+_pending_lock: threading.Lock = threading.Lock()
+
+
+def defer_artifacts(archive: ModelArchive, names: Iterable[str], directory: Path) -> None:
+    """
+    Register artifacts to be written from an archive to a directory when `materialise_pending` is called for them.
+
+    :param archive: the archive holding the artifacts
+    :param names: the names of the artifacts
+    :param directory: the directory to write the artifacts to
+    """
+    with _pending_lock:
+        for name in names:
+            _pending[os.path.abspath(directory / name)] = _PendingArtifact(archive, name, directory)
+
+
+def materialise_pending(paths: Iterable[str | Path]) -> None:
+    """
+    Write any of the given artifacts that have been deferred and not yet written.
+
+    :param paths: the paths of the artifacts
+    """
+    for path in paths:
+        key = os.path.abspath(path)
+        artifact = _pending.get(key)
+        if artifact is not None:
+            artifact.materialise()
+            with _pending_lock:
+                _pending.pop(key, None)
+
+
+def forget_pending(paths: Iterable[str | Path]) -> None:
+    """
+    Stop tracking any of the given artifacts that have been deferred and not yet written, without writing them.
+
+    :param paths: the paths of the artifacts
+    """
+    with _pending_lock:
+        for path in paths:
+            _pending.pop(os.path.abspath(path), None)
@@ -0,0 +1,431 @@
+# TinyML/internal/storage/store.py
+
+"""
+This module provides the `ArtifactStore` class, a content-addressed store for model artifacts in the model cache.
+
+Each file in the store is an object named by the SHA-256 digest of its contents, so identical artifacts shared by
+several models, or by several copies of one model, are stored once. A model's cache directory holds hardlinks to
+the objects rather than copies; where hardlinks are not possible, such as across filesystems, an object is reflinked
+if the filesystem supports it, and copied otherwise. Objects are read-only, and files in a model's cache directory
+must be replaced rather than written in place, so that a change to one model's artifact never alters the store.
+
+The store also keeps an index of the archives it has extracted, keyed by the SHA-256 digest of the archive file:
+the archive's small members, such as its metadata and source code, and the digest of each artifact. Loading an
+archive that is already indexed only links its artifacts into the model's cache directory, without decompressing the
+archive. Archive digests are memoised on the archive's path, size, modification time and inode, so an unchanged
+archive is not hashed again either. An archive that is not indexed yet is hashed with a `HashingReader` while it is
+extracted, so that it is read only once.
+
+The store records which files refer to each object: `link` writes a reference, named after the linked file's path,
+before it links the file, so that objects are known to be in use whether they were hardlinked, reflinked or copied.
+`release` drops the references of files that are removed, such as the files of a released model, and deletes the
+objects that these files referred to and no other file does, without looking at the rest of the store. `prune`
+checks every object, and also deletes the references of files that no longer exist, and the archive indexes and
+memoised digests that are no longer valid. Both skip objects and references created within a grace period, so that
+they do not delete an object that a concurrent load has just added.
+
+Example:
+>>>    store = ArtifactStore()
+>>>    digest = store.put_stream(tar.extractfile(member))
+>>>    store.link(digest, model.files_path / "model.joblib")
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import stat
+import time
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable
+
+from TinyML.config import config
+
+# The Linux ioctl that clones a file's extents into another file, on filesystems that support reflinks
+_FICLONE = 0x40049409
+
+
+def _reflink(source: Path, target: Path) -> None:
+    import fcntl
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+class HashingReader:
+    """Wraps a binary file, computing the SHA-256 digest of the bytes read from it."""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        self.sha256.update(data)
+        return data
+
+
+def _stat_key(path: str | Path, info: os.stat_result = None) -> str:
+    info = info or os.stat(path)
+    return f"{os.path.abspath(path)}\0{info.st_size}\0{info.st_mtime_ns}\0{info.st_ino}"
+
+
+def _target_key(path: str | Path) -> str:
+    return hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()
+
+
+def _write_text(path: Path, text: str) -> None:
+    """Write a small file through a temporary file with a suffix, so that it is never seen partly written."""
+    temporary = path.with_name(f"{path.name}.{uuid.uuid4().hex}")
+    temporary.write_text(text)
+    os.replace(temporary, path)
+
+
+class ArtifactStore:
+    """
+    A content-addressed store of files, linked into model cache directories.
+
+    Attributes:
+        root: The directory of the store.
+    """
+
+    def __init__(self, root: str | Path = config.file_storage.artifact_store_dir):
+        """
+        Open a store, creating its directories if needed.
+
+        :param root: the directory of the store
+        """
+        self.root: Path = Path(root)
+        for directory in ("objects", "archives", "paths", "refs", "targets", "tmp"):
+            (self.root / directory).mkdir(parents=True, exist_ok=True)
+
+    def object_path(self, digest: str) -> Path:
+        """
+        Return the path of an object in the store.
+
+        :param digest: the SHA-256 digest of the object, in hexadecimal
+        :return: the path of the object, which may not exist
+        """
+        return self.root / "objects" / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        """
+        Check whether the store holds an object.
+
+        :param digest: the SHA-256 digest of the object
+        :return: True if the object exists
+        """
+        return self.object_path(digest).is_file()
+
+    def put_stream(self, stream: BinaryIO) -> str:
+        """
+        Add the contents of a readable binary stream to the store, hashing it as it is written.
+
+        :param stream: the stream to read until its end
+        :return: the SHA-256 digest of the contents
+        """
+        sha256 = hashlib.sha256()
+        temporary = self.root / "tmp" / uuid.uuid4().hex
+        try:
+            with open(temporary, "wb") as f:
+                while chunk := stream.read(config.file_storage.archive_buffer_bytes):
+                    sha256.update(chunk)
+                    f.write(chunk)
+            digest = sha256.hexdigest()
+            target = self.object_path(digest)
+            if not target.is_file():
+                target.parent.mkdir(exist_ok=True)
+                os.chmod(temporary, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.replace(temporary, target)
+        finally:
+            if temporary.exists():
+                temporary.unlink()
+        return digest
+
+    def put_bytes(self, data: bytes) -> str:
+        """
+        Add a bytes object to the store.
+
+        :param data: the contents
+        :return: the SHA-256 digest of the contents
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.has(digest):
+            temporary = self.root / "tmp" / uuid.uuid4().hex
+            temporary.write_bytes(data)
+            self.object_path(digest).parent.mkdir(exist_ok=True)
+            os.chmod(temporary, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(temporary, self.object_path(digest))
+        return digest
+
+    def read_bytes(self, digest: str) -> bytes:
+        """
+        Read an object from the store.
+
+        :param digest: the SHA-256 digest of the object
+        :return: the contents of the object
+        """
+        return self.object_path(digest).read_bytes()
+
+    def link(self, digest: str, target: Path) -> Path:
+        """
+        Make a file refer to an object in the store: a hardlink if possible, else a reflink, else a copy.
+
+        An existing file at the target is replaced, unless it is already a link to the object. The target is recorded
+        as a reference to the object, in place of any object that it referred to before, until `release` is called
+        for it or the file no longer exists.
+
+        :param digest: the SHA-256 digest of the object
+        :param target: the path of the file
+        :return: the path of the file
+        """
+        source = self.object_path(digest)
+        self._reference(digest, target)
+        if target.exists() and os.path.samefile(source, target):
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_name(f".{target.name}.{uuid.uuid4().hex}.link")
+        try:
+            try:
+                os.link(source, temporary)
+            except OSError:
+                try:
+                    _reflink(source, temporary)
+                except (OSError, ImportError):
+                    shutil.copyfile(source, temporary)
+            os.replace(temporary, target)
+        finally:
+            if temporary.exists():
+                temporary.unlink()
+        return target
+
+    def digest_file(self, path: str | Path) -> str:
+        """
+        Compute the SHA-256 digest of a file, memoised on its path, size, modification time and inode.
+
+        :param path: the path of the file
+        :return: the SHA-256 digest of the file's contents
+        """
+        digest = self.cached_digest(path)
+        if digest is not None:
+            return digest
+        with open(path, "rb") as f:
+            info = os.fstat(f.fileno())
+            reader = HashingReader(f)
+            while reader.read(config.file_storage.archive_buffer_bytes):
+                pass
+        digest = reader.sha256.hexdigest()
+        self.remember_digest(path, digest, info)
+        return digest
+
+    def cached_digest(self, path: str | Path) -> str | None:
+        """
+        Return the memoised SHA-256 digest of a file, without reading the file.
+
+        :param path: the path of the file
+        :return: the digest, or None if the file has not been hashed since it last changed
+        """
+        memo = self._memo_path(_stat_key(path))
+        if not memo.is_file():
+            return None
+        return memo.read_text().split("\n", 1)[0]
+
+    def remember_digest(self, path: str | Path, digest: str, info: os.stat_result = None) -> None:
+        """
+        Memoise the SHA-256 digest of a file, computed by the caller, on the file's path, size, modification time
+        and inode.
+
+        :param path: the path of the file
+        :param digest: the SHA-256 digest of the file's contents
+        :param info: the status of the file when it was hashed, or None to read it now
+        """
+        key = _stat_key(path, info)
+        _write_text(self._memo_path(key), f"{digest}\n{key}")
+
+    def _memo_path(self, key: str) -> Path:
+        return self.root / "paths" / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def read_index(self, archive_digest: str) -> Dict[str, Any] | None:
+        """
+        Read the index of an extracted archive.
+
+        :param archive_digest: the SHA-256 digest of the archive file
+        :return: the archive's small members by name, and the digests of its artifacts by name; or None if the
+            archive has not been extracted, or any of its artifacts is no longer in the store
+        """
+        path = self.root / "archives" / archive_digest
+        if not path.is_file():
+            return None
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        if not all(self.has(digest) for digest in index["artifacts"].values()):
+            return None
+        return index
+
+    def write_index(self, archive_digest: str, index: Dict[str, Any]) -> None:
+        """
+        Record the index of an extracted archive.
+
+        :param archive_digest: the SHA-256 digest of the archive file
+        :param index: a dictionary with the archive's small members by name under "members", and the digests of
+            its artifacts by name under "artifacts"
+        """
+        path = self.root / "archives" / archive_digest
+        temporary = path.with_name(f"{path.name}.{uuid.uuid4().hex}")
+        with open(temporary, "wb") as f:
+            pickle.dump(index, f)
+        os.replace(temporary, path)
+
+    def release(
+        self,
+        paths: Iterable[str | Path],
+        grace_seconds: float = config.file_storage.artifact_store_prune_grace_seconds,
+    ) -> int:
+        """
+        Drop the references of files that no longer use their objects, such as the files of a removed model cache
+        directory, and delete the objects that they referred to and that no other file refers to.
+
+        Only the objects of the given files are checked. Objects created within the grace period are kept, and are
+        deleted by a later `prune`.
+
+        :param paths: the paths of the files
+        :param grace_seconds: the minimum age of an object for it to be deleted
+        :return: the number of objects deleted
+        """
+        digests = set()
+        for path in paths:
+            key = _target_key(path)
+            digest = self._referenced_digest(key)
+            if digest is not None:
+                (self.root / "refs" / digest / key).unlink(missing_ok=True)
+                (self.root / "targets" / key).unlink(missing_ok=True)
+                digests.add(digest)
+        cutoff = time.time() - grace_seconds
+        return sum(self._delete_if_unused(digest, cutoff) for digest in digests)
+
+    def prune(self, grace_seconds: float = config.file_storage.artifact_store_prune_grace_seconds) -> int:
+        """
+        Delete the objects that no file refers to, the references of files that no longer exist, the archive indexes
+        that refer to deleted objects, the memoised digests of archives that have changed, been removed or are no
+        longer indexed, and temporary files left behind by interrupted writes.
+
+        An object is in use while a file recorded by `link` as referring to it exists, whether it was linked or
+        copied, or while it has other hardlinks. Files created within the grace period are kept.
+
+        :param grace_seconds: the minimum time since a file was created for it to be deleted
+        :return: the number of objects deleted
+        """
+        cutoff = time.time() - grace_seconds
+
+        def settled(info: os.stat_result) -> bool:
+            return max(info.st_mtime, info.st_ctime) < cutoff
+
+        deleted = sum(self._delete_if_unused(path.name, cutoff) for path in (self.root / "objects").glob("*/*"))
+        for path in (self.root / "refs").iterdir():
+            if not self.has(path.name):
+                # Drop the references that outlived their object
+                self._referenced(path.name, cutoff)
+        for path in (self.root / "targets").iterdir():
+            try:
+                if settled(path.stat()) and (
+                    "." in path.name or not os.path.exists(path.read_text().partition("\n")[2])
+                ):
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+        for path in (self.root / "tmp").iterdir():
+            try:
+                if settled(path.stat()):
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+        for path in (self.root / "archives").iterdir():
+            try:
+                # Indexes and memos that are being written have a temporary name with a suffix
+                if "." in path.name and not settled(path.stat()):
+                    continue
+                if self.read_index(path.name) is None:
+                    path.unlink()
+            except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+                path.unlink(missing_ok=True)
+        for path in (self.root / "paths").iterdir():
+            try:
+                if "." in path.name and not settled(path.stat()):
+                    continue
+                digest, _, key = path.read_text().partition("\n")
+                archive = key.split("\0", 1)[0]
+                current = _stat_key(archive) if key and os.path.isfile(archive) else None
+                if current != key or not (self.root / "archives" / digest).is_file():
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+        return deleted
+
+    def _reference(self, digest: str, target: Path) -> None:
+        """Record a file as referring to an object, in place of the object that it referred to before, if any."""
+        key = _target_key(target)
+        previous = self._referenced_digest(key)
+        while True:
+            (self.root / "refs" / digest).mkdir(exist_ok=True)
+            try:
+                _write_text(self.root / "refs" / digest / key, os.path.abspath(target))
+                break
+            except FileNotFoundError:
+                # A concurrent prune removed the directory while it was empty
+                continue
+        _write_text(self.root / "targets" / key, f"{digest}\n{os.path.abspath(target)}")
+        if previous is not None and previous != digest:
+            (self.root / "refs" / previous / key).unlink(missing_ok=True)
+
+    def _referenced_digest(self, key: str) -> str | None:
+        try:
+            return (self.root / "targets" / key).read_text().partition("\n")[0]
+        except FileNotFoundError:
+            return None
+
+    def _referenced(self, digest: str, cutoff: float) -> bool:
+        """
+        Check whether a file refers to an object, dropping the references of files that no longer exist.
+        """
+        directory = self.root / "refs" / digest
+        referenced = False
+        try:
+            entries = list(directory.iterdir())
+        except FileNotFoundError:
+            return False
+        for entry in entries:
+            try:
+                info = entry.stat()
+                # References that are being written have a temporary name with a suffix
+                if max(info.st_mtime, info.st_ctime) >= cutoff or (
+                    "." not in entry.name and os.path.exists(entry.read_text())
+                ):
+                    referenced = True
+                    continue
+                entry.unlink()
+                if "." not in entry.name and self._referenced_digest(entry.name) == digest:
+                    (self.root / "targets" / entry.name).unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+        if not referenced:
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+        return referenced
+
+    def _delete_if_unused(self, digest: str, cutoff: float) -> bool:
+        """
+        Delete an object that was created before the cutoff time, if no file refers to it.
+        """
+        path = self.object_path(digest)
+        try:
+            info = path.stat()
+            # Hardlinks count as uses too, for the files linked before the store recorded references
+            if info.st_mtime >= cutoff or info.st_nlink > 1 or self._referenced(digest, cutoff):
+                return False
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
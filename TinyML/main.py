@@ -1,8 +1,72 @@
-# todo: main.py can eventually be used to enable smolmodels being used as a CLI, as well
+# TinyML/main.py
 
+"""
+Command line interface for the TinyML library.
 
-def main():
-    print("Hello, World!")
+Usage:
+    TinyML serve model.tar.gz [--host HOST] [--port PORT] [--max-batch-size N] [--max-wait-ms MS]
+                              [--workers N] [--watch] [--metrics]
+"""
+
+import argparse
+from typing import List
+
+from TinyML.config import config
+from TinyML.internal.serving.server import serve
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog="TinyML", description="Build and serve ML models from natural language.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="serve predictions from a saved model archive over HTTP")
+    serve_parser.add_argument("path", help="path of a model archive created by save_model")
+    serve_parser.add_argument("--host", default=config.serving.host, help="host address to bind to")
+    serve_parser.add_argument("--port", type=int, default=config.serving.port, help="port to bind to")
+    serve_parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=config.serving.max_batch_size,
+        help="maximum number of samples scored in a single batch",
+    )
+    serve_parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=config.serving.max_wait_ms,
+        help="maximum time in milliseconds that a sample waits for its batch to fill up",
+    )
+
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.serving.workers,
+        help="number of worker processes, forked after the model is loaded so that they share its memory",
+    )
+
+    serve_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="reload the model without downtime whenever the archive file changes",
+    )
+
+    serve_parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="record prediction metrics, and serve them in the Prometheus text format on GET /metrics",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(
+            args.path,
+            args.host,
+            args.port,
+            args.max_batch_size,
+            args.max_wait_ms,
+            args.workers,
+            args.watch,
+            args.metrics,
+        )
 
 
 if __name__ == "__main__":
@@ -33,19 +33,24 @@ Example:
 
 import io
 import logging
+import os
 import pickle
 import shutil
 import tarfile
 import time
 import types
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Union, List, Literal, Any
+from typing import Dict, Union, List, Literal, Any, Callable, Iterable
 
+import joblib
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 from TinyML.callbacks import Callback
 from TinyML.config import config
@@ -56,6 +61,30 @@ from TinyML.internal.common.provider import Provider
 from TinyML.internal.data_generation.generator import generate_data, DataGenerationRequest
 from TinyML.internal.models.generation.schema import generate_schema_from_dataset, generate_schema_from_intent
 from TinyML.internal.models.generators import ModelGenerator
+from TinyML.internal.runtime.batch import outputs_match, predict_batch, to_dataframe
+from TinyML.internal.runtime.cache import PredictionCache
+from TinyML.internal.runtime.coalescing import BatchingPredictor
+from TinyML.internal.runtime.compression import compress_predictor, is_estimator, store_compressed
+from TinyML.internal.runtime.concurrency import AsyncExecutor
+from TinyML.internal.runtime.deadline import DeadlineGuard
+from TinyML.internal.runtime.drift import DriftMonitor, profile_inputs
+from TinyML.internal.runtime.guard import ConstraintGuard
+from TinyML.internal.runtime.handle import PredictorHandle
+from TinyML.internal.runtime.metrics import PredictionMetrics
+from TinyML.internal.runtime.parallel import predict_many, create_worker_pool, worker_predict, worker_predict_batch
+from TinyML.internal.runtime.preprocessing import use_reference_preprocessing, verify_preprocessing
+from TinyML.internal.runtime.shadow import ShadowScorer
+from TinyML.internal.runtime.streaming import predict_file
+from TinyML.internal.runtime.trees import compile_tree_ensemble, is_tree_ensemble
+from TinyML.internal.runtime.warmup import profile_predictor, single_threaded, synthesise_inputs
+from TinyML.internal.storage.archive import (
+    ModelArchive,
+    defer_artifacts,
+    is_model_archive,
+    materialise_pending,
+    write_model_archive,
+)
+from TinyML.internal.storage.store import ArtifactStore, HashingReader
 
 
 class ModelState(Enum):
@@ -153,12 +182,19 @@ class Model:
 
         # The model's mutable state is defined by these fields
         self.state = ModelState.DRAFT
-        self.predictor: types.ModuleType | None = None
+        self.predictor: types.ModuleType | PredictorHandle | None = None
         self.trainer_source: str | None = None
         self.predictor_source: str | None = None
         self.artifacts: List[Path] = []
         self.metrics: Dict[str, str] = dict()
-        self.metadata: Dict[str, str] = dict()  # todo: initialise metadata, etc
+        self.metadata: Dict[str, Any] = dict()
+        self.cache: PredictionCache | None = None
+        self.async_executor: AsyncExecutor | None = None
+        self.constraint_guard: ConstraintGuard | None = None
+        self.prediction_metrics: PredictionMetrics | None = None
+        self.drift_monitor: DriftMonitor | None = None
+        self.shadow_scorer: ShadowScorer | None = None
+        self.deadline_guard: DeadlineGuard | None = None
 
         # Unique identifier for the model, used in directory paths etc
         self.identifier: str = f"model-{abs(hash(self.intent))}-{str(uuid.uuid4())}"
@@ -175,6 +211,8 @@ class Model:
         provider: str = "openai/gpt-4o-mini",
         timeout: int = None,
         max_iterations: int = None,
+        cascade: bool = False,
+        compress: bool = False,
     ) -> None:
         """
         Build the model using the provided dataset, directives, and optional data generation configuration.
@@ -187,6 +225,15 @@ class Model:
         :param provider: the provider to use for model building
         :param timeout: maximum time in seconds to spend building the model
         :param max_iterations: maximum number of iterations to spend building the model
+        :param cascade: whether to combine a fast solution with the best solution into a cascade predictor, which
+            escalates samples to the best solution when the fast solution is not confident; the calibration of the
+            cascade is stored in `metadata["cascade"]`; the cascade is calibrated on a held-out fraction of the
+            dataset (`config.model_search.cascade_calibration_fraction`), which is not used to train the model even if
+            no cascade is kept
+        :param compress: whether to replace the built model's estimators with cheaper variants whose loss of
+            accuracy is within the configured tolerance; see `compress`. The loss of accuracy is measured on a
+            held-out fraction of the dataset (`config.inference.compression_holdout_fraction`), which is not used to
+            train the model
         :return:
         """
         try:
@@ -253,17 +300,35 @@ class Model:
             else:
                 raise ValueError("No data available. Provide dataset or generate_samples.")
 
+            # Hold out part of the data to measure the accuracy of the compressed model on, if compression is requested
+            training_rows, validation_data = self.training_data, None
+            if compress and len(self.training_data) > 1:
+                validation_data = self.training_data.sample(
+                    frac=config.inference.compression_holdout_fraction, random_state=0
+                )
+                training_rows = self.training_data.drop(validation_data.index).reset_index(drop=True)
+
             # Step 3: Generate Model
             model_generator = ModelGenerator(
                 self.intent, self.input_schema, self.output_schema, provider, self.files_path, self.constraints
             )
-            generated = model_generator.generate(self.training_data, timeout, max_iterations, directives, callbacks)
+            generated = model_generator.generate(training_rows, timeout, max_iterations, directives, callbacks, cascade)
 
             self.trainer_source = generated.training_source_code
             self.predictor_source = generated.inference_source_code
             self.predictor = generated.inference_module
             self.artifacts = generated.model_artifacts
             self.metrics = generated.performance
+            self.metadata["input_profile"] = profile_inputs(self.training_data, self.input_schema or {})
+            if generated.cascade is not None:
+                self.metadata["cascade"] = generated.cascade
+            self._verify_preprocessing()
+            self.warm_up()
+            if compress:
+                try:
+                    self.compress(validation_data=validation_data)
+                except RuntimeError as e:
+                    logger.warning(f"Model was not compressed: {str(e)}")
 
             self.state = ModelState.READY
             print("✅ Model built successfully.")
@@ -272,18 +337,692 @@ class Model:
             logger.error(f"Error during model building: {str(e)}")
             raise e
 
-    def predict(self, x: dict) -> dict:
+    def predict(self, x: dict, deadline_ms: float = None) -> dict:
         """
         Call the model with input x and return the output.
+
+        With a deadline, the prediction runs on the model's deadline guard, and a fallback response is returned if
+        the predictor does not answer in time; see `configure_deadlines`.
+
+        :param x: input to the model
+        :param deadline_ms: maximum time in milliseconds to wait for the output, or None to wait indefinitely
+        :return: output of the model, or the fallback response if the deadline is missed
+        :raises TimeoutError: if the deadline is missed and no fallback is available
+        """
+        if self.state != ModelState.READY:
+            raise RuntimeError("The model is not ready for predictions.")
+        if deadline_ms is not None:
+            guard = self.deadline_guard or self.configure_deadlines()
+            return guard.run(self.predict, x, deadline_ms, self.cache, self.prediction_metrics)
+        if self.drift_monitor is not None:
+            self.drift_monitor.observe(x)
+        start = time.perf_counter()
+        with self._observe("predict"):
+            try:
+                if self.cache is not None:
+                    output = self.cache.get_or_compute(x, self.predictor.predict)
+                else:
+                    output = self.predictor.predict(x)
+            except Exception as e:
+                raise RuntimeError(f"Error during prediction: {str(e)}") from e
+            if self.constraint_guard is not None:
+                self.constraint_guard.check(x, output)
+        if self.shadow_scorer is not None:
+            self.shadow_scorer.submit(x, output, time.perf_counter() - start)
+        return output
+
+    def predict_batch(self, x: pd.DataFrame | pa.Table) -> pd.DataFrame | pa.Table:
+        """
+        Call the model on a batch of inputs and return the outputs in columnar form.
+
+        The batch is scored with the predictor's vectorised `predict_batch` function where available, falling
+        back to calling `predict` once per row for predictors that do not provide one.
+
+        :param x: batch of inputs, with one row per sample and one column per input schema field
+        :return: batch of outputs, with one row per input row; a pyarrow Table if x is a pyarrow Table
+        """
+        if self.state != ModelState.READY:
+            raise RuntimeError("The model is not ready for predictions.")
+        if self.drift_monitor is not None:
+            self.drift_monitor.observe_batch(to_dataframe(x))
+        with self._observe("predict_batch", len(x), batch=True):
+            try:
+                outputs = predict_batch(self.predictor, x, list(self.output_schema) if self.output_schema else None)
+            except Exception as e:
+                raise RuntimeError(f"Error during batch prediction: {str(e)}") from e
+            if self.constraint_guard is not None:
+                self.constraint_guard.check_batch(
+                    to_dataframe(x), outputs.to_pandas() if isinstance(outputs, pa.Table) else outputs
+                )
+        return outputs
+
+    def predict_many(self, x: pd.DataFrame | pa.Table, n_jobs: int = -1) -> pd.DataFrame | pa.Table:
+        """
+        Call the model on a batch of inputs, splitting the batch across a pool of worker processes.
+
+        Each worker loads the predictor and its artifacts once, and reads its rows of the batch from shared memory.
+        This is intended for large offline scoring jobs; for small batches, `predict_batch` is faster.
+
+        :param x: batch of inputs, with one row per sample and one column per input schema field
+        :param n_jobs: number of worker processes to use; -1 to use one per CPU
+        :return: batch of outputs, with one row per input row; a pyarrow Table if x is a pyarrow Table
+        """
+        if self.state != ModelState.READY:
+            raise RuntimeError("The model is not ready for predictions.")
+        with self._observe("predict_many", len(x), batch=True):
+            try:
+                return predict_many(
+                    self.predictor_handle(), x, list(self.output_schema) if self.output_schema else None, n_jobs
+                )
+            except Exception as e:
+                raise RuntimeError(f"Error during parallel prediction: {str(e)}") from e
+
+    def predict_file(
+        self,
+        in_path: str | Path,
+        out_path: str | Path,
+        batch_size: int = config.inference.file_batch_size,
+        include_inputs: bool = False,
+    ) -> int:
+        """
+        Call the model on every row of a parquet or CSV file, and write the outputs to a parquet file.
+
+        The input is read and scored one batch of rows at a time, and each batch of outputs is written before the
+        next batch is read, so memory use is bounded by the batch size rather than by the size of the file.
+
+        :param in_path: path of the input parquet or CSV file, with one column per input schema field
+        :param out_path: path of the output parquet file, with one column per output schema field
+        :param batch_size: number of rows scored at a time
+        :param include_inputs: whether to also write the input columns to the output file
+        :return: the number of rows scored
+        """
+        if self.state != ModelState.READY:
+            raise RuntimeError("The model is not ready for predictions.")
+        start = time.perf_counter()
+        try:
+            rows = predict_file(
+                self.predictor,
+                in_path,
+                out_path,
+                list(self.output_schema) if self.output_schema else None,
+                batch_size,
+                include_inputs,
+                self.input_schema,
+                self.output_schema,
+            )
+        except Exception as e:
+            if self.prediction_metrics is not None:
+                self.prediction_metrics.record("predict_file", time.perf_counter() - start, 0, error=True)
+            raise RuntimeError(f"Error during file prediction: {str(e)}") from e
+        if self.prediction_metrics is not None:
+            # The number of rows is only known once the file has been read, so the call is recorded afterwards
+            self.prediction_metrics.record("predict_file", time.perf_counter() - start, rows)
+        return rows
+
+    async def apredict(self, x: dict, deadline_ms: float = None) -> dict:
+        """
+        Call the model with input x without blocking the event loop, and return the output.
+
+        The prediction runs on the model's async executor, which limits the number of predictions in flight; see
+        `configure_async`. A default thread-based executor is created on first use.
+
         :param x: input to the model
+        :param deadline_ms: maximum time in milliseconds to wait for the output, or None to wait indefinitely
         :return: output of the model
+        :raises TimeoutError: if the deadline is exceeded
+        """
+        if self.state != ModelState.READY:
+            raise RuntimeError("The model is not ready for predictions.")
+        executor = self.async_executor or self.configure_async()
+        if isinstance(executor.executor, ThreadPoolExecutor):
+            return await executor.run(self.predict, x, deadline_ms=deadline_ms)
+        # Predictions in worker processes do not go through `predict`, so they are recorded here
+        with self._observe("predict"):
+            try:
+                return await executor.run(worker_predict, x, deadline_ms=deadline_ms)
+            except TimeoutError:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error during prediction: {str(e)}") from e
+
+    async def apredict_batch(self, x: pd.DataFrame | pa.Table, deadline_ms: float = None) -> pd.DataFrame | pa.Table:
+        """
+        Call the model on a batch of inputs without blocking the event loop, and return the outputs.
+
+        :param x: batch of inputs, with one row per sample and one column per input schema field
+        :param deadline_ms: maximum time in milliseconds to wait for the outputs, or None to wait indefinitely
+        :return: batch of outputs, with one row per input row; a pyarrow Table if x is a pyarrow Table
+        :raises TimeoutError: if the deadline is exceeded
         """
         if self.state != ModelState.READY:
             raise RuntimeError("The model is not ready for predictions.")
+        executor = self.async_executor or self.configure_async()
+        if isinstance(executor.executor, ThreadPoolExecutor):
+            return await executor.run(self.predict_batch, x, deadline_ms=deadline_ms)
+        with self._observe("predict_batch", len(x), batch=True):
+            try:
+                outputs = await executor.run(worker_predict_batch, to_dataframe(x), deadline_ms=deadline_ms)
+            except TimeoutError:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error during batch prediction: {str(e)}") from e
+        return pa.Table.from_pandas(outputs, preserve_index=False) if isinstance(x, pa.Table) else outputs
+
+    def configure_async(
+        self,
+        max_concurrency: int = config.inference.async_max_concurrency,
+        executor: Literal["thread", "process"] = "thread",
+    ) -> AsyncExecutor:
+        """
+        Configure the executor used by `apredict` and `apredict_batch`, replacing any existing one.
+
+        With a thread executor, predictions go through `predict` and `predict_batch`, including the prediction
+        cache if enabled. With a process executor, each worker process loads the predictor once, which avoids
+        contention on the GIL for CPU-bound predictors.
+
+        :param max_concurrency: the maximum number of predictions in flight; further calls wait for a free slot
+        :param executor: whether to run predictions on a pool of threads or of processes
+        :return: the new async executor
+        """
+        if self.async_executor is not None:
+            self.async_executor.shutdown(wait=False)
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tinyml-predict")
+        elif executor == "process":
+            pool = create_worker_pool(
+                self.predictor_handle(), max_concurrency, list(self.output_schema) if self.output_schema else None
+            )
+        else:
+            raise ValueError(f"Unsupported executor type: {executor}")
+        self.async_executor = AsyncExecutor(pool, max_concurrency)
+        return self.async_executor
+
+    def configure_deadlines(
+        self,
+        fallback: dict | Callable[[dict], dict] | None = None,
+        use_cache: bool = True,
+        workers: int = config.inference.deadline_workers,
+    ) -> DeadlineGuard:
+        """
+        Configure the fallback responses of `predict` calls that miss their deadline, replacing any existing setup.
+
+        A missed deadline is answered with the most recent cached prediction for the same input if the prediction
+        cache is enabled, even if it has expired, and otherwise with the fallback. The slow prediction keeps running
+        in the background, on one of a pool of threads, and is cached when it completes. The missed deadlines are
+        counted, and reported by `describe()`.
+
+        :param fallback: a fixed output, or a cheap function of the input, to answer missed deadlines with; None to
+            raise a TimeoutError when no cached prediction is available
+        :param use_cache: whether to answer missed deadlines with cached predictions
+        :param workers: the number of threads that run predictions with a deadline; when all of them are busy with
+            slow predictions, further calls miss their deadline
+        :return: the new deadline guard
+        """
+        if self.deadline_guard is not None:
+            self.deadline_guard.shutdown()
+        self.deadline_guard = DeadlineGuard(fallback, use_cache, workers)
+        return self.deadline_guard
+
+    def warm_up(self, n_samples: int = config.inference.warmup_samples) -> Dict[str, float]:
+        """
+        Warm up the predictor by running sample inputs through it, and record its latency in the model metadata.
+
+        Samples are drawn from the training data if it is available, and otherwise generated from the input schema.
+        The time of the first call, and the p50/p95/p99 single-sample and batch latencies, are stored in
+        `metadata["latency"]`. A predictor that fails on the samples is logged, but does not raise an error.
+
+        :param n_samples: the number of samples to run through the predictor; 0 to skip the warm-up
+        :return: the recorded latency statistics, in milliseconds
+        """
+        if n_samples <= 0 or self.predictor is None:
+            return {}
+
+        try:
+            samples = self._sample_inputs(n_samples)
+            latency = profile_predictor(
+                self.predictor, samples, config.inference.warmup_batch_size, config.inference.warmup_batch_runs
+            )
+        except Exception as e:
+            logger.warning(f"Predictor warm-up failed, latency was not recorded: {str(e)}")
+            return {}
+
+        self.metadata["latency"] = latency
+        logger.info(
+            f"🔥 Warmed up predictor: first call {latency['first_call_ms']:.2f}ms, "
+            f"p50 {latency['single_p50_ms']:.2f}ms, p99 {latency['single_p99_ms']:.2f}ms"
+        )
+        return latency
+
+    def compress(
+        self,
+        tolerance: float = config.inference.compression_tolerance,
+        n_samples: int = config.inference.compression_samples,
+        validation_data: pd.DataFrame = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Replace the estimators loaded by the predictor with cheaper variants, to speed up predictions and shrink the
+        model artifacts.
+
+        The estimators held in the predictor's module-level variables are replaced with ensembles of fewer trees,
+        float32 weights, or decision trees distilled from them, where the variant is smaller or faster and the
+        prediction error, or the disagreement with the original predictor if the outputs are not known, grows by at
+        most the tolerance. The compressed estimators are written over the artifacts they were loaded from, so that
+        saved models stay compressed, and are described in `metadata["compression"]`.
+
+        The error is measured on `validation_data`, which should contain rows that were not used to train the model;
+        `build` passes the rows it held out for this. Without it, the error is measured on rows of the training data,
+        on which the original model may be overfitted, so the tolerance is then only an approximate bound on the loss
+        of accuracy on new data. Each entry of the report records the data that the error was measured on.
+
+        :param tolerance: the maximum increase in prediction error over the original predictor
+        :param n_samples: the number of inputs on which the variants are measured, and on which estimators are
+            distilled
+        :param validation_data: rows that were not used for training, on which to measure the error
+        :return: for each compressed variable, the chosen variant, and its size, latency and error before and after
+        """
+        if self.predictor is None or self.predictor_source is None:
+            raise RuntimeError("The model has no predictor to compress.")
+
+        module = self.predictor.module if isinstance(self.predictor, PredictorHandle) else self.predictor
+        fields = list(self.input_schema or [])
+        output_columns = list(self.output_schema) if self.output_schema else None
+        try:
+            truth, held_out, distil_rows, measured_on = None, None, None, "synthetic inputs"
+            if (
+                self.training_data is not None
+                and len(self.training_data) > 1
+                and set(fields) <= set(self.training_data)
+            ):
+                rows = self.training_data.sample(n=min(len(self.training_data), 2 * n_samples), random_state=0)
+                distil_rows, held_out = rows.iloc[: len(rows) // 2], rows.iloc[len(rows) // 2 :]
+                measured_on = "training data"
+            if validation_data is not None and len(validation_data) > 0 and set(fields) <= set(validation_data):
+                held_out = validation_data.sample(n=min(len(validation_data), n_samples), random_state=0)
+                measured_on = "held-out data"
+                if distil_rows is not None:
+                    distil_rows = rows.iloc[:n_samples]
+
+            if held_out is not None:
+                inputs = held_out[fields].reset_index(drop=True)
+                if output_columns and set(output_columns) <= set(held_out):
+                    truth = held_out[output_columns].reset_index(drop=True)
+            else:
+                inputs = pd.DataFrame(synthesise_inputs(self.input_schema or {}, n_samples))
+            if distil_rows is not None:
+                distil_inputs = distil_rows[fields]
+            else:
+                distil_inputs = pd.DataFrame(synthesise_inputs(self.input_schema or {}, n_samples))
+
+            originals = {name: value for name, value in vars(module).items() if is_estimator(value)}
+            names = [name for name in originals if name not in self.metadata.get("compiled_trees", [])]
+            report = compress_predictor(
+                self.predictor,
+                module,
+                inputs,
+                truth,
+                tolerance,
+                distil_inputs.reset_index(drop=True),
+                names,
+                output_columns,
+            )
+
+            materialise_pending(self.artifacts)
+            for name, entry in report.items():
+                path = store_compressed(originals[name], getattr(module, name), self.artifacts)
+                if path is None:
+                    # The estimator was not loaded from a single artifact, so load the compressed one after it
+                    self.files_path.mkdir(parents=True, exist_ok=True)
+                    path = self.files_path / f"compressed-{name}.joblib"
+                    joblib.dump(getattr(module, name), path)
+                    self.artifacts.append(str(path))
+                    self.predictor_source += (
+                        f"\nimport joblib as _joblib\n\n{name} = _joblib.load({path.as_posix()!r})\n"
+                    )
+                entry["artifact"] = Path(path).as_posix()
+                entry["error_measured_on"] = measured_on
+        except Exception as e:
+            raise RuntimeError(f"Error during compression: {str(e)}") from e
+
+        self.metadata.setdefault("compression", {}).update(report)
+        if report:
+            compressed = ", ".join(f"{name} ({entry['variant']})" for name, entry in report.items())
+            self.predictor_source += f"\n# Compressed estimators: {compressed}\n"
+            logger.info(f"🗜️ Compressed estimators: {compressed}")
+            if self.cache is not None:
+                self.cache.clear()
+            self.warm_up()
+        return report
+
+    def compile_trees(
+        self,
+        n_samples: int = config.inference.compile_trees_samples,
+        tolerance: float = config.inference.compile_trees_tolerance,
+    ) -> List[str]:
+        """
+        Replace the tree ensembles loaded by the predictor with flattened, vectorised equivalents.
+
+        Fitted scikit-learn and xgboost tree ensembles held in the predictor's module-level variables are compiled
+        to flat NumPy node arrays, which serve `predict` and `predict_proba` without calling into the estimator.
+        Each compiled ensemble is kept only if the predictor's outputs on sample inputs are unchanged, within the
+        tolerance. The names of the compiled variables are stored in `metadata["compiled_trees"]`, so that the
+        ensembles are compiled again when the model is loaded.
+
+        :param n_samples: the number of sample inputs on which the compiled predictor is checked
+        :param tolerance: the maximum relative or absolute difference allowed between numeric outputs
+        :return: the names of the predictor variables that were compiled
+        """
+        if self.predictor is None:
+            raise RuntimeError("The model has no predictor to compile.")
+
+        module = self.predictor.module if isinstance(self.predictor, PredictorHandle) else self.predictor
+        output_columns = list(self.output_schema) if self.output_schema else None
+        try:
+            samples = pd.DataFrame(self._sample_inputs(n_samples))
+            expected = predict_batch(self.predictor, samples, output_columns)
+        except Exception as e:
+            raise RuntimeError(f"Error during tree compilation: {str(e)}") from e
+
+        compiled = []
+        for name, estimator in list(vars(module).items()):
+            if not is_tree_ensemble(estimator):
+                continue
+            try:
+                setattr(module, name, compile_tree_ensemble(estimator))
+                matches = outputs_match(expected, predict_batch(self.predictor, samples, output_columns), tolerance)
+            except Exception as e:
+                logger.debug(f"Could not compile '{name}': {str(e)}")
+                matches = False
+            if matches:
+                compiled.append(name)
+            else:
+                setattr(module, name, estimator)
+                logger.warning(f"Compiled tree ensemble '{name}' does not match the original, keeping the original")
+
+        self.metadata["compiled_trees"] = compiled
+        if compiled:
+            logger.info(f"🌲 Compiled tree ensembles: {', '.join(compiled)}")
+            if self.cache is not None:
+                self.cache.clear()
+            self.warm_up()
+        return compiled
+
+    def batching_predictor(
+        self,
+        max_batch_size: int = config.inference.coalesce_max_batch_size,
+        max_wait_ms: float = config.inference.coalesce_max_wait_ms,
+    ) -> BatchingPredictor:
+        """
+        Return a wrapper of the model whose `predict` method coalesces concurrent calls from many threads into
+        batches, which are scored with `predict_batch`. Each caller still passes one sample and gets one output.
+
+        This suits threaded servers where many requests score single samples at once; the wrapper trades up to
+        `max_wait_ms` of extra latency for the throughput of vectorised batch predictions. Call `close()` on the
+        wrapper when it is no longer needed.
+
+        :param max_batch_size: the maximum number of samples scored in a single batch
+        :param max_wait_ms: the maximum time in milliseconds that a sample waits for its batch to fill up
+        :return: the batching wrapper
+        """
+        if self.state != ModelState.READY:
+            raise RuntimeError("The model is not ready for predictions.")
+        return BatchingPredictor(self, max_batch_size, max_wait_ms)
+
+    def artifact_path(self, name: str) -> Path:
+        """
+        Return the path of one of the model's artifacts, writing the artifact first if its writing was deferred when
+        the model was loaded.
+
+        :param name: the file name of the artifact
+        :return: the path of the artifact
+        :raises ValueError: if the model has no artifact with this name
+        """
+        for artifact in self.artifacts:
+            if Path(artifact).name == name:
+                materialise_pending([artifact])
+                return Path(artifact)
+        raise ValueError(f"The model has no artifact named {name}")
+
+    def predictor_handle(self, embed_artifacts: bool = False) -> PredictorHandle:
+        """
+        Return a picklable handle to the model's predictor, which rebuilds the predictor in the process using it.
+
+        The handle can be sent to worker processes, for example with `ProcessPoolExecutor.map(handle.predict, ...)`
+        or `joblib.Parallel`. Each process builds the predictor once, and shares it between all copies of the handle.
+
+        :param embed_artifacts: whether the handle carries the contents of the model artifacts, so that it can be
+            used on machines where the artifact files do not exist
+        :return: the predictor handle
+        """
+        if self.predictor_source is None:
+            raise RuntimeError("The model has no predictor source to create a handle from.")
+        # The process using the handle cannot write deferred artifacts, so they are written now
+        materialise_pending(self.artifacts)
+        return PredictorHandle(
+            self.predictor_source,
+            self.artifacts,
+            embed_artifacts,
+            self.metadata.get("compiled_trees"),
+            self.metadata.get("preprocessing_fallback"),
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Return the state of the model for pickling.
+
+        The predictor module is replaced with a `PredictorHandle`, which rebuilds the predictor lazily in the
+        process that unpickles the model; the artifacts are embedded in the handle if the `pickle_artifacts`
+        inference setting is enabled. The training data, the trainer module, the async executor, the shadow scorer and
+        the deadline guard are not pickled.
+        Constraints that cannot be pickled, such as lambdas, are left out with a warning, together with the
+        constraint checks that use them.
+        """
+        state = self.__dict__.copy()
+        if self.predictor_source is not None:
+            state["predictor"] = self.predictor_handle(config.inference.pickle_artifacts)
+        state.pop("trainer", None)
+        state["training_data"] = None
+        state["async_executor"] = None
+        state["shadow_scorer"] = None
+        state["deadline_guard"] = None
         try:
-            return self.predictor.predict(x)
+            pickle.dumps(self.constraints)
+        except Exception:
+            logger.warning("The model's constraints cannot be pickled, and are left out of the pickled model")
+            state["constraints"] = []
+            state["constraint_guard"] = None
+        return state
+
+    def enable_cache(
+        self,
+        max_size: int = config.inference.cache_max_size,
+        ttl_seconds: float | None = config.inference.cache_ttl_seconds,
+    ) -> None:
+        """
+        Cache the results of `predict`, so that repeated inputs are answered without calling the predictor.
+
+        Cached predictions are keyed on the input values in the order of the input schema. The least recently used
+        predictions are evicted when the cache is full, and predictions expire after `ttl_seconds` if it is set.
+        The cache statistics are reported by `describe()`.
+
+        :param max_size: the maximum number of cached predictions
+        :param ttl_seconds: the time after which a cached prediction expires, or None to disable expiry
+        """
+        self.cache = PredictionCache(list(self.input_schema or []), max_size, ttl_seconds)
+
+    def disable_cache(self) -> None:
+        """
+        Stop caching the results of `predict`, and discard any cached predictions.
+        """
+        self.cache = None
+
+    def enable_constraint_checks(
+        self,
+        sample_rate: float = config.inference.constraint_sample_rate,
+        batch_sample_rate: float = 1.0,
+        on_violation: Literal["log", "raise"] = "log",
+    ) -> None:
+        """
+        Check the model's constraints on a sample of its live predictions, and count the violations.
+
+        Single predictions from `predict` are checked at `sample_rate`; batches from `predict_batch` are checked
+        with each constraint evaluated once over the sampled rows of the batch. The counters are reported by
+        `describe()`.
+
+        :param sample_rate: the fraction of single predictions that are checked
+        :param batch_sample_rate: the fraction of rows that are checked in each batch of predictions
+        :param on_violation: whether to "log" violations, or to "raise" a ConstraintViolationError
+        """
+        self.constraint_guard = ConstraintGuard(self.constraints, sample_rate, batch_sample_rate, on_violation)
+
+    def disable_constraint_checks(self) -> None:
+        """
+        Stop checking the model's constraints on its predictions.
+        """
+        self.constraint_guard = None
+
+    def enable_metrics(self, name: str = None) -> None:
+        """
+        Record metrics of the model's predictions: the number of calls, failed calls and samples scored, and
+        histograms of the latency and batch size, per prediction method. The metrics are reported by `describe()`,
+        and can be exported in the Prometheus text format with `export_metrics()`.
+
+        :param name: the value of the `model` label of the exported metrics; defaults to the model's identifier
+        """
+        self.prediction_metrics = PredictionMetrics(name or self.identifier)
+
+    def disable_metrics(self) -> None:
+        """
+        Stop recording metrics of the model's predictions, and discard the recorded metrics.
+        """
+        self.prediction_metrics = None
+
+    def export_metrics(self, path: str | Path = None) -> str:
+        """
+        Export the model's prediction metrics in the Prometheus text exposition format.
+
+        :param path: a file to write the metrics to, such as one read by the node exporter's textfile collector;
+            the file is replaced atomically
+        :return: the metrics as text
+        """
+        if self.prediction_metrics is None:
+            raise RuntimeError("Prediction metrics are not enabled; call enable_metrics() first.")
+        if path is not None:
+            self.prediction_metrics.write(path)
+        return self.prediction_metrics.export()
+
+    def enable_drift_monitoring(self, buffer_size: int = config.inference.drift_buffer_size) -> None:
+        """
+        Summarise the inputs of `predict` and `predict_batch` in per-field streaming sketches, and compare them with
+        the profile of the training data stored with the model, to detect input drift. The drift report is
+        available from `drift_report()`, and is included in `describe()`.
+
+        Models built before input profiles were stored are profiled from their training data if it is available;
+        otherwise the inputs are summarised without drift scores.
+
+        :param buffer_size: the number of single predictions buffered before their inputs are merged into the sketches
+        """
+        profile = self.metadata.get("input_profile")
+        if profile is None and self.training_data is not None:
+            profile = self.metadata["input_profile"] = profile_inputs(self.training_data, self.input_schema or {})
+        self.drift_monitor = DriftMonitor(self.input_schema or {}, profile, buffer_size)
+
+    def disable_drift_monitoring(self) -> None:
+        """
+        Stop summarising the inputs of the model's predictions, and discard the sketches.
+        """
+        self.drift_monitor = None
+
+    def drift_report(self, threshold: float = config.inference.drift_psi_threshold) -> dict:
+        """
+        Report the drift of the inputs observed since drift monitoring was enabled from the training data profile.
+
+        :param threshold: the population stability index above which a field is reported as drifted
+        :return: the number of observed samples, the drifted fields, and per-field summaries and drift scores
+        """
+        if self.drift_monitor is None:
+            raise RuntimeError("Drift monitoring is not enabled; call enable_drift_monitoring() first.")
+        return self.drift_monitor.report(threshold)
+
+    def enable_shadow(
+        self,
+        shadow: "Model",
+        sample_rate: float = config.inference.shadow_sample_rate,
+        workers: int = config.inference.shadow_workers,
+        queue_size: int = config.inference.shadow_queue_size,
+        tolerance: float = config.inference.shadow_tolerance,
+    ) -> None:
+        """
+        Mirror a fraction of the calls to `predict` to a shadow model, such as a rebuilt candidate, and record how
+        often the two models agree and how fast each of them is. The report is available from `shadow_report()`, and
+        is included in `describe()`.
+
+        The shadow model scores the mirrored calls on background threads, so it never delays the responses of this
+        model; when it falls behind, mirrored calls are dropped and counted. Any existing shadow is replaced.
+
+        :param shadow: the shadow model
+        :param sample_rate: the fraction of calls to `predict` that are mirrored
+        :param workers: the number of background threads that score mirrored calls
+        :param queue_size: the maximum number of mirrored calls waiting to be scored
+        :param tolerance: the maximum relative or absolute difference between numeric outputs that still agree
+        """
+        self.disable_shadow(wait=False)
+        self.shadow_scorer = ShadowScorer(shadow, sample_rate, workers, queue_size, tolerance)
+
+    def disable_shadow(self, wait: bool = True) -> None:
+        """
+        Stop mirroring calls to the shadow model, and discard the shadow statistics.
+
+        :param wait: whether to wait for the mirrored calls already queued to be scored
+        """
+        scorer, self.shadow_scorer = self.shadow_scorer, None
+        if scorer is not None:
+            scorer.close(wait)
+
+    def shadow_report(self) -> dict:
+        """
+        Report how the shadow model compares with this model on the mirrored calls so far.
+
+        :return: the mirrored, dropped and scored calls, the shadow model's errors, the agreement rate, and the
+            latency percentiles of both models
+        """
+        if self.shadow_scorer is None:
+            raise RuntimeError("Shadow scoring is not enabled; call enable_shadow() first.")
+        return self.shadow_scorer.stats()
+
+    def _observe(self, method: str, n_samples: int = 1, batch: bool = False):
+        """
+        Return a context manager that records a prediction call in the model's metrics, if they are enabled.
+        """
+        if self.prediction_metrics is None:
+            return nullcontext()
+        return self.prediction_metrics.observe(method, n_samples, batch)
+
+    def _verify_preprocessing(self) -> None:
+        """
+        Check the preprocessing plans compiled by the predictor against their original preprocessors on sample
+        inputs, and switch the plans that do not match, or that did not match when the model was built, to calling
+        the original preprocessors. Their names are stored in `metadata["preprocessing_fallback"]`.
+        """
+        module = self.predictor.module if isinstance(self.predictor, PredictorHandle) else self.predictor
+        fallback = list(self.metadata.get("preprocessing_fallback", []))
+        use_reference_preprocessing(module, fallback)
+        try:
+            samples = pd.DataFrame(self._sample_inputs(config.inference.preprocessing_check_samples))
+            failed = verify_preprocessing(module, samples)
         except Exception as e:
-            raise RuntimeError(f"Error during prediction: {str(e)}") from e
+            logger.warning(f"Preprocessing plans could not be checked: {str(e)}")
+            failed = []
+        self.metadata["preprocessing_fallback"] = fallback + [name for name in failed if name not in fallback]
+
+    def _sample_inputs(self, n_samples: int) -> List[dict]:
+        """
+        Draw sample inputs from the training data if it is available, and otherwise generate them from the schema.
+        """
+        fields = list(self.input_schema or [])
+        if self.training_data is not None and len(self.training_data) and set(fields) <= set(self.training_data):
+            rows = self.training_data[fields].sample(n=n_samples, replace=True, random_state=0)
+            return rows.to_dict(orient="records")
+        return synthesise_inputs(self.input_schema or {}, n_samples)
 
     def get_state(self) -> ModelState:
         """
@@ -319,6 +1058,12 @@ class Model:
             "state": self.state,
             "metadata": self.metadata,
             "metrics": self.metrics,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "constraint_checks": self.constraint_guard.stats() if self.constraint_guard is not None else None,
+            "prediction_metrics": (self.prediction_metrics.snapshot() if self.prediction_metrics is not None else None),
+            "drift": self.drift_monitor.report() if self.drift_monitor is not None else None,
+            "shadow": self.shadow_scorer.stats() if self.shadow_scorer is not None else None,
+            "deadlines": self.deadline_guard.stats() if self.deadline_guard is not None else None,
         }
 
     def review(self) -> ModelReview:
@@ -330,30 +1075,61 @@ class Model:
         raise NotImplementedError("Review functionality is not yet implemented.")
 
 
-def save_model(model: Model, path: str) -> None:
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    """
+    Add an in-memory file to a tar archive.
+    """
+    tarinfo = tarfile.TarInfo(name=name)
+    tarinfo.size = len(data)
+    tar.addfile(tarinfo, io.BytesIO(data))
+
+
+def save_model(model: Model, path: str, archive_format: Literal["tar", "zip"] = None) -> None:
     """
     Save a model to a single archive file, including trainer, predictor, and artifacts.
 
+    The default "tar" format is a gzip-compressed tar file. The model metadata and source code are written before
+    the artifacts, so that `load_model` can stream the artifacts straight into the model's cache directory. The
+    "zip" format is a random-access archive with zstd-compressed artifacts, from which the metadata, the sources and
+    each artifact can be read on their own; see `TinyML.internal.storage.archive`.
+
     :param model: the model to save
     :param path: the path to save the model to
+    :param archive_format: "tar" or "zip"; by default, "zip" if the path ends with ".zip", and otherwise the
+        configured archive format
     """
-    if not path.endswith(".tar.gz"):
-        path += ".tar.gz"
+    if archive_format is None:
+        archive_format = "zip" if path.endswith(".zip") else config.file_storage.archive_format
+    extension = ".zip" if archive_format == "zip" else ".tar.gz"
+    if not path.endswith(extension):
+        path += extension
+    # Artifacts of a loaded model may not have been written to its cache directory yet
+    materialise_pending(model.artifacts)
+    model_data = {
+        "intent": model.intent,
+        "output_schema": model.output_schema,
+        "input_schema": model.input_schema,
+        "constraints": model.constraints,
+        "metrics": model.metrics,
+        "metadata": model.metadata,
+        "state": model.state.value,
+        "identifier": model.identifier,
+    }
     try:
+        if archive_format == "zip":
+            sources = {"trainer.py": model.trainer_source, "predictor.py": model.predictor_source}
+            write_model_archive(path, model_data, {k: v for k, v in sources.items() if v}, model.artifacts)
+            return
+
         with tarfile.open(path, "w:gz") as tar:
-            # Save the trainer source code
-            if model.trainer_source:
-                trainer_info = io.BytesIO(model.trainer_source.encode("utf-8"))
-                trainer_tarinfo = tarfile.TarInfo(name="trainer.py")
-                trainer_tarinfo.size = len(model.trainer_source)
-                tar.addfile(trainer_tarinfo, trainer_info)
+            # Save the model metadata
+            _add_bytes(tar, "model_data.pkl", pickle.dumps(model_data))
 
-            # Save the predictor source code
+            # Save the trainer and predictor source code
+            if model.trainer_source:
+                _add_bytes(tar, "trainer.py", model.trainer_source.encode("utf-8"))
             if model.predictor_source:
-                predictor_info = io.BytesIO(model.predictor_source.encode("utf-8"))
-                predictor_tarinfo = tarfile.TarInfo(name="predictor.py")
-                predictor_tarinfo.size = len(model.predictor_source)
-                tar.addfile(predictor_tarinfo, predictor_info)
+                _add_bytes(tar, "predictor.py", model.predictor_source.encode("utf-8"))
 
             # Collect and save all artifacts
             for artifact in model.artifacts:
@@ -363,23 +1139,6 @@ def save_model(model: Model, path: str) -> None:
                 else:
                     raise FileNotFoundError(f"Artifact not found: {artifact}")
 
-            # Save the model metadata
-            model_data = {
-                "intent": model.intent,
-                "output_schema": model.output_schema,
-                "input_schema": model.input_schema,
-                "constraints": model.constraints,
-                "metrics": model.metrics,
-                "metadata": model.metadata,
-                "state": model.state.value,
-                "identifier": model.identifier,
-            }
-
-            model_data_bytes = io.BytesIO(pickle.dumps(model_data))
-            model_data_tarinfo = tarfile.TarInfo(name="model_data.pkl")
-            model_data_tarinfo.size = model_data_bytes.getbuffer().nbytes
-            tar.addfile(model_data_tarinfo, model_data_bytes)
-
     except Exception as e:
         logger.error(f"Error saving model, cleaning up tarfile: {e}")
         if Path(path).exists():
@@ -391,77 +1150,135 @@ def save_model(model: Model, path: str) -> None:
             shutil.rmtree(model.files_path)
 
 
-def load_model(path: str) -> Model:
+def _restore_model(model_data: dict) -> Model:
     """
-    Load a model from the archive created by `save_model`.
-    :param path: the path to load the model from
-    :return: the loaded model
+    Create a model from the metadata saved in a model archive, with its cache directory.
     """
-    import tarfile
-
-    try:
-        # Ensure smolmodels cache directory exists
-        cache_dir: Path = Path(config.file_storage.model_cache_dir)
-        cache_dir.mkdir(parents=True, exist_ok=True)
-
-        # Create a temporary directory to extract the archive
-        temp_dir: Path = cache_dir / f"loading-{time.time()}"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-
-        # Extract the archive
-        with tarfile.open(path, "r:gz") as tar:
-            tar.extractall(temp_dir)
-
-        # Load model data
-        model_data_path = temp_dir / "model_data.pkl"
-        with open(model_data_path, "rb") as f:
-            model_data = pickle.load(f)
-
-        # Create the model instance
-        model = Model(
-            intent=model_data["intent"],
-            output_schema=model_data["output_schema"],
-            input_schema=model_data["input_schema"],
-            constraints=model_data["constraints"],
-        )
-
-        print(model.intent)
-        print(model.files_path)
-
-        model.identifier = model_data["identifier"]
-        model.files_path = model.files_path.parent / model.identifier
-
-        # Restore state, metrics, and metadata
-        model.state = ModelState(model_data["state"])
-        model.metrics = model_data["metrics"]
-        model.metadata = model_data["metadata"]
+    model = Model(
+        intent=model_data["intent"],
+        output_schema=model_data["output_schema"],
+        input_schema=model_data["input_schema"],
+        constraints=model_data["constraints"],
+    )
+    model.identifier = model_data["identifier"]
+    model.files_path = model.files_path.parent / model.identifier
+    model.state = ModelState(model_data["state"])
+    model.metrics = model_data["metrics"]
+    model.metadata = model_data["metadata"]
+    model.files_path.mkdir(parents=True, exist_ok=True)
+    return model
+
+
+def load_model(path: str, lazy_artifacts: Iterable[str] = ()) -> Model:
+    """
+    Load a model from the archive created by `save_model`.
 
-        # Ensure model cache directory exists
-        model.files_path.mkdir(parents=True, exist_ok=True)
+    Artifacts are kept in the content-addressed `ArtifactStore` in the model cache, and the model's cache directory
+    holds links to them, so an artifact shared by several models is stored once. The archive is read in a single
+    pass, without extracting it first: the model metadata and source code are read into memory, and each artifact
+    is streamed straight into the store, so it is written to disk only once. The store keeps an index of the
+    archives it has read, so loading an archive that was loaded before only links its artifacts, without reading it.
 
-        # Copy trainer and predictor source code to the model's cache directory
-        shutil.copy(temp_dir / "trainer.py", model.files_path / "trainer.py")
-        shutil.copy(temp_dir / "predictor.py", model.files_path / "predictor.py")
+    Archives in the random-access "zip" format are recognised from their version marker. Their artifacts are
+    decompressed in parallel when the model is loaded, except those named in `lazy_artifacts`, which are only
+    written when `Model.artifact_path()` is called for them, or when the model is saved or sent to another process.
+    Only artifacts that are accessed through `artifact_path()`, and not opened by the predictor when it is loaded,
+    can be deferred.
 
-        trainer_path = model.files_path / "trainer.py"
-        predictor_path = model.files_path / "predictor.py"
+    The checks and the warm-up that run while loading limit native thread pools to one thread, so that the loading
+    process can be forked safely, as a pre-fork server does; the latency recorded by the warm-up is therefore
+    single-threaded.
 
-        # Restore artifacts
-        if temp_dir.exists():
-            for artifact_path in temp_dir.iterdir():
-                shutil.copy(artifact_path, model.files_path / artifact_path.name)
-                model.artifacts.append(str(model.files_path / artifact_path.name))
+    :param path: the path to load the model from
+    :param lazy_artifacts: the names of the artifacts of a "zip" archive to write only when they are accessed; the
+        artifacts of other archives are always linked when the model is loaded
+    :return: the loaded model
+    :raises ValueError: if the archive has no artifact with one of the names in `lazy_artifacts`
+    """
+    model: Model | None = None
+    lazy_artifacts = set(lazy_artifacts)
 
-        with open(trainer_path, "r") as f:
+    try:
+        store = ArtifactStore()
+        sources: Dict[str, str] = {}
+        artifact_names: Dict[str, None] = {}
+
+        if is_model_archive(path):
+            archive = ModelArchive(path, store)
+            model = _restore_model(archive.model_data())
+            for name in ("trainer.py", "predictor.py"):
+                source = archive.read_source(name)
+                if source is not None:
+                    sources[name] = source
+            unknown = lazy_artifacts - set(archive.artifact_names)
+            if unknown:
+                raise ValueError(f"The archive {path} has no artifacts named {sorted(unknown)}")
+            archive.materialise_all([n for n in archive.artifact_names if n not in lazy_artifacts], model.files_path)
+            defer_artifacts(archive, [n for n in archive.artifact_names if n in lazy_artifacts], model.files_path)
+            artifact_names = dict.fromkeys(archive.artifact_names)
+        else:
+            archive_digest = store.cached_digest(path)
+            index = store.read_index(archive_digest) if archive_digest is not None else None
+            if index is None:
+                # Stream the archive's members, in the order in which they were written, hashing the archive as it
+                # is read, so that it is read only once
+                index = {"members": {}, "artifacts": {}}
+                with open(path, "rb") as f:
+                    info = os.fstat(f.fileno())
+                    reader = HashingReader(f)
+                    with tarfile.open(fileobj=reader, mode="r|gz") as tar:
+                        for member in tar:
+                            if not member.isfile():
+                                continue
+                            name = Path(member.name).name
+                            if name in ("model_data.pkl", "trainer.py", "predictor.py"):
+                                index["members"][name] = tar.extractfile(member).read()
+                            else:
+                                index["artifacts"][name] = store.put_stream(tar.extractfile(member))
+                    # The tar reader stops at the end-of-archive marker, so hash the padding after it too
+                    while reader.read(config.file_storage.archive_buffer_bytes):
+                        pass
+                if "model_data.pkl" not in index["members"]:
+                    raise ValueError(f"The archive {path} does not contain model data")
+                archive_digest = reader.sha256.hexdigest()
+                store.write_index(archive_digest, index)
+                store.remember_digest(path, archive_digest, info)
+
+            model = _restore_model(pickle.loads(index["members"]["model_data.pkl"]))
+            for name in ("trainer.py", "predictor.py"):
+                if name in index["members"]:
+                    sources[name] = index["members"][name].decode("utf-8")
+            for name, digest in index["artifacts"].items():
+                store.link(digest, model.files_path / name)
+                artifact_names[name] = None
+
+        model.artifacts = [str(model.files_path / name) for name in artifact_names]
+
+        # Keep a copy of the source code in the model's cache directory
+        for name, source in sources.items():
+            (model.files_path / name).write_text(source, encoding="utf-8")
+
+        if "trainer.py" in sources:
             model.trainer = types.ModuleType("trainer")
-            model.trainer_source = f.read()
+            model.trainer_source = sources["trainer.py"]
             exec(model.trainer_source, model.trainer.__dict__)
 
-        with open(predictor_path, "r") as f:
+        if "predictor.py" in sources:
             model.predictor = types.ModuleType("predictor")
-            model.predictor_source = f.read()
+            model.predictor_source = sources["predictor.py"]
             exec(model.predictor_source, model.predictor.__dict__)
-
+            with single_threaded():
+                model._verify_preprocessing()
+
+        compiled = []
+        with single_threaded():
+            if model.metadata.get("compiled_trees"):
+                try:
+                    compiled = model.compile_trees()
+                except RuntimeError as e:
+                    logger.warning(f"Tree ensembles were not compiled: {str(e)}")
+            if not compiled:
+                model.warm_up()
         logger.info(f"Model successfully loaded from {path}.")
         return model
 
@@ -470,8 +1287,3 @@ def load_model(path: str) -> Model:
         if model is not None and model.files_path.exists():
             shutil.rmtree(model.files_path)
         raise e
-
-    finally:
-        # Cleanup temp directory
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
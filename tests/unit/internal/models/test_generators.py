@@ -0,0 +1,77 @@
+"""
+Unit tests for the selection of a cascade predictor by the ModelGenerator in TinyML.internal.models.generators.
+"""
+
+from TinyML.internal.models import generators
+from TinyML.internal.models.entities.graph import Graph
+from TinyML.internal.models.entities.metric import ComparisonMethod, Metric, MetricComparator
+from TinyML.internal.models.entities.node import Node
+from TinyML.internal.models.generators import ModelGenerator
+
+
+def make_node(tmp_path, name, execution_time, value=0.9):
+    artifact = tmp_path / "workdir" / f"{name}.joblib"
+    artifact.parent.mkdir(exist_ok=True)
+    artifact.write_text(name)
+    return Node(
+        solution_plan=name,
+        training_code=f"MODEL = '{name}.joblib'",
+        inference_code=f"# {name}\nMODEL = '{name}.joblib'",
+        performance=Metric("accuracy", value, MetricComparator(ComparisonMethod.HIGHER_IS_BETTER)),
+        execution_time=execution_time,
+        model_artifacts=[artifact],
+        visited=True,
+    )
+
+
+def make_generator(tmp_path, nodes):
+    generator = ModelGenerator.__new__(ModelGenerator)
+    generator.input_schema, generator.output_schema = {"x": float}, {"label": str}
+    generator.filedir = tmp_path / "cache"
+    generator.graph = Graph()
+    for node in nodes:
+        generator.graph.add_node(node)
+    generator._produce_inference_code = lambda node, input_schema, output_schema: node
+    return generator
+
+
+def test_produce_cascade_keeps_the_fastest_cascade(tmp_path, monkeypatch):
+    best = make_node(tmp_path, "best", 9.0)
+    fast, faster = make_node(tmp_path, "fast", 2.0), make_node(tmp_path, "faster", 1.0)
+    slow = make_node(tmp_path, "slow", 5.0)
+    unscored = make_node(tmp_path, "unscored", 0.5, value=None)
+    savings = {"fast": 0.6, "faster": 0.4}
+    tried = []
+
+    def fake_build_cascade(fast_source, accurate_source, calibration_data):
+        name = fast_source.split("\n")[0][2:]
+        tried.append(name)
+        assert accurate_source == best.inference_code
+        return f"cascade of {name}", {"saving": savings[name], "escalation_rate": 0.1}
+
+    monkeypatch.setattr(generators, "build_cascade", fake_build_cascade)
+    generator = make_generator(tmp_path, [best, slow, fast, faster, unscored])
+    source, summary, artifacts = generator._produce_cascade(best, None)
+
+    # Only the configured number of candidates is tried, fastest first, excluding the best and unscored solutions
+    assert tried == ["faster", "fast"]
+    assert source == "cascade of fast" and summary["saving"] == 0.6
+    # The kept candidate's cached artifacts are returned, and the replaced candidate's are removed
+    assert artifacts == [generator.filedir / "fast-1-fast.joblib"]
+    assert sorted(p.name for p in generator.filedir.iterdir()) == ["fast-1-fast.joblib"]
+    assert str(artifacts[0].as_posix()) in fast.inference_code
+
+
+def test_produce_cascade_removes_unused_candidates(tmp_path, monkeypatch):
+    best = make_node(tmp_path, "best", 9.0)
+    broken, useless = make_node(tmp_path, "broken", 1.0), make_node(tmp_path, "useless", 2.0)
+
+    def fake_build_cascade(fast_source, accurate_source, calibration_data):
+        if "broken" in fast_source:
+            raise ValueError("no confidence")
+        return None
+
+    monkeypatch.setattr(generators, "build_cascade", fake_build_cascade)
+    generator = make_generator(tmp_path, [best, broken, useless])
+    assert generator._produce_cascade(best, None) is None
+    assert list(generator.filedir.iterdir()) == []
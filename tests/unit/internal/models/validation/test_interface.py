@@ -0,0 +1,52 @@
+import pytest
+from TinyML.internal.models.validation.interface import InterfaceValidator
+
+
+@pytest.fixture
+def interface_validator():
+    """
+    Fixture to provide an InterfaceValidator that expects the inference module interface.
+
+    :return: An instance of InterfaceValidator.
+    """
+    return InterfaceValidator({"predict": 1, "predict_batch": 1})
+
+
+def test_valid_interface(interface_validator):
+    """Test that code defining both prediction functions passes validation."""
+    code = "def predict(sample):\n" "    return {}\n\n" "def predict_batch(samples):\n" "    return samples\n"
+    result = interface_validator.validate(code)
+    assert result.passed is True
+    assert result.message == "Interface is valid."
+    assert result.exception is None
+
+
+def test_missing_function(interface_validator):
+    """Test that code missing predict_batch fails validation and names the function."""
+    code = "def predict(sample):\n" "    return {}\n"
+    result = interface_validator.validate(code)
+    assert result.passed is False
+    assert "'predict_batch' is not defined" in result.message
+    assert isinstance(result.exception, TypeError)
+
+
+def test_wrong_arity(interface_validator):
+    """Test that functions with the wrong number of positional arguments fail validation."""
+    code = "def predict(sample, extra):\n" "    return {}\n\n" "def predict_batch(samples):\n" "    return samples\n"
+    result = interface_validator.validate(code)
+    assert result.passed is False
+    assert "'predict' takes 2 positional arguments, expected 1" in result.message
+
+
+def test_nested_function_not_counted(interface_validator):
+    """Test that functions nested inside other definitions do not satisfy the interface."""
+    code = "def predict(sample):\n" "    def predict_batch(samples):\n" "        return samples\n" "    return {}\n"
+    result = interface_validator.validate(code)
+    assert result.passed is False
+
+
+def test_invalid_syntax(interface_validator):
+    """Test that unparseable code fails validation rather than raising."""
+    result = interface_validator.validate("def predict(:\n")
+    assert result.passed is False
+    assert isinstance(result.exception, SyntaxError)
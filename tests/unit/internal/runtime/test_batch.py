@@ -0,0 +1,98 @@
+"""
+Unit tests for the batch prediction helpers in TinyML.internal.runtime.batch.
+
+These tests verify:
+1. Dispatch to a predictor's vectorised predict_batch function.
+2. The row-by-row fallback for predictors that only define predict.
+3. Conversion between pandas DataFrames, pyarrow Tables and lists of records.
+"""
+
+import types
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from TinyML.internal.runtime.batch import predict_batch, to_dataframe, has_vectorised_predict
+
+
+def make_predictor(vectorised: bool) -> types.ModuleType:
+    predictor = types.ModuleType("predictor")
+    predictor.calls = 0
+
+    def predict(sample: dict) -> dict:
+        predictor.calls += 1
+        return {"y": sample["x"] * 2}
+
+    def predict_batch(samples: pd.DataFrame) -> pd.DataFrame:
+        predictor.calls += 1
+        return pd.DataFrame({"y": samples["x"] * 2})
+
+    predictor.predict = predict
+    if vectorised:
+        predictor.predict_batch = predict_batch
+    return predictor
+
+
+@pytest.mark.parametrize("vectorised", [True, False])
+def test_predict_batch_dataframe(vectorised):
+    predictor = make_predictor(vectorised)
+    outputs = predict_batch(predictor, pd.DataFrame({"x": [1, 2, 3]}), ["y"])
+    assert isinstance(outputs, pd.DataFrame)
+    assert outputs["y"].tolist() == [2, 4, 6]
+    assert predictor.calls == (1 if vectorised else 3)
+
+
+def test_predict_batch_arrow_roundtrip():
+    outputs = predict_batch(make_predictor(True), pa.table({"x": [1, 2]}), ["y"])
+    assert isinstance(outputs, pa.Table)
+    assert outputs.column("y").to_pylist() == [2, 4]
+
+
+def test_predict_batch_records():
+    outputs = predict_batch(make_predictor(False), [{"x": 5}], ["y"])
+    assert outputs.to_dict(orient="records") == [{"y": 10}]
+
+
+def test_predict_batch_preserves_index_alignment():
+    frame = pd.DataFrame({"x": [1, 2]}, index=[10, 20])
+    outputs = predict_batch(make_predictor(True), frame, ["y"])
+    assert outputs.index.tolist() == [0, 1]
+
+
+def test_predict_batch_empty_fallback_has_columns():
+    outputs = predict_batch(make_predictor(False), pd.DataFrame({"x": []}), ["y"])
+    assert list(outputs.columns) == ["y"]
+    assert len(outputs) == 0
+
+
+def test_predict_batch_length_mismatch():
+    predictor = make_predictor(True)
+    predictor.predict_batch = lambda samples: pd.DataFrame({"y": [1]})
+    with pytest.raises(ValueError):
+        predict_batch(predictor, pd.DataFrame({"x": [1, 2]}))
+
+
+@pytest.mark.parametrize("vectorised", [True, False])
+def test_predict_batch_rejects_missing_output_columns(vectorised):
+    predictor = make_predictor(vectorised)
+    with pytest.raises(ValueError, match="missing the columns \\['Y'\\]"):
+        predict_batch(predictor, pd.DataFrame({"x": [1, 2]}), ["Y"])
+
+
+def test_predict_batch_drops_unexpected_output_columns(caplog):
+    predictor = make_predictor(True)
+    predictor.predict_batch = lambda samples: pd.DataFrame({"debug": samples["x"], "y": samples["x"] * 2})
+    outputs = predict_batch(predictor, pd.DataFrame({"x": [1, 2]}), ["y"])
+    assert list(outputs.columns) == ["y"]
+    assert "['debug']" in caplog.text
+
+
+def test_has_vectorised_predict():
+    assert has_vectorised_predict(make_predictor(True)) is True
+    assert has_vectorised_predict(make_predictor(False)) is False
+
+
+def test_to_dataframe_unsupported():
+    with pytest.raises(TypeError):
+        to_dataframe("not a batch")
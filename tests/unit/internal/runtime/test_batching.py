@@ -0,0 +1,96 @@
+"""
+Unit tests for the MicroBatcher class in TinyML.internal.runtime.batching.
+
+These tests verify:
+1. Items submitted concurrently are grouped into batches of at most the maximum size.
+2. Partial batches are flushed after the maximum wait time.
+3. Errors raised by the batch function are propagated to every item in the batch.
+4. Pending items are processed when the batcher is stopped.
+"""
+
+import threading
+import time
+
+import pytest
+
+from TinyML.internal.runtime.batching import MicroBatcher
+
+
+def test_results_match_items():
+    with MicroBatcher(lambda items: [x * 2 for x in items], max_batch_size=8, max_wait_ms=5) as batcher:
+        futures = [batcher.submit(i) for i in range(20)]
+        assert [f.result(timeout=5) for f in futures] == [i * 2 for i in range(20)]
+
+
+def test_batches_respect_max_size():
+    sizes = []
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        return items
+
+    with MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=50) as batcher:
+        futures = [batcher.submit(i) for i in range(10)]
+        [f.result(timeout=5) for f in futures]
+    assert max(sizes) <= 4
+    assert sum(sizes) == 10
+
+
+def test_concurrent_submissions_are_grouped():
+    sizes = []
+    barrier = threading.Barrier(8)
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        return items
+
+    with MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=200) as batcher:
+
+        def worker(i):
+            barrier.wait()
+            batcher.submit(i).result(timeout=5)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+    assert len(sizes) < 8
+
+
+def test_partial_batch_flushed_after_wait():
+    with MicroBatcher(lambda items: items, max_batch_size=100, max_wait_ms=10) as batcher:
+        start = time.monotonic()
+        assert batcher.submit("x").result(timeout=5) == "x"
+        assert time.monotonic() - start < 1
+
+
+def test_batch_errors_propagate():
+    def batch_fn(items):
+        raise ValueError("boom")
+
+    with MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=1) as batcher:
+        future = batcher.submit(1)
+        with pytest.raises(ValueError, match="boom"):
+            future.result(timeout=5)
+
+
+def test_wrong_result_count_is_an_error():
+    with MicroBatcher(lambda items: [], max_batch_size=2, max_wait_ms=1) as batcher:
+        with pytest.raises(ValueError):
+            batcher.submit(1).result(timeout=5)
+
+
+def test_stop_drains_pending_items():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=2, max_wait_ms=1000)
+    futures = [batcher.submit(i) for i in range(5)]
+    batcher.start()
+    batcher.stop(timeout=5)
+    assert [f.result(timeout=0) for f in futures] == list(range(5))
+    with pytest.raises(RuntimeError):
+        batcher.submit(6)
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, max_batch_size=0, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, max_batch_size=1, max_wait_ms=-1)
@@ -0,0 +1,108 @@
+"""
+Unit tests for the PredictionCache class in TinyML.internal.runtime.cache.
+
+These tests verify:
+1. Canonical keys that do not depend on the order of the input's keys.
+2. LRU eviction when the cache is full, and expiry after the time-to-live.
+3. The hit, miss, eviction and expiration counters.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from TinyML.internal.runtime.cache import PredictionCache
+
+
+class CountingPredictor:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, x: dict) -> dict:
+        self.calls += 1
+        return {"y": x["a"] + x["b"]}
+
+
+def test_key_is_independent_of_input_order():
+    cache = PredictionCache(["a", "b"], max_size=10)
+    assert cache.key({"a": 1, "b": 2}) == cache.key({"b": 2, "a": 1})
+    assert cache.key({"a": 1, "b": 2}) != cache.key({"a": 2, "b": 1})
+
+
+def test_key_includes_extra_fields():
+    cache = PredictionCache(["a"], max_size=10)
+    assert cache.key({"a": 1, "z": 1}) != cache.key({"a": 1, "z": 2})
+
+
+def test_key_handles_unhashable_values():
+    cache = PredictionCache(["a"], max_size=10)
+    assert cache.key({"a": [1, 2]}) == cache.key({"a": [1, 2]})
+
+
+def test_hits_skip_the_predictor():
+    cache, predictor = PredictionCache(["a", "b"], max_size=10), CountingPredictor()
+    assert cache.get_or_compute({"a": 1, "b": 2}, predictor.predict) == {"y": 3}
+    assert cache.get_or_compute({"b": 2, "a": 1}, predictor.predict) == {"y": 3}
+    assert predictor.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_returned_values_are_copies():
+    cache, predictor = PredictionCache(["a", "b"], max_size=10), CountingPredictor()
+    cache.get_or_compute({"a": 1, "b": 2}, predictor.predict)["y"] = -1
+    assert cache.get_or_compute({"a": 1, "b": 2}, predictor.predict) == {"y": 3}
+
+
+def test_lru_eviction():
+    cache, predictor = PredictionCache(["a", "b"], max_size=2), CountingPredictor()
+    cache.get_or_compute({"a": 1, "b": 0}, predictor.predict)
+    cache.get_or_compute({"a": 2, "b": 0}, predictor.predict)
+    cache.get_or_compute({"a": 1, "b": 0}, predictor.predict)  # 1 is now most recently used
+    cache.get_or_compute({"a": 3, "b": 0}, predictor.predict)  # evicts 2
+    assert cache.stats()["evictions"] == 1
+    cache.get_or_compute({"a": 1, "b": 0}, predictor.predict)
+    assert predictor.calls == 3
+    cache.get_or_compute({"a": 2, "b": 0}, predictor.predict)
+    assert predictor.calls == 4
+
+
+def test_ttl_expiry():
+    cache, predictor = PredictionCache(["a", "b"], max_size=10, ttl_seconds=10), CountingPredictor()
+    with patch("TinyML.internal.runtime.cache.time.monotonic", return_value=100.0):
+        cache.get_or_compute({"a": 1, "b": 2}, predictor.predict)
+    with patch("TinyML.internal.runtime.cache.time.monotonic", return_value=105.0):
+        cache.get_or_compute({"a": 1, "b": 2}, predictor.predict)
+    with patch("TinyML.internal.runtime.cache.time.monotonic", return_value=111.0):
+        cache.get_or_compute({"a": 1, "b": 2}, predictor.predict)
+    assert predictor.calls == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_peek_returns_expired_entries_on_request():
+    cache = PredictionCache(["a"], max_size=10, ttl_seconds=10)
+    with patch("TinyML.internal.runtime.cache.time.monotonic", return_value=100.0):
+        cache.get_or_compute({"a": 1}, lambda x: {"y": 1})
+    with patch("TinyML.internal.runtime.cache.time.monotonic", return_value=111.0):
+        assert cache.peek({"a": 1}) is None
+        assert cache.peek({"a": 1}, include_expired=True) == {"y": 1}
+    assert cache.peek({"a": 2}, include_expired=True) is None
+    assert cache.stats()["hits"] == cache.stats()["misses"] - 1 == 0
+
+
+def test_errors_are_not_cached():
+    cache = PredictionCache(["a"], max_size=10)
+
+    def failing(x):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute({"a": 1}, failing)
+    assert cache.stats()["size"] == 0
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        PredictionCache(["a"], max_size=0)
+    with pytest.raises(ValueError):
+        PredictionCache(["a"], max_size=1, ttl_seconds=0)
@@ -0,0 +1,162 @@
+"""
+Unit tests for the cascade predictor in TinyML.internal.runtime.cascade.
+"""
+
+import pickle
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from TinyML.internal.runtime.batch import rows_match
+from TinyML.internal.runtime.cascade import (
+    CascadePredictor,
+    build_cascade,
+    calibrate_threshold,
+    cascade_source,
+)
+from TinyML.internal.runtime.handle import PredictorHandle
+
+# The fast predictor is confident far from the decision boundary, and wrong close to it
+FAST_SOURCE = """
+import numpy as np
+import pandas as pd
+
+def predict(sample):
+    return {"label": "high" if sample["x"] > 0.1 else "low"}
+
+def predict_batch(samples):
+    return pd.DataFrame({"label": np.where(samples["x"] > 0.1, "high", "low")})
+
+def predict_confidence(sample):
+    return min(abs(sample["x"]), 1.0)
+
+def predict_confidence_batch(samples):
+    return np.minimum(samples["x"].abs().to_numpy(), 1.0)
+"""
+
+ACCURATE_SOURCE = """
+import time
+import pandas as pd
+
+def predict(sample):
+    time.sleep(0.0005)
+    return {"label": "high" if sample["x"] > 0 else "low"}
+
+def predict_batch(samples):
+    time.sleep(0.0005 * len(samples))
+    return pd.DataFrame({"label": ["high" if x > 0 else "low" for x in samples["x"]]})
+"""
+
+
+def load(source):
+    module = types.ModuleType("predictor")
+    exec(source, module.__dict__)
+    return module
+
+
+def make_inputs(n=200, seed=0):
+    return pd.DataFrame({"x": np.random.default_rng(seed).uniform(-1, 1, n)})
+
+
+def test_rows_match():
+    expected = pd.DataFrame({"y": [1.0, 2.0, np.nan], "label": ["a", "b", None]})
+    actual = pd.DataFrame({"label": ["a", "c", None], "y": [1.0 + 1e-9, 2.0, np.nan]})
+    assert rows_match(expected, actual, tolerance=1e-6).tolist() == [True, False, True]
+    assert not rows_match(expected, actual[["y"]]).any()
+    with pytest.raises(ValueError):
+        rows_match(expected, actual.head(2))
+
+
+def test_calibrate_threshold():
+    confidences = np.array([0.9, 0.8, 0.8, 0.7, 0.6, 0.5])
+    agrees = np.array([True, True, True, False, True, False])
+    assert calibrate_threshold(confidences, agrees, max_disagreement=0.0) == 0.8
+    assert calibrate_threshold(confidences, agrees, max_disagreement=0.2) == 0.6
+    assert calibrate_threshold(confidences, agrees, max_disagreement=1.0) == 0.5
+    # Inputs with equal confidence cannot be split between the two models
+    assert calibrate_threshold(np.array([0.9, 0.9]), np.array([True, False]), 0.0) == np.inf
+    assert calibrate_threshold(np.array([np.nan, 0.5]), np.array([True, True]), 0.0) == 0.5
+
+
+def test_cascade_routes_on_confidence():
+    cascade = CascadePredictor(load(FAST_SOURCE), load(ACCURATE_SOURCE), threshold=0.2)
+    assert cascade.predict({"x": 0.05}) == {"label": "high"}
+    assert cascade.predict({"x": 0.5}) == {"label": "high"}
+    outputs = cascade.predict_batch(pd.DataFrame({"x": [0.05, -0.5, 0.5, -0.05]}))
+    assert outputs["label"].tolist() == ["high", "low", "high", "low"]
+    stats = cascade.stats()
+    assert (stats["fast_answers"], stats["escalations"]) == (3, 3)
+
+
+def test_cascade_requires_confidence():
+    with pytest.raises(ValueError, match="predict_confidence"):
+        CascadePredictor(load(ACCURATE_SOURCE), load(ACCURATE_SOURCE), threshold=0.5)
+
+
+def test_build_cascade():
+    built = build_cascade(FAST_SOURCE, ACCURATE_SOURCE, make_inputs(), max_disagreement=0.0, min_saving=0.3)
+    assert built is not None
+    source, summary = built
+    assert 0.05 < summary["threshold"] < 0.2
+    assert summary["agreement"] == 1.0
+    assert summary["saving"] >= 0.3
+
+    predictor = load(source)
+    inputs = make_inputs(seed=1)
+    expected = load(ACCURATE_SOURCE).predict_batch(inputs)
+    outputs = predictor.predict_batch(inputs)
+    assert rows_match(expected, outputs).mean() > 0.95
+    assert predictor.predict({"x": 0.9}) == {"label": "high"}
+
+    # The cascade source works like any other predictor source
+    handle = pickle.loads(pickle.dumps(PredictorHandle(source)))
+    assert handle.predict({"x": -0.9}) == {"label": "low"}
+
+
+def test_build_cascade_rejects_unsuitable_fast_models():
+    assert build_cascade(ACCURATE_SOURCE, ACCURATE_SOURCE, make_inputs()) is None
+    assert build_cascade(FAST_SOURCE, ACCURATE_SOURCE, make_inputs(), min_saving=0.99) is None
+
+
+def test_cascade_source_threshold():
+    assert "THRESHOLD = 0.25" in cascade_source(FAST_SOURCE, ACCURATE_SOURCE, 0.25)
+
+
+# The same fast predictor, returning its prediction and confidence from a single run of the model
+COMBINED_SOURCE = """
+import numpy as np
+import pandas as pd
+
+calls = []
+
+def predict(sample):
+    raise AssertionError("the cascade should use predict_with_confidence")
+
+def predict_batch(samples):
+    raise AssertionError("the cascade should use predict_with_confidence_batch")
+
+def predict_with_confidence(sample):
+    calls.append(1)
+    return {"label": "high" if sample["x"] > 0.1 else "low"}, min(abs(sample["x"]), 1.0)
+
+def predict_with_confidence_batch(samples):
+    calls.append(len(samples))
+    labels = pd.DataFrame({"label": np.where(samples["x"] > 0.1, "high", "low")})
+    return labels, np.minimum(samples["x"].abs().to_numpy(), 1.0)
+"""
+
+
+def test_cascade_runs_the_fast_model_once():
+    fast = load(COMBINED_SOURCE)
+    cascade = CascadePredictor(fast, load(ACCURATE_SOURCE), threshold=0.2)
+    assert cascade.predict({"x": 0.5}) == {"label": "high"}
+    assert cascade.predict({"x": 0.05}) == {"label": "high"}
+    outputs = cascade.predict_batch(pd.DataFrame({"x": [0.05, -0.5, 0.5, -0.05]}))
+    assert outputs["label"].tolist() == ["high", "low", "high", "low"]
+    assert fast.calls == [1, 1, 4]
+    assert (cascade.stats()["fast_answers"], cascade.stats()["escalations"]) == (3, 3)
+
+    built = build_cascade(COMBINED_SOURCE, ACCURATE_SOURCE, make_inputs(), max_disagreement=0.0, min_saving=0.3)
+    assert built is not None and 0.05 < built[1]["threshold"] < 0.2
@@ -0,0 +1,71 @@
+"""
+Unit tests for the BatchingPredictor class in TinyML.internal.runtime.coalescing.
+"""
+
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from TinyML.internal.runtime.coalescing import BatchingPredictor
+from TinyML.models import Model, ModelState
+
+
+class StubModel:
+    def __init__(self):
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def predict_batch(self, x: pd.DataFrame) -> pd.DataFrame:
+        with self.lock:
+            self.batch_sizes.append(len(x))
+        if (x["x"] < 0).any():
+            raise ValueError("negative input")
+        return pd.DataFrame({"y": x["x"] * 2})
+
+
+def test_concurrent_calls_are_coalesced():
+    model = StubModel()
+    with BatchingPredictor(model, max_batch_size=16, max_wait_ms=50) as predictor:
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            outputs = list(pool.map(lambda i: predictor.predict({"x": i}), range(64)))
+    assert outputs == [{"y": 2 * i} for i in range(64)]
+    assert sum(model.batch_sizes) == 64
+    assert max(model.batch_sizes) > 1
+    assert max(model.batch_sizes) <= 16
+
+
+def test_failing_sample_only_fails_its_caller():
+    model = StubModel()
+    barrier = threading.Barrier(4)
+
+    def call(i):
+        barrier.wait()
+        try:
+            return predictor.predict({"x": i})
+        except ValueError as e:
+            return str(e)
+
+    with BatchingPredictor(model, max_batch_size=4, max_wait_ms=200) as predictor:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            outputs = list(pool.map(call, [1, -1, 2, 3]))
+    assert outputs == [{"y": 2}, "negative input", {"y": 4}, {"y": 6}]
+
+
+def test_model_batching_predictor_uses_cache():
+    model = Model(intent="test", input_schema={"x": int}, output_schema={"y": int})
+    model.predictor = types.ModuleType("predictor")
+    exec("def predict(sample):\n    return {'y': 2 * sample['x']}", model.predictor.__dict__)
+    model.state = ModelState.READY
+    model.enable_cache()
+
+    with model.batching_predictor(max_wait_ms=1) as predictor:
+        assert predictor.predict({"x": 3}) == {"y": 6}
+        assert predictor.predict({"x": 3}) == {"y": 6}
+    assert model.cache.stats()["hits"] == 1
+
+    model.state = ModelState.DRAFT
+    with pytest.raises(RuntimeError, match="not ready"):
+        model.batching_predictor()
@@ -0,0 +1,155 @@
+"""
+Unit tests for the estimator compression pass in TinyML.internal.runtime.compression.
+"""
+
+import types
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+from sklearn.linear_model import LinearRegression
+
+from TinyML.internal.runtime.compression import (
+    compress_predictor,
+    compression_variants,
+    estimator_size,
+    prediction_error,
+    record_features,
+)
+from TinyML.models import Model, ModelState
+
+X, Y = make_classification(n_samples=1000, n_features=6, n_informative=3, n_redundant=0, random_state=0)
+COLUMNS = [f"x{i}" for i in range(X.shape[1])]
+DATA = pd.DataFrame(X, columns=COLUMNS).assign(label=np.where(Y == 1, "yes", "no"))
+
+PREDICTOR_SOURCE = """
+import joblib
+import numpy as np
+import pandas as pd
+
+COLUMNS = {columns!r}
+model = joblib.load({path!r})
+
+def predict(sample):
+    return {{"label": "yes" if model.predict(np.array([[sample[c] for c in COLUMNS]]))[0] == 1 else "no"}}
+
+def predict_batch(samples):
+    return pd.DataFrame({{"label": np.where(model.predict(samples[COLUMNS].to_numpy()) == 1, "yes", "no")}})
+"""
+
+
+def test_fewer_trees_variants():
+    forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, Y)
+    variants = dict(compression_variants(forest, tree_fractions=(0.5, 0.1)))
+    assert list(variants) == ["10 of 20 trees", "2 of 20 trees"]
+    assert len(forest.estimators_) == 20
+    assert estimator_size(variants["2 of 20 trees"]) < estimator_size(forest) / 5
+    assert variants["10 of 20 trees"].predict(X).shape == Y.shape
+
+    boosted = GradientBoostingRegressor(n_estimators=20, random_state=0).fit(X, Y)
+    variant = dict(compression_variants(boosted, tree_fractions=(0.5,)))["10 of 20 trees"]
+    assert np.allclose(variant.predict(X), list(boosted.staged_predict(X))[9])
+
+    booster = xgb.XGBClassifier(n_estimators=20).fit(X, Y)
+    variant = dict(compression_variants(booster, tree_fractions=(0.25,)))["5 of 20 trees"]
+    assert variant.get_booster().num_boosted_rounds() == 5
+    assert np.mean(variant.predict(X) == Y) > 0.8
+
+
+def test_float32_and_distilled_variants():
+    linear = LinearRegression().fit(X, Y.astype(float))
+    variants = dict(compression_variants(linear))
+    assert variants["float32 weights"].coef_.dtype == np.float32
+    assert np.allclose(variants["float32 weights"].predict(X), linear.predict(X), atol=1e-5)
+
+    forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, Y)
+    variants = dict(compression_variants(forest, features=X, tree_fractions=(), distil_depths=(4,)))
+    student = variants["decision tree of depth 4 distilled from the estimator"]
+    assert list(student.classes_) == list(forest.classes_)
+    assert np.mean(student.predict(X) == forest.predict(X)) > 0.8
+
+
+def test_record_features():
+    module = types.ModuleType("predictor")
+    module.model = LinearRegression().fit(X, Y)
+    module.predict_batch = lambda samples: pd.DataFrame({"y": module.model.predict(samples[COLUMNS].to_numpy())})
+    features = record_features(module, "model", lambda: module.predict_batch(DATA.head(10)))
+    assert features.shape == (10, len(COLUMNS))
+    assert isinstance(module.model, LinearRegression)
+
+
+def test_prediction_error():
+    truth = pd.DataFrame({"y": [1.0, 2.0, 3.0], "label": ["a", "b", "c"]})
+    assert prediction_error(truth, truth) == 0.0
+    assert prediction_error(truth.assign(label=["a", "b", "x"]), truth) == pytest.approx(1 / 6)
+    assert prediction_error(truth[["y"]], truth) == 0.5
+
+
+def test_compress_predictor_respects_tolerance():
+    module = types.ModuleType("predictor")
+    module.model = RandomForestClassifier(n_estimators=100, random_state=0).fit(X[:500], Y[:500])
+    module.predict = lambda sample: {"y": int(module.model.predict([[sample[c] for c in COLUMNS]])[0])}
+    module.predict_batch = lambda samples: pd.DataFrame({"y": module.model.predict(samples[COLUMNS].to_numpy())})
+    inputs, distil = DATA[COLUMNS].iloc[500:].reset_index(drop=True), DATA[COLUMNS].iloc[:500]
+
+    assert compress_predictor(module, module, inputs, tolerance=-1.0, latency_samples=4) == {}
+    assert len(module.model.estimators_) == 100
+
+    report = compress_predictor(module, module, inputs, tolerance=0.05, distil_inputs=distil, latency_samples=4)
+    entry = report["model"]
+    assert entry["bytes_after"] < entry["bytes_before"]
+    assert entry["error_after"] <= entry["error_before"] + 0.05
+    assert estimator_size(module.model) == entry["bytes_after"]
+
+
+def test_model_compress_overwrites_artifacts(tmp_path):
+    path = tmp_path / "model.joblib"
+    joblib.dump(RandomForestClassifier(n_estimators=100, random_state=0).fit(X, Y), path)
+    model = Model(intent="test", input_schema={c: float for c in COLUMNS}, output_schema={"label": str})
+    model.predictor_source = PREDICTOR_SOURCE.format(columns=COLUMNS, path=str(path))
+    model.predictor = types.ModuleType("predictor")
+    exec(model.predictor_source, model.predictor.__dict__)
+    model.artifacts = [str(path)]
+    model.training_data = DATA
+    model.state = ModelState.READY
+    size = path.stat().st_size
+
+    report = model.compress(tolerance=0.02, n_samples=400)
+    assert set(report) == {"model"}
+    assert model.metadata["compression"]["model"]["artifact"] == path.as_posix()
+    assert report["model"]["error_measured_on"] == "training data"
+    assert path.stat().st_size < size
+    assert model.artifacts == [str(path)]
+
+    # The compressed estimator is loaded from the artifact by the unchanged predictor code
+    reloaded = types.ModuleType("predictor")
+    exec(model.predictor_source, reloaded.__dict__)
+    assert estimator_size(reloaded.model) == report["model"]["bytes_after"]
+    assert model.predict(DATA[COLUMNS].iloc[0].to_dict())["label"] in ("yes", "no")
+
+
+def test_model_compress_measures_error_on_validation_data(tmp_path):
+    path = tmp_path / "model.joblib"
+    joblib.dump(RandomForestClassifier(n_estimators=50, random_state=0).fit(X[:700], Y[:700]), path)
+    model = Model(intent="test", input_schema={c: float for c in COLUMNS}, output_schema={"label": str})
+    model.predictor_source = PREDICTOR_SOURCE.format(columns=COLUMNS, path=str(path))
+    model.predictor = types.ModuleType("predictor")
+    exec(model.predictor_source, model.predictor.__dict__)
+    model.artifacts = [str(path)]
+    model.training_data = DATA.iloc[:700]
+    model.state = ModelState.READY
+
+    report = model.compress(tolerance=1.0, n_samples=300, validation_data=DATA.iloc[700:])
+    entry = report["model"]
+    assert entry["error_measured_on"] == "held-out data"
+    # The forest fits its training data perfectly, so only rows it was not trained on show its real error
+    assert entry["error_before"] > 0
+
+
+def test_model_compress_requires_predictor():
+    with pytest.raises(RuntimeError, match="no predictor"):
+        Model(intent="test").compress()
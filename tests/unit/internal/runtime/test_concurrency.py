@@ -0,0 +1,106 @@
+"""
+Unit tests for the AsyncExecutor class in TinyML.internal.runtime.concurrency.
+
+These tests verify:
+1. Blocking calls run off the event loop and return their results.
+2. The number of calls in flight never exceeds the concurrency limit.
+3. Calls that exceed their deadline raise TimeoutError.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from TinyML.internal.runtime.concurrency import AsyncExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = AsyncExecutor(ThreadPoolExecutor(max_workers=4), max_concurrency=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_run_returns_result_off_loop_thread(executor):
+    async def main():
+        return await executor.run(lambda x: (x * 2, threading.current_thread()), 21)
+
+    result, thread = asyncio.run(main())
+    assert result == 42
+    assert thread is not threading.main_thread()
+
+
+def test_concurrency_limit(executor):
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def work(_):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+
+    async def main():
+        await asyncio.gather(*[executor.run(work, i) for i in range(8)])
+
+    asyncio.run(main())
+    assert peak[0] == 2
+
+
+def test_deadline_exceeded(executor):
+    async def main():
+        await executor.run(time.sleep, 0.5, deadline_ms=20)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(main())
+
+
+def test_timed_out_calls_keep_their_slots(executor):
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def work(seconds):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(seconds)
+        with lock:
+            in_flight[0] -= 1
+
+    async def main():
+        results = await asyncio.gather(
+            *[executor.run(work, 0.1, deadline_ms=10) for _ in range(6)], return_exceptions=True
+        )
+        assert all(isinstance(result, TimeoutError) for result in results)
+        # The next call waits until one of the timed out calls has returned
+        await executor.run(work, 0)
+
+    asyncio.run(main())
+    assert peak[0] == 2
+
+
+def test_errors_propagate(executor):
+    def fail():
+        raise ValueError("boom")
+
+    async def main():
+        await executor.run(fail)
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(main())
+
+
+def test_usable_from_several_event_loops(executor):
+    async def main():
+        return await executor.run(lambda: 1)
+
+    assert asyncio.run(main()) == 1
+    assert asyncio.run(main()) == 1
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        AsyncExecutor(ThreadPoolExecutor(max_workers=1), max_concurrency=0)
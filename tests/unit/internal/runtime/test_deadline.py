@@ -0,0 +1,84 @@
+"""
+Unit tests for the DeadlineGuard class in TinyML.internal.runtime.deadline, and for predictions with deadlines.
+"""
+
+import threading
+import time
+import types
+
+import pytest
+
+from TinyML.internal.runtime.deadline import DeadlineGuard
+from TinyML.models import Model, ModelState
+
+
+class SlowPredictor:
+    """Answers immediately, except for inputs with a "slow" flag, which block until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def predict(self, x):
+        if x.get("slow"):
+            self.release.wait(timeout=5)
+        return {"y": 2 * x["x"]}
+
+
+@pytest.fixture
+def predictor():
+    predictor = SlowPredictor()
+    yield predictor
+    predictor.release.set()
+
+
+def test_fast_predictions_are_returned(predictor):
+    guard = DeadlineGuard()
+    assert guard.run(predictor.predict, {"x": 2}, deadline_ms=1000) == {"y": 4}
+    assert guard.stats()["timeouts"] == 0
+    guard.shutdown()
+
+
+def test_default_fallback(predictor):
+    guard = DeadlineGuard(fallback={"y": -1})
+    start = time.perf_counter()
+    assert guard.run(predictor.predict, {"x": 2, "slow": True}, deadline_ms=20) == {"y": -1}
+    assert time.perf_counter() - start < 1.0
+
+    guard.fallback = lambda x: {"y": -x["x"]}
+    assert guard.run(predictor.predict, {"x": 3, "slow": True}, deadline_ms=20) == {"y": -3}
+    stats = guard.stats()
+    assert (stats["calls"], stats["timeouts"], stats["default_fallbacks"]) == (2, 2, 2)
+    guard.shutdown()
+
+
+def test_no_fallback_raises(predictor):
+    guard = DeadlineGuard()
+    with pytest.raises(TimeoutError, match="no fallback"):
+        guard.run(predictor.predict, {"x": 2, "slow": True}, deadline_ms=20)
+    guard.shutdown()
+
+
+def make_model(predictor):
+    model = Model(intent="test", input_schema={"x": int}, output_schema={"y": int})
+    model.predictor = types.SimpleNamespace(predict=predictor.predict)
+    model.state = ModelState.READY
+    return model
+
+
+def test_model_falls_back_to_cached_prediction(predictor):
+    model = make_model(predictor)
+    model.enable_cache(ttl_seconds=0.01)
+    model.enable_metrics()
+    model.configure_deadlines(fallback={"y": 0})
+    assert model.predict({"x": 5}, deadline_ms=1000) == {"y": 10}
+    time.sleep(0.02)
+
+    # The cached prediction has expired, so the slow predictor is called again, but it still serves as a fallback
+    model.predictor = types.SimpleNamespace(predict=lambda x: predictor.predict({**x, "slow": True}))
+    assert model.predict({"x": 5}, deadline_ms=20) == {"y": 10}
+    assert model.predict({"x": 6}, deadline_ms=20) == {"y": 0}
+
+    deadlines = model.describe()["deadlines"]
+    assert (deadlines["timeouts"], deadlines["cached_fallbacks"], deadlines["default_fallbacks"]) == (2, 1, 1)
+    assert model.describe()["prediction_metrics"]["predict_fallback"]["calls"] == 2
+    model.deadline_guard.shutdown()
@@ -0,0 +1,119 @@
+"""
+Unit tests for the streaming input sketches and drift reports in TinyML.internal.runtime.drift.
+"""
+
+import pickle
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from TinyML.internal.runtime.drift import DriftMonitor, FrequencySketch, QuantileSketch, profile_inputs
+from TinyML.models import Model, ModelState
+
+SCHEMA = {"amount": float, "items": int, "country": str}
+
+
+def make_data(n, seed=0, mean=0.0, countries="abcde"):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "amount": rng.normal(mean, 1.0, n),
+            "items": rng.integers(0, 10, n),
+            "country": rng.choice(list(countries), n),
+        }
+    )
+
+
+def test_quantile_sketch_is_accurate_and_bounded():
+    values = np.random.default_rng(0).exponential(size=100_000)
+    sketch = QuantileSketch()
+    for start in range(0, len(values), 1000):
+        sketch.update(values[start : start + 1000])
+    assert sketch.count == len(values)
+    assert len(sketch.means) <= sketch.compression
+    for q in (0.01, 0.5, 0.99):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.05)
+    assert sketch.cdf(np.quantile(values, 0.9)) == pytest.approx(0.9, abs=0.01)
+
+
+def test_frequency_sketch_tracks_heavy_hitters():
+    values = np.array(["a"] * 500 + ["b"] * 300 + [f"rare-{i}" for i in range(200)], dtype=object)
+    sketch = FrequencySketch(top_k=2)
+    sketch.update(values[:400])
+    sketch.update(values[400:])
+    assert list(sketch.heavy_hitters) == ["a", "b"]
+    assert sketch.estimate(["a", "b", "missing"]).tolist()[:2] == [500, 300]
+    assert sketch.estimate(["rare-1"])[0] >= 1
+
+
+def test_profile_inputs():
+    profile = profile_inputs(make_data(1000), SCHEMA, bins=4)
+    assert profile["amount"]["type"] == "numeric"
+    assert len(profile["amount"]["edges"]) == 3
+    assert sum(profile["amount"]["fractions"]) == pytest.approx(1.0)
+    assert set(profile["country"]["frequencies"]) == set("abcde")
+
+
+def test_no_drift_on_training_distribution():
+    monitor = DriftMonitor(SCHEMA, profile_inputs(make_data(5000), SCHEMA), buffer_size=64)
+    for sample in make_data(1000, seed=1).to_dict(orient="records"):
+        monitor.observe(sample)
+    report = monitor.report()
+    assert report["observed"] == 1000
+    assert report["drifted"] == []
+    assert all(field["psi"] < 0.05 for field in report["fields"].values())
+
+
+def test_drift_is_detected():
+    monitor = DriftMonitor(SCHEMA, profile_inputs(make_data(5000), SCHEMA))
+    monitor.observe_batch(make_data(1000, seed=1, mean=1.0, countries="abxyz"))
+    assert monitor.report()["drifted"] == ["amount", "country"]
+
+
+def test_missing_values_count_as_drift():
+    monitor = DriftMonitor(SCHEMA, profile_inputs(make_data(5000), SCHEMA))
+    data = make_data(500, seed=1)
+    data["items"] = None
+    monitor.observe_batch(data)
+    report = monitor.report()
+    assert report["fields"]["items"]["missing"] == 1.0
+    assert "items" in report["drifted"]
+
+
+def test_monitor_without_profile_only_summarises():
+    monitor = DriftMonitor(SCHEMA)
+    monitor.observe({"amount": 1.5, "country": "a"})
+    report = monitor.report()
+    assert report["fields"]["amount"]["quantiles"]["p50"] == 1.5
+    assert report["fields"]["items"]["missing"] == 1.0
+    assert "psi" not in report["fields"]["country"]
+
+
+def test_pickled_monitor_starts_empty():
+    monitor = DriftMonitor(SCHEMA, profile_inputs(make_data(100), SCHEMA))
+    monitor.observe_batch(make_data(10))
+    copy = pickle.loads(pickle.dumps(monitor))
+    assert copy.profile == monitor.profile
+    assert copy.report()["observed"] == 0
+
+
+def test_model_drift_monitoring():
+    model = Model(intent="test", input_schema=SCHEMA, output_schema={"y": float})
+    model.predictor = types.ModuleType("predictor")
+    exec("def predict(sample):\n    return {'y': sample['amount']}", model.predictor.__dict__)
+    model.state = ModelState.READY
+    model.training_data = make_data(2000)
+
+    model.enable_drift_monitoring(buffer_size=8)
+    assert "input_profile" in model.metadata
+    for sample in make_data(20, seed=1, mean=3.0).to_dict(orient="records"):
+        model.predict(sample)
+    model.predict_batch(make_data(20, seed=2, mean=3.0))
+    assert model.drift_report()["observed"] == 40
+    assert "amount" in model.describe()["drift"]["drifted"]
+
+    model.disable_drift_monitoring()
+    with pytest.raises(RuntimeError, match="enable_drift_monitoring"):
+        model.drift_report()
@@ -0,0 +1,85 @@
+"""
+Unit tests for the InputEncoder class in TinyML.internal.runtime.encoding.
+
+These tests verify:
+1. Column order follows the input schema, regardless of the order of the sample's keys.
+2. Values are coerced to the schema's types, and missing values are encoded as NaN or None.
+3. Lists of samples and DataFrames encode to the same arrays, optionally into a preallocated buffer.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from TinyML.internal.runtime.encoding import InputEncoder
+
+
+def test_numeric_schema_encodes_to_float_array():
+    encoder = InputEncoder({"a": int, "b": "float", "c": bool})
+    features = encoder.encode({"c": True, "b": 2.5, "a": "3"})
+    assert features.dtype == np.float64
+    assert features.tolist() == [[3.0, 2.5, 1.0]]
+
+
+def test_missing_numeric_value_is_nan():
+    features = InputEncoder({"a": int, "b": float}).encode({"a": 1})
+    assert features[0, 0] == 1.0
+    assert np.isnan(features[0, 1])
+
+
+def test_mixed_schema_encodes_to_object_array():
+    encoder = InputEncoder({"a": int, "b": str, "c": "bool"})
+    features = encoder.encode({"a": 2.0, "b": 7, "c": "false"})
+    assert features.dtype == object
+    assert features.tolist() == [[2, "7", False]]
+    assert encoder.encode({"a": 1})[0, 1] is None
+
+
+def test_encode_many_matches_encode():
+    encoder = InputEncoder({"a": int, "b": float})
+    samples = [{"a": 1, "b": 0.5}, {"b": 1.5, "a": 2}]
+    features = encoder.encode_many(samples)
+    assert features.shape == (2, 2)
+    assert np.array_equal(features[1:], encoder.encode(samples[1]))
+
+
+def test_encode_many_dataframe():
+    encoder = InputEncoder({"a": int, "b": str})
+    frame = pd.DataFrame({"b": ["x", None], "a": [1, 2]})
+    assert encoder.encode_many(frame).tolist() == [[1, "x"], [2, None]]
+    numeric = InputEncoder({"a": int, "b": float}).encode_many(pd.DataFrame({"a": [1, 2], "b": [0.5, None]}))
+    assert numeric[0].tolist() == [1.0, 0.5]
+    assert np.isnan(numeric[1, 1])
+
+
+def test_all_paths_apply_the_same_coercion():
+    encoder = InputEncoder({"a": int, "b": float, "c": bool})
+    samples = [
+        {"a": 3.7, "b": 1, "c": 2},
+        {"a": -3.7, "b": None, "c": 0.0},
+        {"a": float("nan"), "b": "2.5", "c": float("nan")},
+        {"a": "2.9", "b": np.float32(0.5), "c": True},
+    ]
+    expected = [[3.0, 1.0, 1.0], [-3.0, np.nan, 0.0], [np.nan, 2.5, np.nan], [2.0, 0.5, 1.0]]
+    single = np.vstack([encoder.encode(sample) for sample in samples])
+    assert np.array_equal(single, expected, equal_nan=True)
+    assert np.array_equal(encoder.encode_many(samples), expected, equal_nan=True)
+    assert np.array_equal(encoder.encode_many(pd.DataFrame(samples)), expected, equal_nan=True)
+
+    numeric = pd.DataFrame({"a": [3.7, -3.7, np.nan, 2.9], "b": [1.0, None, 2.5, 0.5], "c": [2, 0, np.nan, 1]})
+    assert np.array_equal(encoder.encode_many(numeric), expected, equal_nan=True)
+
+
+def test_encode_many_into_preallocated_buffer():
+    encoder = InputEncoder({"a": int, "b": float})
+    buffer = np.zeros((2, 2))
+    result = encoder.encode_many([{"a": 1, "b": 2}, {"a": 3, "b": 4}], out=buffer)
+    assert result is buffer
+    assert buffer.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+    with pytest.raises(ValueError):
+        encoder.encode_many([{"a": 1, "b": 2}], out=buffer)
+
+
+def test_empty_schema_is_rejected():
+    with pytest.raises(ValueError):
+        InputEncoder({})
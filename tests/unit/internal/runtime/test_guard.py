@@ -0,0 +1,69 @@
+"""
+Unit tests for the ConstraintGuard class in TinyML.internal.runtime.guard.
+"""
+
+import pandas as pd
+import pytest
+
+from TinyML.constraints import Constraint
+from TinyML.exceptions import ConstraintViolationError
+from TinyML.internal.runtime.guard import ConstraintGuard
+
+non_negative = Constraint(lambda inputs, outputs: outputs["y"] >= 0, description="y must be non-negative")
+
+
+def test_check_counts_violations():
+    guard = ConstraintGuard([non_negative], sample_rate=1.0)
+    guard.check({"x": 1}, {"y": 1})
+    guard.check({"x": 1}, {"y": -1})
+    stats = guard.stats()
+    assert stats["checked"] == 2
+    assert stats["violations"] == 1
+    assert stats["violations_by_constraint"] == {"y must be non-negative": 1}
+
+
+def test_check_respects_sample_rate():
+    guard = ConstraintGuard([non_negative], sample_rate=0.0)
+    guard.check({"x": 1}, {"y": -1})
+    assert guard.stats()["checked"] == 0
+
+    guard = ConstraintGuard([non_negative], sample_rate=0.5, seed=0)
+    for _ in range(1000):
+        guard.check({"x": 1}, {"y": 1})
+    assert 400 < guard.stats()["checked"] < 600
+
+
+def test_check_batch_counts_all_rows():
+    guard = ConstraintGuard([non_negative], sample_rate=0.0)
+    guard.check_batch(pd.DataFrame({"x": [1, 2, 3]}), pd.DataFrame({"y": [1, -1, -2]}))
+    assert guard.stats()["checked"] == 3
+    assert guard.stats()["violations"] == 2
+
+
+def test_check_batch_sampled_rows():
+    guard = ConstraintGuard([non_negative], sample_rate=0.0, batch_sample_rate=0.1, seed=0)
+    guard.check_batch(pd.DataFrame({"x": range(1000)}), pd.DataFrame({"y": range(1000)}, index=range(5, 1005)))
+    assert 50 < guard.stats()["checked"] < 150
+
+
+def test_raise_on_violation():
+    guard = ConstraintGuard([non_negative], sample_rate=1.0, on_violation="raise")
+    with pytest.raises(ConstraintViolationError, match="y must be non-negative"):
+        guard.check({"x": 1}, {"y": -1})
+    assert guard.stats()["violations"] == 1
+
+
+def test_evaluation_errors_are_counted():
+    broken = Constraint(lambda inputs, outputs: outputs["missing"] > 0, description="broken")
+    guard = ConstraintGuard([broken], sample_rate=1.0)
+    guard.check({"x": 1}, {"y": 1})
+    guard.check_batch(pd.DataFrame({"x": [1]}), pd.DataFrame({"y": [1]}))
+    assert guard.stats()["errors"] == 2
+    assert guard.stats()["violations"] == 0
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        ConstraintGuard([non_negative], sample_rate=2.0)
+    with pytest.raises(ValueError):
+        ConstraintGuard([non_negative], sample_rate=1.0, on_violation="ignore")
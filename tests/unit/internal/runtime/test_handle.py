@@ -0,0 +1,114 @@
+"""
+Unit tests for picklable predictors in TinyML.internal.runtime.handle, and for pickling models that use them.
+"""
+
+import pickle
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from TinyML.internal.runtime import handle as handle_module
+from TinyML.internal.runtime.handle import PredictorHandle
+from TinyML.models import Model, ModelState
+
+SOURCE = """
+import os
+
+with open("{path}") as f:
+    OFFSET = int(f.read())
+
+def predict(sample):
+    return {{"y": sample["x"] + OFFSET, "pid": os.getpid()}}
+"""
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / "offset.txt"
+    path.write_text("10")
+    return path
+
+
+def test_handle_is_lazy_and_picklable(artifact):
+    handle = PredictorHandle(SOURCE.format(path=artifact.as_posix()), [artifact])
+    copy = pickle.loads(pickle.dumps(handle))
+    assert copy._module is None
+    assert copy.predict({"x": 1})["y"] == 11
+    assert copy.OFFSET == 10
+
+
+def test_copies_share_a_module_per_process(artifact):
+    handle = PredictorHandle(SOURCE.format(path=artifact.as_posix()), [artifact])
+    first, second = pickle.loads(pickle.dumps(handle)), pickle.loads(pickle.dumps(handle))
+    assert first.module is second.module
+
+
+def test_new_artifact_contents_get_a_new_module(artifact):
+    source = SOURCE.format(path=artifact.as_posix())
+    handle = PredictorHandle(source, [artifact])
+    assert handle.predict({"x": 1})["y"] == 11
+
+    artifact.write_text("20")
+    reloaded = PredictorHandle(source, [artifact])
+    assert reloaded.digest != handle.digest
+    assert reloaded.predict({"x": 1})["y"] == 21
+
+
+def test_release_modules(artifact):
+    handle = PredictorHandle(SOURCE.format(path=artifact.as_posix()), [artifact])
+    handle.predict({"x": 1})
+    assert handle.digest in handle_module._modules
+    assert handle_module.release_modules([str(artifact)]) == 1
+    assert handle.digest not in handle_module._modules
+    assert handle_module.release_modules([str(artifact)]) == 0
+
+
+def test_predict_batch_falls_back_to_predict(artifact):
+    handle = PredictorHandle(SOURCE.format(path=artifact.as_posix()), [artifact])
+    outputs = handle.predict_batch(pd.DataFrame({"x": [1, 2]}))
+    assert outputs["y"].tolist() == [11, 12]
+
+
+def test_embedded_artifacts_are_restored(artifact, monkeypatch):
+    handle = PredictorHandle(SOURCE.format(path=artifact.as_posix()), [artifact], embed_artifacts=True)
+    payload = pickle.dumps(handle)
+    artifact.unlink()
+    monkeypatch.setattr(handle_module, "_modules", {})
+    assert pickle.loads(payload).predict({"x": 1})["y"] == 11
+
+
+def test_missing_artifacts_are_reported(artifact):
+    handle = PredictorHandle(SOURCE.format(path=artifact.as_posix()), [artifact])
+    artifact.unlink()
+    with pytest.raises(FileNotFoundError, match="embed_artifacts"):
+        handle.predict({"x": 1})
+
+
+def test_handle_in_process_pool(artifact):
+    handle = PredictorHandle(SOURCE.format(path=artifact.as_posix()), [artifact])
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        outputs = list(pool.map(handle.predict, [{"x": i} for i in range(20)]))
+    assert [output["y"] for output in outputs] == list(range(10, 30))
+
+
+def test_model_is_picklable(artifact):
+    source = SOURCE.format(path=artifact.as_posix())
+    model = Model(intent="test", input_schema={"x": int}, output_schema={"y": int, "pid": int})
+    model.constraints = [lambda: None]  # not picklable, so left out
+    model.predictor_source, model.artifacts = source, [artifact]
+    model.predictor = types.ModuleType("predictor")
+    exec(source, model.predictor.__dict__)
+    model.state = ModelState.READY
+    model.enable_cache()
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        outputs = list(pool.map(model.predict, [{"x": i} for i in range(10)]))
+    assert [output["y"] for output in outputs] == list(range(10, 20))
+
+    copy = pickle.loads(pickle.dumps(model))
+    assert isinstance(copy.predictor, PredictorHandle)
+    assert copy.constraints == []
+    assert copy.predict_batch(pd.DataFrame({"x": [1]}))["y"].tolist() == [11]
+    assert copy.cache.stats()["size"] == 0
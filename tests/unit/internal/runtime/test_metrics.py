@@ -0,0 +1,144 @@
+"""
+Unit tests for the prediction metrics in TinyML.internal.runtime.metrics, and for recording them on a model.
+"""
+
+import pickle
+import threading
+import types
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from TinyML.internal.runtime.metrics import PredictionMetrics, SharedMetrics, render_metrics, start_metrics_server
+from TinyML.models import Model, ModelState
+
+
+def test_counters_and_histograms():
+    metrics = PredictionMetrics("m", latency_buckets=(0.01, 0.1), batch_size_buckets=(1, 10), stripes=4)
+    metrics.record("predict", 0.005)
+    metrics.record("predict", 0.01)
+    metrics.record("predict", 0.5, error=True)
+    metrics.record("predict_batch", 0.05, n_samples=8, batch=True)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["predict"]["calls"] == 3
+    assert snapshot["predict"]["errors"] == 1
+    assert snapshot["predict"]["latency_buckets"] == [2, 0, 1]
+    assert snapshot["predict"]["batches"] == 0
+    assert snapshot["predict_batch"]["samples"] == 8
+    assert snapshot["predict_batch"]["batch_size_buckets"] == [0, 1, 0]
+
+
+def test_export_format():
+    metrics = PredictionMetrics('my "model"', latency_buckets=(0.01, 0.1), batch_size_buckets=(1, 10))
+    metrics.record("predict_batch", 0.05, n_samples=8, batch=True)
+    metrics.record("predict_batch", 0.5, n_samples=20, batch=True)
+    lines = metrics.export().splitlines()
+
+    labels = 'model="my \\"model\\"",method="predict_batch"'
+    assert "# TYPE tinyml_predictions_total counter" in lines
+    assert f"tinyml_predictions_total{{{labels}}} 2" in lines
+    assert f'tinyml_prediction_latency_seconds_bucket{{{labels},le="0.01"}} 0' in lines
+    assert f'tinyml_prediction_latency_seconds_bucket{{{labels},le="0.1"}} 1' in lines
+    assert f'tinyml_prediction_latency_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f'tinyml_prediction_batch_size_bucket{{{labels},le="10.0"}} 1' in lines
+    assert f"tinyml_prediction_batch_size_sum{{{labels}}} 28" in lines
+    assert f"tinyml_prediction_batch_size_count{{{labels}}} 2" in lines
+
+
+def test_concurrent_recording_is_exact():
+    metrics = PredictionMetrics("m", stripes=4)
+
+    def work():
+        for _ in range(2000):
+            with metrics.observe("predict"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.snapshot()["predict"]["calls"] == 16000
+
+
+def test_observe_records_errors():
+    metrics = PredictionMetrics("m")
+    with pytest.raises(ValueError):
+        with metrics.observe("predict"):
+            raise ValueError("boom")
+    assert metrics.snapshot()["predict"]["errors"] == 1
+
+
+def test_write_and_serve(tmp_path):
+    metrics = PredictionMetrics("m")
+    metrics.record("predict", 0.001)
+    path = tmp_path / "m.prom"
+    metrics.write(path)
+    assert path.read_text() == render_metrics([metrics])
+    assert [p.name for p in tmp_path.iterdir()] == ["m.prom"]
+
+    httpd = start_metrics_server([metrics], port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{httpd.server_address[1]}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert 'tinyml_predictions_total{model="m",method="predict"} 1' in response.read().decode()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_shared_metrics_are_summed_across_processes(tmp_path):
+    first, second = PredictionMetrics("m", latency_buckets=(0.01,)), PredictionMetrics("m", latency_buckets=(0.01,))
+    first.record("predict", 0.001)
+    second.record("predict", 0.5, error=True)
+    second.record("predict_batch", 0.001, n_samples=4, batch=True)
+    SharedMetrics(second, tmp_path, name="worker-2").publish()
+
+    shared = SharedMetrics(first, tmp_path, name="worker-1")
+    snapshot = shared.snapshot()
+    assert snapshot["predict"]["calls"] == 2 and snapshot["predict"]["errors"] == 1
+    assert snapshot["predict"]["latency_buckets"] == [1, 1]
+    assert snapshot["predict_batch"]["samples"] == 4
+    assert 'tinyml_predictions_total{model="m",method="predict"} 2' in render_metrics([shared])
+
+    # The counts of a process that has stopped publishing are kept
+    first.reset()
+    assert shared.snapshot()["predict"]["calls"] == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["worker-1.json", "worker-2.json"]
+
+
+def test_pickled_metrics_start_empty():
+    metrics = PredictionMetrics("m", stripes=2)
+    metrics.record("predict", 0.001)
+    copy = pickle.loads(pickle.dumps(metrics))
+    assert copy.model_name == "m" and copy.snapshot() == {}
+
+
+@pytest.fixture
+def model():
+    model = Model(intent="test", input_schema={"x": int}, output_schema={"y": int})
+    model.predictor = types.ModuleType("predictor")
+    exec("def predict(sample):\n    return {'y': 2 * sample['x']}", model.predictor.__dict__)
+    model.state = ModelState.READY
+    return model
+
+
+def test_model_records_predictions(model, tmp_path):
+    model.enable_metrics("doubler")
+    model.predict({"x": 1})
+    model.predict_batch(pd.DataFrame({"x": [1, 2, 3]}))
+    with pytest.raises(RuntimeError):
+        model.predict({})
+
+    snapshot = model.describe()["prediction_metrics"]
+    assert (snapshot["predict"]["calls"], snapshot["predict"]["errors"]) == (2, 1)
+    assert snapshot["predict_batch"]["samples"] == 3
+    assert 'model="doubler"' in model.export_metrics(tmp_path / "doubler.prom")
+    assert (tmp_path / "doubler.prom").exists()
+
+    model.disable_metrics()
+    assert model.describe()["prediction_metrics"] is None
+    with pytest.raises(RuntimeError, match="enable_metrics"):
+        model.export_metrics()
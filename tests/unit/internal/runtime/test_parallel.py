@@ -0,0 +1,57 @@
+"""
+Unit tests for multi-process prediction in TinyML.internal.runtime.parallel.
+
+The tests run real worker processes against small predictor sources, to verify that the workers rebuild the
+predictor from source and read their rows from the shared input file.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from TinyML.internal.runtime.parallel import predict_many
+
+VECTORISED_SOURCE = """
+import os
+import pandas as pd
+
+def predict(sample):
+    return {"y": sample["x"] + 1, "pid": os.getpid()}
+
+def predict_batch(samples):
+    return pd.DataFrame({"y": samples["x"] + 1, "pid": os.getpid()})
+"""
+
+SINGLE_SAMPLE_SOURCE = """
+def predict(sample):
+    return {"y": sample["x"] + 1}
+"""
+
+
+def test_predict_many_dataframe():
+    frame = pd.DataFrame({"x": list(range(100))})
+    outputs = predict_many(VECTORISED_SOURCE, frame, ["y", "pid"], n_jobs=2, chunk_size=10)
+    assert outputs["y"].tolist() == list(range(1, 101))
+    assert outputs["pid"].nunique() <= 2
+
+
+def test_predict_many_single_sample_predictor():
+    outputs = predict_many(SINGLE_SAMPLE_SOURCE, pd.DataFrame({"x": [1, 2, 3]}), ["y"], n_jobs=2)
+    assert outputs["y"].tolist() == [2, 3, 4]
+
+
+def test_predict_many_arrow():
+    outputs = predict_many(SINGLE_SAMPLE_SOURCE, pa.table({"x": [5, 6]}), ["y"], n_jobs=1)
+    assert isinstance(outputs, pa.Table)
+    assert outputs.column("y").to_pylist() == [6, 7]
+
+
+def test_predict_many_empty():
+    outputs = predict_many(SINGLE_SAMPLE_SOURCE, pd.DataFrame({"x": []}), ["y"], n_jobs=2)
+    assert len(outputs) == 0
+    assert list(outputs.columns) == ["y"]
+
+
+def test_predict_many_invalid_jobs():
+    with pytest.raises(ValueError):
+        predict_many(SINGLE_SAMPLE_SOURCE, pd.DataFrame({"x": [1]}), ["y"], n_jobs=0)
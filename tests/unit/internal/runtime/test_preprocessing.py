@@ -0,0 +1,132 @@
+"""
+Unit tests for the preprocessing compiler in TinyML.internal.runtime.preprocessing.
+
+Each plan is compiled from fitted scikit-learn preprocessors and checked for equivalence with them.
+"""
+
+import types
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler, OneHotEncoder, StandardScaler
+
+from TinyML import compile_preprocessing
+from TinyML.internal.runtime.preprocessing import use_reference_preprocessing, verify_preprocessing
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "a": rng.normal(size=100),
+            "b": rng.integers(0, 10, size=100),
+            "colour": rng.choice(["red", "green", "blue"], size=100),
+            "size": rng.choice(["S", "L"], size=100),
+            "grade": rng.choice([1, 2, 3], size=100),
+        }
+    )
+
+
+def test_separate_preprocessors(data):
+    scaler = StandardScaler().fit(data[["a", "b"]])
+    encoder = OneHotEncoder(drop="if_binary").fit(data[["colour", "size"]])
+    label_encoder = LabelEncoder().fit(data["grade"])
+
+    plan = compile_preprocessing([scaler, encoder, (label_encoder, ["grade"])])
+    assert plan.columns == ["a", "b", "colour", "size", "grade"]
+    assert plan.n_features_out == 2 + 3 + 1 + 1
+    assert plan.check(data)
+
+
+def test_column_transformer(data):
+    transformer = ColumnTransformer(
+        [("num", StandardScaler(), ["a"]), ("cat", OneHotEncoder(), ["colour"]), ("mm", MinMaxScaler(), ["b"])],
+        remainder="passthrough",
+    ).fit(data[["a", "b", "colour", "grade"]])
+
+    plan = compile_preprocessing(transformer)
+    assert plan.check(data[["a", "b", "colour", "grade"]])
+
+
+def test_column_transformer_column_selections(data):
+    frame = data[["a", "b", "colour", "grade"]]
+    transformer = ColumnTransformer(
+        [
+            ("num", StandardScaler(), [0]),
+            ("cat", OneHotEncoder(), lambda X: ["colour"]),
+            ("mm", MinMaxScaler(), np.array([False, True, False, False])),
+        ],
+        remainder=StandardScaler(),
+    ).fit(frame)
+    # The plan only relies on the public attributes of the fitted transformer
+    indices = vars(transformer).pop("_transformer_to_input_indices", None)
+    plan = compile_preprocessing(transformer)
+    transformer._transformer_to_input_indices = indices
+    assert plan.check(frame)
+    assert np.allclose(plan.transform(frame), transformer.transform(frame))
+
+
+def test_single_samples_and_lists_match_frames(data):
+    plan = compile_preprocessing([StandardScaler().fit(data[["a"]]), OneHotEncoder().fit(data[["colour"]])])
+    records = data.to_dict(orient="records")
+    assert np.array_equal(plan.transform(records[0]), plan.transform(data.iloc[:1]))
+    assert np.array_equal(plan.transform(records), plan.transform(data))
+
+
+def test_mismatched_plan_falls_back_to_preprocessors(data):
+    scaler = StandardScaler().fit(data[["a", "b"]])
+    module = types.ModuleType("predictor")
+    module.good = compile_preprocessing([scaler])
+    # The columns are listed in the wrong order, so the plan scales each column with the other's statistics
+    module.bad = compile_preprocessing([(scaler, ["b", "a"])])
+
+    assert verify_preprocessing(module, data) == ["bad"]
+    assert not module.good.use_reference and module.bad.use_reference
+    assert np.allclose(module.bad.transform(data.to_dict(orient="records")), scaler.transform(data[["a", "b"]]))
+    assert np.allclose(module.bad.transform(data.iloc[0].to_dict()), scaler.transform(data[["a", "b"]].iloc[:1]))
+
+    reloaded = types.ModuleType("predictor")
+    reloaded.bad = compile_preprocessing([(scaler, ["b", "a"])])
+    use_reference_preprocessing(reloaded, ["bad", "missing"])
+    assert reloaded.bad.use_reference
+
+
+def test_plans_are_not_judged_on_inputs_the_preprocessors_reject(data):
+    module = types.ModuleType("predictor")
+    module.plan = compile_preprocessing([OneHotEncoder().fit(data[["colour"]])])
+    assert verify_preprocessing(module, pd.DataFrame({"colour": ["purple"]})) == []
+    assert not module.plan.use_reference
+
+
+def test_unknown_categories(data):
+    strict = compile_preprocessing(OneHotEncoder().fit(data[["colour"]]))
+    with pytest.raises(ValueError, match="unknown categories"):
+        strict.transform({"colour": "purple"})
+
+    lenient = compile_preprocessing(OneHotEncoder(handle_unknown="ignore").fit(data[["colour"]]))
+    assert np.array_equal(lenient.transform({"colour": "purple"}), np.zeros((1, 3)))
+
+
+def test_missing_values_are_a_category():
+    frame = pd.DataFrame({"colour": ["red", None, "blue", np.nan]})
+    plan = compile_preprocessing(OneHotEncoder().fit(frame))
+    assert plan.check(frame)
+    assert plan.transform({"colour": None}).sum() == 1
+
+
+def test_artifact_paths(data, tmp_path):
+    joblib.dump(StandardScaler().fit(data[["a", "b"]]), tmp_path / "scaler.joblib")
+    plan = compile_preprocessing([(str(tmp_path / "scaler.joblib"), ["a", "b"])])
+    assert plan.check(data)
+
+
+def test_unsupported_preprocessors(data):
+    with pytest.raises(ValueError, match="Unsupported"):
+        compile_preprocessing(PCA(n_components=1).fit(data[["a", "b"]]))
+    with pytest.raises(ValueError, match="Input columns"):
+        compile_preprocessing(StandardScaler().fit(data[["a"]].to_numpy()))
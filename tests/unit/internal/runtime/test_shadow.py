@@ -0,0 +1,113 @@
+"""
+Unit tests for the ShadowScorer class in TinyML.internal.runtime.shadow, and for shadow scoring on a model.
+"""
+
+import threading
+import types
+
+import pytest
+
+from TinyML.internal.runtime.shadow import ShadowScorer
+from TinyML.models import Model, ModelState
+
+
+class StubShadow:
+    def __init__(self, offset=0.0, fail_on=None, gate=None):
+        self.offset = offset
+        self.fail_on = fail_on
+        self.gate = gate
+
+    def predict(self, x):
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        if x["x"] == self.fail_on:
+            raise ValueError("shadow failure")
+        return {"y": 2 * x["x"] + self.offset}
+
+
+def test_agreement_and_latency():
+    scorer = ShadowScorer(StubShadow(), sample_rate=1.0, workers=2)
+    for i in range(10):
+        assert scorer.submit({"x": i}, {"y": 2 * i if i < 8 else -1}, 0.001)
+    scorer.drain()
+    stats = scorer.stats()
+    scorer.close()
+
+    assert (stats["mirrored"], stats["scored"], stats["dropped"]) == (10, 10, 0)
+    assert stats["agreement_rate"] == pytest.approx(0.8)
+    assert stats["primary_p50_ms"] == pytest.approx(1.0)
+    assert stats["shadow_p99_ms"] is not None
+
+
+def test_tolerance_and_errors():
+    scorer = ShadowScorer(StubShadow(offset=1e-9, fail_on=3), sample_rate=1.0, tolerance=1e-6)
+    for i in range(5):
+        scorer.submit({"x": i}, {"y": 2 * i}, 0.001)
+    scorer.drain()
+    stats = scorer.stats()
+    scorer.close()
+    assert stats["shadow_errors"] == 1
+    assert stats["agreement_rate"] == pytest.approx(0.8)
+
+
+def test_full_queue_drops_work_without_blocking():
+    gate = threading.Event()
+    scorer = ShadowScorer(StubShadow(gate=gate), sample_rate=1.0, workers=1, queue_size=2)
+    results = [scorer.submit({"x": i}, {"y": 2 * i}, 0.001) for i in range(10)]
+    gate.set()
+    scorer.drain()
+    stats = scorer.stats()
+    scorer.close()
+    assert results.count(False) == stats["dropped"] >= 7
+    assert stats["scored"] == stats["mirrored"] == results.count(True)
+
+
+def test_sampling_and_closing():
+    scorer = ShadowScorer(StubShadow(), sample_rate=0.0)
+    assert not scorer.submit({"x": 1}, {"y": 2}, 0.001)
+    scorer.close()
+    scorer.sample_rate = 1.0
+    assert not scorer.submit({"x": 1}, {"y": 2}, 0.001)
+
+
+def test_close_without_waiting_does_not_block_on_a_full_queue():
+    gate = threading.Event()
+    scorer = ShadowScorer(StubShadow(gate=gate), sample_rate=1.0, workers=2, queue_size=1)
+    for i in range(5):
+        scorer.submit({"x": i}, {"y": 2 * i}, 0.001)
+    closer = threading.Thread(target=scorer.close, kwargs={"wait": False})
+    closer.start()
+    closer.join(timeout=1)
+    assert not closer.is_alive()
+    assert not scorer.submit({"x": 9}, {"y": 18}, 0.001)
+    gate.set()
+    scorer.drain()
+    scorer.close()
+    stats = scorer.stats()
+    assert stats["scored"] == stats["mirrored"] and stats["queued"] == 0
+    assert not any(thread.is_alive() for thread in scorer._threads)
+
+
+def make_model(offset=0):
+    model = Model(intent="test", input_schema={"x": int}, output_schema={"y": int})
+    model.predictor = types.ModuleType("predictor")
+    exec(f"def predict(sample):\n    return {{'y': 2 * sample['x'] + {offset}}}", model.predictor.__dict__)
+    model.state = ModelState.READY
+    return model
+
+
+def test_model_shadow_scoring():
+    model, candidate = make_model(), make_model(offset=1)
+    model.enable_shadow(candidate, sample_rate=1.0)
+    outputs = [model.predict({"x": i}) for i in range(5)]
+    assert outputs == [{"y": 2 * i} for i in range(5)]
+
+    model.shadow_scorer.drain()
+    report = model.shadow_report()
+    assert report["scored"] == 5
+    assert report["agreement_rate"] == 0.0
+    assert model.describe()["shadow"]["mirrored"] == 5
+
+    model.disable_shadow()
+    with pytest.raises(RuntimeError, match="enable_shadow"):
+        model.shadow_report()
@@ -0,0 +1,103 @@
+"""
+Unit tests for streaming file-to-file scoring in TinyML.internal.runtime.streaming.
+"""
+
+import types
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from TinyML.internal.runtime.streaming import predict_file
+
+
+@pytest.fixture
+def predictor():
+    predictor = types.ModuleType("predictor")
+    predictor.batch_sizes = []
+
+    def predict_batch(samples: pd.DataFrame) -> pd.DataFrame:
+        predictor.batch_sizes.append(len(samples))
+        return pd.DataFrame({"y": samples["x"] * 2})
+
+    predictor.predict = lambda sample: {"y": sample["x"] * 2}
+    predictor.predict_batch = predict_batch
+    return predictor
+
+
+def test_parquet_is_scored_in_batches(tmp_path, predictor):
+    pd.DataFrame({"x": range(10)}).to_parquet(tmp_path / "in.parquet")
+    n_rows = predict_file(predictor, tmp_path / "in.parquet", tmp_path / "out.parquet", ["y"], batch_size=4)
+    assert n_rows == 10
+    assert predictor.batch_sizes == [4, 4, 2]
+    assert pq.read_table(tmp_path / "out.parquet").column("y").to_pylist() == [x * 2 for x in range(10)]
+
+
+def test_csv_input_with_inputs_included(tmp_path, predictor):
+    pd.DataFrame({"x": [1, 2, 3], "id": ["a", "b", "c"]}).to_csv(tmp_path / "in.csv", index=False)
+    predict_file(predictor, tmp_path / "in.csv", tmp_path / "out.parquet", ["y"], include_inputs=True)
+    outputs = pd.read_parquet(tmp_path / "out.parquet")
+    assert outputs.to_dict(orient="list") == {"y": [2, 4, 6], "x": [1, 2, 3], "id": ["a", "b", "c"]}
+
+
+def test_csv_is_scored_in_batches_of_the_requested_size(tmp_path, predictor):
+    pd.DataFrame({"x": range(10)}).to_csv(tmp_path / "in.csv", index=False)
+    predict_file(predictor, tmp_path / "in.csv", tmp_path / "out.parquet", ["y"], batch_size=4)
+    assert predictor.batch_sizes == [4, 4, 2]
+
+
+def test_csv_column_types_come_from_input_schema(tmp_path, predictor):
+    # The first block only holds integers and empty values, and a later block holds floats and strings
+    rows = [{"x": i, "name": ""} for i in range(300_000)] + [{"x": 0.5, "name": "late"}]
+    pd.DataFrame(rows).to_csv(tmp_path / "in.csv", index=False)
+    n_rows = predict_file(
+        predictor,
+        tmp_path / "in.csv",
+        tmp_path / "out.parquet",
+        ["y"],
+        batch_size=1000,
+        include_inputs=True,
+        input_schema={"x": float, "name": str},
+    )
+    assert n_rows == len(rows)
+    outputs = pq.read_table(tmp_path / "out.parquet")
+    assert outputs.column("y").to_pylist()[-1] == 1.0
+    assert outputs.column("name").to_pylist()[-1] == "late"
+
+
+def test_output_types_come_from_output_schema(tmp_path, predictor):
+    # The first batch's outputs are all missing, so their type cannot be inferred from the batch
+    predictor.predict_batch = lambda samples: pd.DataFrame({"y": [None if x < 4 else x * 0.5 for x in samples["x"]]})
+    pd.DataFrame({"x": range(10)}).to_parquet(tmp_path / "in.parquet")
+    predict_file(
+        predictor, tmp_path / "in.parquet", tmp_path / "out.parquet", ["y"], batch_size=4, output_schema={"y": float}
+    )
+    outputs = pq.read_table(tmp_path / "out.parquet")
+    assert outputs.schema.field("y").type == pa.float64()
+    assert outputs.column("y").to_pylist() == [None] * 4 + [x * 0.5 for x in range(4, 10)]
+
+    empty = tmp_path / "empty-in.parquet"
+    pd.DataFrame({"x": pd.Series([], dtype="int64")}).to_parquet(empty)
+    predict_file(predictor, empty, tmp_path / "none.parquet", ["y"], output_schema={"y": float})
+    assert pq.read_table(tmp_path / "none.parquet").schema.field("y").type == pa.float64()
+
+
+def test_empty_input_writes_empty_output(tmp_path, predictor):
+    pd.DataFrame({"x": pd.Series([], dtype="int64")}).to_parquet(tmp_path / "in.parquet")
+    assert predict_file(predictor, tmp_path / "in.parquet", tmp_path / "out.parquet", ["y"]) == 0
+    assert pq.read_table(tmp_path / "out.parquet").column_names == ["y"]
+
+
+def test_failure_removes_partial_output(tmp_path, predictor):
+    pd.DataFrame({"x": range(10)}).to_parquet(tmp_path / "in.parquet")
+    predictor.predict_batch = lambda samples: (_ for _ in ()).throw(ValueError("boom"))
+    with pytest.raises(ValueError):
+        predict_file(predictor, tmp_path / "in.parquet", tmp_path / "out.parquet", ["y"], batch_size=4)
+    assert not (tmp_path / "out.parquet").exists()
+
+
+def test_unsupported_format(tmp_path, predictor):
+    (tmp_path / "in.json").write_text("{}")
+    with pytest.raises(ValueError):
+        predict_file(predictor, tmp_path / "in.json", tmp_path / "out.parquet")
@@ -0,0 +1,121 @@
+"""
+Unit tests for the flattened tree-ensemble engine in TinyML.internal.runtime.trees.
+
+Each supported estimator is fitted on a small synthetic dataset, compiled, and checked for parity with the
+original estimator's predictions.
+"""
+
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.datasets import make_classification, make_regression
+from sklearn.ensemble import (
+    ExtraTreesRegressor,
+    GradientBoostingClassifier,
+    GradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from TinyML.internal.runtime.batch import outputs_match
+from TinyML.internal.runtime.trees import compile_tree_ensemble, is_tree_ensemble
+from TinyML.models import Model, ModelState
+
+X_CLS, Y_CLS = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=0)
+X_REG, Y_REG = make_regression(n_samples=300, n_features=6, random_state=0)
+
+
+@pytest.mark.parametrize(
+    "estimator, X, y",
+    [
+        (DecisionTreeClassifier(random_state=0), X_CLS, Y_CLS),
+        (RandomForestClassifier(n_estimators=10, random_state=0), X_CLS, Y_CLS),
+        (GradientBoostingClassifier(n_estimators=10, random_state=0), X_CLS, Y_CLS),
+        (GradientBoostingClassifier(n_estimators=10, random_state=0), X_CLS, Y_CLS > 0),
+        (xgb.XGBClassifier(n_estimators=10), X_CLS, Y_CLS),
+        (xgb.XGBClassifier(n_estimators=10), X_CLS, (Y_CLS > 0).astype(int)),
+    ],
+)
+def test_classifier_parity(estimator, X, y):
+    estimator.fit(X, y)
+    ensemble = compile_tree_ensemble(estimator)
+    assert np.array_equal(ensemble.predict(X), estimator.predict(X))
+    assert np.allclose(ensemble.predict_proba(X), estimator.predict_proba(X), atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "estimator",
+    [
+        RandomForestRegressor(n_estimators=10, random_state=0),
+        ExtraTreesRegressor(n_estimators=10, random_state=0),
+        GradientBoostingRegressor(n_estimators=20, random_state=0),
+        xgb.XGBRegressor(n_estimators=20),
+    ],
+)
+def test_regressor_parity(estimator):
+    estimator.fit(X_REG, Y_REG)
+    ensemble = compile_tree_ensemble(estimator)
+    assert np.allclose(ensemble.predict(X_REG), estimator.predict(X_REG), rtol=1e-5, atol=1e-3)
+    assert ensemble.predict(X_REG[:1]).shape == (1,)
+
+
+def test_missing_values_follow_the_estimator():
+    X = X_CLS.copy()
+    X[::5, 1] = np.nan
+    for estimator in (RandomForestClassifier(n_estimators=5, random_state=0), xgb.XGBClassifier(n_estimators=5)):
+        estimator.fit(X, Y_CLS)
+        assert np.array_equal(compile_tree_ensemble(estimator).predict(X), estimator.predict(X))
+
+
+def test_chunked_traversal_matches():
+    estimator = RandomForestRegressor(n_estimators=5, random_state=0).fit(X_REG, Y_REG)
+    ensemble = compile_tree_ensemble(estimator)
+    expected = ensemble.predict(X_REG)
+    ensemble.chunk_size = 7
+    assert np.array_equal(ensemble.predict(X_REG), expected)
+
+
+def test_unsupported_estimators():
+    estimator = LinearRegression().fit(X_REG, Y_REG)
+    assert not is_tree_ensemble(estimator)
+    assert not is_tree_ensemble(RandomForestRegressor())
+    assert not is_tree_ensemble(RandomForestRegressor)
+    with pytest.raises(ValueError):
+        compile_tree_ensemble(estimator)
+
+
+def test_input_shape_is_checked():
+    ensemble = compile_tree_ensemble(RandomForestRegressor(n_estimators=2).fit(X_REG, Y_REG))
+    with pytest.raises(ValueError):
+        ensemble.predict(X_REG[:, :3])
+
+
+def test_model_compile_trees():
+    columns = [f"x{i}" for i in range(X_REG.shape[1])]
+    predictor = types.ModuleType("predictor")
+    predictor.estimator = RandomForestRegressor(n_estimators=5, random_state=0).fit(X_REG, Y_REG)
+    predictor.scale = LinearRegression().fit(X_REG, Y_REG)
+    predictor.predict = lambda sample: {"y": float(predictor.estimator.predict([[sample[c] for c in columns]])[0])}
+
+    model = Model(intent="test", input_schema={c: float for c in columns}, output_schema={"y": float})
+    model.training_data = pd.DataFrame(X_REG, columns=columns)
+    model.predictor, model.state = predictor, ModelState.READY
+    expected = model.predict_batch(model.training_data)
+
+    assert model.compile_trees() == ["estimator"]
+    assert model.metadata["compiled_trees"] == ["estimator"]
+    assert not is_tree_ensemble(predictor.estimator)
+    assert outputs_match(expected, model.predict_batch(model.training_data), tolerance=1e-5)
+
+
+def test_outputs_match():
+    a = pd.DataFrame({"y": [1.0, np.nan], "label": ["a", None]})
+    assert outputs_match(a, pd.DataFrame({"y": [1.0 + 1e-9, np.nan], "label": ["a", None]}), tolerance=1e-6)
+    assert not outputs_match(a, pd.DataFrame({"y": [1.1, np.nan], "label": ["a", None]}), tolerance=1e-6)
+    assert not outputs_match(a, pd.DataFrame({"y": [1.0, np.nan], "label": ["b", None]}))
+    assert not outputs_match(a, a[["y"]])
@@ -0,0 +1,50 @@
+"""
+Unit tests for predictor warm-up and latency profiling in TinyML.internal.runtime.warmup.
+"""
+
+import types
+
+import pandas as pd
+import pytest
+from threadpoolctl import threadpool_info
+
+from TinyML.internal.runtime.warmup import profile_predictor, single_threaded, synthesise_inputs
+
+
+def test_synthesise_inputs_follows_schema():
+    samples = synthesise_inputs({"a": int, "b": "float", "c": bool, "d": str}, 5)
+    assert len(samples) == 5
+    for sample in samples:
+        assert isinstance(sample["a"], int)
+        assert isinstance(sample["b"], float)
+        assert isinstance(sample["c"], bool)
+        assert isinstance(sample["d"], str)
+
+
+def test_synthesise_inputs_is_reproducible():
+    assert synthesise_inputs({"a": int}, 10) == synthesise_inputs({"a": int}, 10)
+
+
+def test_profile_predictor_reports_percentiles():
+    predictor = types.ModuleType("predictor")
+    predictor.calls = []
+    predictor.predict = lambda sample: predictor.calls.append(sample) or {"y": 1}
+    predictor.predict_batch = lambda samples: pd.DataFrame({"y": [1] * len(samples)})
+
+    latency = profile_predictor(predictor, synthesise_inputs({"a": int}, 8), batch_size=4, batch_runs=3)
+    assert len(predictor.calls) == 8
+    assert latency["samples"] == 8
+    assert latency["batch_size"] == 4
+    for prefix in ("single", "batch"):
+        assert 0 <= latency[f"{prefix}_p50_ms"] <= latency[f"{prefix}_p95_ms"] <= latency[f"{prefix}_p99_ms"]
+    assert latency["first_call_ms"] >= 0
+
+
+def test_profile_predictor_requires_samples():
+    with pytest.raises(ValueError):
+        profile_predictor(types.ModuleType("predictor"), [], batch_size=1, batch_runs=1)
+
+
+def test_single_threaded_limits_native_thread_pools():
+    with single_threaded():
+        assert all(pool["num_threads"] == 1 for pool in threadpool_info())
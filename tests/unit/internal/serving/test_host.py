@@ -0,0 +1,171 @@
+"""
+Unit tests for the ModelHost class in TinyML.internal.serving.host.
+
+Archives are "loaded" by a stub loader, which returns stub models whose artifacts are files of known size.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from TinyML.internal.serving import host as host_module
+from TinyML.internal.serving.host import ModelHost, estimate_model_memory
+
+
+class StubModel:
+    def __init__(self, files_path: Path, artifact_size: int):
+        self.files_path = files_path
+        self.files_path.mkdir(parents=True, exist_ok=True)
+        artifact = files_path / "model.joblib"
+        artifact.write_bytes(b"\0" * artifact_size)
+        self.artifacts = [str(artifact)]
+        self.predictor_source = ""
+        self.trainer_source = ""
+        self.async_executor = None
+
+    def predict(self, x: dict) -> dict:
+        return {"y": x["x"] * 2}
+
+
+@pytest.fixture
+def loader(tmp_path, monkeypatch):
+    # Resident memory growth is noisy in a test process, so estimates rely on artifact sizes only
+    monkeypatch.setattr(host_module, "_resident_memory", lambda: None)
+    calls = []
+
+    def load(path: str) -> StubModel:
+        calls.append(path)
+        return StubModel(tmp_path / "cache" / Path(path).name, artifact_size=1000)
+
+    load.calls = calls
+    return load
+
+
+def test_estimate_model_memory(tmp_path):
+    model = StubModel(tmp_path / "model", artifact_size=500)
+    model.predictor_source = "x" * 20
+    assert estimate_model_memory(model) == 520
+
+
+def test_models_are_loaded_once_and_reused(loader):
+    host = ModelHost(memory_budget_bytes=10_000, loader=loader)
+    assert host.predict("a.tar.gz", {"x": 2}) == {"y": 4}
+    assert host.predict("a.tar.gz", {"x": 3}) == {"y": 6}
+    assert loader.calls == ["a.tar.gz"]
+    stats = host.stats()
+    assert (stats["loads"], stats["hits"], stats["evictions"]) == (1, 1, 0)
+    assert stats["memory_bytes"] == 1000
+
+
+def test_least_recently_used_model_is_evicted_over_budget(loader):
+    host = ModelHost(memory_budget_bytes=2500, loader=loader)
+    a = host.get("a.tar.gz")
+    host.get("b.tar.gz")
+    host.get("a.tar.gz")  # "b" is now the least recently used
+    host.get("c.tar.gz")
+
+    models = host.stats()["models"]
+    assert sorted(Path(key).name for key in models) == ["a.tar.gz", "c.tar.gz"]
+    assert host.stats()["evictions"] == 1
+    assert a.files_path.exists()
+    assert not (a.files_path.parent / "b.tar.gz").exists()
+
+    host.get("b.tar.gz")
+    assert loader.calls.count("b.tar.gz") == 2
+
+
+def test_model_larger_than_budget_is_kept(loader):
+    host = ModelHost(memory_budget_bytes=500, loader=loader)
+    host.get("a.tar.gz")
+    host.get("b.tar.gz")
+    assert [Path(key).name for key in host.stats()["models"]] == ["b.tar.gz"]
+
+
+def test_explicit_eviction(loader):
+    host = ModelHost(memory_budget_bytes=10_000, loader=loader, cleanup_files=False)
+    model = host.get("a.tar.gz")
+    assert host.evict("a.tar.gz")
+    assert not host.evict("a.tar.gz")
+    assert model.files_path.exists()
+    assert host.stats()["models"] == {}
+
+
+def test_held_model_is_released_after_its_last_request(loader):
+    host = ModelHost(memory_budget_bytes=1500, loader=loader)
+    with host.use("a.tar.gz") as a:
+        host.get("b.tar.gz")  # evicts "a", which is still held
+        assert [Path(key).name for key in host.stats()["models"]] == ["b.tar.gz"]
+        assert a.files_path.exists()
+        assert a.predict({"x": 1}) == {"y": 2}
+    assert not a.files_path.exists()
+
+
+def test_archives_sharing_a_cache_directory_keep_each_others_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(host_module, "_resident_memory", lambda: None)
+    # Two archives of the same model are loaded into the cache directory named after its identifier
+    host = ModelHost(memory_budget_bytes=10_000, loader=lambda path: StubModel(tmp_path / "model-id", 100))
+    host.get("v1.tar.gz")
+    v2 = host.get("v2.tar.gz")
+    assert host.evict("v1.tar.gz")
+    assert v2.files_path.exists()
+    assert host.evict("v2.tar.gz")
+    assert not v2.files_path.exists()
+
+
+def test_removing_files_releases_them_from_the_artifact_store(tmp_path, loader, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    released = []
+    monkeypatch.setattr(host_module.ArtifactStore, "release", lambda store, paths: released.append(list(paths)))
+    monkeypatch.setattr(host_module.ArtifactStore, "prune", lambda store: pytest.fail("the store should not be pruned"))
+    host = ModelHost(memory_budget_bytes=10_000, loader=loader)
+    host.get("a.tar.gz")
+    assert host.evict("a.tar.gz")
+    assert released == []  # no store has been created in this directory
+
+    host_module.ArtifactStore()
+    model = host.get("b.tar.gz")
+    assert host.evict("b.tar.gz")
+    assert released == [model.artifacts]
+
+
+def test_concurrent_requests_share_a_single_load(tmp_path, monkeypatch):
+    monkeypatch.setattr(host_module, "_resident_memory", lambda: None)
+    calls = []
+
+    def slow_loader(path: str) -> StubModel:
+        calls.append(path)
+        time.sleep(0.1)
+        return StubModel(tmp_path / Path(path).name, artifact_size=10)
+
+    host = ModelHost(memory_budget_bytes=10_000, loader=slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(host.get("a.tar.gz"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["a.tar.gz"]
+    assert len(results) == 8 and all(result is results[0] for result in results)
+
+
+def test_failed_load_is_retried(loader):
+    attempts = []
+
+    def flaky_loader(path: str):
+        attempts.append(path)
+        if len(attempts) == 1:
+            raise RuntimeError("corrupt archive")
+        return loader(path)
+
+    host = ModelHost(memory_budget_bytes=10_000, loader=flaky_loader)
+    with pytest.raises(RuntimeError, match="corrupt archive"):
+        host.get("a.tar.gz")
+    assert host.predict("a.tar.gz", {"x": 1}) == {"y": 2}
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        ModelHost(memory_budget_bytes=0)
@@ -0,0 +1,151 @@
+"""
+Unit tests for the PreforkServer class in TinyML.internal.serving.prefork.
+
+The server forks, so it is run in a separate Python process with a stub model, and exercised over HTTP.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork serving requires os.fork")
+
+SCRIPT = """
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from TinyML.internal.runtime.metrics import PredictionMetrics
+from TinyML.internal.serving.prefork import PreforkServer
+
+
+class StubModel:
+    def __init__(self, path):
+        self.version = Path(path).read_text()
+        self.loaded_by = os.getpid()
+        self.warmed_up_by = None
+        self.prediction_metrics = PredictionMetrics("stub")
+        self.async_executor = None
+        self.artifacts = []
+        self.files_path = Path(path).parent / f"files-{self.version}"
+        self.files_path.mkdir()
+
+    def warm_up(self):
+        self.warmed_up_by = os.getpid()
+
+    def predict_batch(self, x):
+        with self.prediction_metrics.observe("predict_batch", len(x), batch=True):
+            return pd.DataFrame(
+                {
+                    "y": x["x"] * 2,
+                    "pid": os.getpid(),
+                    "version": self.version,
+                    "loaded_by": self.loaded_by,
+                    "warmed_up_by": self.warmed_up_by,
+                }
+            )
+
+    def describe(self):
+        return {}
+
+
+path = sys.argv[1]
+model = StubModel(path)
+model.predict_batch(pd.DataFrame({"x": [0]}))  # recorded once, in the parent
+server = PreforkServer(model, host="127.0.0.1", port=0, workers=2, max_wait_ms=1, path=path, watch=True, loader=StubModel)
+print(server.address[1], flush=True)
+server.serve_forever(interval=0.1)
+print("stopped", flush=True)
+"""
+
+
+def start(tmp_path):
+    script, archive = tmp_path / "serve.py", tmp_path / "model-a"
+    script.write_text(SCRIPT)
+    archive.write_text("1")
+    env = dict(os.environ, PYTHONPATH=os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    process = subprocess.Popen([sys.executable, str(script), str(archive)], stdout=subprocess.PIPE, text=True, env=env)
+    return process, int(process.stdout.readline())
+
+
+def post(port, endpoint, body):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/{endpoint}", data=json.dumps(body).encode("utf-8"), method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.status, json.loads(response.read())
+
+
+def predict_until(port, version, timeout=10):
+    """Send predictions until both workers have answered with the given model version."""
+    responses = []
+    deadline = time.monotonic() + timeout
+    while len({r["pid"] for r in responses if r["version"] == version}) < 2 and time.monotonic() < deadline:
+        responses.append(post(port, "predict", {"x": 3})[1])
+    return [r for r in responses if r["version"] == version]
+
+
+def stop(process):
+    process.send_signal(signal.SIGTERM)
+    output, _ = process.communicate(timeout=20)
+    assert process.returncode == 0
+    assert "stopped" in output
+
+
+def test_prefork_server_shares_model_across_workers(tmp_path):
+    process, port = start(tmp_path)
+    try:
+        responses = predict_until(port, "1")
+        assert len({r["pid"] for r in responses}) == 2
+
+        assert all(r["y"] == 6 for r in responses)
+        assert all(r["loaded_by"] == process.pid for r in responses)
+        assert process.pid not in {r["pid"] for r in responses}
+        # Each worker warms up the model after it is forked
+        assert all(r["warmed_up_by"] == r["pid"] for r in responses)
+
+        # Every worker serves the calls of all the workers, once they have published their counts
+        time.sleep(1.5)
+        for _ in range(4):
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                text = response.read().decode()
+            assert f'tinyml_predictions_total{{model="stub",method="predict_batch"}} {len(responses) + 1}' in text
+    finally:
+        stop(process)
+
+
+def test_prefork_server_reloads_in_parent(tmp_path):
+    process, port = start(tmp_path)
+    try:
+        first = {r["pid"] for r in predict_until(port, "1")}
+
+        # A reload request received by a worker is done by the parent, which replaces all the workers
+        (tmp_path / "model-b").write_text("2")
+        assert post(port, "reload", {"path": str(tmp_path / "model-b")}) == (
+            202,
+            {"status": "reload requested", "path": str(tmp_path / "model-b")},
+        )
+        responses = predict_until(port, "2")
+        assert len({r["pid"] for r in responses}) == 2
+        assert all(r["loaded_by"] == process.pid and r["pid"] not in first for r in responses)
+
+        # The previous version's files are released once its workers have exited, and not before
+        deadline = time.monotonic() + 10
+        while (tmp_path / "files-1").exists() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert not (tmp_path / "files-1").exists()
+        assert (tmp_path / "files-2").exists()
+
+        # The parent watches the archive that it now serves
+        (tmp_path / "model-b").write_text("3")
+        assert len({r["pid"] for r in predict_until(port, "3")}) == 2
+    finally:
+        stop(process)
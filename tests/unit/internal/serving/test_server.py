@@ -0,0 +1,226 @@
+"""
+Unit tests for the ModelServer class in TinyML.internal.serving.server.
+
+The server is started on a free local port with a stub model, and exercised over HTTP. Reloads use a stub loader,
+which returns a new version of the stub model for each archive it loads.
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from TinyML.internal.runtime.metrics import PredictionMetrics
+from TinyML.internal.serving.server import ModelServer
+
+
+class StubModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, x: pd.DataFrame) -> pd.DataFrame:
+        self.batch_sizes.append(len(x))
+        if (x["x"] < 0).any():
+            raise ValueError("negative input")
+        return pd.DataFrame({"y": x["x"] * 2})
+
+    def describe(self) -> dict:
+        return {"intent": "double x"}
+
+
+@pytest.fixture
+def server():
+    server = ModelServer(StubModel(), host="127.0.0.1", port=0, max_batch_size=16, max_wait_ms=20)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+def request(server, path, body=None):
+    host, port = server.address
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(f"http://{host}:{port}{path}", data=data, method="GET" if data is None else "POST")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_health(server):
+    assert request(server, "/health") == (200, {"status": "ok"})
+
+
+def test_describe(server):
+    assert request(server, "/describe") == (200, {"intent": "double x"})
+
+
+def test_predict_single(server):
+    assert request(server, "/predict", {"x": 3}) == (200, {"y": 6})
+
+
+def test_predict_many(server):
+    assert request(server, "/predict", [{"x": 1}, {"x": 2}]) == (200, [{"y": 2}, {"y": 4}])
+
+
+def test_concurrent_requests_are_batched(server):
+    results = {}
+
+    def worker(i):
+        results[i] = request(server, "/predict", {"x": i})
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    assert all(results[i] == (200, {"y": i * 2}) for i in range(16))
+    assert len(server.model.batch_sizes) < 16
+
+
+def test_invalid_body(server):
+    status, body = request(server, "/predict", [1, 2])
+    assert status == 400
+
+
+def test_prediction_error(server):
+    status, body = request(server, "/predict", {"x": -1})
+    assert status == 500
+    assert "negative input" in body["error"]
+
+
+def test_failing_sample_only_fails_its_request(server):
+    results = {}
+
+    def worker(i):
+        results[i] = request(server, "/predict", {"x": i})
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in (-1, 1, 2, 3)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    assert results[-1][0] == 500
+    assert all(results[i] == (200, {"y": i * 2}) for i in (1, 2, 3))
+
+
+def test_samples_are_validated_against_input_schema(server):
+    server.model.input_schema = {"x": float}
+    status, body = request(server, "/predict", [{"x": 1}, {"z": 1}])
+    assert status == 400
+    assert "Sample 1" in body["error"] and "missing fields ['x']" in body["error"]
+    assert "unknown fields ['z']" in body["error"]
+    assert server.model.batch_sizes == []
+    assert request(server, "/predict", {"x": 1}) == (200, {"y": 2})
+
+
+def test_non_finite_outputs_are_null(server):
+    assert request(server, "/predict", {"x": float("inf")}) == (200, {"y": None})
+
+
+def test_unknown_endpoint(server):
+    assert request(server, "/nope")[0] == 404
+
+
+def test_metrics_endpoint(server):
+    assert request(server, "/metrics")[0] == 404
+
+    metrics = server.model.prediction_metrics = PredictionMetrics("stub")
+    metrics.record("predict_batch", 0.001, n_samples=2, batch=True)
+    host, port = server.address
+    with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+        assert 'tinyml_predictions_total{model="stub",method="predict_batch"} 1' in response.read().decode()
+
+
+class VersionedModel:
+    def __init__(self, factor, files_path):
+        self.factor = factor
+        self.files_path = files_path
+        self.files_path.mkdir(parents=True, exist_ok=True)
+        self.async_executor = None
+        self.entered = threading.Event()
+        self.proceed = threading.Event()
+        self.proceed.set()
+
+    def predict_batch(self, x: pd.DataFrame) -> pd.DataFrame:
+        self.entered.set()
+        self.proceed.wait(timeout=5)
+        return pd.DataFrame({"y": x["x"] * self.factor})
+
+    def describe(self) -> dict:
+        return {"factor": self.factor}
+
+
+@pytest.fixture
+def reloadable(tmp_path):
+    versions = iter(range(3, 10))
+
+    def loader(path):
+        if "broken" in path:
+            raise ValueError("corrupt archive")
+        factor = next(versions)
+        return VersionedModel(factor, tmp_path / f"v{factor}")
+
+    model = VersionedModel(2, tmp_path / "v2")
+    server = ModelServer(model, port=0, max_wait_ms=1, path=str(tmp_path / "model.tar.gz"), loader=loader)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+def test_reload_swaps_model(reloadable):
+    assert request(reloadable, "/predict", {"x": 1}) == (200, {"y": 2})
+    old = reloadable.model
+    assert request(reloadable, "/reload", {}) == (200, {"status": "reloaded", "path": reloadable.path})
+    assert request(reloadable, "/predict", {"x": 1}) == (200, {"y": 3})
+    assert not old.files_path.exists()
+
+
+def test_reload_keeps_metrics(reloadable):
+    metrics = reloadable.model.prediction_metrics = PredictionMetrics("versioned")
+    request(reloadable, "/reload", {})
+    assert reloadable.model.prediction_metrics is metrics
+
+
+def test_in_flight_requests_finish_on_old_model(reloadable):
+    old = reloadable.model
+    old.proceed.clear()
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(response=request(reloadable, "/predict", {"x": 1})))
+    thread.start()
+    assert old.entered.wait(timeout=5)
+
+    reloadable.reload()
+    assert old.files_path.exists()
+    old.proceed.set()
+    thread.join(timeout=5)
+
+    assert result["response"] == (200, {"y": 2})
+    assert not old.files_path.exists()
+    assert request(reloadable, "/predict", {"x": 1}) == (200, {"y": 3})
+
+
+def test_failed_reload_keeps_current_model(reloadable):
+    status, body = request(reloadable, "/reload", {"path": "broken.tar.gz"})
+    assert status == 500
+    assert "corrupt archive" in body["error"]
+    assert request(reloadable, "/predict", {"x": 1}) == (200, {"y": 2})
+
+
+def test_watch_reloads_changed_archive(reloadable):
+    archive = Path(reloadable.path)
+    archive.write_bytes(b"v1")
+    watcher = threading.Thread(target=reloadable._watch, args=(0.02,), daemon=True)
+    watcher.start()
+    time.sleep(0.1)
+    archive.write_bytes(b"version 2")
+
+    deadline = time.monotonic() + 5
+    while reloadable.model.factor == 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert reloadable.model.factor == 3
@@ -0,0 +1,124 @@
+"""
+Unit tests for the random-access model archive format in TinyML.internal.storage.archive.
+"""
+
+import hashlib
+import os
+import zipfile
+
+import pytest
+
+from TinyML.internal.storage.archive import (
+    ModelArchive,
+    defer_artifacts,
+    forget_pending,
+    is_model_archive,
+    materialise_pending,
+    write_model_archive,
+)
+from TinyML.internal.storage.store import ArtifactStore
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    small = tmp_path / "small.txt"
+    small.write_text("hello")
+    large = tmp_path / "large.bin"
+    large.write_bytes(os.urandom(1000) * 3000)
+    return [small, large]
+
+
+@pytest.mark.parametrize("codec", ["zstd", "stored"])
+def test_write_and_read_archive(tmp_path, artifacts, codec):
+    path = tmp_path / "model.zip"
+    write_model_archive(path, {"intent": "test"}, {"predictor.py": "X = 1\n"}, artifacts, codec=codec)
+
+    assert is_model_archive(path)
+    archive = ModelArchive(path)
+    assert archive.artifact_names == ["small.txt", "large.bin"]
+    assert archive.model_data() == {"intent": "test"}
+    assert archive.read_source("predictor.py") == "X = 1\n"
+    assert archive.read_source("trainer.py") is None
+
+    out = tmp_path / "out"
+    paths = archive.materialise_all(archive.artifact_names, out)
+    assert [p.read_bytes() for p in paths] == [a.read_bytes() for a in artifacts]
+    assert sorted(p.name for p in out.iterdir()) == ["large.bin", "small.txt"]
+    if codec == "zstd":
+        with zipfile.ZipFile(path) as zf:
+            assert zf.getinfo("artifacts/large.bin").compress_size < artifacts[1].stat().st_size / 100
+
+
+def test_materialise_links_from_store(tmp_path, artifacts):
+    path = tmp_path / "model.zip"
+    write_model_archive(path, {"intent": "test"}, {}, artifacts)
+    store = ArtifactStore(tmp_path / "store")
+    archive = ModelArchive(path, store)
+    digest = hashlib.sha256(artifacts[1].read_bytes()).hexdigest()
+    assert archive.manifest["artifacts"]["large.bin"]["sha256"] == digest
+
+    first = archive.materialise("large.bin", tmp_path / "first")
+    assert os.path.samefile(first, store.object_path(digest))
+
+    # An artifact already in the store is linked without decompressing the archive again
+    os.remove(path)
+    second = archive.materialise("large.bin", tmp_path / "second")
+    assert os.path.samefile(first, second)
+
+
+def test_other_files_are_not_model_archives(tmp_path):
+    plain = tmp_path / "plain.zip"
+    with zipfile.ZipFile(plain, "w") as zf:
+        zf.writestr("a.txt", "a")
+    (tmp_path / "text.txt").write_text("not a zip")
+    assert not is_model_archive(plain)
+    assert not is_model_archive(tmp_path / "text.txt")
+    with pytest.raises(ValueError, match="not a model archive"):
+        ModelArchive(plain)
+
+
+def test_deferred_artifacts_are_written_when_requested(tmp_path, artifacts):
+    path = tmp_path / "model.zip"
+    write_model_archive(path, {}, {}, artifacts)
+    archive = ModelArchive(path)
+    out = tmp_path / "lazy"
+    defer_artifacts(archive, archive.artifact_names, out)
+
+    # Opening a deferred artifact's path does not write it
+    with pytest.raises(FileNotFoundError):
+        open(out / "small.txt")
+
+    materialise_pending([out / "large.bin"])
+    assert (out / "large.bin").read_bytes() == artifacts[1].read_bytes()
+    assert not (out / "small.txt").exists()
+
+
+@pytest.mark.parametrize("with_store", [False, True])
+def test_materialise_replaces_a_stale_artifact_of_the_same_size(tmp_path, with_store):
+    store = ArtifactStore(tmp_path / "store") if with_store else None
+    artifact = tmp_path / "v1" / "model.bin"
+    artifact.parent.mkdir()
+    artifact.write_bytes(b"a" * 1000)
+    write_model_archive(tmp_path / "v1.zip", {}, {}, [artifact])
+    out = tmp_path / "out"
+    ModelArchive(tmp_path / "v1.zip", store).materialise("model.bin", out)
+
+    # A new version of the model, with an artifact of the same name and size, is loaded into the same directory
+    artifact.write_bytes(b"b" * 1000)
+    write_model_archive(tmp_path / "v2.zip", {}, {}, [artifact])
+    path = ModelArchive(tmp_path / "v2.zip", store).materialise("model.bin", out)
+    assert path.read_bytes() == b"b" * 1000
+
+
+def test_forgotten_artifacts_are_not_written(tmp_path, artifacts):
+    path = tmp_path / "model.zip"
+    write_model_archive(path, {}, {}, artifacts)
+    archive = ModelArchive(path)
+    out = tmp_path / "released"
+    defer_artifacts(archive, archive.artifact_names, out)
+
+    forget_pending([out / name for name in archive.artifact_names])
+    with pytest.raises(FileNotFoundError):
+        open(out / "small.txt")
+    materialise_pending([out / "large.bin"])
+    assert not out.exists()
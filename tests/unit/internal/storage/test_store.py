@@ -0,0 +1,132 @@
+"""
+Unit tests for the content-addressed artifact store in TinyML.internal.storage.store.
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+
+from TinyML.internal.storage.store import ArtifactStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(tmp_path / "store")
+
+
+def no_hardlinks(*args):
+    raise OSError("cross-device link")
+
+
+def test_identical_contents_are_stored_once(store):
+    digest = store.put_stream(io.BytesIO(b"weights"))
+    assert digest == hashlib.sha256(b"weights").hexdigest()
+    assert store.put_bytes(b"weights") == digest
+    assert store.read_bytes(digest) == b"weights"
+    assert len(list((store.root / "objects").glob("*/*"))) == 1
+    assert not list((store.root / "tmp").iterdir())
+
+
+def test_link_shares_the_object(store, tmp_path):
+    digest = store.put_bytes(b"weights")
+    first = store.link(digest, tmp_path / "a" / "model.joblib")
+    second = store.link(digest, tmp_path / "b" / "model.joblib")
+    assert first.read_bytes() == b"weights"
+    assert os.path.samefile(first, second)
+    assert store.object_path(digest).stat().st_nlink == 3
+
+    # An existing file at the target is replaced
+    other = store.put_bytes(b"other weights")
+    assert store.link(other, first).read_bytes() == b"other weights"
+    assert second.read_bytes() == b"weights"
+
+
+def test_link_copies_when_hardlinks_fail(store, tmp_path, monkeypatch):
+    digest = store.put_bytes(b"weights")
+    monkeypatch.setattr(os, "link", no_hardlinks)
+    target = store.link(digest, tmp_path / "model.joblib")
+    assert target.read_bytes() == b"weights"
+
+    # A copied object is still known to be in use, until its copy is removed
+    assert store.prune(grace_seconds=0) == 0
+    assert store.has(digest)
+    target.unlink()
+    assert store.prune(grace_seconds=0) == 1
+    assert not store.has(digest)
+    assert not list((store.root / "refs").iterdir()) and not list((store.root / "targets").iterdir())
+
+
+def test_release_deletes_only_the_released_objects(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "link", no_hardlinks)
+    shared, own, other = store.put_bytes(b"shared"), store.put_bytes(b"own"), store.put_bytes(b"other")
+    released = [store.link(shared, tmp_path / "a" / "shared.bin"), store.link(own, tmp_path / "a" / "own.bin")]
+    store.link(shared, tmp_path / "b" / "shared.bin")
+    for path in released:
+        path.unlink()
+
+    # Objects still referred to by another model, and unrelated objects, are not checked or deleted
+    assert store.release(released, grace_seconds=0) == 1
+    assert store.has(shared) and not store.has(own) and store.has(other)
+    assert store.release(released, grace_seconds=0) == 0
+
+    # Objects younger than the grace period are kept
+    store.link(other, tmp_path / "c" / "other.bin").unlink()
+    assert store.release([tmp_path / "c" / "other.bin"]) == 0
+    assert store.has(other)
+
+
+def test_relinking_a_file_moves_its_reference(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "link", no_hardlinks)
+    old, new = store.put_bytes(b"old weights"), store.put_bytes(b"new weights")
+    store.link(old, tmp_path / "model.bin")
+    store.link(new, tmp_path / "model.bin")
+    assert store.prune(grace_seconds=0) == 1
+    assert not store.has(old) and store.has(new)
+
+
+def test_digest_file_is_memoised(store, tmp_path):
+    path = tmp_path / "model.tar.gz"
+    path.write_bytes(b"archive")
+    digest = store.digest_file(path)
+    assert digest == hashlib.sha256(b"archive").hexdigest()
+    assert len(list((store.root / "paths").iterdir())) == 1
+    assert store.digest_file(path) == digest
+
+    path.write_bytes(b"another archive")
+    assert store.digest_file(path) == hashlib.sha256(b"another archive").hexdigest()
+
+
+def test_index_and_prune(store, tmp_path):
+    used, unused = store.put_bytes(b"used"), store.put_bytes(b"unused")
+    store.link(used, tmp_path / "model" / "used.bin")
+    store.write_index("a" * 64, {"members": {"predictor.py": b"pass"}, "artifacts": {"used.bin": used}})
+    store.write_index("b" * 64, {"members": {}, "artifacts": {"unused.bin": unused}})
+    assert store.read_index("a" * 64)["members"] == {"predictor.py": b"pass"}
+    assert store.read_index("c" * 64) is None
+
+    assert store.prune() == 0
+    assert store.prune(grace_seconds=0) == 1
+    assert store.has(used) and not store.has(unused)
+    assert store.read_index("a" * 64) is not None
+    assert not (store.root / "archives" / ("b" * 64)).exists()
+
+
+def test_prune_removes_stale_digests_and_temporary_files(store, tmp_path):
+    path = tmp_path / "model.tar.gz"
+    path.write_bytes(b"archive")
+    digest = store.digest_file(path)
+    assert store.cached_digest(path) == digest
+    store.write_index(digest, {"members": {}, "artifacts": {}})
+    (store.root / "tmp" / "leftover").write_bytes(b"partial")
+
+    store.prune(grace_seconds=0)
+    assert store.cached_digest(path) == digest
+    assert not (store.root / "tmp" / "leftover").exists()
+
+    # Once the archive changes, its old digest is no longer memoised on any path
+    path.write_bytes(b"another archive")
+    store.prune(grace_seconds=0)
+    assert not list((store.root / "paths").iterdir())
+    assert store.cached_digest(path) is None
@@ -5,8 +5,10 @@ This module verifies:
 1. Validation of conditions during initialization.
 2. Logical operations (AND, OR, NOT) between constraints.
 3. Error handling during condition evaluation.
+4. Batch evaluation, both vectorised and row by row.
 """
 
+import pandas as pd
 import pytest
 from TinyML.constraints import Constraint
 
@@ -94,3 +96,34 @@ def test_runtime_error_handling():
     )
     with pytest.raises(RuntimeError):
         constraint.evaluate({}, {})
+
+
+def test_evaluate_batch_vectorised():
+    constraint = Constraint(
+        condition=lambda inputs, outputs: outputs["value"] > inputs["threshold"],
+        description="Value must exceed the threshold",
+    )
+    inputs = pd.DataFrame({"threshold": [0, 5, 10]})
+    outputs = pd.DataFrame({"value": [1, 5, 11]})
+    assert constraint.evaluate_batch(inputs, outputs).tolist() == [True, False, True]
+    assert constraint._vectorised is True
+
+
+def test_evaluate_batch_falls_back_to_rows():
+    constraint = Constraint(
+        condition=lambda inputs, outputs: outputs["status"] in ("success", "pending"),
+        description="Status must be known",
+    )
+    outputs = pd.DataFrame({"status": ["success", "failure", "pending"]})
+    assert constraint.evaluate_batch(pd.DataFrame(index=range(3)), outputs).tolist() == [True, False, True]
+    assert constraint._vectorised is False
+
+
+def test_evaluate_batch_combined_operators():
+    positive = Constraint(condition=lambda inputs, outputs: outputs["value"] > 0)
+    success = Constraint(condition=lambda inputs, outputs: outputs["status"] == "success")
+    outputs = pd.DataFrame({"value": [1, 0, 1, 0], "status": ["success", "success", "failure", "failure"]})
+    inputs = pd.DataFrame(index=range(4))
+    assert (positive & success).evaluate_batch(inputs, outputs).tolist() == [True, False, False, False]
+    assert (positive | success).evaluate_batch(inputs, outputs).tolist() == [True, True, True, False]
+    assert (~positive).evaluate_batch(inputs, outputs).tolist() == [False, True, False, True]
@@ -16,6 +16,7 @@ from TinyML.exceptions import (
     InvalidSchemaError,
     InstructionError,
     ConstraintError,
+    ConstraintViolationError,
 )
 
 
@@ -54,6 +55,10 @@ def test_constraint_errors():
         raise ConstraintError("Constraint error")
     assert str(exc_info.value) == "Constraint error"
 
+    with pytest.raises(ConstraintError) as exc_info:
+        raise ConstraintViolationError("Constraint violated")
+    assert str(exc_info.value) == "Constraint violated"
+
 
 def test_inheritance_relationships():
     # Check SpecificationError hierarchy
@@ -67,3 +72,4 @@ def test_inheritance_relationships():
 
     # Check ConstraintError hierarchy
     assert issubclass(ConstraintError, SmolmodelsError)
+    assert issubclass(ConstraintViolationError, ConstraintError)
@@ -0,0 +1,164 @@
+"""
+Unit tests for saving models to archives and loading them back, in TinyML.models.
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import shutil
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from TinyML.internal.storage.store import ArtifactStore
+from TinyML.models import Model, ModelState, load_model, save_model
+
+PREDICTOR_SOURCE = """
+from pathlib import Path
+
+# Prédicteur: the offset is read from an artifact
+OFFSET = float(Path({path!r}).read_text())
+
+def predict(sample):
+    return {{"y": sample["x"] + OFFSET}}
+"""
+
+
+def make_model(tmp_path: Path) -> Model:
+    model = Model(intent="add an offset", input_schema={"x": float}, output_schema={"y": float})
+    model.files_path.mkdir(parents=True)
+    artifact = model.files_path / "offset.txt"
+    artifact.write_text("2.5")
+    model.artifacts = [str(artifact)]
+    model.trainer_source = "TRAINED = True\n"
+    model.predictor_source = PREDICTOR_SOURCE.format(path=artifact.as_posix())
+    model.metadata["note"] = "saved"
+    model.state = ModelState.READY
+    return model
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_save_and_load_model(tmp_path, monkeypatch):
+    model = make_model(tmp_path)
+    save_model(model, str(tmp_path / "model"))
+
+    with tarfile.open(tmp_path / "model.tar.gz", "r:gz") as tar:
+        assert tar.getnames() == ["model_data.pkl", "trainer.py", "predictor.py", "offset.txt"]
+
+    loaded = load_model(str(tmp_path / "model.tar.gz"))
+    assert loaded.identifier == model.identifier
+    assert loaded.metadata["note"] == "saved"
+    assert loaded.artifacts == [str(loaded.files_path / "offset.txt")]
+    assert loaded.predictor_source == model.predictor_source
+    assert loaded.trainer.TRAINED
+    assert loaded.predict({"x": 1.0}) == {"y": 3.5}
+    assert sorted(p.name for p in Path(".tinycache").iterdir()) == sorted([model.identifier, "store"])
+
+    # The artifact is linked from the store, and a second load does not read the archive again
+    store = ArtifactStore()
+    assert os.path.samefile(loaded.files_path / "offset.txt", store.object_path(store.put_bytes(b"2.5")))
+    monkeypatch.setattr(tarfile, "open", lambda *args, **kwargs: pytest.fail("the archive should not be read"))
+    reloaded = load_model(str(tmp_path / "model.tar.gz"))
+    assert reloaded.predict({"x": 1.0}) == {"y": 3.5}
+
+
+def test_first_load_reads_the_archive_once(tmp_path, monkeypatch):
+    save_model(make_model(tmp_path), str(tmp_path / "model"))
+    monkeypatch.setattr(ArtifactStore, "digest_file", lambda *args: pytest.fail("the archive should be hashed once"))
+    loaded = load_model(str(tmp_path / "model.tar.gz"))
+    assert loaded.predict({"x": 1.0}) == {"y": 3.5}
+
+    # The index is written under the digest of the whole archive file, which is memoised for the next load
+    store = ArtifactStore()
+    digest = hashlib.sha256((tmp_path / "model.tar.gz").read_bytes()).hexdigest()
+    assert store.cached_digest(tmp_path / "model.tar.gz") == digest
+    assert store.read_index(digest)["members"]["predictor.py"] == loaded.predictor_source.encode("utf-8")
+
+
+def test_save_and_load_random_access_archive(tmp_path):
+    model = make_model(tmp_path)
+    extra = model.files_path / "unused.bin"
+    extra.write_bytes(b"\0" * 1000)
+    model.artifacts.append(str(extra))
+    save_model(model, str(tmp_path / "model.zip"))
+
+    loaded = load_model(str(tmp_path / "model.zip"))
+    assert loaded.predict({"x": 1.0}) == {"y": 3.5}
+    assert loaded.artifacts == [str(loaded.files_path / "offset.txt"), str(loaded.files_path / "unused.bin")]
+    # Every artifact is written when the model is loaded, as a link to the store
+    assert (loaded.files_path / "unused.bin").read_bytes() == b"\0" * 1000
+    assert (loaded.files_path / "offset.txt").stat().st_nlink == 2
+
+    with pytest.raises(ValueError, match="no artifacts named"):
+        load_model(str(tmp_path / "model.zip"), lazy_artifacts=["missing.bin"])
+
+
+def test_load_random_access_archive_with_lazy_artifacts(tmp_path):
+    model = make_model(tmp_path)
+    extra = model.files_path / "unused.bin"
+    extra.write_bytes(b"\0" * 1000)
+    model.artifacts.append(str(extra))
+    save_model(model, str(tmp_path / "model.zip"))
+
+    loaded = load_model(str(tmp_path / "model.zip"), lazy_artifacts=["unused.bin"])
+    assert loaded.predict({"x": 1.0}) == {"y": 3.5}
+    assert not (loaded.files_path / "unused.bin").exists()
+    # A deferred artifact is written when its path is requested
+    assert loaded.artifact_path("unused.bin").read_bytes() == b"\0" * 1000
+    assert loaded.artifact_path("offset.txt") == loaded.files_path / "offset.txt"
+    with pytest.raises(ValueError, match="no artifact named"):
+        loaded.artifact_path("missing.bin")
+
+    # Saving a model writes its deferred artifacts first
+    shutil.rmtree(loaded.files_path)
+    loaded = load_model(str(tmp_path / "model.zip"), lazy_artifacts=["unused.bin"])
+    assert not (loaded.files_path / "unused.bin").exists()
+    save_model(loaded, str(tmp_path / "again"))
+    with tarfile.open(tmp_path / "again.tar.gz", "r:gz") as tar:
+        assert tar.extractfile("unused.bin").read() == b"\0" * 1000
+
+
+def test_load_model_with_artifacts_before_metadata(tmp_path):
+    model = make_model(tmp_path)
+    model_data = {
+        "intent": model.intent,
+        "output_schema": model.output_schema,
+        "input_schema": model.input_schema,
+        "constraints": model.constraints,
+        "metrics": model.metrics,
+        "metadata": model.metadata,
+        "state": model.state.value,
+        "identifier": model.identifier,
+    }
+    with tarfile.open(tmp_path / "legacy.tar.gz", "w:gz") as tar:
+        for name, data in [
+            ("trainer.py", model.trainer_source.encode("utf-8")),
+            ("predictor.py", model.predictor_source.encode("utf-8")),
+            ("offset.txt", b"2.5"),
+            ("model_data.pkl", pickle.dumps(model_data)),
+        ]:
+            tarinfo = tarfile.TarInfo(name=name)
+            tarinfo.size = len(data)
+            tar.addfile(tarinfo, io.BytesIO(data))
+
+    loaded = load_model(str(tmp_path / "legacy.tar.gz"))
+    assert loaded.artifacts == [str(loaded.files_path / "offset.txt")]
+    assert loaded.predict({"x": 0.5}) == {"y": 3.0}
+
+
+def test_load_model_without_model_data(tmp_path):
+    with tarfile.open(tmp_path / "broken.tar.gz", "w:gz") as tar:
+        tarinfo = tarfile.TarInfo(name="offset.txt")
+        tarinfo.size = 3
+        tar.addfile(tarinfo, io.BytesIO(b"2.5"))
+
+    with pytest.raises(ValueError, match="does not contain model data"):
+        load_model(str(tmp_path / "broken.tar.gz"))
+    assert [p.name for p in Path(".tinycache").iterdir()] == ["store"]
+    assert not list(Path(".tinycache/store/archives").iterdir())